@@ -0,0 +1,199 @@
+import asyncio
+import math
+import random
+import time
+import types
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import Any, Literal, TypeVar, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+from src.domain.model import Message, Role, SearchResult
+from src.domain.service import (
+    FinalAnswerService,
+    GeneralAnswerService,
+    SearchQueryGenerationService,
+    TaskPlanningService,
+    TaskResultEvaluationService,
+    TaskResultGenerationService,
+)
+from src.infrastructure.external.llm import LatencyObserver
+
+T = TypeVar("T", bound=BaseModel)
+
+# システムプロンプトから呼び出し元のステージを判定する
+STAGE_BY_SYSTEM_PROMPT = {
+    TaskPlanningService.SYSTEM_PROMPT: "planning",
+    SearchQueryGenerationService.SYSTEM_PROMPT: "query_generation",
+    TaskResultGenerationService.SYSTEM_PROMPT: "result_generation",
+    TaskResultEvaluationService.SYSTEM_PROMPT: "evaluation",
+    GeneralAnswerService.SYSTEM_PROMPT: "general_answer",
+    FinalAnswerService.SYSTEM_PROMPT: "final_answer",
+}
+
+
+@dataclass(frozen=True)
+class LatencyDistribution:
+    """中央値とp95で指定する対数正規分布の遅延"""
+
+    median_seconds: float
+    p95_seconds: float
+
+    def sample(self, rng: random.Random) -> float:
+        if self.median_seconds <= 0:
+            return 0.0
+        sigma = 0.0
+        if self.p95_seconds > self.median_seconds:
+            sigma = math.log(self.p95_seconds / self.median_seconds) / 1.645
+        return rng.lognormvariate(math.log(self.median_seconds), sigma)
+
+
+class StageRecorder:
+    """ステージごとの所要時間を記録する"""
+
+    def __init__(self):
+        self.samples: dict[str, list[float]] = defaultdict(list)
+
+    def record(self, stage: str, seconds: float) -> None:
+        self.samples[stage].append(seconds)
+
+
+class FakeLLMClient:
+    """設定した遅延で決まった応答を返すLLMクライアント
+
+    構造化出力はresponse_modelのスキーマから値を組み立てる。タスク計画の
+    エージェントはweb_search_ratioの割合でweb_searchを選ぶ。
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        latency: LatencyDistribution,
+        rng: random.Random,
+        recorder: StageRecorder,
+        *,
+        latency_observer: LatencyObserver | None = None,
+        observer_stage: str | None = None,
+        web_search_ratio: float = 0.5,
+        stream_chunks: int = 8,
+    ):
+        self._model_name = model_name
+        self._latency = latency
+        self._rng = rng
+        self._recorder = recorder
+        self._latency_observer = latency_observer
+        self._observer_stage = observer_stage or model_name
+        self._web_search_ratio = web_search_ratio
+        self._stream_chunks = stream_chunks
+
+    async def generate(self, messages: list[Message]) -> str:
+        stage = self._stage(messages)
+        await self._wait(stage, self._latency.sample(self._rng))
+        return self._answer(stage)
+
+    async def stream(self, messages: list[Message]) -> AsyncIterator[str]:
+        stage = self._stage(messages)
+        # 受け取った側の処理時間は含めず、応答を待った時間だけを数える
+        model_seconds = 0.0
+        chunk_latency = self._latency.sample(self._rng) / self._stream_chunks
+        answer = self._answer(stage)
+        size = math.ceil(len(answer) / self._stream_chunks)
+        for i in range(0, len(answer), size):
+            started_at = time.monotonic()
+            await asyncio.sleep(chunk_latency)
+            model_seconds += time.monotonic() - started_at
+            yield answer[i : i + size]
+        self._observe(stage, model_seconds)
+
+    async def generate_with_structured_output(
+        self, messages: list[Message], response_model: type[T]
+    ) -> T:
+        stage = self._stage(messages)
+        await self._wait(stage, self._latency.sample(self._rng))
+        return self._build_model(response_model, 1)
+
+    def _stage(self, messages: list[Message]) -> str:
+        if messages and messages[0].role == Role.SYSTEM:
+            return STAGE_BY_SYSTEM_PROMPT.get(messages[0].content, "llm")
+        return "llm"
+
+    async def _wait(self, stage: str, seconds: float) -> None:
+        started_at = time.monotonic()
+        await asyncio.sleep(seconds)
+        self._observe(stage, time.monotonic() - started_at)
+
+    def _observe(self, stage: str, seconds: float) -> None:
+        self._recorder.record(stage, seconds)
+        if self._latency_observer is not None:
+            self._latency_observer(f"llm:{self._observer_stage}", seconds, False)
+
+    def _answer(self, stage: str) -> str:
+        sentence = f"{stage}の結果です。根拠は検索結果[1]と[2]に基づきます。"
+        return sentence * 10
+
+    def _build_model(self, model: type[BaseModel], index: int) -> Any:
+        values = {
+            name: self._build_value(field.annotation, name, index)
+            for name, field in model.model_fields.items()
+        }
+        return model(**values)
+
+    def _build_value(self, annotation: Any, name: str, index: int) -> Any:  # noqa: PLR0911
+        origin = get_origin(annotation)
+        args = get_args(annotation)
+
+        if origin is Literal:
+            if "web_search" in args:
+                return (
+                    "web_search"
+                    if self._rng.random() < self._web_search_ratio
+                    else "general_answer"
+                )
+            return args[0]
+        if origin in (Union, types.UnionType):
+            if type(None) in args:
+                return None
+            return self._build_value(args[0], name, index)
+        if origin is list:
+            return [self._build_value(args[0], name, i) for i in (1, 2)]
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            return self._build_model(annotation, index)
+        if annotation is bool:
+            return True
+        if annotation is int:
+            return index
+        if annotation is float:
+            return float(index)
+        # 一括回答のタスクIDは「task-1」形式
+        if name.endswith("_id"):
+            return f"task-{index}"
+        return f"{name} {index}"
+
+
+class FakeSearchClient:
+    """設定した遅延で決まった検索結果を返す検索クライアント"""
+
+    def __init__(
+        self,
+        latency: LatencyDistribution,
+        rng: random.Random,
+        recorder: StageRecorder,
+    ):
+        self._latency = latency
+        self._rng = rng
+        self._recorder = recorder
+
+    async def search(self, query: str, num_results: int = 3) -> list[SearchResult]:
+        started_at = time.monotonic()
+        await asyncio.sleep(self._latency.sample(self._rng))
+        self._recorder.record("search", time.monotonic() - started_at)
+        return [
+            SearchResult(
+                url=f"https://example.com/{abs(hash(query)) % 10_000}/{i}",
+                title=f"{query} {i}",
+                content=f"{query}についての解説です。" * 20,
+            )
+            for i in range(1, num_results + 1)
+        ]
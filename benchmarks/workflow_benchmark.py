@@ -0,0 +1,276 @@
+"""ワークフローの負荷ベンチマーク
+
+偽のLLMクライアントと検索クライアントでLangGraphWorkflowService.executeを
+同時実行し、同時実行数ごとのスループット・ステージ別の遅延・イベントループの
+遅延・ピークRSSを計測してJSONで出力する。
+
+    uv run python -m benchmarks.workflow_benchmark --concurrency 1,10,50 \\
+        --requests 200 --output benchmark.json --baseline previous.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from src.domain.model import ChatSession
+from src.infrastructure.external.llm import LatencyObserver, ModelFactory
+from src.infrastructure.langgraph.graph import LangGraphWorkflowService
+
+from .fakes import FakeLLMClient, FakeSearchClient, LatencyDistribution, StageRecorder
+
+
+class EventLoopLagMonitor:
+    """一定間隔でスリープし、予定より遅れて再開した時間をイベントループの遅延として記録する"""
+
+    def __init__(self, interval_seconds: float = 0.01):
+        self._interval_seconds = interval_seconds
+        self.samples: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+
+    async def _run(self) -> None:
+        while True:
+            started_at = time.monotonic()
+            await asyncio.sleep(self._interval_seconds)
+            lag = time.monotonic() - started_at - self._interval_seconds
+            self.samples.append(max(lag, 0.0))
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    """件数・平均・p50/p95/p99・最大(秒)"""
+    if not samples:
+        return {"count": 0}
+
+    if len(samples) > 1:
+        quantiles = statistics.quantiles(samples, n=100, method="inclusive")
+        p50, p95, p99 = quantiles[49], quantiles[94], quantiles[98]
+    else:
+        p50 = p95 = p99 = samples[0]
+
+    return {
+        "count": len(samples),
+        "mean": statistics.fmean(samples),
+        "p50": p50,
+        "p95": p95,
+        "p99": p99,
+        "max": max(samples),
+    }
+
+
+def peak_rss_mb() -> float:
+    """プロセス開始からのピークRSS(MB)"""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linuxはキロバイト、macOSはバイト単位
+    return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+
+
+def build_service(
+    args: argparse.Namespace, rng: random.Random, recorder: StageRecorder
+) -> LangGraphWorkflowService:
+    llm_latency = LatencyDistribution(args.llm_median, args.llm_p95)
+    search_latency = LatencyDistribution(args.search_median, args.search_p95)
+
+    def llm_client_factory(
+        model_name: str, stage: str, latency_observer: LatencyObserver
+    ):
+        return FakeLLMClient(
+            model_name=model_name,
+            observer_stage=stage,
+            latency=llm_latency,
+            rng=rng,
+            recorder=recorder,
+            latency_observer=latency_observer,
+            web_search_ratio=args.web_search_ratio,
+        )
+
+    return LangGraphWorkflowService(
+        model_factory=ModelFactory(google_api_key="benchmark"),
+        llm_client_factory=llm_client_factory,
+        search_client=FakeSearchClient(search_latency, rng, recorder),
+    )
+
+
+async def run_level(
+    concurrency: int, args: argparse.Namespace, level_index: int
+) -> dict[str, Any]:
+    """指定した同時実行数でリクエストを実行し、計測結果を返す"""
+    rng = random.Random(args.seed + level_index)
+    recorder = StageRecorder()
+    service = build_service(args, rng, recorder)
+    errors: Counter[str] = Counter()
+    next_request = iter(range(args.requests))
+
+    async def worker() -> None:
+        for i in next_request:
+            conversation_id = f"C{i % args.channels:05d}_{level_index}.{i}"
+            chat_session = ChatSession.create(
+                id=conversation_id,
+                thread_id=f"{level_index}.{i}",
+                user_id=f"U{i:06d}",
+                channel_id=f"C{i % args.channels:05d}",
+            )
+            chat_session.add_user_message(args.question)
+            context = {
+                "user_id": chat_session.user_id,
+                "channel_id": chat_session.channel_id,
+                "thread_ts": chat_session.thread_id,
+                "message_ts": chat_session.thread_id,
+                "conversation_id": conversation_id,
+            }
+
+            started_at = time.monotonic()
+            try:
+                await service.execute(chat_session, context)
+            except Exception as e:
+                errors[type(e).__name__] += 1
+            else:
+                recorder.record("workflow", time.monotonic() - started_at)
+
+    monitor = EventLoopLagMonitor()
+    monitor.start()
+    started_at = time.monotonic()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.monotonic() - started_at
+    await monitor.stop()
+
+    completed = len(recorder.samples["workflow"])
+    return {
+        "concurrency": concurrency,
+        "requests": args.requests,
+        "completed": completed,
+        "errors": dict(errors),
+        "duration_seconds": duration,
+        "throughput_rps": completed / duration if duration else 0.0,
+        "stages": {
+            stage: summarize(samples)
+            for stage, samples in sorted(recorder.samples.items())
+        },
+        "event_loop_lag": summarize(monitor.samples),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(result: dict[str, Any], baseline: dict[str, Any]) -> list[str]:
+    """同じ同時実行数の結果と比較し、スループットとワークフローp95の変化を返す"""
+    baseline_levels = {level["concurrency"]: level for level in baseline["levels"]}
+    lines = []
+    for level in result["levels"]:
+        previous = baseline_levels.get(level["concurrency"])
+        if previous is None:
+            continue
+
+        throughput_change = _change(level["throughput_rps"], previous["throughput_rps"])
+        p95_change = _change(
+            level["stages"].get("workflow", {}).get("p95", 0.0),
+            previous["stages"].get("workflow", {}).get("p95", 0.0),
+        )
+        lines.append(
+            f"concurrency={level['concurrency']}: "
+            f"throughput {throughput_change:+.1%}, workflow p95 {p95_change:+.1%}"
+        )
+    return lines
+
+
+def _change(current: float, previous: float) -> float:
+    return (current - previous) / previous if previous else 0.0
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    levels = []
+    for index, concurrency in enumerate(args.concurrency):
+        level = await run_level(concurrency, args, index)
+        levels.append(level)
+        workflow = level["stages"].get("workflow", {})
+        sys.stderr.write(
+            f"concurrency={concurrency}: {level['throughput_rps']:.2f} req/s, "
+            f"workflow p50={workflow.get('p50', 0):.3f}s "
+            f"p95={workflow.get('p95', 0):.3f}s p99={workflow.get('p99', 0):.3f}s, "
+            f"event loop lag p99={level['event_loop_lag'].get('p99', 0) * 1000:.1f}ms, "
+            f"errors={level['errors']}\n"
+        )
+
+    return {
+        "benchmark": "workflow",
+        "created_at": datetime.now().isoformat(),
+        "git_revision": git_revision(),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "levels": levels,
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--concurrency",
+        type=lambda value: [int(v) for v in value.split(",")],
+        default=[1, 10, 50],
+        help="カンマ区切りの同時実行数",
+    )
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--channels", type=int, default=10)
+    parser.add_argument("--web-search-ratio", type=float, default=0.5)
+    parser.add_argument("--llm-median", type=float, default=0.5)
+    parser.add_argument("--llm-p95", type=float, default=1.5)
+    parser.add_argument("--search-median", type=float, default=0.3)
+    parser.add_argument("--search-p95", type=float, default=1.0)
+    parser.add_argument("--question", default="Pythonの最新バージョンについて教えて")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--output", help="結果のJSONを書き出すファイル(省略時は標準出力)"
+    )
+    parser.add_argument("--baseline", help="比較する過去の結果のJSONファイル")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    # ワークフローのログは出力しない(流量制限による拒否はerrorsに集計する)
+    logging.disable(logging.WARNING)
+
+    result = asyncio.run(run(args))
+    output = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(output, encoding="utf-8")
+    else:
+        sys.stdout.write(output + "\n")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        for line in compare(result, baseline):
+            sys.stderr.write(line + "\n")
+
+
+if __name__ == "__main__":
+    main()
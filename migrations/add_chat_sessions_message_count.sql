@@ -0,0 +1,8 @@
+-- depends: add_chat_sessions_version create_messages
+
+ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS message_count INTEGER NOT NULL DEFAULT 0;
+
+UPDATE chat_sessions cs
+SET message_count = (
+    SELECT count(*) FROM messages m WHERE m.chat_session_id = cs.id
+);
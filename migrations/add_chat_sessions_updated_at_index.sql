@@ -0,0 +1,3 @@
+-- depends: create_chat_sessions
+
+CREATE INDEX IF NOT EXISTS idx_chat_sessions_updated_at ON chat_sessions(updated_at, id);
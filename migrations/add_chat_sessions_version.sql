@@ -0,0 +1,3 @@
+-- depends: create_chat_sessions
+
+ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 0;
@@ -0,0 +1,3 @@
+-- depends: create_tasks
+
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS timings_json JSONB;
@@ -0,0 +1,5 @@
+-- depends: create_web_documents
+
+-- ページ本文を最後に保存(参照)した日時。保存時の行ロックと合わせて、
+-- 保存中のセッションが参照する本文を未参照の本文の削除で消さないようにする
+ALTER TABLE web_documents ADD COLUMN IF NOT EXISTS saved_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP;
@@ -0,0 +1,17 @@
+CREATE TABLE IF NOT EXISTS slack_event_jobs (
+    id UUID PRIMARY KEY,
+    event_id VARCHAR(255) NOT NULL UNIQUE,
+    payload JSONB NOT NULL,
+    status VARCHAR(50) NOT NULL CHECK (status IN ('queued', 'running', 'completed', 'dead')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    locked_until TIMESTAMP WITH TIME ZONE,
+    last_error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_slack_event_jobs_queued ON slack_event_jobs(available_at) WHERE status = 'queued';
+CREATE INDEX IF NOT EXISTS idx_slack_event_jobs_running ON slack_event_jobs(locked_until) WHERE status = 'running';
+CREATE INDEX IF NOT EXISTS idx_slack_event_jobs_status ON slack_event_jobs(status);
@@ -0,0 +1,54 @@
+-- depends: create_tasks
+
+-- 検索結果のページ本文を本文のハッシュで1件にまとめて保存する
+CREATE TABLE IF NOT EXISTS web_documents (
+    id CHAR(64) PRIMARY KEY,
+    content BYTEA NOT NULL,
+    compression VARCHAR(16) NOT NULL CHECK (compression IN ('none', 'zlib')),
+    original_size INTEGER NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 既存のタスクログに埋め込まれた本文を移す(SQLでは圧縮できないため非圧縮で保存する)
+INSERT INTO web_documents (id, content, compression, original_size)
+SELECT DISTINCT ON (document_id) document_id, content, 'none', octet_length(content)
+FROM (
+    SELECT
+        encode(sha256(convert_to(r->>'content', 'UTF8')), 'hex') AS document_id,
+        convert_to(r->>'content', 'UTF8') AS content
+    FROM tasks t,
+        jsonb_array_elements(t.task_log_json->'attempts') AS a,
+        jsonb_array_elements(a->'results') AS r
+    WHERE t.agent_name = 'web_search' AND r ? 'content'
+) AS contents
+ON CONFLICT (id) DO NOTHING;
+
+-- タスクログの検索結果は本文の代わりにcontent_idで参照する
+UPDATE tasks t
+SET task_log_json = t.task_log_json || jsonb_build_object(
+    'attempts',
+    (
+        SELECT COALESCE(jsonb_agg(
+            a || jsonb_build_object(
+                'results',
+                (
+                    SELECT COALESCE(jsonb_agg(
+                        CASE WHEN r ? 'content' THEN
+                            (r - 'content') || jsonb_build_object(
+                                'content_id',
+                                encode(sha256(convert_to(r->>'content', 'UTF8')), 'hex')
+                            )
+                        ELSE r END
+                        ORDER BY result_index
+                    ), '[]'::jsonb)
+                    FROM jsonb_array_elements(a->'results')
+                        WITH ORDINALITY AS results(r, result_index)
+                )
+            )
+            ORDER BY attempt_index
+        ), '[]'::jsonb)
+        FROM jsonb_array_elements(t.task_log_json->'attempts')
+            WITH ORDINALITY AS attempts(a, attempt_index)
+    )
+)
+WHERE t.agent_name = 'web_search' AND t.task_log_json ? 'attempts';
@@ -2,10 +2,12 @@ from src.application.exception.base import ApplicationException
 from src.application.exception.usecase_exception import (
     InvalidInputError,
     UseCaseException,
+    WorkflowSupersededError,
 )
 
 __all__ = [
     "ApplicationException",
     "InvalidInputError",
     "UseCaseException",
+    "WorkflowSupersededError",
 ]
@@ -14,3 +14,14 @@ class InvalidInputError(UseCaseException):
         self.field_name = field_name
         message = f"{field_name}が不正です"
         super().__init__(message)
+
+
+class WorkflowSupersededError(UseCaseException):
+    """同じ会話の新しいメッセージによりワークフローが中断された場合の例外"""
+
+    status_code = 409
+
+    def __init__(self, conversation_id: str):
+        self.conversation_id = conversation_id
+        message = f"新しいメッセージにより処理を中断しました: {conversation_id}"
+        super().__init__(message)
@@ -0,0 +1,16 @@
+from .conversation_run_registry import (
+    ConversationRunRegistry,
+    SupersedePolicy,
+    WorkflowRun,
+)
+from .conversation_work_queue import ConversationWorkQueue, PendingMessage
+from .in_process_conversation_lock import InProcessConversationLock
+
+__all__ = [
+    "ConversationRunRegistry",
+    "ConversationWorkQueue",
+    "InProcessConversationLock",
+    "PendingMessage",
+    "SupersedePolicy",
+    "WorkflowRun",
+]
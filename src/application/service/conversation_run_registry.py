@@ -0,0 +1,69 @@
+import asyncio
+from dataclasses import dataclass
+from enum import Enum
+
+from ...log import get_logger
+
+logger = get_logger(__name__)
+
+
+class SupersedePolicy(Enum):
+    """同じ会話に新しいメッセージが届いたときの実行中ワークフローの扱い
+
+    - NONE: 実行中のワークフローは最後まで実行する
+    - CANCEL: 実行中のワークフローを中断し、そのメッセージは破棄する
+    - MERGE: 実行中のワークフローを中断し、そのメッセージを新しい実行にまとめて回答する
+    """
+
+    NONE = "none"
+    CANCEL = "cancel"
+    MERGE = "merge"
+
+
+@dataclass(eq=False)
+class WorkflowRun:
+    """会話ごとに実行中のワークフロー"""
+
+    conversation_id: str
+    task: asyncio.Task | None = None
+    superseded: bool = False
+
+
+class ConversationRunRegistry:
+    """会話ごとに実行中のワークフローを管理し、新しいメッセージで古い実行を中断する"""
+
+    def __init__(self, policy: SupersedePolicy = SupersedePolicy.NONE):
+        self.policy = policy
+        self._runs: dict[str, WorkflowRun] = {}
+        self.superseded_count = 0
+
+    def register(self, conversation_id: str, task: asyncio.Task) -> WorkflowRun:
+        """実行を開始したワークフローを登録する"""
+        run = WorkflowRun(conversation_id=conversation_id, task=task)
+        self._runs[conversation_id] = run
+        return run
+
+    def supersede(self, conversation_id: str) -> bool:
+        """ポリシーに従って同じ会話の実行中のワークフローを中断する"""
+        if self.policy == SupersedePolicy.NONE:
+            return False
+
+        run = self._runs.get(conversation_id)
+        if run is None or run.superseded or (run.task is not None and run.task.done()):
+            return False
+
+        run.superseded = True
+        if run.task is not None:
+            run.task.cancel()
+        self.superseded_count += 1
+
+        logger.info(
+            f"新しいメッセージを受け付けたため実行中のワークフローを中断しました "
+            f"(conversation_id={conversation_id}, policy={self.policy.value}, "
+            f"累計: {self.superseded_count}件)"
+        )
+        return True
+
+    def unregister(self, run: WorkflowRun) -> None:
+        if self._runs.get(run.conversation_id) is run:
+            del self._runs[run.conversation_id]
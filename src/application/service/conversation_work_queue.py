@@ -0,0 +1,43 @@
+from collections import deque
+from dataclasses import dataclass
+
+
+@dataclass(eq=False)
+class PendingMessage:
+    """会話のワークフローでまだ処理されていないユーザーメッセージ"""
+
+    content: str
+    consumed: bool = False
+
+
+class ConversationWorkQueue:
+    """会話ごとに未処理のユーザーメッセージを到着順に保持するキュー
+
+    ロックを取得した実行が会話の未処理メッセージをまとめて取り出すことで、
+    連続して届いたメッセージを1回のワークフロー実行にまとめる。
+    """
+
+    def __init__(self):
+        self._queues: dict[str, deque[PendingMessage]] = {}
+
+    def enqueue(self, conversation_id: str, content: str) -> PendingMessage:
+        message = PendingMessage(content=content)
+        self._queues.setdefault(conversation_id, deque()).append(message)
+        return message
+
+    def take_all(self, conversation_id: str) -> list[PendingMessage]:
+        """未処理のメッセージをすべて取り出し、処理済みにする"""
+        queue = self._queues.pop(conversation_id, deque())
+        for message in queue:
+            message.consumed = True
+        return list(queue)
+
+    def requeue(self, conversation_id: str, messages: list[PendingMessage]) -> None:
+        """処理を中断したメッセージを先頭に戻し、次の実行に引き継ぐ"""
+        queue = self._queues.setdefault(conversation_id, deque())
+        for message in reversed(messages):
+            message.consumed = False
+            queue.appendleft(message)
+
+    def pending_count(self, conversation_id: str) -> int:
+        return len(self._queues.get(conversation_id, ()))
@@ -0,0 +1,27 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+
+class InProcessConversationLock:
+    """プロセス内で会話ごとに処理を直列化するロック
+
+    待機中・実行中の処理がなくなった会話のロックは破棄する。
+    """
+
+    def __init__(self):
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._holders: dict[str, int] = {}
+
+    @asynccontextmanager
+    async def acquire(self, conversation_id: str) -> AsyncIterator[None]:
+        lock = self._locks.setdefault(conversation_id, asyncio.Lock())
+        self._holders[conversation_id] = self._holders.get(conversation_id, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._holders[conversation_id] -= 1
+            if not self._holders[conversation_id]:
+                del self._holders[conversation_id]
+                del self._locks[conversation_id]
@@ -1,12 +1,25 @@
-from src.application.exception.usecase_exception import InvalidInputError
+import asyncio
 
+from src.application.exception.usecase_exception import (
+    InvalidInputError,
+    WorkflowSupersededError,
+)
+
+from ...domain.exception import ChatSessionConflictError
 from ...domain.model import ChatSession
 from ...domain.repository import ChatSessionRepository
 from ...domain.service.interfaces import WorkflowService
+from ...domain.service.port import AnswerStream, ConversationLock
 from ..dto.answer_to_user_request_usecase import (
     AnswerToUserRequestInput,
     AnswerToUserRequestOutput,
 )
+from ..service import (
+    ConversationRunRegistry,
+    ConversationWorkQueue,
+    InProcessConversationLock,
+    SupersedePolicy,
+)
 
 
 class AnswerToUserRequestUseCase:
@@ -14,12 +27,26 @@ class AnswerToUserRequestUseCase:
         self,
         workflow_service: WorkflowService,
         chat_session_repository: ChatSessionRepository,
+        run_registry: ConversationRunRegistry | None = None,
+        conversation_lock: ConversationLock | None = None,
+        *,
+        coalesce_window_seconds: float = 0.0,
+        max_save_attempts: int = 3,
+        history_max_messages: int | None = None,
     ):
         self._workflow_service = workflow_service
         self._chat_session_repository = chat_session_repository
+        self._run_registry = run_registry or ConversationRunRegistry()
+        self._conversation_lock = conversation_lock or InProcessConversationLock()
+        self._coalesce_window_seconds = coalesce_window_seconds
+        self._max_save_attempts = max_save_attempts
+        self._history_max_messages = history_max_messages
+        self._work_queue = ConversationWorkQueue()
 
     async def execute(
-        self, input_dto: AnswerToUserRequestInput
+        self,
+        input_dto: AnswerToUserRequestInput,
+        answer_stream: AnswerStream | None = None,
     ) -> AnswerToUserRequestOutput:
         if not input_dto.user_message:
             raise InvalidInputError("user_message")
@@ -28,29 +55,86 @@ class AnswerToUserRequestUseCase:
         if not conversation_id:
             raise InvalidInputError("conversation_id")
 
-        # チャットセッションを取得または作成
-        chat_session = await self._chat_session_repository.find_by_id(conversation_id)
-        if not chat_session:
-            chat_session = ChatSession.create(
-                id=conversation_id,
-                thread_id=input_dto.context.get("thread_ts"),
-                user_id=input_dto.context.get("user_id", ""),
-                channel_id=input_dto.context.get("channel_id", ""),
+        # 未処理のメッセージとして積み、実行中のワークフローはポリシーに従って中断する
+        pending = self._work_queue.enqueue(conversation_id, input_dto.user_message)
+        self._run_registry.supersede(conversation_id)
+
+        # 同じ会話の処理は到着順に1件ずつ実行する
+        async with self._conversation_lock.acquire(conversation_id):
+            if pending.consumed:
+                # 先に実行された処理にまとめて回答済み
+                raise WorkflowSupersededError(conversation_id)
+
+            if self._coalesce_window_seconds > 0:
+                await asyncio.sleep(self._coalesce_window_seconds)
+            messages = self._work_queue.take_all(conversation_id)
+
+            # チャットセッションを取得または作成(回答には直近のメッセージ履歴だけを使う)
+            chat_session = await self._chat_session_repository.find_by_id(
+                conversation_id,
+                include_task_plans=False,
+                max_messages=self._history_max_messages,
             )
+            if not chat_session:
+                chat_session = ChatSession.create(
+                    id=conversation_id,
+                    thread_id=input_dto.context.get("thread_ts"),
+                    user_id=input_dto.context.get("user_id", ""),
+                    channel_id=input_dto.context.get("channel_id", ""),
+                )
 
-        # ユーザーメッセージを追加
-        chat_session.add_user_message(input_dto.user_message)
+            # ユーザーメッセージを追加(連続して届いたメッセージはまとめて追加する)
+            chat_session.add_user_message(
+                "\n\n".join(message.content for message in messages)
+            )
+
+            # ワークフロー実行
+            workflow_task = asyncio.ensure_future(
+                self._workflow_service.execute(
+                    chat_session, input_dto.context, answer_stream=answer_stream
+                )
+            )
+            run = self._run_registry.register(conversation_id, workflow_task)
+            try:
+                result = await workflow_task
+            except asyncio.CancelledError:
+                if run.superseded:
+                    if self._run_registry.policy == SupersedePolicy.MERGE:
+                        self._work_queue.requeue(conversation_id, messages)
+                    raise WorkflowSupersededError(conversation_id) from None
+                raise
+            finally:
+                self._run_registry.unregister(run)
 
-        # ワークフロー実行
-        result = await self._workflow_service.execute(chat_session, input_dto.context)
+            # 結果をチャットセッションに追加
+            chat_session.add_assistant_message(result.answer)
+            chat_session.add_task_plan(result.task_plan)
+            message_id = chat_session.last_assistant_message_id()
 
-        # 結果をチャットセッションに追加
-        chat_session.add_assistant_message(result.answer)
-        chat_session.add_task_plan(result.task_plan)
+            await self._save(chat_session)
 
-        await self._chat_session_repository.save(chat_session)
+        return AnswerToUserRequestOutput(answer=result.answer, message_id=message_id)
 
-        return AnswerToUserRequestOutput(
-            answer=result.answer,
-            message_id=chat_session.last_assistant_message_id(),
-        )
+    async def _save(self, chat_session: ChatSession) -> None:
+        """チャットセッションを保存する
+
+        他の処理(別インスタンスなど)が先に保存していた場合は、最新の状態を
+        読み直して今回追加したメッセージとタスク計画を取り込み、保存し直す。
+        """
+        for attempt in range(1, self._max_save_attempts + 1):
+            try:
+                await self._chat_session_repository.save(chat_session)
+                return
+            except ChatSessionConflictError:
+                if attempt == self._max_save_attempts:
+                    raise
+
+            latest = await self._chat_session_repository.find_by_id(
+                chat_session.id,
+                include_task_plans=False,
+                max_messages=self._history_max_messages,
+            )
+            if latest is None:
+                raise ChatSessionConflictError(chat_session.id, chat_session.version)
+            latest.merge_pending(chat_session)
+            chat_session = latest
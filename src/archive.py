@@ -0,0 +1,75 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from .config import (
+    ARCHIVE_CHUNK_SIZE,
+    ARCHIVE_DELETE_BATCH_SIZE,
+    ARCHIVE_GCS_BUCKET,
+    ARCHIVE_GCS_PREFIX,
+    ARCHIVE_LOCAL_DIR,
+    ARCHIVE_MAX_CHUNKS,
+    ARCHIVE_RETENTION_DAYS,
+    ARCHIVE_STORAGE_BACKEND,
+)
+from .infrastructure.archive import (
+    ArchiveStorage,
+    GcsArchiveStorage,
+    LocalArchiveStorage,
+    SessionArchiver,
+)
+from .infrastructure.database import DatabasePool, run_migrations
+from .infrastructure.repository import ChatSessionRepository, FeedbackRepository
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+
+def create_archive_storage() -> ArchiveStorage:
+    """ARCHIVE_STORAGE_BACKENDに応じたアーカイブの保存先を作成"""
+    if ARCHIVE_STORAGE_BACKEND == "gcs":
+        if not ARCHIVE_GCS_BUCKET:
+            raise ValueError("環境変数 ARCHIVE_GCS_BUCKET が設定されていません。")
+        return GcsArchiveStorage(ARCHIVE_GCS_BUCKET, ARCHIVE_GCS_PREFIX)
+    if ARCHIVE_STORAGE_BACKEND == "local":
+        return LocalArchiveStorage(ARCHIVE_LOCAL_DIR)
+    raise ValueError(
+        f"ARCHIVE_STORAGE_BACKEND の値が不正です: {ARCHIVE_STORAGE_BACKEND}"
+    )
+
+
+async def run_archive():
+    """保持期間を過ぎたチャットセッションをアーカイブして削除するジョブ"""
+    storage = create_archive_storage()
+
+    logger.info("データベースマイグレーションを実行中...")
+    run_migrations()
+    logger.info("データベースマイグレーションが完了しました")
+
+    logger.info("データベース接続プールを初期化中...")
+    await DatabasePool.initialize()
+    logger.info("データベース接続プールの初期化が完了しました")
+
+    archiver = SessionArchiver(
+        ChatSessionRepository(),
+        FeedbackRepository(),
+        storage,
+        chunk_size=max(ARCHIVE_CHUNK_SIZE, 1),
+        delete_batch_size=max(ARCHIVE_DELETE_BATCH_SIZE, 1),
+    )
+    cutoff = datetime.now() - timedelta(days=ARCHIVE_RETENTION_DAYS)
+    try:
+        logger.info(
+            f"{cutoff.isoformat()} より前のチャットセッションをアーカイブします"
+        )
+        await archiver.run(cutoff, max_chunks=ARCHIVE_MAX_CHUNKS or None)
+    finally:
+        await DatabasePool.close()
+        logger.info("データベース接続プールをクローズしました")
+
+
+def main():
+    asyncio.run(run_archive())
+
+
+if __name__ == "__main__":
+    main()
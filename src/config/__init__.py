@@ -4,6 +4,17 @@ from dotenv import load_dotenv
 
 load_dotenv(override=True)
 
+
+def _parse_key_values(value: str) -> dict[str, float]:
+    """「ID:値,ID:値」形式の環境変数を辞書に変換する"""
+    result: dict[str, float] = {}
+    for item in value.split(","):
+        key, _, number = item.strip().partition(":")
+        if key and number:
+            result[key.strip()] = float(number)
+    return result
+
+
 # Slack関連
 SLACK_BOT_TOKEN = os.environ.get("SLACK_BOT_TOKEN")
 SLACK_APP_TOKEN = os.environ.get("SLACK_APP_TOKEN")
@@ -18,3 +29,207 @@ POSTGRES_URL = os.environ.get("POSTGRES_URL")
 
 # 環境設定
 ENV = os.environ.get("ENV")
+
+# ワークフロー関連
+# タスク計画と並行して一般回答を投機的に生成するか
+SPECULATIVE_GENERAL_ANSWER_ENABLED = (
+    os.environ.get("SPECULATIVE_GENERAL_ANSWER_ENABLED", "false").lower() == "true"
+)
+
+# 最終回答をSlackへ逐次表示するか、およびchat.updateの最小間隔(秒)
+STREAMING_ANSWER_ENABLED = (
+    os.environ.get("STREAMING_ANSWER_ENABLED", "false").lower() == "true"
+)
+STREAMING_UPDATE_INTERVAL_SECONDS = float(
+    os.environ.get("STREAMING_UPDATE_INTERVAL_SECONDS", "1.0")
+)
+
+# リクエスト全体のタイムアウト(秒)
+WORKFLOW_REQUEST_TIMEOUT_SECONDS = float(
+    os.environ.get("WORKFLOW_REQUEST_TIMEOUT_SECONDS", "120")
+)
+
+# 同じ会話に新しいメッセージが届いたときの実行中ワークフローの扱い(none / cancel / merge)
+WORKFLOW_SUPERSEDE_POLICY = os.environ.get("WORKFLOW_SUPERSEDE_POLICY", "none").lower()
+
+# ワークフローのチェックポイントをPostgreSQLに保存し、中断した実行を再開する
+WORKFLOW_CHECKPOINT_ENABLED = (
+    os.environ.get("WORKFLOW_CHECKPOINT_ENABLED", "false").lower() == "true"
+)
+WORKFLOW_CHECKPOINT_POOL_SIZE = int(
+    os.environ.get("WORKFLOW_CHECKPOINT_POOL_SIZE", "10")
+)
+
+# 会話ごとの直列化ロック(memory: プロセス内のみ / postgres: アドバイザリロックで複数インスタンス間)
+CONVERSATION_LOCK_BACKEND = os.environ.get(
+    "CONVERSATION_LOCK_BACKEND", "memory"
+).lower()
+# 実行中のワークフローごとに1接続を保持する(0の場合は同時実行数の上限に合わせる)
+CONVERSATION_LOCK_POOL_SIZE = int(os.environ.get("CONVERSATION_LOCK_POOL_SIZE", "0"))
+# 接続を確保できるまで待つ時間(秒)。超えた場合は混雑として扱う
+CONVERSATION_LOCK_CONNECTION_TIMEOUT_SECONDS = float(
+    os.environ.get("CONVERSATION_LOCK_CONNECTION_TIMEOUT_SECONDS", "30")
+)
+# 連続して届いたメッセージを1回の実行にまとめるために待つ時間(秒)
+CONVERSATION_COALESCE_WINDOW_SECONDS = float(
+    os.environ.get("CONVERSATION_COALESCE_WINDOW_SECONDS", "0")
+)
+
+# Slackイベントをジョブキュー経由で処理する(trueの場合、イベント受信時はキューへの登録のみ行う)
+SLACK_EVENT_QUEUE_ENABLED = (
+    os.environ.get("SLACK_EVENT_QUEUE_ENABLED", "false").lower() == "true"
+)
+# 受信プロセス内で起動するワーカー数(0の場合は別プロセスのワーカーのみで処理する)
+JOB_WORKER_CONCURRENCY = int(os.environ.get("JOB_WORKER_CONCURRENCY", "4"))
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "3"))
+JOB_VISIBILITY_TIMEOUT_SECONDS = float(
+    os.environ.get("JOB_VISIBILITY_TIMEOUT_SECONDS", "300")
+)
+JOB_RETRY_BASE_DELAY_SECONDS = float(
+    os.environ.get("JOB_RETRY_BASE_DELAY_SECONDS", "5")
+)
+JOB_POLL_INTERVAL_SECONDS = float(os.environ.get("JOB_POLL_INTERVAL_SECONDS", "1"))
+# 完了したジョブを残す時間(0は削除しない)
+JOB_COMPLETED_RETENTION_HOURS = float(
+    os.environ.get("JOB_COMPLETED_RETENTION_HOURS", "24")
+)
+JOB_CLEANUP_INTERVAL_SECONDS = float(
+    os.environ.get("JOB_CLEANUP_INTERVAL_SECONDS", "3600")
+)
+
+# チャットセッションの保存をSlackへの回答後にバックグラウンドで行う
+CHAT_SESSION_WRITE_BEHIND_ENABLED = (
+    os.environ.get("CHAT_SESSION_WRITE_BEHIND_ENABLED", "false").lower() == "true"
+)
+# 書き込み待ちの上限件数(超える場合は保存が空きを待つ)と同時に書き込む件数
+CHAT_SESSION_WRITE_BEHIND_MAX_PENDING = int(
+    os.environ.get("CHAT_SESSION_WRITE_BEHIND_MAX_PENDING", "100")
+)
+CHAT_SESSION_WRITE_BEHIND_CONCURRENCY = int(
+    os.environ.get("CHAT_SESSION_WRITE_BEHIND_CONCURRENCY", "4")
+)
+CHAT_SESSION_WRITE_BEHIND_MAX_ATTEMPTS = int(
+    os.environ.get("CHAT_SESSION_WRITE_BEHIND_MAX_ATTEMPTS", "5")
+)
+CHAT_SESSION_WRITE_BEHIND_RETRY_BASE_DELAY_SECONDS = float(
+    os.environ.get("CHAT_SESSION_WRITE_BEHIND_RETRY_BASE_DELAY_SECONDS", "0.5")
+)
+# シャットダウン時に書き込み待ちの完了を待つ最大時間(秒)
+CHAT_SESSION_WRITE_BEHIND_FLUSH_TIMEOUT_SECONDS = float(
+    os.environ.get("CHAT_SESSION_WRITE_BEHIND_FLUSH_TIMEOUT_SECONDS", "30")
+)
+
+# チャットセッションのメッセージ履歴をプロセス内にキャッシュする(件数とメモリ量(MB)の上限)
+CHAT_SESSION_CACHE_ENABLED = (
+    os.environ.get("CHAT_SESSION_CACHE_ENABLED", "false").lower() == "true"
+)
+CHAT_SESSION_CACHE_MAX_ENTRIES = int(
+    os.environ.get("CHAT_SESSION_CACHE_MAX_ENTRIES", "1000")
+)
+CHAT_SESSION_CACHE_MAX_MB = float(os.environ.get("CHAT_SESSION_CACHE_MAX_MB", "64"))
+
+# 回答の生成に読み込む直近のメッセージ件数(0はすべて読み込む)
+CHAT_SESSION_HISTORY_MAX_MESSAGES = int(
+    os.environ.get("CHAT_SESSION_HISTORY_MAX_MESSAGES", "50")
+)
+
+# ノードごとの制限時間(秒)。タスク実行は最終回答の生成時間を残して打ち切る
+WORKFLOW_PLANNING_TIMEOUT_SECONDS = float(
+    os.environ.get("WORKFLOW_PLANNING_TIMEOUT_SECONDS", "20")
+)
+WORKFLOW_WEB_SEARCH_TIMEOUT_SECONDS = float(
+    os.environ.get("WORKFLOW_WEB_SEARCH_TIMEOUT_SECONDS", "60")
+)
+WORKFLOW_GENERAL_ANSWER_TIMEOUT_SECONDS = float(
+    os.environ.get("WORKFLOW_GENERAL_ANSWER_TIMEOUT_SECONDS", "30")
+)
+WORKFLOW_FINAL_ANSWER_RESERVE_SECONDS = float(
+    os.environ.get("WORKFLOW_FINAL_ANSWER_RESERVE_SECONDS", "20")
+)
+
+# ワークフローの同時実行数(LLMの遅延・エラーに応じてmin〜maxの範囲で調整)
+WORKFLOW_CONCURRENCY_MIN_LIMIT = int(
+    os.environ.get("WORKFLOW_CONCURRENCY_MIN_LIMIT", "10")
+)
+WORKFLOW_CONCURRENCY_MAX_LIMIT = int(
+    os.environ.get("WORKFLOW_CONCURRENCY_MAX_LIMIT", "100")
+)
+WORKFLOW_CONCURRENCY_INITIAL_LIMIT = int(
+    os.environ.get("WORKFLOW_CONCURRENCY_INITIAL_LIMIT", "60")
+)
+WORKFLOW_CONCURRENCY_LATENCY_TOLERANCE = float(
+    os.environ.get("WORKFLOW_CONCURRENCY_LATENCY_TOLERANCE", "2.0")
+)
+WORKFLOW_CONCURRENCY_BACKOFF_RATIO = float(
+    os.environ.get("WORKFLOW_CONCURRENCY_BACKOFF_RATIO", "0.9")
+)
+
+# 実行待ちキューの上限件数と最大待ち時間(秒)。超える場合は混雑として即時に拒否する
+WORKFLOW_ADMISSION_MAX_QUEUE_DEPTH = int(
+    os.environ.get("WORKFLOW_ADMISSION_MAX_QUEUE_DEPTH", "100")
+)
+WORKFLOW_ADMISSION_MAX_WAIT_SECONDS = float(
+    os.environ.get("WORKFLOW_ADMISSION_MAX_WAIT_SECONDS", "30")
+)
+
+# ユーザー・チャンネルごとの同時実行数の上限(0は無制限)、個別の上限とスケジューリングの重み
+WORKFLOW_MAX_IN_FLIGHT_PER_USER = int(
+    os.environ.get("WORKFLOW_MAX_IN_FLIGHT_PER_USER", "5")
+)
+WORKFLOW_MAX_IN_FLIGHT_PER_CHANNEL = int(
+    os.environ.get("WORKFLOW_MAX_IN_FLIGHT_PER_CHANNEL", "20")
+)
+WORKFLOW_USER_QUOTAS = {
+    key: int(value)
+    for key, value in _parse_key_values(
+        os.environ.get("WORKFLOW_USER_QUOTAS", "")
+    ).items()
+}
+WORKFLOW_CHANNEL_QUOTAS = {
+    key: int(value)
+    for key, value in _parse_key_values(
+        os.environ.get("WORKFLOW_CHANNEL_QUOTAS", "")
+    ).items()
+}
+WORKFLOW_CHANNEL_WEIGHTS = _parse_key_values(
+    os.environ.get("WORKFLOW_CHANNEL_WEIGHTS", "")
+)
+
+# Web検索ポリシー(負荷は同時実行上限に対する実行中ワークフローの割合)
+WEB_SEARCH_MODERATE_LOAD_THRESHOLD = float(
+    os.environ.get("WEB_SEARCH_MODERATE_LOAD_THRESHOLD", "0.5")
+)
+WEB_SEARCH_HIGH_LOAD_THRESHOLD = float(
+    os.environ.get("WEB_SEARCH_HIGH_LOAD_THRESHOLD", "0.8")
+)
+WEB_SEARCH_MIN_FULL_REMAINING_SECONDS = float(
+    os.environ.get("WEB_SEARCH_MIN_FULL_REMAINING_SECONDS", "60")
+)
+WEB_SEARCH_MIN_REDUCED_REMAINING_SECONDS = float(
+    os.environ.get("WEB_SEARCH_MIN_REDUCED_REMAINING_SECONDS", "30")
+)
+
+# タスク結果の事前評価(off / shadow / enforce)
+PRE_EVALUATION_MODE = os.environ.get("PRE_EVALUATION_MODE", "off").lower()
+PRE_EVALUATION_MIN_CITATIONS = int(os.environ.get("PRE_EVALUATION_MIN_CITATIONS", "2"))
+PRE_EVALUATION_MIN_SOURCE_COVERAGE = float(
+    os.environ.get("PRE_EVALUATION_MIN_SOURCE_COVERAGE", "0.3")
+)
+PRE_EVALUATION_MIN_LENGTH = int(os.environ.get("PRE_EVALUATION_MIN_LENGTH", "200"))
+PRE_EVALUATION_MIN_TERM_OVERLAP = float(
+    os.environ.get("PRE_EVALUATION_MIN_TERM_OVERLAP", "0.6")
+)
+PRE_EVALUATION_ACCEPT_SCORE = float(
+    os.environ.get("PRE_EVALUATION_ACCEPT_SCORE", "1.0")
+)
+
+# 古いチャットセッションのアーカイブ(ARCHIVE_STORAGE_BACKENDはlocal / gcs)
+ARCHIVE_RETENTION_DAYS = int(os.environ.get("ARCHIVE_RETENTION_DAYS", "90"))
+ARCHIVE_STORAGE_BACKEND = os.environ.get("ARCHIVE_STORAGE_BACKEND", "local").lower()
+ARCHIVE_LOCAL_DIR = os.environ.get("ARCHIVE_LOCAL_DIR", "archive")
+ARCHIVE_GCS_BUCKET = os.environ.get("ARCHIVE_GCS_BUCKET")
+ARCHIVE_GCS_PREFIX = os.environ.get("ARCHIVE_GCS_PREFIX", "")
+ARCHIVE_CHUNK_SIZE = int(os.environ.get("ARCHIVE_CHUNK_SIZE", "100"))
+ARCHIVE_DELETE_BATCH_SIZE = int(os.environ.get("ARCHIVE_DELETE_BATCH_SIZE", "20"))
+# 1回の実行で処理するチャンク数の上限(0は上限なし)
+ARCHIVE_MAX_CHUNKS = int(os.environ.get("ARCHIVE_MAX_CHUNKS", "0"))
@@ -1,14 +1,55 @@
 from slack_sdk.web.async_client import AsyncWebClient
 
+from .application.service import (
+    ConversationRunRegistry,
+    InProcessConversationLock,
+    SupersedePolicy,
+)
 from .application.usecase import FeedbackUseCase
 from .application.usecase.answer_to_user_request_usecase import (
     AnswerToUserRequestUseCase,
 )
-from .config import GOOGLE_API_KEY
+from .config import (
+    CHAT_SESSION_CACHE_ENABLED,
+    CHAT_SESSION_CACHE_MAX_ENTRIES,
+    CHAT_SESSION_CACHE_MAX_MB,
+    CHAT_SESSION_HISTORY_MAX_MESSAGES,
+    CHAT_SESSION_WRITE_BEHIND_CONCURRENCY,
+    CHAT_SESSION_WRITE_BEHIND_ENABLED,
+    CHAT_SESSION_WRITE_BEHIND_FLUSH_TIMEOUT_SECONDS,
+    CHAT_SESSION_WRITE_BEHIND_MAX_ATTEMPTS,
+    CHAT_SESSION_WRITE_BEHIND_MAX_PENDING,
+    CHAT_SESSION_WRITE_BEHIND_RETRY_BASE_DELAY_SECONDS,
+    CONVERSATION_COALESCE_WINDOW_SECONDS,
+    CONVERSATION_LOCK_BACKEND,
+    CONVERSATION_LOCK_CONNECTION_TIMEOUT_SECONDS,
+    CONVERSATION_LOCK_POOL_SIZE,
+    GOOGLE_API_KEY,
+    JOB_CLEANUP_INTERVAL_SECONDS,
+    JOB_COMPLETED_RETENTION_HOURS,
+    JOB_MAX_ATTEMPTS,
+    JOB_POLL_INTERVAL_SECONDS,
+    JOB_RETRY_BASE_DELAY_SECONDS,
+    JOB_VISIBILITY_TIMEOUT_SECONDS,
+    JOB_WORKER_CONCURRENCY,
+    POSTGRES_URL,
+    SLACK_EVENT_QUEUE_ENABLED,
+    STREAMING_ANSWER_ENABLED,
+    STREAMING_UPDATE_INTERVAL_SECONDS,
+    WORKFLOW_CONCURRENCY_MAX_LIMIT,
+    WORKFLOW_SUPERSEDE_POLICY,
+)
 from .infrastructure.external.llm import ModelFactory
 from .infrastructure.external.slack import SlackMessageService
 from .infrastructure.langgraph.graph import LangGraphWorkflowService
-from .infrastructure.repository import ChatSessionRepository, FeedbackRepository
+from .infrastructure.lock import PostgresConversationLock
+from .infrastructure.queue import Job, JobWorker, PostgresJobQueue
+from .infrastructure.repository import (
+    CachedChatSessionRepository,
+    ChatSessionRepository,
+    FeedbackRepository,
+    WriteBehindChatSessionRepository,
+)
 from .presentation.controllers import SlackFeedbackController, SlackMessageController
 from .presentation.mapper import SlackRequestMapper
 
@@ -17,9 +58,45 @@ class DIContainer:
     def __init__(self, slack_client: AsyncWebClient):
         # インフラストラクチャ層
         self._model_factory = ModelFactory(google_api_key=GOOGLE_API_KEY)
-        self._slack_service = SlackMessageService(slack_client=slack_client)
+        self._slack_service = SlackMessageService(
+            slack_client=slack_client,
+            streaming_update_interval=STREAMING_UPDATE_INTERVAL_SECONDS,
+        )
         self._chat_session_repository = ChatSessionRepository()
+        self._write_behind_repository = None
+        if CHAT_SESSION_WRITE_BEHIND_ENABLED:
+            self._write_behind_repository = WriteBehindChatSessionRepository(
+                repository=self._chat_session_repository,
+                max_pending=CHAT_SESSION_WRITE_BEHIND_MAX_PENDING,
+                concurrency=CHAT_SESSION_WRITE_BEHIND_CONCURRENCY,
+                max_attempts=CHAT_SESSION_WRITE_BEHIND_MAX_ATTEMPTS,
+                retry_base_delay_seconds=CHAT_SESSION_WRITE_BEHIND_RETRY_BASE_DELAY_SECONDS,
+            )
+            self._chat_session_repository = self._write_behind_repository
+        if CHAT_SESSION_CACHE_ENABLED:
+            self._chat_session_repository = CachedChatSessionRepository(
+                repository=self._chat_session_repository,
+                max_entries=CHAT_SESSION_CACHE_MAX_ENTRIES,
+                max_bytes=int(CHAT_SESSION_CACHE_MAX_MB * 1024 * 1024),
+            )
         self._feedback_repository = FeedbackRepository()
+        self._job_queue = PostgresJobQueue(
+            max_attempts=JOB_MAX_ATTEMPTS,
+            visibility_timeout_seconds=JOB_VISIBILITY_TIMEOUT_SECONDS,
+            retry_base_delay_seconds=JOB_RETRY_BASE_DELAY_SECONDS,
+        )
+        self._conversation_lock = None
+        if CONVERSATION_LOCK_BACKEND == "postgres":
+            if not POSTGRES_URL:
+                raise ValueError("POSTGRES_URL環境変数が設定されていません")
+            self._conversation_lock = PostgresConversationLock(
+                postgres_url=POSTGRES_URL,
+                local_lock=InProcessConversationLock(),
+                max_connections=(
+                    CONVERSATION_LOCK_POOL_SIZE or WORKFLOW_CONCURRENCY_MAX_LIMIT
+                ),
+                connection_timeout_seconds=CONVERSATION_LOCK_CONNECTION_TIMEOUT_SECONDS,
+            )
 
         # ドメイン層
         self._workflow_service = LangGraphWorkflowService(
@@ -30,6 +107,12 @@ class DIContainer:
         self._use_case = AnswerToUserRequestUseCase(
             workflow_service=self._workflow_service,
             chat_session_repository=self._chat_session_repository,
+            run_registry=ConversationRunRegistry(
+                policy=SupersedePolicy(WORKFLOW_SUPERSEDE_POLICY)
+            ),
+            conversation_lock=self._conversation_lock,
+            coalesce_window_seconds=CONVERSATION_COALESCE_WINDOW_SECONDS,
+            history_max_messages=CHAT_SESSION_HISTORY_MAX_MESSAGES or None,
         )
         self._feedback_usecase = FeedbackUseCase(
             feedback_repository=self._feedback_repository,
@@ -41,11 +124,53 @@ class DIContainer:
             use_case=self._use_case,
             mapper=self._mapper,
             slack_service=self._slack_service,
+            streaming_enabled=STREAMING_ANSWER_ENABLED,
+            job_queue=self._job_queue if SLACK_EVENT_QUEUE_ENABLED else None,
         )
         self._feedback_controller = SlackFeedbackController(
             feedback_usecase=self._feedback_usecase,
         )
 
+    def create_job_worker(self, concurrency: int = JOB_WORKER_CONCURRENCY) -> JobWorker:
+        """ジョブキューのSlackイベントに回答するワーカーを作成"""
+
+        async def handle(job: Job) -> None:
+            async def remember_placeholder(ts: str) -> None:
+                await self._job_queue.set_placeholder_ts(job, ts)
+
+            await self._controller.process_event(
+                job.payload,
+                deduplicate=False,
+                notify_errors=job.is_last_attempt,
+                placeholder_ts=job.placeholder_ts,
+                on_placeholder_posted=remember_placeholder,
+            )
+
+        return JobWorker(
+            job_queue=self._job_queue,
+            handler=handle,
+            concurrency=concurrency,
+            poll_interval_seconds=JOB_POLL_INTERVAL_SECONDS,
+            lease_extension_interval_seconds=JOB_VISIBILITY_TIMEOUT_SECONDS / 3,
+            completed_retention_seconds=(
+                JOB_COMPLETED_RETENTION_HOURS * 3600
+                if JOB_COMPLETED_RETENTION_HOURS > 0
+                else None
+            ),
+            cleanup_interval_seconds=JOB_CLEANUP_INTERVAL_SECONDS,
+        )
+
+    async def close(self) -> None:
+        """コンテナが保持するリソースを解放"""
+        # 接続プールを閉じる前に書き込み待ちのチャットセッションを書き込む
+        if self._write_behind_repository:
+            await self._write_behind_repository.close(
+                timeout=CHAT_SESSION_WRITE_BEHIND_FLUSH_TIMEOUT_SECONDS
+            )
+        if isinstance(self._conversation_lock, PostgresConversationLock):
+            await self._conversation_lock.close()
+        await self._workflow_service.close()
+
     @property
     def slack_message_controller(self) -> SlackMessageController:
         return self._controller
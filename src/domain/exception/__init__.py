@@ -1,6 +1,7 @@
 from src.domain.exception.base import DomainException
 from src.domain.exception.chat_session_exception import (
     AssistantMessageNotFoundError,
+    ChatSessionConflictError,
     ChatSessionException,
     InvalidAssistantMessageRoleError,
     InvalidMessageRoleError,
@@ -40,6 +41,7 @@ from src.domain.exception.task_plan_exception import (
 __all__ = [
     "AllTasksFailedError",
     "AssistantMessageNotFoundError",
+    "ChatSessionConflictError",
     "ChatSessionException",
     "DomainException",
     "DomainServiceException",
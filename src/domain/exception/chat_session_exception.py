@@ -39,6 +39,21 @@ class NoneTaskPlanError(ChatSessionException):
         super().__init__(message)
 
 
+class ChatSessionConflictError(ChatSessionException):
+    """読み込んだ後に他の処理がチャットセッションを保存していた場合の例外"""
+
+    status_code = 409
+
+    def __init__(self, chat_session_id: str, expected_version: int):
+        self.chat_session_id = chat_session_id
+        self.expected_version = expected_version
+        message = (
+            f"チャットセッションが他の処理で更新されています: {chat_session_id} "
+            f"(読み込み時のバージョン: {expected_version})"
+        )
+        super().__init__(message)
+
+
 class UserMessageNotFoundError(ChatSessionException):
     """ユーザーメッセージが存在しない場合の例外"""
 
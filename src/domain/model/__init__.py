@@ -6,6 +6,8 @@ from .task import AgentName, Task, TaskStatus
 from .task_evaluation import TaskEvaluation
 from .task_log import TaskLog
 from .task_plan import TaskPlan
+from .task_pre_evaluation import TaskPreEvaluation
+from .task_timing import TaskTiming
 from .web_search_task_log import SearchResult, WebSearchTaskLog
 from .workflow_result import WorkflowResult
 
@@ -22,6 +24,8 @@ __all__ = [
     "TaskEvaluation",
     "TaskLog",
     "TaskPlan",
+    "TaskPreEvaluation",
+    "TaskTiming",
     "SearchResult",
     "WebSearchTaskLog",
     "WorkflowResult",
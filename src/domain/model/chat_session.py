@@ -1,4 +1,6 @@
 from datetime import datetime
+from typing import Any
+from uuid import UUID
 
 from src.domain.exception.chat_session_exception import (
     AssistantMessageNotFoundError,
@@ -9,6 +11,7 @@ from src.domain.exception.chat_session_exception import (
 )
 
 from .message import Message, Role
+from .task import Task
 from .task_plan import TaskPlan
 
 
@@ -23,6 +26,9 @@ class ChatSession:
         task_plans: list[TaskPlan],
         created_at: datetime,
         updated_at: datetime,
+        *,
+        version: int = 0,
+        omitted_message_count: int = 0,
     ):
         self._id = id
         self._thread_id = thread_id
@@ -32,6 +38,14 @@ class ChatSession:
         self._task_plans = task_plans
         self._created_at = created_at
         self._updated_at = updated_at
+        # 永続化済みの状態のバージョン(保存のたびに1ずつ増える。未保存は0)
+        self._version = version
+        # 読み込まなかった古いメッセージの件数(直近の一部だけを読み込んだ場合)
+        self._omitted_message_count = omitted_message_count
+
+        # 永続化後に追加されたメッセージとタスク計画(保存時に差分だけを書き込む)
+        self._pending_message_ids: set[UUID] = set()
+        self._pending_task_plan_ids: set[UUID] = set()
 
     @classmethod
     def create(
@@ -60,6 +74,9 @@ class ChatSession:
         task_plans: list[TaskPlan],
         created_at: datetime,
         updated_at: datetime,
+        *,
+        version: int = 0,
+        omitted_message_count: int = 0,
     ) -> "ChatSession":
         return cls(
             id=id,
@@ -70,6 +87,8 @@ class ChatSession:
             task_plans=task_plans,
             created_at=created_at,
             updated_at=updated_at,
+            version=version,
+            omitted_message_count=omitted_message_count,
         )
 
     @property
@@ -94,6 +113,7 @@ class ChatSession:
 
     @property
     def task_plans(self) -> list[TaskPlan]:
+        """タスク計画(過去の計画を読み込まずに復元した場合は、追加した計画のみ)"""
         return self._task_plans
 
     @property
@@ -104,6 +124,52 @@ class ChatSession:
     def updated_at(self) -> datetime:
         return self._updated_at
 
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def message_count(self) -> int:
+        """読み込まなかった古いメッセージを含むメッセージの件数"""
+        return self._omitted_message_count + len(self._messages)
+
+    @property
+    def omitted_message_count(self) -> int:
+        return self._omitted_message_count
+
+    def to_dict(self) -> dict[str, Any]:
+        """辞書形式に変換"""
+        return {
+            "id": self._id,
+            "thread_id": self._thread_id,
+            "user_id": self._user_id,
+            "channel_id": self._channel_id,
+            "messages": [message.to_dict() for message in self._messages],
+            "task_plans": [task_plan.to_dict() for task_plan in self._task_plans],
+            "created_at": self._created_at.isoformat(),
+            "updated_at": self._updated_at.isoformat(),
+            "version": self._version,
+            "omitted_message_count": self._omitted_message_count,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "ChatSession":
+        """辞書形式から復元"""
+        return cls.reconstruct(
+            id=data["id"],
+            thread_id=data.get("thread_id"),
+            user_id=data["user_id"],
+            channel_id=data["channel_id"],
+            messages=[Message.from_dict(message) for message in data["messages"]],
+            task_plans=[
+                TaskPlan.from_dict(task_plan) for task_plan in data["task_plans"]
+            ],
+            created_at=datetime.fromisoformat(data["created_at"]),
+            updated_at=datetime.fromisoformat(data["updated_at"]),
+            version=data.get("version", 0),
+            omitted_message_count=data.get("omitted_message_count", 0),
+        )
+
     def last_user_message(self) -> Message:
         """直近のユーザーメッセージを取得"""
         for message in reversed(self._messages):
@@ -123,23 +189,92 @@ class ChatSession:
         if isinstance(content, Message):
             if content.role != Role.USER:
                 raise InvalidUserMessageRoleError()
-            self._messages.append(content)
+            message = content
         else:
             message = Message.create_user_message(content)
-            self._messages.append(message)
+        self._messages.append(message)
+        self._pending_message_ids.add(message.id)
 
     def add_assistant_message(self, content: str | Message):
         """アシスタントからのメッセージを追加"""
         if isinstance(content, Message):
             if content.role != Role.ASSISTANT:
                 raise InvalidAssistantMessageRoleError()
-            self._messages.append(content)
+            message = content
         else:
             message = Message.create_assistant_message(content)
-            self._messages.append(message)
+        self._messages.append(message)
+        self._pending_message_ids.add(message.id)
 
     def add_task_plan(self, task_plan: TaskPlan):
-        """タスク計画を追加"""
+        """タスク計画を追加(同じIDの計画が追加済みの場合は何もしない)"""
         if task_plan is None:
             raise NoneTaskPlanError()
+        if any(existing.id == task_plan.id for existing in self._task_plans):
+            return
         self._task_plans.append(task_plan)
+        self._pending_task_plan_ids.add(task_plan.id)
+
+    def pending_messages(self) -> list[Message]:
+        """永続化後に追加されたメッセージ"""
+        return [
+            message
+            for message in self._messages
+            if message.id in self._pending_message_ids
+        ]
+
+    def pending_task_plans(self) -> list[TaskPlan]:
+        """永続化後に追加されたタスク計画"""
+        return [
+            task_plan
+            for task_plan in self._task_plans
+            if task_plan.id in self._pending_task_plan_ids
+        ]
+
+    def modified_tasks(self) -> list[tuple[TaskPlan, Task]]:
+        """永続化済みのタスク計画のうち、変更されたタスクと所属する計画"""
+        return [
+            (task_plan, task)
+            for task_plan in self._task_plans
+            if task_plan.id not in self._pending_task_plan_ids
+            for task in task_plan.tasks
+            if task.is_modified
+        ]
+
+    def trim_messages(self, max_messages: int) -> None:
+        """直近max_messages件より古いメッセージを取り除く(読み込んだ直後に使う)
+
+        取り除いた件数はomitted_message_countに加える。履歴が回答から始まらない
+        ように、先頭に残ったアシスタントのメッセージも取り除く。
+        """
+        kept = self._messages[-max_messages:] if max_messages > 0 else []
+        while kept and kept[0].role == Role.ASSISTANT:
+            kept.pop(0)
+        self._omitted_message_count += len(self._messages) - len(kept)
+        self._messages = kept
+
+    def merge_pending(self, other: "ChatSession") -> None:
+        """別のインスタンスで追加された未保存のメッセージとタスク計画を取り込む
+
+        保存が競合した場合に、読み直した最新のセッションへ変更を移すために使う。
+        """
+        message_ids = {message.id for message in self._messages}
+        for message in other.pending_messages():
+            if message.id not in message_ids:
+                self._messages.append(message)
+                self._pending_message_ids.add(message.id)
+        for task_plan in other.pending_task_plans():
+            self.add_task_plan(task_plan)
+
+    def mark_persisted(self, version: int | None = None) -> None:
+        """すべての変更を永続化済みとして記録する
+
+        versionを指定した場合は、永続化後のバージョンとして記録する。
+        """
+        if version is not None:
+            self._version = version
+        self._pending_message_ids.clear()
+        self._pending_task_plan_ids.clear()
+        for task_plan in self._task_plans:
+            for task in task_plan.tasks:
+                task.mark_persisted()
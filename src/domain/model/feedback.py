@@ -1,5 +1,6 @@
 from datetime import datetime
 from enum import Enum
+from typing import Any
 from uuid import UUID, uuid4
 
 
@@ -83,6 +84,17 @@ class Feedback:
     def updated_at(self) -> datetime:
         return self._updated_at
 
+    def to_dict(self) -> dict[str, Any]:
+        """辞書形式に変換"""
+        return {
+            "id": str(self._id),
+            "user_id": self._user_id,
+            "message_id": str(self._message_id),
+            "feedback": self._feedback.value,
+            "created_at": self._created_at.isoformat(),
+            "updated_at": self._updated_at.isoformat(),
+        }
+
     def is_positive(self) -> bool:
         return self._feedback == FeedbackType.GOOD
 
@@ -1,5 +1,6 @@
 from datetime import datetime
 from enum import Enum
+from typing import Any
 from uuid import UUID, uuid4
 
 from src.domain.exception.message_exception import EmptyMessageContentError
@@ -61,3 +62,22 @@ class Message:
     @property
     def created_at(self) -> datetime:
         return self._created_at
+
+    def to_dict(self) -> dict[str, Any]:
+        """辞書形式に変換"""
+        return {
+            "id": str(self._id),
+            "role": self._role.value,
+            "content": self._content,
+            "created_at": self._created_at.isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Message":
+        """辞書形式から復元"""
+        return cls.reconstruct(
+            id=UUID(data["id"]),
+            role=Role(data["role"]),
+            content=data["content"],
+            created_at=datetime.fromisoformat(data["created_at"]),
+        )
@@ -1,5 +1,6 @@
 from datetime import datetime
 from enum import Enum
+from typing import Any
 from uuid import UUID, uuid4
 
 from src.domain.exception.task_exception import (
@@ -11,6 +12,7 @@ from src.domain.exception.task_exception import (
 
 from .general_answer_task_log import GeneralAnswerTaskLog
 from .task_log import TaskLog
+from .task_timing import TaskTiming
 from .web_search_task_log import SearchResult, WebSearchTaskLog
 
 
@@ -36,6 +38,8 @@ class Task:
         result: str | None = None,
         created_at: datetime | None = None,
         completed_at: datetime | None = None,
+        *,
+        timings: list[TaskTiming] | None = None,
     ):
         if not description:
             raise EmptyTaskDescriptionError()
@@ -50,6 +54,11 @@ class Task:
         self._result = result
         self._created_at = created_at or datetime.now()
         self._completed_at = completed_at
+        self._timings: dict[str, TaskTiming] = {
+            timing.stage: timing for timing in timings or []
+        }
+        # 永続化後に変更されたかどうか(保存時に変更されたタスクだけを書き込む)
+        self._modified = False
 
     @classmethod
     def create_web_search(cls, description: str) -> "Task":
@@ -86,6 +95,8 @@ class Task:
         result: str | None,
         created_at: datetime,
         completed_at: datetime | None,
+        *,
+        timings: list[TaskTiming] | None = None,
     ) -> "Task":
         return cls(
             id=id,
@@ -96,6 +107,7 @@ class Task:
             result=result,
             created_at=created_at,
             completed_at=completed_at,
+            timings=timings,
         )
 
     @property
@@ -130,6 +142,58 @@ class Task:
     def task_log(self) -> TaskLog:
         return self._task_log
 
+    @property
+    def is_modified(self) -> bool:
+        return self._modified
+
+    def mark_persisted(self) -> None:
+        """永続化済みとして変更フラグを下ろす"""
+        self._modified = False
+
+    @property
+    def timings(self) -> list[TaskTiming]:
+        """処理段階ごとの計測値(記録順)"""
+        return list(self._timings.values())
+
+    def to_dict(self) -> dict[str, Any]:
+        """辞書形式に変換"""
+        return {
+            "id": str(self._id),
+            "description": self._description,
+            "agent_name": self._agent_name.value,
+            "task_log": self._task_log.to_dict(),
+            "status": self._status.value,
+            "result": self._result,
+            "created_at": self._created_at.isoformat(),
+            "completed_at": (
+                self._completed_at.isoformat() if self._completed_at else None
+            ),
+            "timings": [timing.to_dict() for timing in self._timings.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Task":
+        """辞書形式から復元"""
+        agent_name = AgentName(data["agent_name"])
+        task_log: TaskLog
+        if agent_name == AgentName.WEB_SEARCH:
+            task_log = WebSearchTaskLog.from_dict(data["task_log"])
+        else:
+            task_log = GeneralAnswerTaskLog.from_dict(data["task_log"])
+
+        completed_at = data.get("completed_at")
+        return cls.reconstruct(
+            id=UUID(data["id"]),
+            description=data["description"],
+            agent_name=agent_name,
+            task_log=task_log,
+            status=TaskStatus(data["status"]),
+            result=data.get("result"),
+            created_at=datetime.fromisoformat(data["created_at"]),
+            completed_at=datetime.fromisoformat(completed_at) if completed_at else None,
+            timings=[TaskTiming.from_dict(item) for item in data.get("timings", [])],
+        )
+
     def complete(self, result: str) -> None:
         """タスクを完了し、結果を記録"""
         if self._status != TaskStatus.IN_PROGRESS:
@@ -142,6 +206,7 @@ class Task:
         self._status = TaskStatus.COMPLETED
         self._result = result
         self._completed_at = datetime.now()
+        self._modified = True
 
     def update_result(self, result: str) -> None:
         """タスクの結果を更新"""
@@ -154,12 +219,23 @@ class Task:
 
         self._result = result
         self._completed_at = datetime.now()
+        self._modified = True
 
     def fail(self, error_message: str) -> None:
         """タスクを失敗として記録"""
         self._status = TaskStatus.FAILED
         self._result = f"Error: {error_message}"
         self._completed_at = datetime.now()
+        self._modified = True
+
+    def record_timing(self, timing: TaskTiming) -> None:
+        """処理段階の計測値を記録する(同じ段階は加算する)"""
+        existing = self._timings.get(timing.stage)
+        if existing is None:
+            self._timings[timing.stage] = timing
+        else:
+            existing.merge(timing)
+        self._modified = True
 
     def add_web_search_attempt(self, query: str, results: list[SearchResult]) -> None:
         """Web検索の試行を記録"""
@@ -168,6 +244,7 @@ class Task:
                 f"このタスクはWeb検索タスクではありません。AgentName: {self._agent_name}"
             )
         self._task_log.add_attempt(query=query, results=results)
+        self._modified = True
 
     def add_general_answer_attempt(self, response: str) -> None:
         """一般回答の試行を記録"""
@@ -176,3 +253,4 @@ class Task:
                 f"このタスクは一般回答タスクではありません。AgentName: {self._agent_name}"
             )
         self._task_log.add_attempt(response=response)
+        self._modified = True
@@ -1,3 +1,4 @@
+from typing import Any
 from uuid import UUID, uuid4
 
 from src.domain.exception.task_plan_exception import (
@@ -42,6 +43,38 @@ class TaskPlan:
     def tasks(self) -> list[Task]:
         return self._tasks
 
+    def replace_task(self, task: Task) -> None:
+        """同じIDのタスクを置き換える
+
+        チェックポイントから再開した場合など、別のオブジェクトとして
+        実行されたタスクの結果を計画に反映する。
+        """
+        for i, current in enumerate(self._tasks):
+            if current.id == task.id:
+                self._tasks[i] = task
+                return
+
+    def to_dict(self) -> dict[str, Any]:
+        """辞書形式に変換"""
+        return {
+            "id": str(self._id),
+            "message_id": str(self._message_id),
+            "tasks": [task.to_dict() for task in self._tasks],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "TaskPlan":
+        """辞書形式から復元"""
+        return cls.reconstruct(
+            id=UUID(data["id"]),
+            message_id=UUID(data["message_id"]),
+            tasks=[Task.from_dict(task) for task in data["tasks"]],
+        )
+
+    def unfinished_tasks(self) -> list[Task]:
+        """完了しなかった(失敗・タイムアウトした)タスク"""
+        return [task for task in self._tasks if task.status != TaskStatus.COMPLETED]
+
     def format_task_results(self) -> str:
         """タスク結果のフォーマット"""
         task_results_parts = []
@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class TaskPreEvaluation:
+    """LLMを使わないローカルな事前評価の結果"""
+
+    accepted: bool
+    score: float
+    citation_count: int
+    source_coverage: float
+    length: int
+    term_overlap: float
+    unknown_source_count: int
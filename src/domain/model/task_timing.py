@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class TaskTiming:
+    """タスクの処理段階(ノード)ごとの所要時間とLLM使用量"""
+
+    stage: str
+    wall_seconds: float = 0.0
+    runs: int = 0
+    errors: int = 0
+    llm_calls: int = 0
+    llm_seconds: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+    @property
+    def retries(self) -> int:
+        """同じ段階を再実行した回数"""
+        return max(self.runs - 1, 0)
+
+    def merge(self, other: "TaskTiming") -> None:
+        """同じ段階の計測値を加算する"""
+        self.wall_seconds += other.wall_seconds
+        self.runs += other.runs
+        self.errors += other.errors
+        self.llm_calls += other.llm_calls
+        self.llm_seconds += other.llm_seconds
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+
+    def to_dict(self) -> dict[str, Any]:
+        """辞書形式に変換"""
+        return {
+            "stage": self.stage,
+            "wall_seconds": self.wall_seconds,
+            "runs": self.runs,
+            "errors": self.errors,
+            "llm_calls": self.llm_calls,
+            "llm_seconds": self.llm_seconds,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "TaskTiming":
+        """辞書形式から復元"""
+        return cls(
+            stage=data["stage"],
+            wall_seconds=data.get("wall_seconds", 0.0),
+            runs=data.get("runs", 0),
+            errors=data.get("errors", 0),
+            llm_calls=data.get("llm_calls", 0),
+            llm_seconds=data.get("llm_seconds", 0.0),
+            input_tokens=data.get("input_tokens", 0),
+            output_tokens=data.get("output_tokens", 0),
+        )
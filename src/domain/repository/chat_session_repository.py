@@ -1,13 +1,37 @@
+from datetime import datetime
 from typing import Protocol
 
 from ..model.chat_session import ChatSession
+from ..model.message import Message
 
 
 class ChatSessionRepository(Protocol):
     async def save(self, chat_session: ChatSession) -> None:
-        """チャットセッションを保存"""
+        """チャットセッションを保存
+
+        読み込んだ後に他の処理が保存していた場合はChatSessionConflictErrorを送出する。
+        """
+        ...
+
+    async def find_by_id(
+        self,
+        chat_session_id: str,
+        include_task_plans: bool = True,
+        max_messages: int | None = None,
+    ) -> ChatSession | None:
+        """IDでチャットセッションを取得
+
+        include_task_plans=Falseの場合、過去のタスク計画は読み込まない。
+        max_messagesを指定した場合、直近のメッセージだけを読み込む。
+        """
         ...
 
-    async def find_by_id(self, chat_session_id: str) -> ChatSession | None:
-        """IDでチャットセッションを取得"""
+    async def find_messages(
+        self,
+        chat_session_id: str,
+        since: datetime | None = None,
+        before: datetime | None = None,
+        limit: int | None = None,
+    ) -> list[Message]:
+        """セッションのメッセージを古い順に取得(範囲内の新しいものからlimit件)"""
         ...
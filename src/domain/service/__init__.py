@@ -4,13 +4,19 @@ from .search_query_generation_service import SearchQueryGenerationService
 from .task_plan_service import TaskPlanningService
 from .task_result_evaluation_service import TaskResultEvaluationService
 from .task_result_generation_service import TaskResultGenerationService
+from .task_result_pre_evaluation_service import (
+    PreEvaluationThresholds,
+    TaskResultPreEvaluationService,
+)
 
 
 __all__ = [
     "FinalAnswerService",
     "GeneralAnswerService",
+    "PreEvaluationThresholds",
     "SearchQueryGenerationService",
     "TaskPlanningService",
     "TaskResultEvaluationService",
     "TaskResultGenerationService",
+    "TaskResultPreEvaluationService",
 ]
\ No newline at end of file
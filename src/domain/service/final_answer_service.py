@@ -1,5 +1,5 @@
-from ...domain.service.port import LLMClient
-from ..model import ChatSession, Message, TaskPlan
+from ...domain.service.port import AnswerStream, LLMClient
+from ..model import ChatSession, Message, TaskPlan, TaskStatus
 
 
 class FinalAnswerService:
@@ -47,13 +47,23 @@ class FinalAnswerService:
     def __init__(self, llm_client: LLMClient):
         self.llm_client = llm_client
 
-    async def execute(self, chat_session: ChatSession, task_plan: TaskPlan) -> Message:
-        """タスク実行結果から最終回答を生成する"""
+    async def execute(
+        self,
+        chat_session: ChatSession,
+        task_plan: TaskPlan,
+        answer_stream: AnswerStream | None = None,
+    ) -> Message:
+        """タスク実行結果から最終回答を生成する
+
+        answer_streamが渡された場合は、生成途中の回答を逐次通知する。
+        """
         latest_message = chat_session.last_user_message()
         task_results_text = task_plan.format_task_results()
 
         human_prompt = self._build_human_prompt(
-            user_question=latest_message.content, task_results=task_results_text
+            user_question=latest_message.content,
+            task_results=task_results_text,
+            unfinished_tasks=self._format_unfinished_tasks(task_plan),
         )
 
         messages = [
@@ -62,16 +72,67 @@ class FinalAnswerService:
             Message.create_user_message(human_prompt),
         ]
 
-        answer = await self.llm_client.generate(messages)
+        if answer_stream is None:
+            answer = await self.llm_client.generate(messages)
+        else:
+            answer = await self._generate_streaming(messages, answer_stream)
 
         return Message.create_assistant_message(answer)
 
-    def _build_human_prompt(self, user_question: str, task_results: str) -> str:
+    def build_fallback_answer(self, task_plan: TaskPlan) -> Message:
+        """最終回答を生成できなかった場合に、LLMを使わずに回答を組み立てる
+
+        完了したタスクがあればその結果をそのまま並べ、なければお詫びの文面を返す。
+        """
+        completed_tasks = [
+            task for task in task_plan.tasks if task.status == TaskStatus.COMPLETED
+        ]
+        if not completed_tasks:
+            return Message.create_assistant_message(
+                "申し訳ありません。時間内に回答を用意できませんでした。"
+                "時間をおいて再度お試しください。"
+            )
+
+        sections = [f"*{task.description}*\n{task.result}" for task in completed_tasks]
+        return Message.create_assistant_message(
+            "時間内に回答をまとめきれなかったため、取得できた結果をお伝えします。\n\n"
+            + "\n\n".join(sections)
+        )
+
+    def _format_unfinished_tasks(self, task_plan: TaskPlan) -> str:
+        return "\n".join(
+            f"- {task.description}: {task.result or '結果なし'}"
+            for task in task_plan.unfinished_tasks()
+        )
+
+    async def _generate_streaming(
+        self, messages: list[Message], answer_stream: AnswerStream
+    ) -> str:
+        """回答をストリーミング生成し、累積したテキストを逐次通知する"""
+        answer = ""
+        async for chunk in self.llm_client.stream(messages):
+            answer += chunk
+            await answer_stream.push(answer)
+
+        return answer
+
+    def _build_human_prompt(
+        self, user_question: str, task_results: str, unfinished_tasks: str = ""
+    ) -> str:
+        unfinished_section = ""
+        if unfinished_tasks:
+            unfinished_section = f"""
+
+## 完了しなかったタスク:
+{unfinished_tasks}
+
+上記のタスクの情報は得られていません。該当する内容は推測で補わず、確認できなかったことを回答内で簡潔に伝えてください。"""
+
         return f"""## ユーザーの質問:
 {user_question}
 
 ## タスクの実行結果:
-{task_results}
+{task_results}{unfinished_section}
 
 上記のタスク結果を統合して、ユーザーの質問に対する包括的な回答を生成してください。
 
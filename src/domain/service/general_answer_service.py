@@ -1,5 +1,8 @@
+import asyncio
 from datetime import datetime
 
+from pydantic import BaseModel, Field
+
 from ...domain.service.port import LLMClient
 from ..model import ChatSession, Message, Task
 
@@ -32,20 +35,83 @@ class GeneralAnswerService:
 
     async def execute(self, chat_session: ChatSession, task: Task):
         """タスクを実行して回答を生成し、タスクを完了させる"""
-        task_prompt = self._build_task_prompt(task.description)
+        answer = await self.generate_answer(chat_session, task.description)
+
+        self.apply_answer(task, answer)
+
+    async def generate_answer(
+        self, chat_session: ChatSession, task_description: str
+    ) -> str:
+        """タスク内容に対する回答を生成する(タスクの状態は変更しない)"""
+        messages = self.build_messages(chat_session, task_description)
+
+        return await self.llm_client.generate(messages)
+
+    async def execute_batch(self, chat_session: ChatSession, tasks: list[Task]):
+        """複数のタスクを1回の構造化出力でまとめて回答し、各タスクを完了させる
+
+        システムプロンプトと会話履歴の送信を1回にまとめるためのもの。
+        回答が欠けていたタスクは個別に並行して回答を生成する。
+        """
+
+        class _TaskAnswer(BaseModel):
+            task_id: str = Field(description="回答対象のタスクID")
+            answer: str = Field(description="タスクに対する回答")
+
+        class _BatchAnswers(BaseModel):
+            answers: list[_TaskAnswer] = Field(
+                description="タスクごとの回答のリスト(タスクIDごとに1つ)"
+            )
+
+        tasks_by_key = {f"task-{i}": task for i, task in enumerate(tasks, 1)}
 
         messages = [
             Message.create_system_message(self.SYSTEM_PROMPT),
             *chat_session.messages,
-            Message.create_user_message(task_prompt),
+            Message.create_user_message(self._build_batch_prompt(tasks_by_key)),
         ]
 
-        answer = await self.llm_client.generate(messages)
-
+        batch_answers = await self.llm_client.generate_with_structured_output(
+            messages, _BatchAnswers
+        )
+
+        answers = {
+            item.task_id.strip(): item.answer
+            for item in batch_answers.answers
+            if item.answer and item.answer.strip()
+        }
+
+        missing_tasks = []
+        for key, task in tasks_by_key.items():
+            answer = answers.get(key)
+            if answer:
+                self.apply_answer(task, answer)
+            else:
+                missing_tasks.append(task)
+
+        # 回答が欠けたタスクは並行して回答させ、直列の呼び出しで遅くならないようにする
+        await asyncio.gather(
+            *(self.execute(chat_session, task) for task in missing_tasks)
+        )
+
+    def apply_answer(self, task: Task, answer: str) -> None:
+        """生成済みの回答をタスクに記録し、タスクを完了させる"""
         task.add_general_answer_attempt(response=answer)
 
         task.complete(answer)
 
+    def build_messages(
+        self, chat_session: ChatSession, task_description: str
+    ) -> list[Message]:
+        """LLMに渡すメッセージリストを構築する"""
+        task_prompt = self._build_task_prompt(task_description)
+
+        return [
+            Message.create_system_message(self.SYSTEM_PROMPT),
+            *chat_session.messages,
+            Message.create_user_message(task_prompt),
+        ]
+
     def _get_current_date(self) -> str:
         return datetime.now().strftime("%Y年%m月%d日")
 
@@ -59,3 +125,20 @@ class GeneralAnswerService:
 {task_description}
 
 上記のタスクについて回答してください。"""
+
+    def _build_batch_prompt(self, tasks_by_key: dict[str, Task]) -> str:
+        current_date = self._get_current_date()
+
+        tasks_text = "\n\n".join(
+            f"### タスクID: {key}\n{task.description}"
+            for key, task in tasks_by_key.items()
+        )
+
+        return f"""## 現在の日付:
+{current_date}
+
+## タスク:
+{tasks_text}
+
+上記の各タスクについて、それぞれ独立した回答を作成してください。
+回答にはタスクIDをそのまま付与し、すべてのタスクIDについて1つずつ回答してください。"""
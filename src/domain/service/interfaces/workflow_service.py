@@ -1,11 +1,18 @@
 from typing import Any, Protocol
 
 from ...model import ChatSession, WorkflowResult
+from ..port import AnswerStream
 
 
 class WorkflowService(Protocol):
     async def execute(
-        self, chat_session: ChatSession, context: dict[str, Any]
+        self,
+        chat_session: ChatSession,
+        context: dict[str, Any],
+        answer_stream: AnswerStream | None = None,
     ) -> WorkflowResult:
-        """チャットセッションを元にワークフローを実行し、結果を返す"""
+        """チャットセッションを元にワークフローを実行し、結果を返す
+
+        answer_streamが渡された場合は、最終回答を生成途中から逐次通知する。
+        """
         ...
@@ -1,5 +1,9 @@
+from .answer_stream import AnswerStream
+from .conversation_lock import ConversationLock
 from .llm_client import LLMClient
 
 __all__ = [
+    "AnswerStream",
+    "ConversationLock",
     "LLMClient",
-]
\ No newline at end of file
+]
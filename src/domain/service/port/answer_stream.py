@@ -0,0 +1,7 @@
+from typing import Protocol
+
+
+class AnswerStream(Protocol):
+    async def push(self, partial_answer: str) -> None:
+        """生成途中の回答(これまでに生成された全文)を受け取る"""
+        ...
@@ -0,0 +1,8 @@
+from contextlib import AbstractAsyncContextManager
+from typing import Protocol
+
+
+class ConversationLock(Protocol):
+    def acquire(self, conversation_id: str) -> AbstractAsyncContextManager[None]:
+        """会話ごとの排他ロックを取得し、ブロックを抜けると解放する"""
+        ...
@@ -1,3 +1,4 @@
+from collections.abc import AsyncIterator
 from typing import Protocol, TypeVar
 
 from pydantic import BaseModel
@@ -12,6 +13,10 @@ class LLMClient(Protocol):
         """メッセージリストから通常のテキスト生成を行う"""
         ...
 
+    def stream(self, messages: list[Message]) -> AsyncIterator[str]:
+        """メッセージリストからテキストを生成し、生成された断片を順に返す"""
+        ...
+
     async def generate_with_structured_output(
         self, messages: list[Message], response_model: type[T]
     ) -> T:
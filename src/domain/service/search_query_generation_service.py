@@ -35,8 +35,15 @@ class SearchQueryGenerationService:
     def __init__(self, llm_client: LLMClient):
         self.llm_client = llm_client
 
-    async def execute(self, task: Task, feedback: str | None = None) -> list[str]:
-        """タスクから検索クエリを生成する"""
+    MAX_QUERIES = 3
+
+    async def execute(
+        self,
+        task: Task,
+        feedback: str | None = None,
+        max_queries: int = MAX_QUERIES,
+    ) -> list[str]:
+        """タスクから検索クエリを生成する(最大max_queries個)"""
 
         class _SearchQueries(BaseModel):
             queries: list[str] = Field(
@@ -52,6 +59,7 @@ class SearchQueryGenerationService:
             task_description=task.description,
             previous_queries=previous_queries,
             feedback=feedback,
+            max_queries=max_queries,
         )
 
         messages = [
@@ -63,16 +71,27 @@ class SearchQueryGenerationService:
             messages, _SearchQueries
         )
 
-        return search_queries_result.queries
+        return search_queries_result.queries[:max_queries]
 
     def _get_current_date(self) -> str:
         return datetime.now().strftime("%Y年%m月%d日")
 
     def _build_human_prompt(
-        self, task_description: str, previous_queries: list[str], feedback: str | None
+        self,
+        task_description: str,
+        previous_queries: list[str],
+        feedback: str | None,
+        max_queries: int = MAX_QUERIES,
     ) -> str:
         current_date = self._get_current_date()
 
+        query_limit_section = ""
+        if max_queries < self.MAX_QUERIES:
+            query_limit_section = f"""
+
+## クエリ数の制限:
+今回は最も効果的なクエリを{max_queries}個だけ生成してください。"""
+
         previous_queries_section = ""
         if previous_queries:
             queries_text = "\n".join([f"- {q}" for q in previous_queries])
@@ -95,4 +114,4 @@ class SearchQueryGenerationService:
 {current_date}
 
 ## 割り当てられたタスク:
-{task_description}{previous_queries_section}{feedback_section}"""
+{task_description}{previous_queries_section}{feedback_section}{query_limit_section}"""
@@ -5,7 +5,7 @@ from pydantic import BaseModel, Field
 from src.domain.exception.service_exception import UnknownAgentError
 
 from ...domain.service.port import LLMClient
-from ..model import ChatSession, Message, Task, TaskPlan
+from ..model import AgentName, ChatSession, Message, Task, TaskPlan
 
 
 class TaskPlanningService:
@@ -83,4 +83,17 @@ class TaskPlanningService:
 
             tasks.append(task)
 
+        if len(tasks) == 1 and tasks[0].agent_name == AgentName.GENERAL_ANSWER:
+            # 一般回答だけで済む場合は言い換えずにリクエストそのものへ回答させる
+            # (計画と並行して先行生成した回答をそのまま使えるようにする)
+            tasks = [Task.create_general_answer(latest_message.content)]
+
         return TaskPlan.create(message_id=latest_message.id, tasks=tasks)
+
+    def fallback_plan(self, chat_session: ChatSession) -> TaskPlan:
+        """計画を生成できなかった場合に、最新のリクエストへ一般回答するだけの計画を返す"""
+        latest_message = chat_session.last_user_message()
+        return TaskPlan.create(
+            message_id=latest_message.id,
+            tasks=[Task.create_general_answer(latest_message.content)],
+        )
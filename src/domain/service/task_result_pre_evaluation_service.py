@@ -0,0 +1,109 @@
+import re
+from dataclasses import dataclass
+
+from src.domain.exception.service_exception import TaskResultNotFoundError
+
+from ..model import Task, TaskPreEvaluation, WebSearchTaskLog
+
+
+@dataclass(frozen=True)
+class PreEvaluationThresholds:
+    """事前評価で合格とみなすための目標値"""
+
+    min_citations: int = 2
+    min_source_coverage: float = 0.3
+    min_length: int = 200
+    min_term_overlap: float = 0.6
+    accept_score: float = 1.0
+
+
+class TaskResultPreEvaluationService:
+    """引用数・情報源の網羅度・長さ・タスク語句との一致度からタスク結果を採点するサービス
+
+    LLMによる評価の前段で使用し、明らかに十分な結果をLLM呼び出しなしで合格とする。
+    """
+
+    CITATION_PATTERN = re.compile(r"\[(\d+)\]")
+    URL_PATTERN = re.compile(r"https?://[^\s|>)\]]+")
+    # 英数字の語、2文字以上のカタカナ語・漢字語をタスクの語句として扱う
+    TERM_PATTERN = re.compile(
+        r"[A-Za-z0-9][A-Za-z0-9.+#\-]*|[\u30a0-\u30ff]{2,}|[\u4e00-\u9fff]{2,}"
+    )
+
+    def __init__(self, thresholds: PreEvaluationThresholds | None = None):
+        self.thresholds = thresholds or PreEvaluationThresholds()
+
+    def execute(self, task: Task) -> TaskPreEvaluation:
+        """タスク結果を採点する"""
+        if not task.result:
+            raise TaskResultNotFoundError()
+
+        result = task.result
+        known_urls = self._get_search_result_urls(task)
+        cited_urls = {url.rstrip(".,") for url in self.URL_PATTERN.findall(result)}
+
+        citation_count = len(set(self.CITATION_PATTERN.findall(result)))
+        source_coverage = (
+            len(cited_urls & known_urls) / len(known_urls) if known_urls else 0.0
+        )
+        term_overlap = self._calculate_term_overlap(task.description, result)
+        unknown_source_count = len(cited_urls - known_urls)
+
+        score = self._calculate_score(
+            citation_count=citation_count,
+            source_coverage=source_coverage,
+            length=len(result),
+            term_overlap=term_overlap,
+        )
+
+        return TaskPreEvaluation(
+            accepted=unknown_source_count == 0
+            and score >= self.thresholds.accept_score,
+            score=score,
+            citation_count=citation_count,
+            source_coverage=source_coverage,
+            length=len(result),
+            term_overlap=term_overlap,
+            unknown_source_count=unknown_source_count,
+        )
+
+    def _calculate_score(
+        self,
+        citation_count: int,
+        source_coverage: float,
+        length: int,
+        term_overlap: float,
+    ) -> float:
+        """各指標の目標達成率(上限1.0)の平均"""
+        ratios = [
+            self._ratio(citation_count, self.thresholds.min_citations),
+            self._ratio(source_coverage, self.thresholds.min_source_coverage),
+            self._ratio(length, self.thresholds.min_length),
+            self._ratio(term_overlap, self.thresholds.min_term_overlap),
+        ]
+        return sum(ratios) / len(ratios)
+
+    def _ratio(self, value: float, target: float) -> float:
+        if target <= 0:
+            return 1.0
+        return min(value / target, 1.0)
+
+    def _calculate_term_overlap(self, task_description: str, result: str) -> float:
+        """タスク内容の語句のうち、結果に含まれるものの割合"""
+        terms = {term.lower() for term in self.TERM_PATTERN.findall(task_description)}
+        if not terms:
+            return 1.0
+
+        normalized_result = result.lower()
+        matched = [term for term in terms if term in normalized_result]
+        return len(matched) / len(terms)
+
+    def _get_search_result_urls(self, task: Task) -> set[str]:
+        """タスクログから取得済みの検索結果のURLを取得する"""
+        urls = set()
+
+        if isinstance(task.task_log, WebSearchTaskLog):
+            for attempt in task.task_log.attempts:
+                urls.update(result.url for result in attempt.results)
+
+        return urls
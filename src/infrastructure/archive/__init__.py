@@ -0,0 +1,10 @@
+from .archive_storage import ArchiveStorage, GcsArchiveStorage, LocalArchiveStorage
+from .session_archiver import ArchiveResult, SessionArchiver
+
+__all__ = [
+    "ArchiveResult",
+    "ArchiveStorage",
+    "GcsArchiveStorage",
+    "LocalArchiveStorage",
+    "SessionArchiver",
+]
@@ -0,0 +1,83 @@
+import asyncio
+from pathlib import Path
+from typing import Protocol
+
+
+class ArchiveStorage(Protocol):
+    """アーカイブファイルの保存先"""
+
+    async def exists(self, name: str) -> bool: ...
+
+    async def write(self, name: str, data: bytes) -> None: ...
+
+    async def read(self, name: str) -> bytes | None: ...
+
+    async def delete(self, name: str) -> None: ...
+
+
+class LocalArchiveStorage:
+    """ローカルのディレクトリにアーカイブファイルを保存する(開発・テスト用)"""
+
+    def __init__(self, root: str | Path):
+        self._root = Path(root)
+
+    async def exists(self, name: str) -> bool:
+        return await asyncio.to_thread((self._root / name).exists)
+
+    async def write(self, name: str, data: bytes) -> None:
+        await asyncio.to_thread(self._write, self._root / name, data)
+
+    async def read(self, name: str) -> bytes | None:
+        return await asyncio.to_thread(self._read, self._root / name)
+
+    async def delete(self, name: str) -> None:
+        await asyncio.to_thread((self._root / name).unlink, missing_ok=True)
+
+    @staticmethod
+    def _read(path: Path) -> bytes | None:
+        return path.read_bytes() if path.exists() else None
+
+    @staticmethod
+    def _write(path: Path, data: bytes) -> None:
+        # 途中で止まっても書きかけのファイルが残らないように一時ファイルから置き換える
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_name(f"{path.name}.tmp")
+        temporary.write_bytes(data)
+        temporary.replace(path)
+
+
+class GcsArchiveStorage:
+    """Cloud Storageのバケットにアーカイブファイルを保存する"""
+
+    def __init__(self, bucket: str, prefix: str = ""):
+        from google.cloud import storage
+
+        self._bucket = storage.Client().bucket(bucket)
+        self._prefix = prefix.strip("/")
+
+    async def exists(self, name: str) -> bool:
+        return await asyncio.to_thread(self._bucket.blob(self._path(name)).exists)
+
+    async def write(self, name: str, data: bytes) -> None:
+        blob = self._bucket.blob(self._path(name))
+        content_type = (
+            "application/json" if name.endswith(".json") else "application/gzip"
+        )
+        await asyncio.to_thread(
+            blob.upload_from_string, data, content_type=content_type
+        )
+
+    async def read(self, name: str) -> bytes | None:
+        return await asyncio.to_thread(self._read, self._bucket.blob(self._path(name)))
+
+    async def delete(self, name: str) -> None:
+        blob = self._bucket.blob(self._path(name))
+        if await asyncio.to_thread(blob.exists):
+            await asyncio.to_thread(blob.delete)
+
+    @staticmethod
+    def _read(blob) -> bytes | None:
+        return blob.download_as_bytes() if blob.exists() else None
+
+    def _path(self, name: str) -> str:
+        return f"{self._prefix}/{name}" if self._prefix else name
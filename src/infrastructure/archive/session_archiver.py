@@ -0,0 +1,183 @@
+import gzip
+import hashlib
+import json
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+
+from ...domain.model.chat_session import ChatSession
+from ...domain.model.feedback import Feedback
+from ...log import get_logger
+from ..repository.chat_session_repository import ChatSessionRepository
+from ..repository.feedback_repository import FeedbackRepository
+from .archive_storage import ArchiveStorage
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class ArchiveResult:
+    """アーカイブ処理の集計"""
+
+    chunks: int = 0
+    uploaded: int = 0
+    skipped: int = 0
+    archived_sessions: int = 0
+    deleted_sessions: int = 0
+    deleted_web_documents: int = 0
+
+
+@dataclass(frozen=True)
+class _PendingChunk:
+    """書き出しから削除までを終えていないチャンク"""
+
+    name: str
+    chat_session_ids: list[str]
+    cutoff: datetime
+
+    def to_json(self) -> bytes:
+        return json.dumps(
+            {
+                "name": self.name,
+                "chat_session_ids": self.chat_session_ids,
+                "cutoff": self.cutoff.isoformat(),
+            }
+        ).encode()
+
+    @classmethod
+    def from_json(cls, data: bytes) -> "_PendingChunk":
+        record = json.loads(data)
+        return cls(
+            name=record["name"],
+            chat_session_ids=record["chat_session_ids"],
+            cutoff=datetime.fromisoformat(record["cutoff"]),
+        )
+
+
+class SessionArchiver:
+    """古いチャットセッションをアーカイブファイルに書き出してから削除する
+
+    cutoffより前に最後に更新されたセッションをchunk_size件ずつ読み込み、
+    フィードバックと合わせて1セッション1行のgzip圧縮したJSONLとして保存先に
+    書き出したあと、delete_batch_size件ずつ短いトランザクションで削除する。
+
+    チャンクの書き出し前に、対象のセッションIDとファイル名を保存先の
+    PENDING_CHUNK_NAMEに記録し、削除を終えたら消す。途中で止まった場合は、
+    再実行時に記録されたチャンクを先に処理する。同じファイルが既にあれば
+    書き出しを省いて削除を続けるため、新たに古くなったセッションが増えていても
+    同じセッションを別のファイルに書き出し直すことはない
+    (書き出しは少なくとも1回、削除は書き出しの後にだけ行う)。
+    書き出した後に更新されたセッションは削除しない。
+    """
+
+    PENDING_CHUNK_NAME = "chat_sessions/pending_chunk.json"
+
+    def __init__(
+        self,
+        chat_session_repository: ChatSessionRepository,
+        feedback_repository: FeedbackRepository,
+        storage: ArchiveStorage,
+        chunk_size: int = 100,
+        delete_batch_size: int = 20,
+    ):
+        self._chat_session_repository = chat_session_repository
+        self._feedback_repository = feedback_repository
+        self._storage = storage
+        self._chunk_size = chunk_size
+        self._delete_batch_size = delete_batch_size
+
+    async def run(
+        self, cutoff: datetime, max_chunks: int | None = None
+    ) -> ArchiveResult:
+        """cutoffより古いセッションがなくなるか、max_chunks回処理するまで続ける"""
+        result = ArchiveResult()
+        data = await self._storage.read(self.PENDING_CHUNK_NAME)
+        if data is not None:
+            chunk = _PendingChunk.from_json(data)
+            logger.info(f"前回中断したチャンクの処理を再開します ({chunk.name})")
+            await self._archive_chunk(chunk, result)
+
+        while max_chunks is None or result.chunks < max_chunks:
+            chat_session_ids = (
+                await self._chat_session_repository.find_ids_updated_before(
+                    cutoff, self._chunk_size
+                )
+            )
+            if not chat_session_ids:
+                break
+            chunk = _PendingChunk(
+                name=self.archive_name(chat_session_ids),
+                chat_session_ids=chat_session_ids,
+                cutoff=cutoff,
+            )
+            await self._storage.write(self.PENDING_CHUNK_NAME, chunk.to_json())
+            await self._archive_chunk(chunk, result)
+
+        if result.deleted_sessions:
+            result.deleted_web_documents = await (
+                self._chat_session_repository.delete_unreferenced_web_documents(cutoff)
+            )
+
+        logger.info(
+            f"チャットセッションのアーカイブが完了しました "
+            f"(チャンク: {result.chunks}件, 書き出し: {result.uploaded}件, "
+            f"書き出し済み: {result.skipped}件, "
+            f"セッション: {result.archived_sessions}件, "
+            f"削除: {result.deleted_sessions}件, "
+            f"ページ本文の削除: {result.deleted_web_documents}件)"
+        )
+        return result
+
+    async def _archive_chunk(self, chunk: _PendingChunk, result: ArchiveResult) -> None:
+        name = chunk.name
+        chat_session_ids = chunk.chat_session_ids
+        if await self._storage.exists(name):
+            result.skipped += 1
+            logger.info(f"書き出し済みのチャンクの削除を再開します ({name})")
+        else:
+            chat_sessions = await self._chat_session_repository.find_by_ids(
+                chat_session_ids
+            )
+            feedbacks = await self._feedback_repository.find_by_chat_session_ids(
+                chat_session_ids
+            )
+            await self._storage.write(name, self.encode(chat_sessions, feedbacks))
+            result.uploaded += 1
+            result.archived_sessions += len(chat_sessions)
+            logger.info(
+                f"チャットセッションを書き出しました "
+                f"({name}, セッション: {len(chat_sessions)}件)"
+            )
+
+        # 書き出した時点のcutoffで削除し、その後に更新されたセッションは残す
+        for start in range(0, len(chat_session_ids), self._delete_batch_size):
+            batch = chat_session_ids[start : start + self._delete_batch_size]
+            result.deleted_sessions += (
+                await self._chat_session_repository.delete_by_ids(batch, chunk.cutoff)
+            )
+        await self._storage.delete(self.PENDING_CHUNK_NAME)
+        result.chunks += 1
+
+    @staticmethod
+    def archive_name(chat_session_ids: list[str]) -> str:
+        """チャンクのファイル名(同じセッションの組み合わせなら同じ名前になる)"""
+        digest = hashlib.sha256("\n".join(sorted(chat_session_ids)).encode())
+        return f"chat_sessions/{digest.hexdigest()}.jsonl.gz"
+
+    @staticmethod
+    def encode(chat_sessions: list[ChatSession], feedbacks: list[Feedback]) -> bytes:
+        """セッションごとにフィードバックを含めた1行のJSONにしてgzip圧縮する"""
+        feedbacks_by_message: dict[str, list[dict]] = defaultdict(list)
+        for feedback in feedbacks:
+            feedbacks_by_message[str(feedback.message_id)].append(feedback.to_dict())
+
+        lines = []
+        for chat_session in chat_sessions:
+            record = chat_session.to_dict()
+            record["feedbacks"] = [
+                feedback
+                for message in chat_session.messages
+                for feedback in feedbacks_by_message.get(str(message.id), [])
+            ]
+            lines.append(json.dumps(record))
+        return gzip.compress(("\n".join(lines) + "\n").encode())
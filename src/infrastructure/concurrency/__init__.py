@@ -0,0 +1,16 @@
+from .adaptive_concurrency_limiter import (
+    AdaptiveConcurrencyLimiter,
+    ConcurrencyLimiterStats,
+    KeyQueueStats,
+)
+from .admission_queue import AdmissionQueue, RequestPriority
+from .fairness_policy import FairnessPolicy
+
+__all__ = [
+    "AdaptiveConcurrencyLimiter",
+    "AdmissionQueue",
+    "ConcurrencyLimiterStats",
+    "FairnessPolicy",
+    "KeyQueueStats",
+    "RequestPriority",
+]
@@ -0,0 +1,415 @@
+import asyncio
+import time
+from collections import Counter, OrderedDict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+from ...log import get_logger
+from ..exception.concurrency_exception import AdmissionRejectedError
+from ..metrics import Histogram
+from .admission_queue import AdmissionQueue, RequestPriority, Waiter
+from .fairness_policy import FairnessPolicy
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class ConcurrencyLimiterStats:
+    """同時実行リミッターの状態のスナップショット"""
+
+    limit: int
+    in_flight: int
+    queue_depth: int
+    admitted: int
+    average_wait_seconds: float
+    p95_wait_seconds: float
+    max_wait_seconds: float
+    shed_counts: dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class KeyQueueStats:
+    """ユーザー・チャンネルごとの実行状況"""
+
+    in_flight: int = 0
+    queued: int = 0
+    admitted: int = 0
+    shed: int = 0
+    total_wait_seconds: float = 0.0
+
+    @property
+    def average_wait_seconds(self) -> float:
+        return self.total_wait_seconds / self.admitted if self.admitted else 0.0
+
+
+class AdaptiveConcurrencyLimiter:
+    """観測した処理段階の遅延とエラーから同時実行数を調整するリミッター(AIMD)
+
+    上限まで使われた状態で処理が成功するたびに上限を加算的に増やし、
+    段階ごとの基準遅延を大きく超える遅延やエラーを観測すると乗算的に減らす。
+    上限はmin_limitからmax_limitの範囲に収める。
+
+    上限を超えたリクエストは優先度付きのキューで待機させる。キューが満杯の場合や
+    max_wait_seconds以内に実行できない見込みの場合は、待たせずに
+    AdmissionRejectedErrorで拒否する。
+
+    ユーザー・チャンネルごとの同時実行数がFairnessPolicyの上限に達している場合は、
+    全体の枠が空いていても待機させ、キューからは公平な順序で取り出す。
+    ユーザー・チャンネルごとの集計は、実行中のリクエストがないまま
+    idle_key_ttl_seconds以上経過したものから破棄する。
+    """
+
+    # 平均処理時間の指数移動平均の重み
+    SERVICE_TIME_SMOOTHING = 0.1
+
+    def __init__(
+        self,
+        min_limit: int,
+        max_limit: int,
+        initial_limit: int | None = None,
+        *,
+        latency_tolerance: float = 2.0,
+        backoff_ratio: float = 0.9,
+        decrease_cooldown_seconds: float = 1.0,
+        baseline_smoothing: float = 0.05,
+        max_queue_depth: int | None = None,
+        max_wait_seconds: float | None = None,
+        fairness_policy: FairnessPolicy | None = None,
+        idle_key_ttl_seconds: float = 600.0,
+    ):
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError("min_limitは1以上かつmax_limit以下である必要があります")
+
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._latency_tolerance = latency_tolerance
+        self._backoff_ratio = backoff_ratio
+        self._decrease_cooldown_seconds = decrease_cooldown_seconds
+        self._baseline_smoothing = baseline_smoothing
+        self._max_queue_depth = max_queue_depth
+        self._max_wait_seconds = max_wait_seconds
+        self._fairness_policy = fairness_policy or FairnessPolicy()
+        self._idle_key_ttl_seconds = idle_key_ttl_seconds
+
+        self._limit = float(min(max(initial_limit or max_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._queue = AdmissionQueue(
+            channel_weight=self._fairness_policy.channel_weight
+        )
+        self._in_flight_by_user: Counter[str] = Counter()
+        self._in_flight_by_channel: Counter[str] = Counter()
+        self._baselines: dict[str, float] = {}
+        self._last_decrease_at = float("-inf")
+        self._service_seconds: float | None = None
+
+        self.queue_time_histogram = Histogram("workflow_queue_time_seconds")
+        self._shed_counts: Counter[str] = Counter()
+        # 最後に利用された順に並べ、先頭から期限切れのキーを破棄する
+        self._key_stats: OrderedDict[str, KeyQueueStats] = OrderedDict()
+        self._key_used_at: dict[str, float] = {}
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def load(self) -> float:
+        """現在の上限に対する実行中・実行待ちの割合"""
+        return (self._in_flight + len(self._queue)) / self.limit
+
+    def stats(self) -> ConcurrencyLimiterStats:
+        histogram = self.queue_time_histogram
+        return ConcurrencyLimiterStats(
+            limit=self.limit,
+            in_flight=self._in_flight,
+            queue_depth=len(self._queue),
+            admitted=histogram.count,
+            average_wait_seconds=histogram.mean,
+            p95_wait_seconds=histogram.percentile(0.95),
+            max_wait_seconds=histogram.percentile(1.0),
+            shed_counts=dict(self._shed_counts),
+        )
+
+    def key_stats(self) -> dict[str, KeyQueueStats]:
+        """「user:ID」「channel:ID」ごとの実行状況のスナップショット"""
+        queued = self._queue.queued_by_key()
+        return {
+            key: self._snapshot(key, stats, queued.get(key, 0))
+            for key, stats in self._key_stats.items()
+        }
+
+    def stats_for_key(self, key: str) -> KeyQueueStats:
+        """「user:ID」「channel:ID」1つ分の実行状況のスナップショット"""
+        return self._snapshot(
+            key,
+            self._key_stats.get(key) or KeyQueueStats(),
+            self._queue.queued_for(key),
+        )
+
+    @asynccontextmanager
+    async def acquire(
+        self,
+        priority: RequestPriority = RequestPriority.NORMAL,
+        user_id: str = "",
+        channel_id: str = "",
+    ) -> AsyncIterator[None]:
+        """実行枠を確保し、終了時に解放する"""
+        waiter = Waiter(
+            priority=priority,
+            enqueued_at=time.monotonic(),
+            user_id=user_id,
+            channel_id=channel_id,
+        )
+        await self._admit(waiter)
+        saturated = self._in_flight >= self.limit
+        started_at = time.monotonic()
+        succeeded = False
+        try:
+            yield
+            succeeded = True
+        finally:
+            self._release(
+                waiter,
+                saturated=saturated,
+                succeeded=succeeded,
+                service_seconds=time.monotonic() - started_at,
+            )
+
+    def observe(self, stage: str, latency_seconds: float, error: bool = False) -> None:
+        """処理段階の遅延とエラーを記録し、過負荷の兆候があれば上限を下げる"""
+        if error:
+            self._decrease(f"{stage}でエラーが発生")
+            return
+
+        baseline = self._baselines.get(stage)
+        if baseline is None:
+            self._baselines[stage] = latency_seconds
+            return
+
+        if latency_seconds > baseline * self._latency_tolerance:
+            self._decrease(
+                f"{stage}の遅延が基準を超過 "
+                f"({latency_seconds:.2f}秒 > 基準{baseline:.2f}秒の{self._latency_tolerance}倍)"
+            )
+
+        self._baselines[stage] = baseline + self._baseline_smoothing * (
+            latency_seconds - baseline
+        )
+
+    def expected_wait_seconds(self, priority: RequestPriority) -> float | None:
+        """指定した優先度で今キューに入った場合の待ち時間の見込み"""
+        return self._wait_for_position(self._queue.count_ahead(priority) + 1)
+
+    async def _admit(self, waiter: Waiter) -> None:
+        self._queue.push(waiter)
+        self._wake_waiters()
+        if not waiter.future.done():
+            self._check_admission(waiter)
+            try:
+                done, _ = await asyncio.wait(
+                    {waiter.future}, timeout=self._max_wait_seconds
+                )
+            except asyncio.CancelledError:
+                self._abandon(waiter)
+                raise
+
+            if not done:
+                self._queue.remove(waiter)
+                self._shed("wait_timeout", waiter)
+
+        # 優先度の高いリクエストに押し出された場合はここで例外が送出される
+        waiter.future.result()
+
+        wait_seconds = time.monotonic() - waiter.enqueued_at
+        self.queue_time_histogram.observe(wait_seconds)
+        for key in self._keys(waiter):
+            key_stats = self._use_key(key)
+            key_stats.admitted += 1
+            key_stats.total_wait_seconds += wait_seconds
+
+    def _check_admission(self, waiter: Waiter) -> None:
+        """キューに入ったリクエストのうち、待っても実行できない見込みのものを拒否する"""
+        # キューに入った後なので、先に実行されうる件数には自身も含まれている
+        expected_wait = self._wait_for_position(
+            self._queue.count_ahead(waiter.priority)
+        )
+        if (
+            self._max_wait_seconds is not None
+            and expected_wait is not None
+            and expected_wait > self._max_wait_seconds
+        ):
+            self._queue.remove(waiter)
+            self._shed("expected_wait", waiter)
+
+        if (
+            self._max_queue_depth is not None
+            and len(self._queue) > self._max_queue_depth
+        ):
+            self._queue.remove(waiter)
+            evicted = self._queue.pop_lowest_below(waiter.priority)
+            if evicted is None:
+                self._shed("queue_full", waiter)
+            else:
+                self._queue.push(waiter)
+                self._count_shed("evicted", evicted)
+                evicted.future.set_exception(AdmissionRejectedError("evicted"))
+
+    def _wait_for_position(self, position: int) -> float | None:
+        if self._service_seconds is None:
+            return None
+        return position * self._service_seconds / self.limit
+
+    def _shed(self, reason: str, waiter: Waiter) -> None:
+        self._count_shed(reason, waiter)
+        logger.warning(
+            f"リクエストを拒否しました (理由: {reason}, 優先度: {waiter.priority.name}, "
+            f"ユーザー: {waiter.user_id}, チャンネル: {waiter.channel_id}, "
+            f"上限: {self.limit}, 実行中: {self._in_flight}, "
+            f"待機中: {len(self._queue)})"
+        )
+        raise AdmissionRejectedError(reason)
+
+    def _count_shed(self, reason: str, waiter: Waiter) -> None:
+        self._shed_counts[f"{reason}:{waiter.priority.name.lower()}"] += 1
+        for key in self._keys(waiter):
+            self._use_key(key).shed += 1
+
+    def _abandon(self, waiter: Waiter) -> None:
+        """キャンセルされた待機中リクエストを片付ける"""
+        if self._queue.remove(waiter):
+            return
+        if (
+            waiter.future.done()
+            and not waiter.future.cancelled()
+            and waiter.future.exception() is None
+        ):
+            # 枠を受け取った直後にキャンセルされた場合は枠を返す
+            self._return_slot(waiter)
+            self._wake_waiters()
+
+    def _release(
+        self,
+        waiter: Waiter,
+        saturated: bool,
+        succeeded: bool,
+        service_seconds: float,
+    ) -> None:
+        self._return_slot(waiter)
+        for key in self._keys(waiter):
+            self._use_key(key)
+        self._evict_idle_keys()
+        if succeeded:
+            if self._service_seconds is None:
+                self._service_seconds = service_seconds
+            else:
+                self._service_seconds += self.SERVICE_TIME_SMOOTHING * (
+                    service_seconds - self._service_seconds
+                )
+            if saturated:
+                self._increase()
+        self._wake_waiters()
+
+    def _wake_waiters(self) -> None:
+        while self._in_flight < self.limit:
+            waiter = self._queue.pop(self._is_within_quota)
+            if waiter is None:
+                return
+            if waiter.future.done():
+                continue
+            # 待機側に枠を引き渡す
+            self._take_slot(waiter)
+            waiter.future.set_result(None)
+
+    def _is_within_quota(self, waiter: Waiter) -> bool:
+        user_quota = self._fairness_policy.user_quota(waiter.user_id)
+        if (
+            user_quota is not None
+            and self._in_flight_by_user[waiter.user_id] >= user_quota
+        ):
+            return False
+
+        channel_quota = self._fairness_policy.channel_quota(waiter.channel_id)
+        return (
+            channel_quota is None
+            or self._in_flight_by_channel[waiter.channel_id] < channel_quota
+        )
+
+    def _take_slot(self, waiter: Waiter) -> None:
+        self._in_flight += 1
+        self._in_flight_by_user[waiter.user_id] += 1
+        self._in_flight_by_channel[waiter.channel_id] += 1
+
+    def _return_slot(self, waiter: Waiter) -> None:
+        self._in_flight -= 1
+        self._in_flight_by_user[waiter.user_id] -= 1
+        self._in_flight_by_channel[waiter.channel_id] -= 1
+        if not self._in_flight_by_user[waiter.user_id]:
+            del self._in_flight_by_user[waiter.user_id]
+        if not self._in_flight_by_channel[waiter.channel_id]:
+            del self._in_flight_by_channel[waiter.channel_id]
+
+    def _keys(self, waiter: Waiter) -> tuple[str, str]:
+        return f"user:{waiter.user_id}", f"channel:{waiter.channel_id}"
+
+    def _in_flight_for(self, key: str) -> int:
+        kind, _, key_id = key.partition(":")
+        if kind == "user":
+            return self._in_flight_by_user[key_id]
+        return self._in_flight_by_channel[key_id]
+
+    def _snapshot(self, key: str, stats: KeyQueueStats, queued: int) -> KeyQueueStats:
+        return KeyQueueStats(
+            in_flight=self._in_flight_for(key),
+            queued=queued,
+            admitted=stats.admitted,
+            shed=stats.shed,
+            total_wait_seconds=stats.total_wait_seconds,
+        )
+
+    def _use_key(self, key: str) -> KeyQueueStats:
+        """キーの集計を取得し、最後に利用された時刻を更新する"""
+        stats = self._key_stats.setdefault(key, KeyQueueStats())
+        self._key_stats.move_to_end(key)
+        self._key_used_at[key] = time.monotonic()
+        return stats
+
+    def _evict_idle_keys(self) -> None:
+        expires_before = time.monotonic() - self._idle_key_ttl_seconds
+        while self._key_stats:
+            key = next(iter(self._key_stats))
+            if self._key_used_at[key] > expires_before:
+                return
+            if self._in_flight_for(key):
+                # 長時間実行中のキーは破棄せず末尾に回す
+                self._use_key(key)
+                continue
+            del self._key_stats[key]
+            del self._key_used_at[key]
+
+    def _increase(self) -> None:
+        previous = self.limit
+        self._limit = min(self._limit + 1 / self._limit, float(self._max_limit))
+        if self.limit != previous:
+            logger.info(f"同時実行上限を引き上げました: {previous} -> {self.limit}")
+
+    def _decrease(self, reason: str) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease_at < self._decrease_cooldown_seconds:
+            return
+        self._last_decrease_at = now
+
+        previous = self.limit
+        self._limit = max(self._limit * self._backoff_ratio, float(self._min_limit))
+        if self.limit != previous:
+            logger.warning(
+                f"同時実行上限を引き下げました: {previous} -> {self.limit} ({reason}, "
+                f"実行中: {self._in_flight}, 待機中: {len(self._queue)})"
+            )
@@ -0,0 +1,192 @@
+import asyncio
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+
+class RequestPriority(IntEnum):
+    """実行待ちキューの優先度(値が小さいほど先に実行される)"""
+
+    HIGH = 0
+    NORMAL = 1
+
+
+@dataclass(eq=False)
+class Waiter:
+    """実行枠を待っているリクエスト"""
+
+    priority: RequestPriority
+    enqueued_at: float
+    user_id: str = ""
+    channel_id: str = ""
+    future: asyncio.Future[None] = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future()
+    )
+
+
+@dataclass
+class _ChannelQueue:
+    """1チャンネル分の実行待ちリクエスト(ユーザーごとのFIFO)"""
+
+    deficit: float = 0.0
+    users: OrderedDict[str, deque[Waiter]] = field(default_factory=OrderedDict)
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self.users.values())
+
+
+class AdmissionQueue:
+    """実行待ちリクエストを公平な順序で取り出すキュー
+
+    優先度の高い順に取り出し、同じ優先度の中ではチャンネル間を
+    Deficit Round Robin(1リクエストのコストを1とし、訪問ごとにチャンネルの重みを加算)、
+    チャンネル内ではユーザー間をラウンドロビンで回す。
+    """
+
+    def __init__(self, channel_weight: Callable[[str], float] = lambda _: 1.0):
+        self._channel_weight = channel_weight
+        self._levels: dict[RequestPriority, OrderedDict[str, _ChannelQueue]] = {
+            priority: OrderedDict() for priority in RequestPriority
+        }
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(self, waiter: Waiter) -> None:
+        level = self._levels[waiter.priority]
+        channel = level.setdefault(waiter.channel_id, _ChannelQueue())
+        channel.users.setdefault(waiter.user_id, deque()).append(waiter)
+        self._size += 1
+
+    def pop(
+        self, is_eligible: Callable[[Waiter], bool] = lambda _: True
+    ) -> Waiter | None:
+        """実行可能なリクエストのうち、次に実行すべきものを取り出す"""
+        for priority in sorted(RequestPriority):
+            waiter = self._pop_level(self._levels[priority], is_eligible)
+            if waiter is not None:
+                return waiter
+        return None
+
+    def remove(self, waiter: Waiter) -> bool:
+        level = self._levels[waiter.priority]
+        channel = level.get(waiter.channel_id)
+        if channel is None:
+            return False
+        queue = channel.users.get(waiter.user_id)
+        if queue is None or waiter not in queue:
+            return False
+
+        queue.remove(waiter)
+        self._cleanup(level, waiter.channel_id, waiter.user_id)
+        return True
+
+    def count_ahead(self, priority: RequestPriority) -> int:
+        """指定した優先度のリクエストより先に実行されうるリクエスト数"""
+        return sum(
+            len(channel)
+            for level_priority, level in self._levels.items()
+            if level_priority <= priority
+            for channel in level.values()
+        )
+
+    def pop_lowest_below(self, priority: RequestPriority) -> Waiter | None:
+        """指定した優先度より低いリクエストのうち、最も多く待たせているチャンネルと
+        ユーザーの最も新しいリクエストを取り出す
+        """
+        for level_priority in sorted(RequestPriority, reverse=True):
+            if level_priority <= priority:
+                return None
+            level = self._levels[level_priority]
+            if not level:
+                continue
+
+            channel_id, channel = max(level.items(), key=lambda item: len(item[1]))
+            user_id, queue = max(channel.users.items(), key=lambda item: len(item[1]))
+            waiter = queue.pop()
+            self._cleanup(level, channel_id, user_id)
+            return waiter
+        return None
+
+    def queued_by_key(self) -> dict[str, int]:
+        """「channel:ID」「user:ID」ごとの待機中リクエスト数"""
+        counts: dict[str, int] = {}
+        for level in self._levels.values():
+            for channel_id, channel in level.items():
+                channel_key = f"channel:{channel_id}"
+                counts[channel_key] = counts.get(channel_key, 0) + len(channel)
+                for user_id, queue in channel.users.items():
+                    user_key = f"user:{user_id}"
+                    counts[user_key] = counts.get(user_key, 0) + len(queue)
+        return counts
+
+    def queued_for(self, key: str) -> int:
+        """「channel:ID」「user:ID」1つ分の待機中リクエスト数"""
+        kind, _, key_id = key.partition(":")
+        if kind == "channel":
+            return sum(
+                len(level[key_id]) for level in self._levels.values() if key_id in level
+            )
+        return sum(
+            len(channel.users.get(key_id, ()))
+            for level in self._levels.values()
+            for channel in level.values()
+        )
+
+    def _pop_level(
+        self,
+        level: OrderedDict[str, _ChannelQueue],
+        is_eligible: Callable[[Waiter], bool],
+    ) -> Waiter | None:
+        eligible_channels = {
+            channel_id
+            for channel_id, channel in level.items()
+            if self._next_user(channel, is_eligible) is not None
+        }
+        if not eligible_channels:
+            return None
+
+        while True:
+            channel_id, channel = next(iter(level.items()))
+            if channel_id not in eligible_channels:
+                level.move_to_end(channel_id)
+                continue
+
+            if channel.deficit < 1:
+                channel.deficit += self._channel_weight(channel_id)
+                if channel.deficit < 1:
+                    level.move_to_end(channel_id)
+                    continue
+
+            user_id = self._next_user(channel, is_eligible)
+            assert user_id is not None
+            # 同じチャンネル内では取り出したユーザーを最後尾に回す
+            channel.users.move_to_end(user_id)
+            waiter = channel.users[user_id].popleft()
+            channel.deficit -= 1
+            if channel.deficit < 1:
+                level.move_to_end(channel_id)
+
+            self._cleanup(level, channel_id, user_id)
+            return waiter
+
+    def _next_user(
+        self, channel: _ChannelQueue, is_eligible: Callable[[Waiter], bool]
+    ) -> str | None:
+        for user_id, queue in channel.users.items():
+            if queue and is_eligible(queue[0]):
+                return user_id
+        return None
+
+    def _cleanup(
+        self, level: OrderedDict[str, _ChannelQueue], channel_id: str, user_id: str
+    ) -> None:
+        self._size -= 1
+        channel = level[channel_id]
+        if not channel.users[user_id]:
+            del channel.users[user_id]
+        if not channel.users:
+            # 待機がなくなったチャンネルの不足分は持ち越さない
+            del level[channel_id]
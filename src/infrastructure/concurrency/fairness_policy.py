@@ -0,0 +1,28 @@
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class FairnessPolicy:
+    """ユーザー・チャンネルごとの同時実行数の上限とスケジューリングの重み
+
+    上限がNoneの場合は制限しない。個別の上限と重みはIDをキーに上書きできる。
+    """
+
+    default_user_quota: int | None = None
+    default_channel_quota: int | None = None
+    user_quotas: dict[str, int] = field(default_factory=dict)
+    channel_quotas: dict[str, int] = field(default_factory=dict)
+    channel_weights: dict[str, float] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if any(weight <= 0 for weight in self.channel_weights.values()):
+            raise ValueError("チャンネルの重みは0より大きい必要があります")
+
+    def user_quota(self, user_id: str) -> int | None:
+        return self.user_quotas.get(user_id, self.default_user_quota)
+
+    def channel_quota(self, channel_id: str) -> int | None:
+        return self.channel_quotas.get(channel_id, self.default_channel_quota)
+
+    def channel_weight(self, channel_id: str) -> float:
+        return self.channel_weights.get(channel_id, 1.0)
@@ -3,6 +3,11 @@ from src.infrastructure.exception.agent_exception import (
     MissingStateError,
 )
 from src.infrastructure.exception.base import InfrastructureException
+from src.infrastructure.exception.concurrency_exception import (
+    AdmissionRejectedError,
+    ConcurrencyException,
+    ConversationLockUnavailableError,
+)
 from src.infrastructure.exception.config_exception import (
     ConfigException,
     MissingEnvironmentVariableError,
@@ -21,8 +26,11 @@ from src.infrastructure.exception.repository_exception import (
 )
 
 __all__ = [
+    "AdmissionRejectedError",
     "AgentException",
+    "ConcurrencyException",
     "ConfigException",
+    "ConversationLockUnavailableError",
     "InfrastructureException",
     "LLMException",
     "MissingEnvironmentVariableError",
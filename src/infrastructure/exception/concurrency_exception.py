@@ -0,0 +1,24 @@
+from src.infrastructure.exception.base import InfrastructureException
+
+
+class ConcurrencyException(InfrastructureException):
+    pass
+
+
+class AdmissionRejectedError(ConcurrencyException):
+    """混雑によりワークフローの実行を受け付けられなかった場合の例外"""
+
+    status_code = 503
+
+    def __init__(self, reason: str):
+        self.reason = reason
+        message = f"混雑のためリクエストを受け付けられませんでした: {reason}"
+        super().__init__(message)
+
+
+class ConversationLockUnavailableError(AdmissionRejectedError):
+    """会話ロック用の接続を時間内に確保できなかった場合の例外"""
+
+    def __init__(self, conversation_id: str):
+        self.conversation_id = conversation_id
+        super().__init__(f"conversation_lock_pool (conversation_id={conversation_id})")
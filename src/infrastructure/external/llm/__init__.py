@@ -1,7 +1,8 @@
-from .langchain_llm_client import LangChainLLMClient
+from .langchain_llm_client import LangChainLLMClient, LatencyObserver
 from .model_factory import ModelFactory
 
 __all__ = [
     "LangChainLLMClient",
+    "LatencyObserver",
     "ModelFactory",
 ]
\ No newline at end of file
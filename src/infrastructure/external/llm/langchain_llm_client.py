@@ -1,23 +1,64 @@
+import time
+from collections.abc import AsyncIterator, Callable
 from typing import TypeVar
 
-from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+)
 from pydantic import BaseModel
 
 from src.infrastructure.exception.llm_exception import UnsupportedMessageRoleError
 
 from ....domain.model import Message, Role
 from ....domain.service.port.llm_client import LLMClient
+from ...metrics import record_llm_call
 from .model_factory import ModelFactory
 
 T = TypeVar("T", bound=BaseModel)
 
+# (段階名, 所要秒数, エラー有無)を受け取るコールバック
+LatencyObserver = Callable[[str, float, bool], None]
+
 
 class LangChainLLMClient(LLMClient):
+    """LangChainのチャットモデルでテキストを生成するLLMクライアント
+
+    呼び出しの所要時間は「llm:{stage}」の段階名でlatency_observerに通知する。
+    所要時間の傾向は用途(計画・評価・最終回答など)ごとに大きく異なるため、
+    用途ごとにstageを分けたクライアントを作る。
+    """
+
     def __init__(
-        self, model_factory: ModelFactory, model_name: str = "gemini-2.0-flash"
+        self,
+        model_factory: ModelFactory,
+        model_name: str = "gemini-2.0-flash",
+        latency_observer: LatencyObserver | None = None,
+        stage: str | None = None,
     ):
         self._model_factory = model_factory
         self._model_name = model_name
+        self._latency_observer = latency_observer
+        self._stage = stage or model_name
+
+    def _observe(
+        self, seconds: float, error: bool, response: BaseMessage | None = None
+    ) -> None:
+        """LLM呼び出しの所要時間・エラー有無・トークン数を通知する"""
+        usage = getattr(response, "usage_metadata", None) or {}
+        record_llm_call(
+            seconds,
+            input_tokens=usage.get("input_tokens", 0),
+            output_tokens=usage.get("output_tokens", 0),
+            error=error,
+        )
+
+        if self._latency_observer is None:
+            return
+        self._latency_observer(f"llm:{self._stage}", seconds, error)
 
     def _to_langchain_messages(self, messages: list[Message]) -> list[BaseMessage]:
         """ドメインモデルのMessageをLangChainのメッセージに変換"""
@@ -40,10 +81,41 @@ class LangChainLLMClient(LLMClient):
         langchain_messages = self._to_langchain_messages(messages)
 
         model = self._model_factory.create(self._model_name)
-        response = await model.ainvoke(langchain_messages)
+        started_at = time.monotonic()
+        try:
+            response = await model.ainvoke(langchain_messages)
+        except Exception:
+            self._observe(time.monotonic() - started_at, error=True)
+            raise
+        self._observe(time.monotonic() - started_at, error=False, response=response)
 
         return response.content  # type: ignore
 
+    async def stream(self, messages: list[Message]) -> AsyncIterator[str]:
+        """メッセージリストからテキストを生成し、生成された断片を順に返す"""
+        langchain_messages = self._to_langchain_messages(messages)
+
+        model = self._model_factory.create(self._model_name)
+        # 所要時間はモデルの応答を待った時間だけを数え、断片を受け取った側の
+        # 処理時間(Slackへの投稿など)は含めない
+        model_seconds = 0.0
+        resumed_at = time.monotonic()
+        # トークン数は断片を結合したメッセージのusage_metadataから取得する
+        aggregated: AIMessageChunk | None = None
+        try:
+            async for chunk in model.astream(langchain_messages):
+                model_seconds += time.monotonic() - resumed_at
+                aggregated = chunk if aggregated is None else aggregated + chunk
+                if isinstance(chunk.content, str) and chunk.content:
+                    yield chunk.content
+                resumed_at = time.monotonic()
+        except Exception:
+            model_seconds += time.monotonic() - resumed_at
+            self._observe(model_seconds, error=True, response=aggregated)
+            raise
+        model_seconds += time.monotonic() - resumed_at
+        self._observe(model_seconds, error=False, response=aggregated)
+
     async def generate_with_structured_output(
         self, messages: list[Message], response_model: type[T]
     ) -> T:
@@ -51,5 +123,21 @@ class LangChainLLMClient(LLMClient):
         langchain_messages = self._to_langchain_messages(messages)
 
         model = self._model_factory.create(self._model_name)
-        structured_model = model.with_structured_output(response_model)
-        return await structured_model.ainvoke(langchain_messages)  # type: ignore
+        # トークン数を取得するため、パース前の応答も受け取る
+        structured_model = model.with_structured_output(
+            response_model, include_raw=True
+        )
+        started_at = time.monotonic()
+        try:
+            result = await structured_model.ainvoke(langchain_messages)
+        except Exception:
+            self._observe(time.monotonic() - started_at, error=True)
+            raise
+
+        seconds = time.monotonic() - started_at
+        if result["parsing_error"] is not None:
+            self._observe(seconds, error=True, response=result["raw"])
+            raise result["parsing_error"]
+        self._observe(seconds, error=False, response=result["raw"])
+
+        return result["parsed"]  # type: ignore
@@ -1,7 +1,9 @@
 from .slack_adapter import SlackAdapter
 from .slack_message_service import SlackMessageService
+from .slack_streaming_message import SlackStreamingMessage
 
 __all__ = [
     "SlackAdapter",
     "SlackMessageService",
+    "SlackStreamingMessage",
 ]
\ No newline at end of file
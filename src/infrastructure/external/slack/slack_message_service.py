@@ -5,6 +5,7 @@ from slack_sdk.errors import SlackApiError
 from slack_sdk.web.async_client import AsyncWebClient
 
 from ....log.logger import get_logger
+from .slack_streaming_message import SlackStreamingMessage
 
 logger = get_logger(__name__)
 
@@ -13,8 +14,11 @@ class SlackMessageService:
     MAX_TEXT_LENGTH = 2900
     MAX_FALLBACK_LENGTH = 100
 
-    def __init__(self, slack_client: AsyncWebClient):
+    def __init__(
+        self, slack_client: AsyncWebClient, streaming_update_interval: float = 1.0
+    ):
         self._client = slack_client
+        self._streaming_update_interval = streaming_update_interval
 
     async def send_message(
         self,
@@ -48,6 +52,73 @@ class SlackMessageService:
             blocks=blocks,
         )
 
+    async def start_streaming_message(
+        self,
+        channel: str,
+        thread_ts: str | None = None,
+        placeholder_ts: str | None = None,
+    ) -> SlackStreamingMessage:
+        """プレースホルダーを投稿し、逐次更新できるメッセージを返す
+
+        placeholder_tsを指定した場合は投稿済みのプレースホルダーを使い回す。
+        """
+        streaming_message = SlackStreamingMessage(
+            message_service=self,
+            channel=channel,
+            thread_ts=thread_ts,
+            update_interval=self._streaming_update_interval,
+        )
+        await streaming_message.start(placeholder_ts)
+        return streaming_message
+
+    async def post_placeholder(
+        self, channel: str, text: str, thread_ts: str | None = None
+    ) -> str | None:
+        """プレースホルダーを投稿し、メッセージのtsを返す"""
+        try:
+            response = await self._client.chat_postMessage(
+                channel=channel,
+                text=text,
+                thread_ts=thread_ts,
+            )
+        except SlackApiError as e:
+            logger.error(f"プレースホルダー投稿エラー: {e.response['error']}")
+            return None
+
+        return response.get("ts")
+
+    async def update_message(
+        self,
+        channel: str,
+        ts: str,
+        text: str,
+        *,
+        use_blocks: bool = True,
+        message_id: str | None = None,
+        enable_feedback: bool = True,
+    ) -> bool:
+        """投稿済みのメッセージを更新する"""
+        text, truncated = self._truncate_text_if_needed(text)
+
+        try:
+            if not use_blocks:
+                await self._client.chat_update(
+                    channel=channel, ts=ts, text=text, blocks=[]
+                )
+                return True
+
+            blocks = self._create_message_blocks(text, message_id, enable_feedback)
+            fallback_text = text[: self.MAX_FALLBACK_LENGTH] if truncated else text
+
+            await self._client.chat_update(
+                channel=channel, ts=ts, text=fallback_text, blocks=blocks
+            )
+            return True
+
+        except SlackApiError as e:
+            logger.warning(f"メッセージ更新エラー: {e.response['error']}")
+            return False
+
     def _truncate_text_if_needed(self, text: str) -> tuple[str, bool]:
         """必要に応じてテキストを切り詰める"""
         if len(text) <= self.MAX_TEXT_LENGTH:
@@ -0,0 +1,155 @@
+import time
+from typing import TYPE_CHECKING
+
+from ....log.logger import get_logger
+
+if TYPE_CHECKING:
+    from .slack_message_service import SlackMessageService
+
+logger = get_logger(__name__)
+
+
+class SlackStreamingMessage:
+    """プレースホルダーを投稿し、生成途中の回答でchat.updateを繰り返すメッセージ
+
+    chat.updateのレート制限を考慮し、update_interval秒に1回まで更新する。
+    """
+
+    PLACEHOLDER_TEXT = "回答を生成しています..."
+    CURSOR = " ▍"
+
+    def __init__(
+        self,
+        message_service: "SlackMessageService",
+        channel: str,
+        thread_ts: str | None,
+        update_interval: float = 1.0,
+    ):
+        self._message_service = message_service
+        self._channel = channel
+        self._thread_ts = thread_ts
+        self._update_interval = update_interval
+
+        self._ts: str | None = None
+        self._started_at = time.monotonic()
+        self._last_update_at: float | None = None
+        self._first_visible_at: float | None = None
+        self._update_count = 0
+
+    @property
+    def ts(self) -> str | None:
+        return self._ts
+
+    @property
+    def update_count(self) -> int:
+        return self._update_count
+
+    @property
+    def time_to_first_visible_token(self) -> float | None:
+        """プレースホルダー投稿から最初の回答断片が表示されるまでの秒数"""
+        if self._first_visible_at is None:
+            return None
+        return self._first_visible_at - self._started_at
+
+    async def start(self, placeholder_ts: str | None = None) -> None:
+        """プレースホルダーを投稿する
+
+        placeholder_tsを指定した場合は、前の試行で投稿したメッセージを
+        プレースホルダーの表示に戻して使い回す。
+        """
+        self._started_at = time.monotonic()
+        if placeholder_ts is not None:
+            self._ts = placeholder_ts
+            await self._message_service.update_message(
+                channel=self._channel,
+                ts=placeholder_ts,
+                text=self.PLACEHOLDER_TEXT,
+                use_blocks=False,
+            )
+            return
+
+        self._ts = await self._message_service.post_placeholder(
+            channel=self._channel,
+            text=self.PLACEHOLDER_TEXT,
+            thread_ts=self._thread_ts,
+        )
+
+    async def push(self, partial_answer: str) -> None:
+        """生成途中の回答でメッセージを更新する(一定間隔ごとに間引く)"""
+        if not self._ts or not partial_answer.strip():
+            return
+
+        now = time.monotonic()
+        if (
+            self._last_update_at is not None
+            and now - self._last_update_at < self._update_interval
+        ):
+            return
+
+        updated = await self._message_service.update_message(
+            channel=self._channel,
+            ts=self._ts,
+            text=partial_answer + self.CURSOR,
+            use_blocks=False,
+        )
+        if updated:
+            self._update_count += 1
+            self._last_update_at = now
+            if self._first_visible_at is None:
+                self._first_visible_at = now
+
+    async def finish(self, text: str, message_id: str | None = None) -> None:
+        """最終回答とフィードバックボタンでメッセージを確定する"""
+        if not self._ts:
+            await self._send_final_answer(text, message_id)
+            return
+
+        if await self._update_final_answer(text, message_id):
+            self._update_count += 1
+        else:
+            # 確定できないと途中の回答のまま残るため、最終回答を新しく投稿する
+            logger.warning(
+                f"ストリーミング回答を確定できなかったため新規投稿します "
+                f"(ts: {self._ts})"
+            )
+            await self._send_final_answer(text, message_id)
+
+        ttft = self.time_to_first_visible_token
+        ttft_text = f"{ttft:.2f}秒" if ttft is not None else "途中表示なし"
+        logger.info(
+            f"ストリーミング回答を確定しました (初回表示まで: {ttft_text}, "
+            f"更新回数: {self._update_count}回, "
+            f"合計: {time.monotonic() - self._started_at:.2f}秒)"
+        )
+
+    async def _update_final_answer(self, text: str, message_id: str | None) -> bool:
+        """最終回答でメッセージを更新する(失敗した場合は1回だけ再試行する)"""
+        for _ in range(2):
+            if await self._message_service.update_message(
+                channel=self._channel, ts=self._ts, text=text, message_id=message_id
+            ):
+                return True
+        return False
+
+    async def _send_final_answer(self, text: str, message_id: str | None) -> None:
+        await self._message_service.send_message(
+            channel=self._channel,
+            text=text,
+            thread_ts=self._thread_ts,
+            message_id=message_id,
+        )
+
+    async def fail(self, text: str) -> None:
+        """エラーメッセージでプレースホルダーを置き換える"""
+        if not self._ts:
+            await self._message_service.send_message(
+                channel=self._channel,
+                text=text,
+                thread_ts=self._thread_ts,
+                use_blocks=False,
+            )
+            return
+
+        await self._message_service.update_message(
+            channel=self._channel, ts=self._ts, text=text, use_blocks=False
+        )
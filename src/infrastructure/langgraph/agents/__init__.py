@@ -1,3 +1,7 @@
 from .general_answer_agent import GeneralAnswerAgent
+from .speculative_general_answer import (
+    SpeculationStats,
+    SpeculativeGeneralAnswerRunner,
+)
 from .supervisor_agent import SupervisorAgent
 from .web_search_agent import WebSearchAgent
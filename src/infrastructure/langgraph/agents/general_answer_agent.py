@@ -8,13 +8,14 @@ from src.infrastructure.exception.agent_exception import MissingStateError
 from ....domain.model import Task
 from ....domain.service import GeneralAnswerService
 from ....log import get_logger
+from ...metrics import instrument_node
 from ..graph.state import BaseState
 
 logger = get_logger(__name__)
 
 
 class GeneralAnswerPrivateState(TypedDict):
-    task: Task
+    tasks: list[Task]
 
 
 class GeneralAnswerState(BaseState, GeneralAnswerPrivateState):
@@ -26,24 +27,34 @@ class GeneralAnswerAgent:
         self.general_answer_service = general_answer_service
 
     async def generate_answer(self, state: GeneralAnswerState) -> Command:
-        """一般回答を生成するノード"""
-        task = state.get("task")
-        if not task:
-            raise MissingStateError("task")
+        """一般回答を生成するノード
+
+        同じタスク計画内の一般回答タスクはまとめて渡され、
+        複数ある場合は1回のLLM呼び出しで回答を生成する。
+        """
+        tasks = state.get("tasks")
+        if not tasks:
+            raise MissingStateError("tasks")
 
         chat_session = state.get("chat_session")
         if not chat_session:
             raise MissingStateError("chat_session")
 
-        await self.general_answer_service.execute(chat_session, task)
+        if len(tasks) == 1:
+            await self.general_answer_service.execute(chat_session, tasks[0])
+        else:
+            await self.general_answer_service.execute_batch(chat_session, tasks)
 
         return Command(update={}, goto=END)
 
     def build_graph(self) -> StateGraph:
         graph = StateGraph(GeneralAnswerState)
 
-        graph.add_node("generate_answer", self.generate_answer)
+        graph.add_node(
+            "generate_answer", instrument_node("generate_answer", self.generate_answer)
+        )
 
         graph.set_entry_point("generate_answer")
 
-        return graph.compile()  # type: ignore
+        # サブグラフ内はチェックポイントを取らず、親グラフのノード単位で再開する
+        return graph.compile(checkpointer=False)  # type: ignore
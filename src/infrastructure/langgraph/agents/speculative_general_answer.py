@@ -0,0 +1,124 @@
+import asyncio
+import contextlib
+from dataclasses import dataclass
+
+from ....domain.model import AgentName, ChatSession, TaskPlan
+from ....domain.service import GeneralAnswerService
+from ....log import get_logger
+from ...metrics import NodeSpan, measure_llm_usage
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class SpeculationStats:
+    """投機実行のヒット率と追加コストの集計
+
+    生成途中でキャンセルした呼び出しは応答のトークン数が得られないため、
+    無駄になったトークン数には応答を受け取った呼び出しの分だけを含める。
+    """
+
+    launched: int = 0
+    hits: int = 0
+    misses: int = 0
+    failures: int = 0
+    wasted_llm_calls: int = 0
+    wasted_input_tokens: int = 0
+    wasted_output_tokens: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        resolved = self.hits + self.misses + self.failures
+        return self.hits / resolved if resolved else 0.0
+
+
+@dataclass
+class Speculation:
+    """実行中の投機的な一般回答"""
+
+    future: asyncio.Task[str]
+    question: str
+    usage: NodeSpan
+
+
+class SpeculativeGeneralAnswerRunner:
+    """タスク計画と並行して、生のユーザーメッセージに対する一般回答を先行生成する
+
+    計画が一般回答タスク1件のみで、その内容が先行生成に使ったメッセージと
+    一致する場合は先行生成した回答を採用する(タスク計画は一般回答タスク1件の
+    計画ではメッセージをそのままタスク内容にする)。それ以外の場合はキャンセルして
+    追加コストとして記録し、計画どおりのタスク内容で改めて回答させる。
+    """
+
+    def __init__(self, general_answer_service: GeneralAnswerService):
+        self.general_answer_service = general_answer_service
+        self.stats = SpeculationStats()
+
+    def start(self, chat_session: ChatSession) -> Speculation:
+        """投機的な一般回答の生成を開始する"""
+        question = chat_session.last_user_message().content
+        usage = NodeSpan(stage="speculative_general_answer", tasks=[])
+        future = asyncio.create_task(self._generate(chat_session, question, usage))
+        self.stats.launched += 1
+
+        return Speculation(future=future, question=question, usage=usage)
+
+    async def resolve(self, speculation: Speculation, task_plan: TaskPlan) -> bool:
+        """計画と照合し、採用できた場合はタスクを完了させてTrueを返す"""
+        if not self._matches(speculation, task_plan):
+            await self.discard(speculation)
+            self.stats.misses += 1
+            self._log_result("miss")
+            return False
+
+        try:
+            answer = await speculation.future
+        except Exception as e:
+            self.stats.failures += 1
+            self._record_waste(speculation)
+            logger.warning(f"投機的な一般回答の生成に失敗しました: {e!s}")
+            self._log_result("failure")
+            return False
+
+        self.general_answer_service.apply_answer(task_plan.tasks[0], answer)
+        self.stats.hits += 1
+        self._log_result("hit")
+        return True
+
+    async def discard(self, speculation: Speculation) -> None:
+        """投機実行をキャンセルし、無駄になったLLM呼び出しとして記録する"""
+        speculation.future.cancel()
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await speculation.future
+
+        self._record_waste(speculation)
+
+    async def _generate(
+        self, chat_session: ChatSession, question: str, usage: NodeSpan
+    ) -> str:
+        with measure_llm_usage(usage):
+            return await self.general_answer_service.generate_answer(
+                chat_session, question
+            )
+
+    def _record_waste(self, speculation: Speculation) -> None:
+        self.stats.wasted_llm_calls += 1
+        self.stats.wasted_input_tokens += speculation.usage.input_tokens
+        self.stats.wasted_output_tokens += speculation.usage.output_tokens
+
+    def _matches(self, speculation: Speculation, task_plan: TaskPlan) -> bool:
+        # 計画がメッセージを言い換えた場合は、先行生成した回答は別の問いへの回答になる
+        return (
+            len(task_plan.tasks) == 1
+            and task_plan.tasks[0].agent_name == AgentName.GENERAL_ANSWER
+            and task_plan.tasks[0].description.strip() == speculation.question.strip()
+        )
+
+    def _log_result(self, result: str) -> None:
+        logger.info(
+            f"投機実行結果: {result} "
+            f"(ヒット率: {self.stats.hit_rate:.1%}, "
+            f"無駄なLLM呼び出し: {self.stats.wasted_llm_calls}回, "
+            f"無駄なトークン: 入力{self.stats.wasted_input_tokens}"
+            f"/出力{self.stats.wasted_output_tokens})"
+        )
@@ -1,12 +1,18 @@
+import asyncio
+
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import END
 from langgraph.types import Command, Send
 
 from src.infrastructure.exception.agent_exception import MissingStateError
 
+from ....domain.exception.task_plan_exception import AllTasksFailedError
 from ....domain.model import AgentName
 from ....domain.service import FinalAnswerService, TaskPlanningService
 from ....log import get_logger
 from ..graph.state import BaseState
+from ..policy import NodeTimeouts
+from .speculative_general_answer import SpeculativeGeneralAnswerRunner
 
 logger = get_logger(__name__)
 
@@ -16,9 +22,13 @@ class SupervisorAgent:
         self,
         task_planning_service: TaskPlanningService,
         final_answer_service: FinalAnswerService,
+        speculative_runner: SpeculativeGeneralAnswerRunner | None = None,
+        node_timeouts: NodeTimeouts | None = None,
     ):
         self.task_planning_service = task_planning_service
         self.final_answer_service = final_answer_service
+        self.speculative_runner = speculative_runner
+        self.node_timeouts = node_timeouts or NodeTimeouts()
 
     async def plan_tasks(self, state: BaseState) -> Command:
         """タスク計画を生成し、各タスクを並列実行するノード"""
@@ -26,32 +36,77 @@ class SupervisorAgent:
         if not chat_session:
             raise MissingStateError("chat_session")
 
-        task_plan = await self.task_planning_service.execute(chat_session)
+        speculation = None
+        if self.speculative_runner:
+            speculation = self.speculative_runner.start(chat_session)
+
+        timeout = self.node_timeouts.planning_timeout(state.get("deadline"))
+        try:
+            task_plan = await asyncio.wait_for(
+                self.task_planning_service.execute(chat_session), timeout=timeout
+            )
+        except TimeoutError:
+            # 計画が間に合わない場合は一般回答のみの計画で続行する
+            logger.warning(
+                f"タスク計画が制限時間({timeout:.1f}秒)を超えたため一般回答で続行します"
+            )
+            task_plan = self.task_planning_service.fallback_plan(chat_session)
+        except BaseException:
+            if self.speculative_runner and speculation:
+                await self.speculative_runner.discard(speculation)
+            raise
 
         chat_session.add_task_plan(task_plan)
 
+        # 投機的に生成した一般回答を採用できた場合はタスク実行をスキップする
+        if (
+            self.speculative_runner
+            and speculation
+            and await self.speculative_runner.resolve(speculation, task_plan)
+        ):
+            return Command(
+                update={"task_plan": task_plan}, goto="generate_final_answer"
+            )
+
         sends = []
+        general_answer_tasks = []
         for task in task_plan.tasks:
-            send_data = {
-                "task": task,
-                "chat_session": chat_session,
-            }
+            if task.agent_name == AgentName.GENERAL_ANSWER:
+                general_answer_tasks.append(task)
+                continue
 
-            if task.agent_name == AgentName.WEB_SEARCH:
-                send_data.update(
+            sends.append(
+                Send(
+                    task.agent_name.value,
                     {
+                        "task": task,
+                        "chat_session": chat_session,
                         "attempt": 0,
                         "feedback": None,
                         "queries": None,
-                    }
+                        "search_budget": None,
+                    },
                 )
+            )
 
-            sends.append(Send(task.agent_name.value, send_data))
+        # 一般回答タスクは1つのブランチにまとめて一括で回答を生成する
+        if general_answer_tasks:
+            sends.append(
+                Send(
+                    AgentName.GENERAL_ANSWER.value,
+                    {"tasks": general_answer_tasks, "chat_session": chat_session},
+                )
+            )
 
         return Command(update={"task_plan": task_plan}, goto=sends)
 
-    async def generate_final_answer(self, state: BaseState) -> Command:
-        """最終回答を生成するノード"""
+    async def generate_final_answer(
+        self, state: BaseState, config: RunnableConfig
+    ) -> Command:
+        """最終回答を生成するノード
+
+        configに回答ストリームが渡されている場合は、生成途中の回答を逐次通知する。
+        """
         try:
             chat_session = state.get("chat_session")
             if not chat_session:
@@ -61,9 +116,29 @@ class SupervisorAgent:
             if not task_plan:
                 raise MissingStateError("task_plan")
 
-            answer_message = await self.final_answer_service.execute(
-                chat_session, task_plan
-            )
+            # チェックポイントから再開した場合はブランチの結果を計画に反映する
+            for task in state.get("finished_tasks") or []:
+                task_plan.replace_task(task)
+
+            answer_stream = config.get("configurable", {}).get("answer_stream")
+            timeout = self.node_timeouts.final_answer_timeout(state.get("deadline"))
+
+            try:
+                answer_message = await asyncio.wait_for(
+                    self.final_answer_service.execute(
+                        chat_session, task_plan, answer_stream=answer_stream
+                    ),
+                    timeout=timeout,
+                )
+            except (AllTasksFailedError, TimeoutError) as e:
+                # 統合できない・間に合わない場合もLLMを使わずに回答を返す
+                logger.warning(
+                    f"最終回答を生成できなかったため代替の回答を返します: "
+                    f"{type(e).__name__}"
+                )
+                answer_message = self.final_answer_service.build_fallback_answer(
+                    task_plan
+                )
 
             return Command(update={"answer": answer_message.content}, goto=END)
 
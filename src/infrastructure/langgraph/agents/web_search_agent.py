@@ -1,3 +1,4 @@
+import time
 from typing import TypedDict
 
 from langgraph.graph import END, StateGraph
@@ -13,7 +14,9 @@ from ....domain.service import (
 )
 from ....log import get_logger
 from ...external.web_search import SearchClient
+from ...metrics import instrument_node
 from ..graph.state import BaseState
+from ..policy import SearchBudget, SearchMode, TaskEvaluationGate, WebSearchPolicy
 
 logger = get_logger(__name__)
 
@@ -23,6 +26,7 @@ class WebSearchPrivateState(TypedDict):
     queries: list[str] | None
     attempt: int
     feedback: str | None
+    search_budget: SearchBudget | None
 
 
 class WebSearchState(BaseState, WebSearchPrivateState):
@@ -30,19 +34,22 @@ class WebSearchState(BaseState, WebSearchPrivateState):
 
 
 class WebSearchAgent:
-    MAX_ATTEMPTS = 2
-
     def __init__(
         self,
         search_query_service: SearchQueryGenerationService,
         task_result_service: TaskResultGenerationService,
         task_evaluation_service: TaskResultEvaluationService,
         search_client: SearchClient,
+        search_policy: WebSearchPolicy | None = None,
+        *,
+        evaluation_gate: TaskEvaluationGate | None = None,
     ):
         self.search_query_service = search_query_service
         self.task_result_service = task_result_service
         self.task_evaluation_service = task_evaluation_service
         self.search_client = search_client
+        self.search_policy = search_policy or WebSearchPolicy(load_provider=lambda: 0.0)
+        self.evaluation_gate = evaluation_gate
 
     async def generate_search_queries(self, state: WebSearchState) -> Command:
         """検索クエリを生成するノード"""
@@ -52,9 +59,16 @@ class WebSearchAgent:
 
         feedback = state.get("feedback")
 
-        queries = await self.search_query_service.execute(task, feedback=feedback)
+        budget = state.get("search_budget") or self._decide_budget(state, task)
+
+        queries = await self.search_query_service.execute(
+            task, feedback=feedback, max_queries=budget.max_queries
+        )
 
-        return Command(update={"queries": queries}, goto="execute_search")
+        return Command(
+            update={"queries": queries, "search_budget": budget},
+            goto="execute_search",
+        )
 
     async def execute_search(self, state: WebSearchState) -> Command:
         """検索を実行するノード"""
@@ -66,8 +80,12 @@ class WebSearchAgent:
         if not queries:
             raise MissingStateError("queries")
 
+        budget = state.get("search_budget") or self._decide_budget(state, task)
+
         for query in queries:
-            search_results = await self.search_client.search(query)
+            search_results = await self.search_client.search(
+                query, num_results=budget.num_results
+            )
             task.add_web_search_attempt(query=query, results=search_results)
 
         return Command(update={}, goto="generate_task_result")
@@ -86,6 +104,16 @@ class WebSearchAgent:
             task, feedback=feedback, previous_result=previous_result
         )
 
+        budget = state.get("search_budget") or self._decide_budget(state, task)
+
+        # 評価をスキップする予算や、縮退中の最終試行では評価せずに終了する
+        # 通常予算では最終試行も従来通り評価する
+        is_last_attempt = attempt >= budget.max_attempts - 1
+        if budget.skip_evaluation or (
+            budget.mode != SearchMode.FULL and is_last_attempt
+        ):
+            return Command(update={}, goto=END)
+
         return Command(update={}, goto="evaluate_task_result")
 
     async def evaluate_task_result(self, state: WebSearchState) -> Command:
@@ -96,31 +124,67 @@ class WebSearchAgent:
 
         attempt = state.get("attempt", 0)
 
-        evaluation = await self.task_evaluation_service.execute(task)
+        if self.evaluation_gate:
+            evaluation = await self.evaluation_gate.evaluate(task)
+        else:
+            evaluation = await self.task_evaluation_service.execute(task)
 
-        if evaluation.is_satisfactory or attempt >= self.MAX_ATTEMPTS - 1:
+        if evaluation.is_satisfactory or evaluation.need is None:
             return Command(update={}, goto=END)
 
+        # 再試行の前に負荷と残り時間を再確認し、余裕がなければ縮退する
+        budget = self._decide_budget(state, task)
+        if budget.skip_evaluation or attempt >= budget.max_attempts - 1:
+            return Command(update={"search_budget": budget}, goto=END)
+
+        update = {
+            "attempt": attempt + 1,
+            "feedback": evaluation.feedback,
+            "search_budget": budget,
+        }
         if evaluation.need == "search":
-            return Command(
-                update={"attempt": attempt + 1, "feedback": evaluation.feedback},
-                goto="generate_search_queries",
-            )
-        if evaluation.need == "generate":
-            return Command(
-                update={"attempt": attempt + 1, "feedback": evaluation.feedback},
-                goto="generate_task_result",
-            )
-        return Command(update={}, goto=END)
+            return Command(update=update, goto="generate_search_queries")
+        return Command(update=update, goto="generate_task_result")
+
+    def _decide_budget(self, state: WebSearchState, task: Task) -> SearchBudget:
+        """検索ポリシーから予算を決定し、タスクごとにログを残す"""
+        deadline = state.get("deadline")
+        remaining_seconds = deadline - time.time() if deadline else None
+
+        budget = self.search_policy.decide(remaining_seconds)
+
+        remaining_text = (
+            f"{remaining_seconds:.1f}秒" if remaining_seconds is not None else "なし"
+        )
+        logger.info(
+            f"検索ポリシー決定 (task_id={task.id}, attempt={state.get('attempt', 0)}): "
+            f"mode={budget.mode.value}, load={self.search_policy.current_load():.2f}, "
+            f"残り時間={remaining_text}, max_attempts={budget.max_attempts}, "
+            f"max_queries={budget.max_queries}, num_results={budget.num_results}, "
+            f"skip_evaluation={budget.skip_evaluation}"
+        )
+        return budget
 
     def build_graph(self) -> StateGraph:
         graph = StateGraph(WebSearchState)
 
-        graph.add_node("generate_search_queries", self.generate_search_queries)
-        graph.add_node("execute_search", self.execute_search)
-        graph.add_node("generate_task_result", self.generate_task_result)
-        graph.add_node("evaluate_task_result", self.evaluate_task_result)
+        graph.add_node(
+            "generate_search_queries",
+            instrument_node("generate_search_queries", self.generate_search_queries),
+        )
+        graph.add_node(
+            "execute_search", instrument_node("execute_search", self.execute_search)
+        )
+        graph.add_node(
+            "generate_task_result",
+            instrument_node("generate_task_result", self.generate_task_result),
+        )
+        graph.add_node(
+            "evaluate_task_result",
+            instrument_node("evaluate_task_result", self.evaluate_task_result),
+        )
 
         graph.set_entry_point("generate_search_queries")
 
-        return graph.compile()  # type: ignore
+        # サブグラフ内はチェックポイントを取らず、親グラフのノード単位で再開する
+        return graph.compile(checkpointer=False)  # type: ignore
@@ -0,0 +1,9 @@
+from .domain_state_serializer import DomainStateSerializer
+from .measured_checkpoint_saver import MeasuredCheckpointSaver
+from .postgres_checkpoint_store import PostgresCheckpointStore
+
+__all__ = [
+    "DomainStateSerializer",
+    "MeasuredCheckpointSaver",
+    "PostgresCheckpointStore",
+]
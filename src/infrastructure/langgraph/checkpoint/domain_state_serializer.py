@@ -0,0 +1,67 @@
+from typing import Any
+
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.types import Send
+
+from ....domain.model import ChatSession, Message, Task, TaskPlan
+from ...metrics import Histogram
+
+DOMAIN_TYPE_KEY = "__domain_type__"
+
+DOMAIN_TYPES: dict[str, Any] = {
+    "ChatSession": ChatSession,
+    "TaskPlan": TaskPlan,
+    "Task": Task,
+    "Message": Message,
+}
+
+
+class DomainStateSerializer(SerializerProtocol):
+    """ドメインオブジェクトを含むグラフの状態をチェックポイント用に直列化する
+
+    ChatSessionやTaskなどのドメインオブジェクトはto_dict()で辞書に変換し、
+    型名を付けて保存する。それ以外の値はLangGraph標準のシリアライザに任せる。
+    """
+
+    SIZE_BUCKETS = (1_000, 5_000, 10_000, 50_000, 100_000, 500_000, 1_000_000)
+
+    def __init__(self, serializer: SerializerProtocol | None = None):
+        self._serializer = serializer or JsonPlusSerializer()
+        self.size_histogram = Histogram("checkpoint_size_bytes", self.SIZE_BUCKETS)
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        type_, data = self._serializer.dumps_typed(self._encode(obj))
+        self.size_histogram.observe(len(data))
+        return type_, data
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        return self._decode(self._serializer.loads_typed(data))
+
+    def _encode(self, obj: Any) -> Any:
+        type_name = type(obj).__name__
+        if DOMAIN_TYPES.get(type_name) is type(obj):
+            return {DOMAIN_TYPE_KEY: type_name, "data": obj.to_dict()}
+        if isinstance(obj, Send):
+            return Send(obj.node, self._encode(obj.arg))
+        if isinstance(obj, dict):
+            return {key: self._encode(value) for key, value in obj.items()}
+        if isinstance(obj, list):
+            return [self._encode(value) for value in obj]
+        if isinstance(obj, tuple) and type(obj) is tuple:
+            return tuple(self._encode(value) for value in obj)
+        return obj
+
+    def _decode(self, obj: Any) -> Any:
+        if isinstance(obj, dict):
+            type_name = obj.get(DOMAIN_TYPE_KEY)
+            if type_name in DOMAIN_TYPES:
+                return DOMAIN_TYPES[type_name].from_dict(obj["data"])
+            return {key: self._decode(value) for key, value in obj.items()}
+        if isinstance(obj, Send):
+            return Send(obj.node, self._decode(obj.arg))
+        if isinstance(obj, list):
+            return [self._decode(value) for value in obj]
+        if isinstance(obj, tuple) and type(obj) is tuple:
+            return tuple(self._decode(value) for value in obj)
+        return obj
@@ -0,0 +1,82 @@
+import time
+from collections.abc import AsyncIterator, Sequence
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+
+from ...metrics import Histogram
+
+
+class MeasuredCheckpointSaver(BaseCheckpointSaver):
+    """チェックポイントの書き込み遅延を計測するチェックポインタ
+
+    読み書きは内部のチェックポインタに委譲し、aput/aput_writesの所要時間を
+    ヒストグラムに記録する。
+    """
+
+    def __init__(self, saver: BaseCheckpointSaver):
+        super().__init__(serde=saver.serde)
+        self._saver = saver
+        self.write_latency_histogram = Histogram(
+            "checkpoint_write_latency_seconds",
+            (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+        )
+
+    @property
+    def config_specs(self) -> list:
+        return self._saver.config_specs
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return await self._saver.aget_tuple(config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        async for checkpoint_tuple in self._saver.alist(
+            config, filter=filter, before=before, limit=limit
+        ):
+            yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        started_at = time.monotonic()
+        try:
+            return await self._saver.aput(config, checkpoint, metadata, new_versions)
+        finally:
+            self.write_latency_histogram.observe(time.monotonic() - started_at)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        started_at = time.monotonic()
+        try:
+            await self._saver.aput_writes(config, writes, task_id, task_path)
+        finally:
+            self.write_latency_histogram.observe(time.monotonic() - started_at)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await self._saver.adelete_thread(thread_id)
+
+    def get_next_version(self, current: Any, channel: None) -> Any:
+        return self._saver.get_next_version(current, channel)
@@ -0,0 +1,46 @@
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+from .domain_state_serializer import DomainStateSerializer
+from .measured_checkpoint_saver import MeasuredCheckpointSaver
+
+
+class PostgresCheckpointStore:
+    """ワークフローのチェックポイントをPostgreSQLに保存するチェックポインタを管理する
+
+    AsyncPostgresSaverはautocommitの接続を必要とするため、DatabasePoolとは
+    別の専用の接続プールを使う。
+    """
+
+    def __init__(self, postgres_url: str, max_connections: int = 10):
+        self._postgres_url = postgres_url
+        self._max_connections = max_connections
+        self._pool: AsyncConnectionPool | None = None
+
+    async def open(self) -> MeasuredCheckpointSaver:
+        """接続プールを開き、チェックポイント用のテーブルを準備する"""
+        # チェックポイントを有効にした場合のみ必要になるため遅延インポートする
+        from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+
+        self._pool = AsyncConnectionPool(
+            self._postgres_url,
+            kwargs={
+                "autocommit": True,
+                "prepare_threshold": 0,
+                "row_factory": dict_row,
+            },
+            min_size=1,
+            max_size=self._max_connections,
+            open=False,
+        )
+        await self._pool.open()
+
+        saver = AsyncPostgresSaver(conn=self._pool, serde=DomainStateSerializer())  # type: ignore
+        await saver.setup()
+        return MeasuredCheckpointSaver(saver)
+
+    async def close(self) -> None:
+        """専用の接続プールをクローズ"""
+        if self._pool:
+            await self._pool.close()
+            self._pool = None
@@ -1,66 +1,219 @@
 import asyncio
+import time
+from collections.abc import Callable
 
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph
+from langgraph.types import Command
 
-from src.infrastructure.exception.config_exception import MissingEnvironmentVariableError
+from src.infrastructure.exception.config_exception import (
+    MissingEnvironmentVariableError,
+)
 
-from ....config import GOOGLE_API_KEY, GOOGLE_CSE_ID
-from ....domain.model import ChatSession, WorkflowResult
+from ....config import (
+    GOOGLE_API_KEY,
+    GOOGLE_CSE_ID,
+    POSTGRES_URL,
+    PRE_EVALUATION_ACCEPT_SCORE,
+    PRE_EVALUATION_MIN_CITATIONS,
+    PRE_EVALUATION_MIN_LENGTH,
+    PRE_EVALUATION_MIN_SOURCE_COVERAGE,
+    PRE_EVALUATION_MIN_TERM_OVERLAP,
+    PRE_EVALUATION_MODE,
+    SPECULATIVE_GENERAL_ANSWER_ENABLED,
+    WEB_SEARCH_HIGH_LOAD_THRESHOLD,
+    WEB_SEARCH_MIN_FULL_REMAINING_SECONDS,
+    WEB_SEARCH_MIN_REDUCED_REMAINING_SECONDS,
+    WEB_SEARCH_MODERATE_LOAD_THRESHOLD,
+    WORKFLOW_ADMISSION_MAX_QUEUE_DEPTH,
+    WORKFLOW_ADMISSION_MAX_WAIT_SECONDS,
+    WORKFLOW_CHANNEL_QUOTAS,
+    WORKFLOW_CHANNEL_WEIGHTS,
+    WORKFLOW_CHECKPOINT_ENABLED,
+    WORKFLOW_CHECKPOINT_POOL_SIZE,
+    WORKFLOW_CONCURRENCY_BACKOFF_RATIO,
+    WORKFLOW_CONCURRENCY_INITIAL_LIMIT,
+    WORKFLOW_CONCURRENCY_LATENCY_TOLERANCE,
+    WORKFLOW_CONCURRENCY_MAX_LIMIT,
+    WORKFLOW_CONCURRENCY_MIN_LIMIT,
+    WORKFLOW_FINAL_ANSWER_RESERVE_SECONDS,
+    WORKFLOW_GENERAL_ANSWER_TIMEOUT_SECONDS,
+    WORKFLOW_MAX_IN_FLIGHT_PER_CHANNEL,
+    WORKFLOW_MAX_IN_FLIGHT_PER_USER,
+    WORKFLOW_PLANNING_TIMEOUT_SECONDS,
+    WORKFLOW_REQUEST_TIMEOUT_SECONDS,
+    WORKFLOW_USER_QUOTAS,
+    WORKFLOW_WEB_SEARCH_TIMEOUT_SECONDS,
+)
+from ....domain.model import AgentName, ChatSession, TaskPlan, WorkflowResult
 from ....domain.service import (
     FinalAnswerService,
     GeneralAnswerService,
+    PreEvaluationThresholds,
     SearchQueryGenerationService,
     TaskPlanningService,
     TaskResultEvaluationService,
     TaskResultGenerationService,
+    TaskResultPreEvaluationService,
 )
+from ....domain.service.port import AnswerStream, LLMClient
 from ....log import get_logger
-from ...external.llm import LangChainLLMClient, ModelFactory
-from ...external.web_search import GoogleSearchClient
-from ..agents import GeneralAnswerAgent, SupervisorAgent, WebSearchAgent
+from ...concurrency import (
+    AdaptiveConcurrencyLimiter,
+    FairnessPolicy,
+    RequestPriority,
+)
+from ...external.llm import LangChainLLMClient, LatencyObserver, ModelFactory
+from ...external.web_search import GoogleSearchClient, SearchClient
+from ...metrics import WorkflowTrace, instrument_node
+from ..agents import (
+    GeneralAnswerAgent,
+    SpeculativeGeneralAnswerRunner,
+    SupervisorAgent,
+    WebSearchAgent,
+)
+from ..agents.general_answer_agent import GeneralAnswerState
+from ..agents.web_search_agent import WebSearchState
+from ..checkpoint import MeasuredCheckpointSaver, PostgresCheckpointStore
+from ..policy import (
+    NodeTimeouts,
+    PreEvaluationMode,
+    TaskEvaluationGate,
+    WebSearchPolicy,
+)
 from .state import BaseState
+from .task_branch import bound_by_deadline
 
 logger = get_logger(__name__)
 
+# モデル名・用途(遅延を集計する段階名)・遅延の通知先からLLMクライアントを生成する関数
+LLMClientFactory = Callable[[str, str, LatencyObserver], LLMClient]
+
 
 class LangGraphWorkflowService:
     _graph = None
     _graph_lock = asyncio.Lock()
-    _graph_semaphore = asyncio.Semaphore(60)
 
-    def __init__(self, model_factory: ModelFactory):
+    def __init__(
+        self,
+        model_factory: ModelFactory,
+        checkpointer: BaseCheckpointSaver | None = None,
+        llm_client_factory: LLMClientFactory | None = None,
+        search_client: SearchClient | None = None,
+    ):
+        """LLMクライアントと検索クライアントは差し替えられる(ベンチマーク用)"""
         self._model_factory = model_factory
 
-        gemini_2_0_flash_client = LangChainLLMClient(
-            model_factory=model_factory, model_name="gemini-2.0-flash"
-        )
+        # チェックポイントを有効にした場合、中断した実行を最後に完了したノードから再開する
+        self._checkpointer = checkpointer
+        self._checkpoint_store = None
+        if checkpointer is None and WORKFLOW_CHECKPOINT_ENABLED:
+            if not POSTGRES_URL:
+                raise MissingEnvironmentVariableError(["POSTGRES_URL"])
+            self._checkpoint_store = PostgresCheckpointStore(
+                postgres_url=POSTGRES_URL,
+                max_connections=WORKFLOW_CHECKPOINT_POOL_SIZE,
+            )
 
-        gemini_2_5_flash_client = LangChainLLMClient(
-            model_factory=model_factory, model_name="gemini-2.5-flash"
+        # LLM呼び出しの遅延とエラーからワークフローの同時実行数を調整する
+        self.concurrency_limiter = AdaptiveConcurrencyLimiter(
+            min_limit=WORKFLOW_CONCURRENCY_MIN_LIMIT,
+            max_limit=WORKFLOW_CONCURRENCY_MAX_LIMIT,
+            initial_limit=WORKFLOW_CONCURRENCY_INITIAL_LIMIT,
+            latency_tolerance=WORKFLOW_CONCURRENCY_LATENCY_TOLERANCE,
+            backoff_ratio=WORKFLOW_CONCURRENCY_BACKOFF_RATIO,
+            max_queue_depth=WORKFLOW_ADMISSION_MAX_QUEUE_DEPTH,
+            max_wait_seconds=WORKFLOW_ADMISSION_MAX_WAIT_SECONDS,
+            fairness_policy=FairnessPolicy(
+                default_user_quota=WORKFLOW_MAX_IN_FLIGHT_PER_USER or None,
+                default_channel_quota=WORKFLOW_MAX_IN_FLIGHT_PER_CHANNEL or None,
+                user_quotas=WORKFLOW_USER_QUOTAS,
+                channel_quotas=WORKFLOW_CHANNEL_QUOTAS,
+                channel_weights=WORKFLOW_CHANNEL_WEIGHTS,
+            ),
         )
 
         missing_vars = []
-        if not GOOGLE_API_KEY:
+        if not GOOGLE_API_KEY and llm_client_factory is None:
             missing_vars.append("GOOGLE_API_KEY")
-        if not GOOGLE_CSE_ID:
+        if not GOOGLE_CSE_ID and search_client is None:
             missing_vars.append("GOOGLE_CSE_ID")
         if missing_vars:
             raise MissingEnvironmentVariableError(missing_vars)
 
-        search_client = GoogleSearchClient(
-            google_api_key=GOOGLE_API_KEY, google_cse_id=GOOGLE_CSE_ID
+        # 所要時間の傾向が異なる用途が同じ基準値で比べられないよう、用途ごとに
+        # 段階名を分けたクライアントを作る
+        llm_client_factory = llm_client_factory or self._create_llm_client
+
+        def create_client(model_name: str, stage: str) -> LLMClient:
+            return llm_client_factory(
+                model_name, stage, self.concurrency_limiter.observe
+            )
+
+        if search_client is None:
+            search_client = GoogleSearchClient(
+                google_api_key=GOOGLE_API_KEY, google_cse_id=GOOGLE_CSE_ID
+            )
+
+        task_planning_service = TaskPlanningService(
+            create_client("gemini-2.5-flash", "planning")
+        )
+        general_answer_service = GeneralAnswerService(
+            create_client("gemini-2.0-flash", "general_answer")
+        )
+        search_query_service = SearchQueryGenerationService(
+            create_client("gemini-2.0-flash", "search_query")
+        )
+        task_result_service = TaskResultGenerationService(
+            create_client("gemini-2.0-flash", "task_result")
+        )
+        task_evaluation_service = TaskResultEvaluationService(
+            create_client("gemini-2.5-flash", "evaluation")
+        )
+        final_answer_service = FinalAnswerService(
+            create_client("gemini-2.5-flash", "final_answer")
         )
 
-        task_planning_service = TaskPlanningService(gemini_2_5_flash_client)
-        general_answer_service = GeneralAnswerService(gemini_2_0_flash_client)
-        search_query_service = SearchQueryGenerationService(gemini_2_0_flash_client)
-        task_result_service = TaskResultGenerationService(gemini_2_0_flash_client)
-        task_evaluation_service = TaskResultEvaluationService(gemini_2_5_flash_client)
-        final_answer_service = FinalAnswerService(gemini_2_5_flash_client)
+        self.speculative_runner = None
+        if SPECULATIVE_GENERAL_ANSWER_ENABLED:
+            self.speculative_runner = SpeculativeGeneralAnswerRunner(
+                general_answer_service=general_answer_service
+            )
+
+        self.node_timeouts = NodeTimeouts(
+            planning_seconds=WORKFLOW_PLANNING_TIMEOUT_SECONDS,
+            web_search_seconds=WORKFLOW_WEB_SEARCH_TIMEOUT_SECONDS,
+            general_answer_seconds=WORKFLOW_GENERAL_ANSWER_TIMEOUT_SECONDS,
+            final_answer_reserve_seconds=WORKFLOW_FINAL_ANSWER_RESERVE_SECONDS,
+        )
 
         self.supervisor_agent = SupervisorAgent(
             task_planning_service=task_planning_service,
             final_answer_service=final_answer_service,
+            speculative_runner=self.speculative_runner,
+            node_timeouts=self.node_timeouts,
+        )
+
+        search_policy = WebSearchPolicy(
+            load_provider=self.current_load,
+            moderate_load_threshold=WEB_SEARCH_MODERATE_LOAD_THRESHOLD,
+            high_load_threshold=WEB_SEARCH_HIGH_LOAD_THRESHOLD,
+            min_full_remaining_seconds=WEB_SEARCH_MIN_FULL_REMAINING_SECONDS,
+            min_reduced_remaining_seconds=WEB_SEARCH_MIN_REDUCED_REMAINING_SECONDS,
+        )
+
+        self.evaluation_gate = TaskEvaluationGate(
+            pre_evaluation_service=TaskResultPreEvaluationService(
+                PreEvaluationThresholds(
+                    min_citations=PRE_EVALUATION_MIN_CITATIONS,
+                    min_source_coverage=PRE_EVALUATION_MIN_SOURCE_COVERAGE,
+                    min_length=PRE_EVALUATION_MIN_LENGTH,
+                    min_term_overlap=PRE_EVALUATION_MIN_TERM_OVERLAP,
+                    accept_score=PRE_EVALUATION_ACCEPT_SCORE,
+                )
+            ),
+            evaluation_service=task_evaluation_service,
+            mode=PreEvaluationMode(PRE_EVALUATION_MODE),
         )
 
         self.web_search_agent = WebSearchAgent(
@@ -68,46 +221,231 @@ class LangGraphWorkflowService:
             task_result_service=task_result_service,
             task_evaluation_service=task_evaluation_service,
             search_client=search_client,
+            search_policy=search_policy,
+            evaluation_gate=self.evaluation_gate,
         )
 
         self.general_answer_agent = GeneralAnswerAgent(
             general_answer_service=general_answer_service
         )
 
+    def _create_llm_client(
+        self, model_name: str, stage: str, latency_observer: LatencyObserver
+    ) -> LLMClient:
+        return LangChainLLMClient(
+            model_factory=self._model_factory,
+            model_name=model_name,
+            latency_observer=latency_observer,
+            stage=stage,
+        )
+
     async def _get_graph(self) -> StateGraph:
         if self._graph is None:
             async with self._graph_lock:
                 if self._graph is None:
+                    if self._checkpoint_store is not None:
+                        self._checkpointer = await self._checkpoint_store.open()
                     self._graph = self.build_graph()
         return self._graph
 
-    async def execute(self, chat_session: ChatSession, context: dict) -> WorkflowResult:
-        async with self._graph_semaphore:
-            initial_state = {"chat_session": chat_session, "context": context}
-            graph = await self._get_graph()
-            result = await graph.ainvoke(  # type: ignore
-                initial_state
+    async def close(self) -> None:
+        """チェックポイント用の接続プールをクローズ"""
+        if self._checkpoint_store is not None:
+            await self._checkpoint_store.close()
+
+    def current_load(self) -> float:
+        """同時実行上限に対する実行中・実行待ちワークフローの割合"""
+        return self.concurrency_limiter.load()
+
+    @staticmethod
+    def request_priority(context: dict) -> RequestPriority:
+        """既存スレッドへの返信は会話の途中であるため優先して実行する"""
+        message_ts = context.get("message_ts")
+        thread_ts = context.get("thread_ts")
+        if message_ts and thread_ts and message_ts != thread_ts:
+            return RequestPriority.HIGH
+        return RequestPriority.NORMAL
+
+    async def execute(
+        self,
+        chat_session: ChatSession,
+        context: dict,
+        answer_stream: AnswerStream | None = None,
+    ) -> WorkflowResult:
+        """ワークフローを実行し、ノードごとの計測結果をリクエスト単位でログに残す"""
+        trace = WorkflowTrace(request_id=self.checkpoint_thread_id(context))
+        with trace.activate():
+            try:
+                return await self._execute(chat_session, context, answer_stream, trace)
+            finally:
+                logger.info(trace.summary())
+
+    async def _execute(
+        self,
+        chat_session: ChatSession,
+        context: dict,
+        answer_stream: AnswerStream | None,
+        trace: WorkflowTrace,
+    ) -> WorkflowResult:
+        deadline = time.time() + WORKFLOW_REQUEST_TIMEOUT_SECONDS
+
+        user_id = context.get("user_id", "")
+        channel_id = context.get("channel_id", "")
+
+        async with self.concurrency_limiter.acquire(
+            self.request_priority(context), user_id=user_id, channel_id=channel_id
+        ):
+            trace.queue_wait_seconds = trace.elapsed_seconds
+            stats = self.concurrency_limiter.stats()
+            channel_stats = self.concurrency_limiter.stats_for_key(
+                f"channel:{channel_id}"
+            )
+            logger.debug(
+                f"ワークフロー開始 (上限: {stats.limit}, 実行中: {stats.in_flight}, "
+                f"待機中: {stats.queue_depth}, 平均待ち時間: "
+                f"{stats.average_wait_seconds:.2f}秒, チャンネル{channel_id}の実行中: "
+                f"{channel_stats.in_flight}, 待機中: {channel_stats.queued}, "
+                f"平均待ち時間: {channel_stats.average_wait_seconds:.2f}秒)"
             )
+
+            graph = await self._get_graph()
+            thread_id = self.checkpoint_thread_id(context)
+            config = {
+                "configurable": {"answer_stream": answer_stream, "thread_id": thread_id}
+            }
+
+            graph_input: dict | Command = {
+                "chat_session": chat_session,
+                "context": context,
+                "deadline": deadline,
+            }
+            resumed = await self._prepare_checkpoint(graph, config, chat_session)
+            if resumed:
+                # 保存済みの状態から再開し、期限だけ今回のリクエストに合わせる
+                graph_input = Command(update={"deadline": deadline})
+
+            try:
+                result = await graph.ainvoke(graph_input, config=config)  # type: ignore
+            except asyncio.CancelledError:
+                # 新しいメッセージで中断された実行は再開しない
+                await asyncio.shield(self._delete_checkpoint(thread_id))
+                raise
+            await self._delete_checkpoint(thread_id)
+
             answer = result.get("answer", "")
             task_plan = result.get("task_plan")
+            if resumed and task_plan:
+                # 再開した計画は今回のリクエストのユーザーメッセージに紐づけ直す
+                task_plan = TaskPlan.reconstruct(
+                    id=task_plan.id,
+                    message_id=chat_session.last_user_message().id,
+                    tasks=task_plan.tasks,
+                )
 
             return WorkflowResult(answer=answer, task_plan=task_plan)
 
+    @staticmethod
+    def checkpoint_thread_id(context: dict) -> str:
+        """チェックポイントのスレッドID(会話とメッセージごと)"""
+        return f"{context.get('conversation_id')}:{context.get('message_ts')}"
+
+    async def _prepare_checkpoint(
+        self, graph, config: dict, chat_session: ChatSession
+    ) -> bool:
+        """再開できるチェックポイントがあればTrueを返す
+
+        同じメッセージに対する未完了の実行だけを再開し、それ以外の
+        古いチェックポイントは削除して最初から実行する。
+        """
+        if self._checkpointer is None:
+            return False
+
+        snapshot = await graph.aget_state(config)
+        if not snapshot.values:
+            return False
+
+        saved_session = snapshot.values.get("chat_session")
+        if (
+            snapshot.next
+            and saved_session is not None
+            and saved_session.last_user_message().content
+            == chat_session.last_user_message().content
+        ):
+            logger.info(
+                f"チェックポイントからワークフローを再開します "
+                f"(thread_id={config['configurable']['thread_id']}, "
+                f"次のノード: {', '.join(snapshot.next)})"
+            )
+            return True
+
+        await self._delete_checkpoint(config["configurable"]["thread_id"])
+        return False
+
+    async def _delete_checkpoint(self, thread_id: str) -> None:
+        if self._checkpointer is None:
+            return
+
+        await self._checkpointer.adelete_thread(thread_id)
+        if isinstance(self._checkpointer, MeasuredCheckpointSaver):
+            latency = self._checkpointer.write_latency_histogram
+            size = getattr(self._checkpointer.serde, "size_histogram", None)
+            logger.debug(
+                f"チェックポイント書き込み (累計: {latency.count}回, "
+                f"平均: {latency.mean * 1000:.1f}ms, "
+                f"p95: {latency.percentile(0.95) * 1000:.1f}ms"
+                + (
+                    f", 平均サイズ: {size.mean:.0f}bytes, "
+                    f"p95サイズ: {size.percentile(0.95):.0f}bytes)"
+                    if size is not None
+                    else ")"
+                )
+            )
+
     def build_graph(self) -> StateGraph:
         """LangGraphのグラフを構築"""
         graph = StateGraph(BaseState)
 
-        graph.add_node("plan_tasks", self.supervisor_agent.plan_tasks)
+        # 各ノードの所要時間とLLM使用量を計測し、対象タスクに記録する
+        graph.add_node(
+            "plan_tasks",
+            instrument_node("plan_tasks", self.supervisor_agent.plan_tasks),
+        )
         graph.add_node(
-            "generate_final_answer", self.supervisor_agent.generate_final_answer
+            "generate_final_answer",
+            instrument_node(
+                "generate_final_answer", self.supervisor_agent.generate_final_answer
+            ),
         )
 
-        graph.add_node("general_answer", self.general_answer_agent.build_graph())  # type: ignore
-        graph.add_node("web_search", self.web_search_agent.build_graph())  # type: ignore
+        # タスク実行のブランチは制限時間付きで実行し、遅れたタスクを待ち続けない
+        graph.add_node(
+            "general_answer",
+            instrument_node(
+                "general_answer",
+                bound_by_deadline(  # type: ignore
+                    AgentName.GENERAL_ANSWER,
+                    self.general_answer_agent.build_graph(),  # type: ignore
+                    self.node_timeouts,
+                ),
+            ),
+            input_schema=GeneralAnswerState,
+        )
+        graph.add_node(
+            "web_search",
+            instrument_node(
+                "web_search",
+                bound_by_deadline(  # type: ignore
+                    AgentName.WEB_SEARCH,
+                    self.web_search_agent.build_graph(),  # type: ignore
+                    self.node_timeouts,
+                ),
+            ),
+            input_schema=WebSearchState,
+        )
 
         graph.set_entry_point("plan_tasks")
 
         graph.add_edge("general_answer", "generate_final_answer")
         graph.add_edge("web_search", "generate_final_answer")
 
-        return graph.compile()  # type: ignore
+        return graph.compile(checkpointer=self._checkpointer)  # type: ignore
@@ -1,6 +1,7 @@
+import operator
 from typing import Annotated, TypedDict
 
-from ....domain.model import ChatSession, TaskPlan
+from ....domain.model import ChatSession, Task, TaskPlan
 
 
 def take_first(left, right):
@@ -25,3 +26,8 @@ class BaseState(TypedDict):
     context: Context
     task_plan: Annotated[TaskPlan | None, take_first]
     answer: str | None
+    # リクエスト全体の期限(UNIX時刻)
+    deadline: float | None
+    # タスク実行のブランチが終了させたタスク。チェックポイントから再開した場合は
+    # ブランチのタスクとtask_planのタスクが別オブジェクトになるため、結果の反映に使う
+    finished_tasks: Annotated[list[Task], operator.add]
@@ -0,0 +1,44 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph.state import CompiledStateGraph
+
+from ....domain.model import AgentName, Task, TaskStatus
+from ....log import get_logger
+from ..policy import NodeTimeouts
+
+logger = get_logger(__name__)
+
+
+def bound_by_deadline(
+    agent_name: AgentName,
+    subgraph: CompiledStateGraph,
+    node_timeouts: NodeTimeouts,
+) -> Callable[[dict[str, Any], RunnableConfig], Awaitable[dict[str, Any]]]:
+    """タスク実行のサブグラフを制限時間付きで実行するノードを返す
+
+    制限時間を超えた場合はサブグラフを打ち切り、未完了のタスクを
+    タイムアウトとして失敗させる。完了済みのタスクの結果はそのまま残す。
+    実行したタスクはfinished_tasksとして返し、チェックポイントに記録する。
+    """
+
+    async def run(state: dict[str, Any], config: RunnableConfig) -> dict[str, Any]:
+        timeout = node_timeouts.task_timeout(agent_name, state.get("deadline"))
+        tasks: list[Task] = state.get("tasks") or [state["task"]]
+        try:
+            await asyncio.wait_for(subgraph.ainvoke(state, config), timeout=timeout)
+        except TimeoutError:
+            for task in tasks:
+                if task.status == TaskStatus.IN_PROGRESS:
+                    task.fail(
+                        f"タイムアウトしました ({agent_name.value}: {timeout:.0f}秒)"
+                    )
+            logger.warning(
+                f"{agent_name.value}が制限時間({timeout:.1f}秒)を超えたため打ち切りました "
+                f"(task_ids={[str(task.id) for task in tasks]})"
+            )
+        return {"finished_tasks": tasks}
+
+    return run
@@ -0,0 +1,17 @@
+from .evaluation_gate import (
+    PreEvaluationAgreementStats,
+    PreEvaluationMode,
+    TaskEvaluationGate,
+)
+from .node_timeouts import NodeTimeouts
+from .web_search_policy import SearchBudget, SearchMode, WebSearchPolicy
+
+__all__ = [
+    "NodeTimeouts",
+    "PreEvaluationAgreementStats",
+    "PreEvaluationMode",
+    "SearchBudget",
+    "SearchMode",
+    "TaskEvaluationGate",
+    "WebSearchPolicy",
+]
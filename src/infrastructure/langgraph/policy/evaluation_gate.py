@@ -0,0 +1,116 @@
+from dataclasses import dataclass
+from enum import Enum
+
+from ....domain.model import Task, TaskEvaluation, TaskPreEvaluation
+from ....domain.service import (
+    TaskResultEvaluationService,
+    TaskResultPreEvaluationService,
+)
+from ....log import get_logger
+
+logger = get_logger(__name__)
+
+
+class PreEvaluationMode(Enum):
+    OFF = "off"
+    # 事前評価を記録するのみで、常にLLM評価を行う
+    SHADOW = "shadow"
+    # 事前評価で合格した場合はLLM評価をスキップする
+    ENFORCE = "enforce"
+
+
+@dataclass
+class PreEvaluationAgreementStats:
+    """事前評価とLLM評価の一致状況の集計"""
+
+    skipped_llm_calls: int = 0
+    both_accepted: int = 0
+    both_rejected: int = 0
+    # 事前評価は合格だがLLM評価は不合格(閾値が緩すぎる兆候)
+    false_accepts: int = 0
+    # 事前評価は不合格だがLLM評価は合格(閾値が厳しすぎる兆候)
+    false_rejects: int = 0
+
+    @property
+    def compared(self) -> int:
+        return (
+            self.both_accepted
+            + self.both_rejected
+            + self.false_accepts
+            + self.false_rejects
+        )
+
+    @property
+    def agreement_rate(self) -> float:
+        if not self.compared:
+            return 0.0
+        return (self.both_accepted + self.both_rejected) / self.compared
+
+    def record(self, pre_accepted: bool, llm_accepted: bool) -> None:
+        if pre_accepted and llm_accepted:
+            self.both_accepted += 1
+        elif not pre_accepted and not llm_accepted:
+            self.both_rejected += 1
+        elif pre_accepted:
+            self.false_accepts += 1
+        else:
+            self.false_rejects += 1
+
+
+class TaskEvaluationGate:
+    """LLMによるタスク結果評価の前段に、ローカルな事前評価を挟む"""
+
+    def __init__(
+        self,
+        pre_evaluation_service: TaskResultPreEvaluationService,
+        evaluation_service: TaskResultEvaluationService,
+        mode: PreEvaluationMode = PreEvaluationMode.OFF,
+    ):
+        self.pre_evaluation_service = pre_evaluation_service
+        self.evaluation_service = evaluation_service
+        self.mode = mode
+        self.stats = PreEvaluationAgreementStats()
+
+    async def evaluate(self, task: Task) -> TaskEvaluation:
+        """タスク結果を評価する"""
+        if self.mode == PreEvaluationMode.OFF:
+            return await self.evaluation_service.execute(task)
+
+        pre_evaluation = self.pre_evaluation_service.execute(task)
+
+        if self.mode == PreEvaluationMode.ENFORCE and pre_evaluation.accepted:
+            self.stats.skipped_llm_calls += 1
+            logger.info(
+                f"事前評価で合格したためLLM評価をスキップしました "
+                f"(task_id={task.id}, {self._format(pre_evaluation)})"
+            )
+            return TaskEvaluation(
+                is_satisfactory=True,
+                need=None,
+                reason=f"ローカルな事前評価で合格しました (score={pre_evaluation.score:.2f})",
+                feedback=None,
+            )
+
+        evaluation = await self.evaluation_service.execute(task)
+
+        self.stats.record(pre_evaluation.accepted, evaluation.is_satisfactory)
+        logger.info(
+            f"事前評価とLLM評価の比較 (task_id={task.id}, "
+            f"事前評価={'合格' if pre_evaluation.accepted else '不合格'}, "
+            f"LLM評価={'合格' if evaluation.is_satisfactory else '不合格'}, "
+            f"{self._format(pre_evaluation)}, "
+            f"一致率={self.stats.agreement_rate:.1%}, "
+            f"誤合格={self.stats.false_accepts}, 誤不合格={self.stats.false_rejects})"
+        )
+
+        return evaluation
+
+    def _format(self, pre_evaluation: TaskPreEvaluation) -> str:
+        return (
+            f"score={pre_evaluation.score:.2f}, "
+            f"引用数={pre_evaluation.citation_count}, "
+            f"情報源網羅度={pre_evaluation.source_coverage:.2f}, "
+            f"長さ={pre_evaluation.length}, "
+            f"語句一致度={pre_evaluation.term_overlap:.2f}, "
+            f"不明な情報源={pre_evaluation.unknown_source_count}"
+        )
@@ -0,0 +1,43 @@
+import time
+from dataclasses import dataclass
+from typing import ClassVar
+
+from ....domain.model import AgentName
+
+
+@dataclass(frozen=True)
+class NodeTimeouts:
+    """ノードごとの制限時間(秒)とリクエスト期限から、各ノードに許す時間を決める
+
+    タスク計画とタスク実行は、最終回答の生成時間を残すために
+    リクエスト期限からfinal_answer_reserve_secondsを差し引いた時刻までに打ち切る。
+    """
+
+    planning_seconds: float = 20.0
+    web_search_seconds: float = 60.0
+    general_answer_seconds: float = 30.0
+    final_answer_reserve_seconds: float = 20.0
+
+    MIN_TIMEOUT_SECONDS: ClassVar[float] = 1.0
+
+    def planning_timeout(self, deadline: float | None) -> float:
+        return self._bounded(self.planning_seconds, deadline)
+
+    def task_timeout(self, agent_name: AgentName, deadline: float | None) -> float:
+        budgets = {
+            AgentName.WEB_SEARCH: self.web_search_seconds,
+            AgentName.GENERAL_ANSWER: self.general_answer_seconds,
+        }
+        return self._bounded(budgets[agent_name], deadline)
+
+    def final_answer_timeout(self, deadline: float | None) -> float | None:
+        """最終回答には期限までの残り時間を与える(少なくとも確保分は与える)"""
+        if deadline is None:
+            return None
+        return max(deadline - time.time(), self.final_answer_reserve_seconds)
+
+    def _bounded(self, budget: float, deadline: float | None) -> float:
+        if deadline is None:
+            return budget
+        remaining = deadline - time.time() - self.final_answer_reserve_seconds
+        return max(min(budget, remaining), self.MIN_TIMEOUT_SECONDS)
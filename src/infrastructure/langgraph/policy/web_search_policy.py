@@ -0,0 +1,89 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+from enum import Enum
+
+
+class SearchMode(Enum):
+    FULL = "full"
+    REDUCED = "reduced"
+    MINIMAL = "minimal"
+
+
+@dataclass(frozen=True)
+class SearchBudget:
+    """Web検索タスク1件に許可する処理量"""
+
+    mode: SearchMode
+    max_attempts: int
+    max_queries: int
+    num_results: int
+    skip_evaluation: bool
+
+
+class WebSearchPolicy:
+    """負荷とリクエストの残り時間から、Web検索ループの品質/レイテンシを決定する
+
+    - FULL: 評価と再試行を含む通常のループ
+    - REDUCED: クエリ数と取得ページ数を減らす
+    - MINIMAL: 評価をスキップし、1クエリ・1ページのみ取得する
+    """
+
+    BUDGETS = {
+        SearchMode.FULL: SearchBudget(
+            mode=SearchMode.FULL,
+            max_attempts=2,
+            max_queries=3,
+            num_results=3,
+            skip_evaluation=False,
+        ),
+        SearchMode.REDUCED: SearchBudget(
+            mode=SearchMode.REDUCED,
+            max_attempts=2,
+            max_queries=2,
+            num_results=2,
+            skip_evaluation=False,
+        ),
+        SearchMode.MINIMAL: SearchBudget(
+            mode=SearchMode.MINIMAL,
+            max_attempts=1,
+            max_queries=1,
+            num_results=1,
+            skip_evaluation=True,
+        ),
+    }
+
+    def __init__(
+        self,
+        load_provider: Callable[[], float],
+        moderate_load_threshold: float = 0.5,
+        high_load_threshold: float = 0.8,
+        min_full_remaining_seconds: float = 60.0,
+        min_reduced_remaining_seconds: float = 30.0,
+    ):
+        self._load_provider = load_provider
+        self._moderate_load_threshold = moderate_load_threshold
+        self._high_load_threshold = high_load_threshold
+        self._min_full_remaining_seconds = min_full_remaining_seconds
+        self._min_reduced_remaining_seconds = min_reduced_remaining_seconds
+
+    def current_load(self) -> float:
+        """現在の負荷(1.0で同時実行上限に到達)"""
+        return self._load_provider()
+
+    def decide(self, remaining_seconds: float | None) -> SearchBudget:
+        """現在の負荷と残り時間から検索の予算を決定する"""
+        load = self.current_load()
+
+        if load >= self._high_load_threshold or (
+            remaining_seconds is not None
+            and remaining_seconds < self._min_reduced_remaining_seconds
+        ):
+            return self.BUDGETS[SearchMode.MINIMAL]
+
+        if load >= self._moderate_load_threshold or (
+            remaining_seconds is not None
+            and remaining_seconds < self._min_full_remaining_seconds
+        ):
+            return self.BUDGETS[SearchMode.REDUCED]
+
+        return self.BUDGETS[SearchMode.FULL]
@@ -0,0 +1,5 @@
+from .postgres_conversation_lock import PostgresConversationLock
+
+__all__ = [
+    "PostgresConversationLock",
+]
@@ -0,0 +1,94 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from psycopg import AsyncConnection
+from psycopg_pool import AsyncConnectionPool, PoolTimeout
+
+from ...domain.service.port import ConversationLock
+from ...log import get_logger
+from ..exception.concurrency_exception import ConversationLockUnavailableError
+
+logger = get_logger(__name__)
+
+
+class PostgresConversationLock:
+    """PostgreSQLのアドバイザリロックで会話ごとの処理を複数インスタンス間で直列化する
+
+    ロックはワークフローの実行中ずっと保持するため、DatabasePoolとは別の
+    専用の接続プールを使う。同じプロセス内の待機はlocal_lock(プロセス内ロック)で
+    直列化し、1会話あたりの接続は1本に抑える。
+    接続をconnection_timeout_seconds秒以内に確保できない場合は
+    ConversationLockUnavailableErrorを送出する。
+    """
+
+    def __init__(
+        self,
+        postgres_url: str,
+        local_lock: ConversationLock,
+        max_connections: int = 20,
+        connection_timeout_seconds: float = 30.0,
+    ):
+        self._postgres_url = postgres_url
+        self._local_lock = local_lock
+        self._max_connections = max_connections
+        self._connection_timeout_seconds = connection_timeout_seconds
+        self._pool: AsyncConnectionPool | None = None
+        self._pool_lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def acquire(self, conversation_id: str) -> AsyncIterator[None]:
+        async with self._local_lock.acquire(conversation_id):
+            pool = await self._get_pool()
+            try:
+                conn = await pool.getconn(timeout=self._connection_timeout_seconds)
+            except PoolTimeout as e:
+                raise ConversationLockUnavailableError(conversation_id) from e
+
+            try:
+                await conn.execute(
+                    "SELECT pg_advisory_lock(hashtextextended(%s, 0))",
+                    (conversation_id,),
+                )
+                try:
+                    yield
+                finally:
+                    await self._unlock(conn, conversation_id)
+            finally:
+                await pool.putconn(conn)
+
+    async def close(self) -> None:
+        """専用の接続プールをクローズ"""
+        if self._pool:
+            await self._pool.close()
+            self._pool = None
+
+    @staticmethod
+    async def _unlock(conn: AsyncConnection, conversation_id: str) -> None:
+        try:
+            await conn.execute(
+                "SELECT pg_advisory_unlock(hashtextextended(%s, 0))",
+                (conversation_id,),
+            )
+        except Exception as e:
+            # ロックを解放できなかった接続は閉じてセッションごと解放する
+            logger.warning(
+                f"アドバイザリロックの解放に失敗しました "
+                f"(conversation_id={conversation_id}): {e!s}"
+            )
+            await conn.close()
+
+    async def _get_pool(self) -> AsyncConnectionPool:
+        # 最初の呼び出しが同時に来ても接続プールは1つだけ作る
+        async with self._pool_lock:
+            if self._pool is None:
+                pool = AsyncConnectionPool(
+                    self._postgres_url,
+                    kwargs={"autocommit": True},
+                    min_size=1,
+                    max_size=self._max_connections,
+                    open=False,
+                )
+                await pool.open()
+                self._pool = pool
+        return self._pool
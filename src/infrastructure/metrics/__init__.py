@@ -0,0 +1,19 @@
+from .histogram import Histogram
+from .workflow_trace import (
+    NodeSpan,
+    WorkflowTrace,
+    current_trace,
+    instrument_node,
+    measure_llm_usage,
+    record_llm_call,
+)
+
+__all__ = [
+    "Histogram",
+    "NodeSpan",
+    "WorkflowTrace",
+    "current_trace",
+    "instrument_node",
+    "measure_llm_usage",
+    "record_llm_call",
+]
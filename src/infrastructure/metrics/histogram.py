@@ -0,0 +1,53 @@
+import bisect
+from collections.abc import Sequence
+
+
+class Histogram:
+    """固定バケットで値の分布を集計するヒストグラム"""
+
+    DEFAULT_BUCKETS: tuple[float, ...] = (0.1, 0.5, 1, 2, 5, 10, 20, 30, 60)
+
+    def __init__(self, name: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self._buckets = sorted(buckets)
+        # 最後の要素は最大バケットを超えた値の件数
+        self._counts = [0] * (len(self._buckets) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    @property
+    def mean(self) -> float:
+        return self._sum / self._count if self._count else 0.0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect.bisect_left(self._buckets, value)] += 1
+        self._count += 1
+        self._sum += value
+        self._max = max(self._max, value)
+
+    def percentile(self, q: float) -> float:
+        """q(0〜1)分位点を含むバケットの上限値を返す"""
+        if not self._count:
+            return 0.0
+
+        threshold = q * self._count
+        cumulative = 0
+        for upper_bound, count in zip(self._buckets, self._counts, strict=False):
+            cumulative += count
+            if cumulative >= threshold:
+                return min(upper_bound, self._max)
+        return self._max
+
+    def snapshot(self) -> dict[str, int]:
+        """バケットごとの件数(「le_上限値」形式のキー)"""
+        labels = [f"le_{bound:g}" for bound in self._buckets] + ["le_inf"]
+        return dict(zip(labels, self._counts, strict=True))
@@ -0,0 +1,207 @@
+import inspect
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+
+from ...domain.model import Task, TaskTiming
+
+
+@dataclass
+class NodeSpan:
+    """ノードを一度実行したときの計測値"""
+
+    stage: str
+    tasks: list[Task]
+    parent: "NodeSpan | None" = None
+    started_at: float = field(default_factory=time.monotonic)
+    wall_seconds: float = 0.0
+    error: bool = False
+    llm_calls: int = 0
+    llm_seconds: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+
+@dataclass
+class StageSummary:
+    """段階ごとの集計"""
+
+    runs: int = 0
+    wall_seconds: float = 0.0
+
+
+class WorkflowTrace:
+    """1リクエスト分のワークフローの計測値
+
+    activate() の中で実行されたノードと、LLM呼び出しを記録する。
+    """
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.started_at = time.monotonic()
+        self.queue_wait_seconds = 0.0
+        self.spans: list[NodeSpan] = []
+        self.llm_calls = 0
+        self.llm_errors = 0
+        self.llm_seconds = 0.0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    @contextmanager
+    def activate(self) -> Iterator["WorkflowTrace"]:
+        token = _current_trace.set(self)
+        try:
+            yield self
+        finally:
+            _current_trace.reset(token)
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def stage_summaries(self) -> dict[str, StageSummary]:
+        """段階名ごとの実行回数と所要時間(初回実行順)"""
+        summaries: dict[str, StageSummary] = {}
+        for span in self.spans:
+            summary = summaries.setdefault(span.stage, StageSummary())
+            summary.runs += 1
+            summary.wall_seconds += span.wall_seconds
+        return summaries
+
+    def summary(self) -> str:
+        stages = ", ".join(
+            f"{stage}: {summary.wall_seconds:.2f}秒"
+            + (f"({summary.runs}回)" if summary.runs > 1 else "")
+            for stage, summary in self.stage_summaries().items()
+        )
+        return (
+            f"ワークフロー計測 (request_id={self.request_id}, "
+            f"合計: {self.elapsed_seconds:.2f}秒, "
+            f"待機: {self.queue_wait_seconds:.2f}秒, "
+            f"LLM: {self.llm_calls}回/{self.llm_seconds:.2f}秒"
+            f"(エラー{self.llm_errors}回), "
+            f"トークン: 入力{self.input_tokens}/出力{self.output_tokens}"
+            + (f", {stages}" if stages else "")
+            + ")"
+        )
+
+
+_current_trace: ContextVar[WorkflowTrace | None] = ContextVar(
+    "workflow_trace", default=None
+)
+_current_span: ContextVar[NodeSpan | None] = ContextVar(
+    "workflow_node_span", default=None
+)
+
+
+def current_trace() -> WorkflowTrace | None:
+    return _current_trace.get()
+
+
+def record_llm_call(
+    seconds: float, input_tokens: int, output_tokens: int, error: bool
+) -> None:
+    """LLM呼び出しを、実行中のノードとリクエストのトレースに記録する"""
+    span = _current_span.get()
+    while span is not None:
+        span.llm_calls += 1
+        span.llm_seconds += seconds
+        span.input_tokens += input_tokens
+        span.output_tokens += output_tokens
+        span = span.parent
+
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.llm_calls += 1
+        trace.llm_errors += int(error)
+        trace.llm_seconds += seconds
+        trace.input_tokens += input_tokens
+        trace.output_tokens += output_tokens
+
+
+@contextmanager
+def measure_llm_usage(span: NodeSpan) -> Iterator[NodeSpan]:
+    """バックグラウンドで行うLLM呼び出しの使用量をspanに記録する
+
+    記録した呼び出しはリクエストのトレースにも加えるが、呼び出し元のノードには
+    加えない(呼び出し元のノードが先に終了することがあるため)。
+    """
+    token = _current_span.set(span)
+    try:
+        yield span
+    finally:
+        _current_span.reset(token)
+
+
+def _state_tasks(state: dict[str, Any]) -> list[Task]:
+    if tasks := state.get("tasks"):
+        return list(tasks)
+    if task := state.get("task"):
+        return [task]
+    return []
+
+
+def _record_task_timings(span: NodeSpan) -> None:
+    """ノードの計測値を対象タスクに記録する
+
+    複数タスクをまとめて処理したノードは、所要時間を各タスクにそのまま記録し、
+    LLM呼び出しの回数・時間・トークン数はタスク数で按分する。
+    """
+    count = len(span.tasks)
+    for index, task in enumerate(span.tasks):
+        first = index == 0
+        task.record_timing(
+            TaskTiming(
+                stage=span.stage,
+                wall_seconds=span.wall_seconds,
+                runs=1,
+                errors=int(span.error),
+                llm_calls=span.llm_calls // count
+                + (span.llm_calls % count if first else 0),
+                llm_seconds=span.llm_seconds / count,
+                input_tokens=span.input_tokens // count
+                + (span.input_tokens % count if first else 0),
+                output_tokens=span.output_tokens // count
+                + (span.output_tokens % count if first else 0),
+            )
+        )
+
+
+def instrument_node(
+    stage: str, node: Callable[..., Awaitable[Any]]
+) -> Callable[[dict[str, Any], RunnableConfig], Awaitable[Any]]:
+    """ノードを計測用のラッパーで包んで返す
+
+    所要時間とLLM使用量をstateのtask/tasksに記録し、トレースが有効な場合は
+    トレースにも追加する。
+    """
+    accepts_config = "config" in inspect.signature(node).parameters
+
+    async def run(state: dict[str, Any], config: RunnableConfig) -> Any:
+        span = NodeSpan(
+            stage=stage, tasks=_state_tasks(state), parent=_current_span.get()
+        )
+        token = _current_span.set(span)
+        try:
+            if accepts_config:
+                return await node(state, config)
+            return await node(state)
+        except BaseException:
+            span.error = True
+            raise
+        finally:
+            _current_span.reset(token)
+            span.wall_seconds = time.monotonic() - span.started_at
+            if span.tasks:
+                _record_task_timings(span)
+            trace = _current_trace.get()
+            if trace is not None:
+                trace.spans.append(span)
+
+    run.__name__ = stage
+    return run
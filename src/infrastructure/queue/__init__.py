@@ -0,0 +1,11 @@
+from .job import Job, JobStatus
+from .job_worker import JobHandler, JobWorker
+from .postgres_job_queue import PostgresJobQueue
+
+__all__ = [
+    "Job",
+    "JobHandler",
+    "JobStatus",
+    "JobWorker",
+    "PostgresJobQueue",
+]
@@ -0,0 +1,34 @@
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any
+from uuid import UUID
+
+# ジョブのペイロードに記録する、ストリーミング回答のプレースホルダーのts
+PLACEHOLDER_TS_KEY = "placeholder_ts"
+
+
+class JobStatus(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    DEAD = "dead"
+
+
+@dataclass
+class Job:
+    """ジョブキューから取得したSlackイベントの処理ジョブ"""
+
+    id: UUID
+    event_id: str
+    payload: dict[str, Any]
+    attempts: int
+    max_attempts: int
+
+    @property
+    def is_last_attempt(self) -> bool:
+        return self.attempts >= self.max_attempts
+
+    @property
+    def placeholder_ts(self) -> str | None:
+        """前の試行で投稿したプレースホルダーのts"""
+        return self.payload.get(PLACEHOLDER_TS_KEY)
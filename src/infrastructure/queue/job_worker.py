@@ -0,0 +1,181 @@
+import asyncio
+import contextlib
+from collections.abc import Awaitable, Callable
+
+from ...log import get_logger
+from .job import Job, JobStatus
+from .postgres_job_queue import PostgresJobQueue
+
+logger = get_logger(__name__)
+
+JobHandler = Callable[[Job], Awaitable[None]]
+
+# 完了したジョブの削除を1回のDELETEで行う件数
+_CLEANUP_BATCH_SIZE = 1000
+
+
+class JobWorker:
+    """ジョブキューからジョブを取り出して処理するワーカープール
+
+    処理中のジョブはlease_extension_interval_seconds秒ごとにロック期限を延ばし、
+    長く掛かる処理が可視性タイムアウトで別のワーカーに再取得されないようにする。
+    completed_retention_secondsを指定した場合は、完了したジョブを定期的に削除する。
+    """
+
+    def __init__(
+        self,
+        job_queue: PostgresJobQueue,
+        handler: JobHandler,
+        concurrency: int = 4,
+        poll_interval_seconds: float = 1.0,
+        *,
+        lease_extension_interval_seconds: float = 60.0,
+        completed_retention_seconds: float | None = None,
+        cleanup_interval_seconds: float = 3600.0,
+    ):
+        self._job_queue = job_queue
+        self._handler = handler
+        self._concurrency = concurrency
+        self._poll_interval_seconds = poll_interval_seconds
+        self._lease_extension_interval_seconds = lease_extension_interval_seconds
+        self._completed_retention_seconds = completed_retention_seconds
+        self._cleanup_interval_seconds = cleanup_interval_seconds
+        self._tasks: list[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+
+    def start(self) -> None:
+        """ワーカーを起動する"""
+        self._stopping.clear()
+        self._tasks = [
+            asyncio.create_task(self._run(index)) for index in range(self._concurrency)
+        ]
+        if self._completed_retention_seconds is not None:
+            self._tasks.append(asyncio.create_task(self._cleanup()))
+        logger.info(f"ジョブワーカーを起動しました (並列数: {self._concurrency})")
+
+    async def stop(self) -> None:
+        """新しいジョブの取得を止め、ワーカーを停止する
+
+        処理中のジョブは中断してキューに戻し、試行回数を消費せずに
+        別のワーカーがすぐに再実行できるようにする。
+        """
+        self._stopping.set()
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._tasks = []
+        logger.info("ジョブワーカーを停止しました")
+
+    async def run_once(self) -> bool:
+        """ジョブを1件処理する。処理するジョブがなければFalseを返す"""
+        job = await self._job_queue.claim()
+        if job is None:
+            return False
+
+        if job.attempts > job.max_attempts:
+            # 最後の試行中にワーカーが落ちたジョブ
+            await self._job_queue.fail(job, "可視性タイムアウトを超過しました")
+            logger.error(f"ジョブをデッドレターにしました (event_id={job.event_id})")
+            return True
+
+        try:
+            await self._handle(job)
+        except asyncio.CancelledError:
+            await self._release(job)
+            raise
+        except Exception as e:
+            status = await self._job_queue.fail(job, str(e))
+            if status == JobStatus.DEAD:
+                logger.error(
+                    f"ジョブをデッドレターにしました (event_id={job.event_id}, "
+                    f"試行回数: {job.attempts}回): {e!s}"
+                )
+            else:
+                logger.warning(
+                    f"ジョブを再実行します (event_id={job.event_id}, "
+                    f"試行回数: {job.attempts}/{job.max_attempts}回): {e!s}"
+                )
+        else:
+            await self._job_queue.complete(job)
+        return True
+
+    async def delete_completed_jobs(self) -> int:
+        """保持期間を過ぎた完了済みのジョブをすべて削除する"""
+        deleted = 0
+        while True:
+            count = await self._job_queue.delete_completed(
+                self._completed_retention_seconds or 0.0, _CLEANUP_BATCH_SIZE
+            )
+            deleted += count
+            if count < _CLEANUP_BATCH_SIZE:
+                return deleted
+
+    async def _handle(self, job: Job) -> None:
+        """ロック期限を延ばしながらハンドラーを実行する"""
+        lease = asyncio.create_task(self._extend_lease(job))
+        try:
+            await self._handler(job)
+        finally:
+            lease.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await lease
+
+    async def _release(self, job: Job) -> None:
+        try:
+            if await self._job_queue.release(job):
+                logger.info(
+                    f"中断したジョブをキューに戻しました (event_id={job.event_id})"
+                )
+        except Exception as e:
+            # 戻せなかった場合も可視性タイムアウト後に再取得される
+            logger.warning(
+                f"中断したジョブをキューに戻せませんでした "
+                f"(event_id={job.event_id}): {e!s}"
+            )
+
+    async def _extend_lease(self, job: Job) -> None:
+        while True:
+            await asyncio.sleep(self._lease_extension_interval_seconds)
+            try:
+                extended = await self._job_queue.extend_lease(job)
+            except Exception as e:
+                logger.warning(
+                    f"ジョブのロック期限の延長に失敗しました "
+                    f"(event_id={job.event_id}): {e!s}"
+                )
+                continue
+            if not extended:
+                logger.warning(
+                    f"ジョブが別のワーカーに再取得されました (event_id={job.event_id})"
+                )
+                return
+
+    async def _cleanup(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                deleted = await self.delete_completed_jobs()
+                if deleted:
+                    logger.info(f"完了したジョブを削除しました ({deleted}件)")
+            except Exception as e:
+                logger.error(f"完了したジョブの削除に失敗しました: {e!s}")
+
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    self._stopping.wait(), timeout=self._cleanup_interval_seconds
+                )
+
+    async def _run(self, index: int) -> None:
+        while not self._stopping.is_set():
+            try:
+                processed = await self.run_once()
+            except Exception as e:
+                logger.error(f"ジョブワーカー{index}でエラーが発生しました: {e!s}")
+                processed = False
+
+            if not processed:
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(
+                        self._stopping.wait(), timeout=self._poll_interval_seconds
+                    )
@@ -0,0 +1,233 @@
+from typing import Any, LiteralString
+from uuid import uuid4
+
+from psycopg.types.json import Jsonb
+
+from ...log import get_logger
+from ..database import DatabasePool
+from ..exception.repository_exception import RepositoryFetchError, RepositorySaveError
+from .job import PLACEHOLDER_TS_KEY, Job, JobStatus
+
+logger = get_logger(__name__)
+
+
+class PostgresJobQueue:
+    """slack_event_jobsテーブルを使った永続的なジョブキュー
+
+    ジョブは SELECT ... FOR UPDATE SKIP LOCKED で取得し、複数のワーカーが
+    同じジョブを取り合わないようにする。取得したジョブは可視性タイムアウトまで
+    他のワーカーから見えなくなり、ワーカーが落ちた場合はタイムアウト後に再取得される。
+
+    ジョブの状態は、取得した試行(attempts)のまま実行中の場合にだけ更新する。
+    ロック期限が切れて別のワーカーに再取得されたジョブを、古い試行の結果で
+    上書きしないためである。
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        visibility_timeout_seconds: float = 300.0,
+        retry_base_delay_seconds: float = 5.0,
+    ):
+        self.max_attempts = max_attempts
+        self.visibility_timeout_seconds = visibility_timeout_seconds
+        self.retry_base_delay_seconds = retry_base_delay_seconds
+
+    async def enqueue(self, event_id: str, payload: dict[str, Any]) -> bool:
+        """ジョブを登録する。同じイベントが登録済みの場合はFalseを返す"""
+        try:
+            async with DatabasePool.get_connection() as conn:
+                cur = await conn.execute(
+                    """
+                    INSERT INTO slack_event_jobs (id, event_id, payload, status, max_attempts)
+                    VALUES (%s, %s, %s, %s, %s)
+                    ON CONFLICT (event_id) DO NOTHING
+                    """,
+                    (
+                        uuid4(),
+                        event_id,
+                        Jsonb(payload),
+                        JobStatus.QUEUED.value,
+                        self.max_attempts,
+                    ),
+                )
+                return cur.rowcount == 1
+        except Exception as e:
+            raise RepositorySaveError("Job", e) from e
+
+    async def claim(self) -> Job | None:
+        """実行可能なジョブを1件取得し、可視性タイムアウトまでロックする
+
+        待機中のジョブに加え、ロック期限の切れた実行中のジョブ(ワーカーが
+        落ちたもの)も再取得の対象にする。
+        """
+        try:
+            async with DatabasePool.get_connection() as conn:
+                cur = await conn.execute(
+                    """
+                    UPDATE slack_event_jobs
+                    SET status = 'running',
+                        attempts = attempts + 1,
+                        locked_until = now() + make_interval(secs => %s),
+                        updated_at = now()
+                    WHERE id = (
+                        SELECT id FROM slack_event_jobs
+                        WHERE (status = 'queued' AND available_at <= now())
+                           OR (status = 'running' AND locked_until < now())
+                        ORDER BY available_at
+                        LIMIT 1
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING id, event_id, payload, attempts, max_attempts
+                    """,
+                    (self.visibility_timeout_seconds,),
+                )
+                row = await cur.fetchone()
+                if not row:
+                    return None
+
+                return Job(
+                    id=row["id"],
+                    event_id=row["event_id"],
+                    payload=row["payload"],
+                    attempts=row["attempts"],
+                    max_attempts=row["max_attempts"],
+                )
+        except Exception as e:
+            raise RepositoryFetchError("Job", e) from e
+
+    async def extend_lease(self, job: Job) -> bool:
+        """処理中のジョブのロック期限を可視性タイムアウト分延ばす
+
+        期限切れで別のワーカーに再取得されていた場合はFalseを返す。
+        """
+        try:
+            async with DatabasePool.get_connection() as conn:
+                cur = await conn.execute(
+                    """
+                    UPDATE slack_event_jobs
+                    SET locked_until = now() + make_interval(secs => %s),
+                        updated_at = now()
+                    WHERE id = %s AND status = 'running' AND attempts = %s
+                    """,
+                    (self.visibility_timeout_seconds, job.id, job.attempts),
+                )
+                return cur.rowcount == 1
+        except Exception as e:
+            raise RepositorySaveError("Job", e) from e
+
+    async def set_placeholder_ts(self, job: Job, ts: str) -> None:
+        """投稿したプレースホルダーのtsを記録し、再実行時に使い回せるようにする"""
+        try:
+            async with DatabasePool.get_connection() as conn:
+                await conn.execute(
+                    """
+                    UPDATE slack_event_jobs
+                    SET payload = payload || jsonb_build_object(%s::text, %s::text),
+                        updated_at = now()
+                    WHERE id = %s
+                    """,
+                    (PLACEHOLDER_TS_KEY, ts, job.id),
+                )
+        except Exception as e:
+            raise RepositorySaveError("Job", e) from e
+        job.payload[PLACEHOLDER_TS_KEY] = ts
+
+    async def delete_completed(self, older_than_seconds: float, limit: int) -> int:
+        """完了してからolder_than_seconds秒より経ったジョブを最大limit件削除する
+
+        デッドレターは調査のために残す。
+        """
+        try:
+            async with DatabasePool.get_connection() as conn:
+                cur = await conn.execute(
+                    """
+                    DELETE FROM slack_event_jobs
+                    WHERE id IN (
+                        SELECT id FROM slack_event_jobs
+                        WHERE status = 'completed'
+                            AND updated_at < now() - make_interval(secs => %s)
+                        LIMIT %s
+                    )
+                    """,
+                    (older_than_seconds, limit),
+                )
+                return cur.rowcount
+        except Exception as e:
+            raise RepositorySaveError("Job", e) from e
+
+    async def complete(self, job: Job) -> None:
+        """ジョブを完了にする"""
+        await self._update_status(job, JobStatus.COMPLETED)
+
+    async def fail(self, job: Job, error: str) -> JobStatus:
+        """ジョブを失敗にする。試行回数が残っていれば間隔を空けて再実行する"""
+        if job.attempts >= job.max_attempts:
+            await self._update_status(job, JobStatus.DEAD, error)
+            return JobStatus.DEAD
+
+        delay = self.retry_base_delay_seconds * 2 ** (job.attempts - 1)
+        await self._update_running_job(
+            job,
+            """
+            UPDATE slack_event_jobs
+            SET status = 'queued',
+                available_at = now() + make_interval(secs => %s),
+                locked_until = NULL,
+                last_error = %s,
+                updated_at = now()
+            WHERE id = %s AND status = 'running' AND attempts = %s
+            """,
+            (delay, error, job.id, job.attempts),
+        )
+        return JobStatus.QUEUED
+
+    async def release(self, job: Job) -> bool:
+        """処理を中断したジョブを試行回数を戻してすぐに再取得できる状態にする"""
+        return await self._update_running_job(
+            job,
+            """
+            UPDATE slack_event_jobs
+            SET status = 'queued',
+                attempts = attempts - 1,
+                available_at = now(),
+                locked_until = NULL,
+                updated_at = now()
+            WHERE id = %s AND status = 'running' AND attempts = %s
+            """,
+            (job.id, job.attempts),
+        )
+
+    async def _update_status(
+        self, job: Job, status: JobStatus, error: str | None = None
+    ) -> None:
+        await self._update_running_job(
+            job,
+            """
+            UPDATE slack_event_jobs
+            SET status = %s,
+                locked_until = NULL,
+                last_error = COALESCE(%s, last_error),
+                updated_at = now()
+            WHERE id = %s AND status = 'running' AND attempts = %s
+            """,
+            (status.value, error, job.id, job.attempts),
+        )
+
+    async def _update_running_job(
+        self, job: Job, query: LiteralString, params: tuple[Any, ...]
+    ) -> bool:
+        """取得した試行のまま実行中のジョブだけを更新し、更新できたかを返す"""
+        try:
+            async with DatabasePool.get_connection() as conn:
+                cur = await conn.execute(query, params)
+        except Exception as e:
+            raise RepositorySaveError("Job", e) from e
+
+        if cur.rowcount != 1:
+            logger.warning(
+                f"ジョブが別のワーカーに再取得されていたため状態を更新しませんでした "
+                f"(event_id={job.event_id}, 試行回数: {job.attempts}回)"
+            )
+            return False
+        return True
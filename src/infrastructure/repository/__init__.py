@@ -1,7 +1,19 @@
+from .cached_chat_session_repository import (
+    CachedChatSessionRepository,
+    SessionCacheStats,
+)
 from .chat_session_repository import ChatSessionRepository
 from .feedback_repository import FeedbackRepository
+from .write_behind_chat_session_repository import (
+    WriteBehindChatSessionRepository,
+    WriteBehindStats,
+)
 
 __all__ = [
+    "CachedChatSessionRepository",
     "ChatSessionRepository",
     "FeedbackRepository",
-]
\ No newline at end of file
+    "SessionCacheStats",
+    "WriteBehindChatSessionRepository",
+    "WriteBehindStats",
+]
@@ -0,0 +1,203 @@
+from collections import OrderedDict
+from copy import deepcopy
+from dataclasses import dataclass
+from datetime import datetime
+
+from ...domain.exception.chat_session_exception import ChatSessionConflictError
+from ...domain.model.chat_session import ChatSession
+from ...domain.model.message import Message
+from ...log import get_logger
+from .chat_session_repository import ChatSessionRepository
+from .write_behind_chat_session_repository import WriteBehindChatSessionRepository
+
+logger = get_logger(__name__)
+
+# メッセージ1件あたりの本文以外のおおよそのメモリ量(ID、日時、オブジェクト)
+_MESSAGE_OVERHEAD_BYTES = 300
+
+
+@dataclass
+class SessionCacheStats:
+    """セッションキャッシュのヒット率とメモリ使用量の集計"""
+
+    hits: int = 0
+    misses: int = 0
+    stale: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses + self.stale
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+
+@dataclass
+class _CacheEntry:
+    chat_session: ChatSession
+    size_bytes: int
+    # 直近のメッセージだけを読み込んだ場合の件数(Noneはすべて読み込んだ場合)
+    max_messages: int | None
+
+    def covers(self, max_messages: int | None) -> bool:
+        """要求された範囲のメッセージを保持しているか"""
+        if self.chat_session.omitted_message_count == 0:
+            return True
+        return (
+            max_messages is not None
+            and self.max_messages is not None
+            and max_messages <= self.max_messages
+        )
+
+
+class CachedChatSessionRepository:
+    """チャットセッションをプロセス内にLRUでキャッシュするリポジトリ
+
+    回答の生成に使うメッセージ履歴(include_task_plans=False)だけをキャッシュし、
+    ヒット時はchat_sessionsのversionだけを読んで、他のインスタンスが保存して
+    いないことを確かめてから返す。件数とおおよそのメモリ量の上限を超えた場合は
+    最も古く使われたセッションから追い出す。
+    直近のメッセージだけを読み込んだセッションは、読み込んだ件数以下の
+    max_messagesの要求にだけ使う。
+    """
+
+    def __init__(
+        self,
+        repository: ChatSessionRepository | WriteBehindChatSessionRepository,
+        max_entries: int = 1000,
+        max_bytes: int = 64 * 1024 * 1024,
+        report_interval: int = 100,
+    ):
+        self._repository = repository
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._report_interval = report_interval
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self.stats = SessionCacheStats()
+
+    async def save(self, chat_session: ChatSession) -> None:
+        """チャットセッションを保存し、保存後の状態をキャッシュする"""
+        try:
+            await self._repository.save(chat_session)
+        except ChatSessionConflictError:
+            self._remove(chat_session.id)
+            raise
+
+        # 保存したセッションは、置き換える前のエントリと同じ範囲を読み込んだもの
+        previous = self._entries.get(chat_session.id)
+        self._put(chat_session, previous.max_messages if previous else None)
+
+    async def find_by_id(
+        self,
+        chat_session_id: str,
+        include_task_plans: bool = True,
+        max_messages: int | None = None,
+    ) -> ChatSession | None:
+        """IDでチャットセッションを取得
+
+        include_task_plans=Trueの場合はキャッシュを使わずに読み込む。
+        """
+        if include_task_plans:
+            return await self._repository.find_by_id(
+                chat_session_id, max_messages=max_messages
+            )
+
+        entry = self._entries.get(chat_session_id)
+        if entry is not None and entry.covers(max_messages):
+            version = await self._repository.find_version(chat_session_id)
+            if version == entry.chat_session.version:
+                self._entries.move_to_end(chat_session_id)
+                self.stats.hits += 1
+                self._report()
+                chat_session = deepcopy(entry.chat_session)
+                if max_messages is not None:
+                    chat_session.trim_messages(max_messages)
+                return chat_session
+
+            self._remove(chat_session_id)
+            self.stats.stale += 1
+        else:
+            self.stats.misses += 1
+        self._report()
+
+        chat_session = await self._repository.find_by_id(
+            chat_session_id, include_task_plans=False, max_messages=max_messages
+        )
+        if chat_session is not None:
+            self._put(chat_session, max_messages)
+        return chat_session
+
+    async def find_messages(
+        self,
+        chat_session_id: str,
+        since: datetime | None = None,
+        before: datetime | None = None,
+        limit: int | None = None,
+    ) -> list[Message]:
+        """メッセージを取得(古い履歴を遡る用途のためキャッシュは使わない)"""
+        return await self._repository.find_messages(
+            chat_session_id, since=since, before=before, limit=limit
+        )
+
+    def invalidate(self, chat_session_id: str) -> None:
+        """セッションをキャッシュから取り除く"""
+        self._remove(chat_session_id)
+
+    def _put(self, chat_session: ChatSession, max_messages: int | None) -> None:
+        """タスク計画を除いたコピーをキャッシュに入れ、上限を超えた分を追い出す"""
+        self._remove(chat_session.id)
+
+        cached = ChatSession.reconstruct(
+            id=chat_session.id,
+            thread_id=chat_session.thread_id,
+            user_id=chat_session.user_id,
+            channel_id=chat_session.channel_id,
+            messages=deepcopy(chat_session.messages),
+            task_plans=[],
+            created_at=chat_session.created_at,
+            updated_at=chat_session.updated_at,
+            version=chat_session.version,
+            omitted_message_count=chat_session.omitted_message_count,
+        )
+        size_bytes = self._estimate_bytes(cached)
+        if size_bytes > self._max_bytes:
+            return
+
+        self._entries[chat_session.id] = _CacheEntry(cached, size_bytes, max_messages)
+        self.stats.entries += 1
+        self.stats.bytes += size_bytes
+
+        while (
+            self.stats.entries > self._max_entries or self.stats.bytes > self._max_bytes
+        ):
+            oldest_id = next(iter(self._entries))
+            self._remove(oldest_id)
+            self.stats.evictions += 1
+
+    def _remove(self, chat_session_id: str) -> None:
+        entry = self._entries.pop(chat_session_id, None)
+        if entry is not None:
+            self.stats.entries -= 1
+            self.stats.bytes -= entry.size_bytes
+
+    @staticmethod
+    def _estimate_bytes(chat_session: ChatSession) -> int:
+        return sum(
+            len(message.content.encode()) + _MESSAGE_OVERHEAD_BYTES
+            for message in chat_session.messages
+        )
+
+    def _report(self) -> None:
+        if self.stats.lookups % self._report_interval != 0:
+            return
+        logger.info(
+            f"セッションキャッシュ (ヒット率: {self.stats.hit_rate:.1%}, "
+            f"ヒット: {self.stats.hits}回, ミス: {self.stats.misses}回, "
+            f"更新済み: {self.stats.stale}回, 追い出し: {self.stats.evictions}回, "
+            f"件数: {self.stats.entries}件, "
+            f"メモリ: {self.stats.bytes / 1024 / 1024:.1f}MB)"
+        )
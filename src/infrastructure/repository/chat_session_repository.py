@@ -1,256 +1,603 @@
+import base64
 import json
+from contextlib import AbstractAsyncContextManager, nullcontext
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 
+from psycopg import AsyncConnection, AsyncPipeline
+
 from src.infrastructure.exception.repository_exception import (
     RepositoryFetchError,
     RepositorySaveError,
 )
 
+from ...domain.exception.chat_session_exception import ChatSessionConflictError
 from ...domain.model.chat_session import ChatSession
-from ...domain.model.general_answer_task_log import GeneralAnswerTaskLog
 from ...domain.model.message import Message, Role
-from ...domain.model.task import AgentName, Task, TaskStatus
+from ...domain.model.task import AgentName, Task
 from ...domain.model.task_plan import TaskPlan
-from ...domain.model.web_search_task_log import WebSearchTaskLog
+from ...log import get_logger
 from ..database import DatabasePool
+from .web_documents import (
+    Compression,
+    WebDocument,
+    attach_contents,
+    decompress,
+    detach_contents,
+)
+
+logger = get_logger(__name__)
+
+# セッションの直近のメッセージ(システムメッセージを除く)を1つのJSON配列に集約する
+# (chat_session_id, created_at)のインデックスを新しい順に読み、LIMITがNULLの場合はすべて読む
+_MESSAGES_JSON_SQL = """
+    (
+        SELECT COALESCE(json_agg(json_build_object(
+            'id', m.id,
+            'role', m.role,
+            'content', m.content,
+            'created_at', m.created_at
+        ) ORDER BY m.created_at ASC), '[]'::json)
+        FROM (
+            SELECT * FROM messages
+            WHERE chat_session_id = cs.id
+                AND role IN ('user', 'assistant')
+            ORDER BY created_at DESC
+            LIMIT %s
+        ) m
+    )::text AS messages_json
+"""
+
+# セッションのタスク計画とタスクを、to_dict()と同じ形のJSON配列に集約する
+_TASK_PLANS_JSON_SQL = """
+    (
+        SELECT COALESCE(json_agg(json_build_object(
+            'id', tp.id,
+            'message_id', tp.message_id,
+            'tasks', (
+                SELECT COALESCE(json_agg(json_build_object(
+                    'id', t.id,
+                    'description', t.description,
+                    'agent_name', t.agent_name,
+                    'status', t.status,
+                    'result', t.result,
+                    'task_log', COALESCE(t.task_log_json, '{}'::jsonb),
+                    'timings', COALESCE(t.timings_json, '[]'::jsonb),
+                    'created_at', t.created_at,
+                    'completed_at', t.completed_at
+                ) ORDER BY t.created_at ASC), '[]'::json)
+                FROM tasks t
+                WHERE t.task_plan_id = tp.id
+            )
+        ) ORDER BY tp.created_at ASC), '[]'::json)
+        FROM task_plans tp
+        WHERE tp.chat_session_id = cs.id
+    )::text AS task_plans_json
+"""
+
+# タスクログから参照しているページ本文(base64)を集約する
+_WEB_DOCUMENTS_JSON_SQL = """
+    (
+        SELECT COALESCE(json_agg(json_build_object(
+            'id', d.id,
+            'compression', d.compression,
+            'content', encode(d.content, 'base64')
+        )), '[]'::json)
+        FROM web_documents d
+        WHERE d.id IN (
+            SELECT r->>'content_id'
+            FROM task_plans tp
+            JOIN tasks t ON t.task_plan_id = tp.id,
+                jsonb_array_elements(t.task_log_json->'attempts') AS a,
+                jsonb_array_elements(a->'results') AS r
+            WHERE tp.chat_session_id = cs.id AND t.agent_name = 'web_search'
+        )
+    )::text AS web_documents_json
+"""
+
+_NO_TASK_PLANS_SQL = """
+    '[]' AS task_plans_json,
+    '[]' AS web_documents_json
+"""
+
+
+@dataclass
+class ChatSessionWriteSet:
+    """1回の保存で書き込む行(永続化後に追加・変更された分だけ)"""
+
+    chat_session: tuple
+    version: int
+    messages: list[tuple] = field(default_factory=list)
+    task_plans: list[tuple] = field(default_factory=list)
+    tasks: list[tuple] = field(default_factory=list)
+    documents: dict[str, WebDocument] = field(default_factory=dict)
+
+    @property
+    def row_count(self) -> int:
+        return (
+            len(self.messages)
+            + len(self.task_plans)
+            + len(self.tasks)
+            + len(self.documents)
+        )
+
+    @property
+    def payload_bytes(self) -> int:
+        """書き込む文字列・バイト列カラムの合計バイト数"""
+        document_rows = [document.as_row() for document in self.documents.values()]
+        return sum(
+            len(value.encode()) if isinstance(value, str) else len(value)
+            for rows in (self.messages, self.task_plans, self.tasks, document_rows)
+            for row in rows
+            for value in row
+            if isinstance(value, str | bytes)
+        )
+
+    def rebase(self, version: int | None) -> "ChatSessionWriteSet":
+        """保存済みの最新バージョンの次のバージョンとして書き込む行に組み直す
+
+        追加・変更する行はIDで上書きするため、他の処理が先に保存していても
+        そのまま書き込める。chat_sessionsの行のバージョンだけを差し替える。
+        """
+        next_version = (version or 0) + 1
+        return replace(
+            self,
+            chat_session=(*self.chat_session[:-1], next_version),
+            version=next_version,
+        )
 
 
 class ChatSessionRepository:
     async def save(self, chat_session: ChatSession) -> None:
-        """チャットセッションと関連するメッセージを保存"""
+        """チャットセッションと、前回の保存以降に追加・変更された行を保存
+
+        各テーブルの行はexecutemanyでまとめて送り、パイプラインモードで
+        1回の同期にまとめるため、往復回数はタスク数によらず一定になる。
+        読み込んだ後に他の処理が保存していた場合はChatSessionConflictErrorを送出する。
+        """
+        write_set = self.build_write_set(chat_session)
+        await self.write(write_set)
+        chat_session.mark_persisted(write_set.version)
+
+    async def write(self, write_set: ChatSessionWriteSet) -> None:
+        """build_write_setで組み立てた行を1トランザクションで書き込む
+
+        chat_sessionsの行はバージョンが読み込んだ時点のままの場合だけ更新し
+        (compare-and-swap)、更新できなかった場合はトランザクションを取り消す。
+        行ロックは書き込みのトランザクションの間だけしか保持しない。
+        """
         try:
             async with DatabasePool.get_connection() as conn:
-                async with conn.transaction():
+                async with (
+                    conn.transaction(),
+                    self._pipeline(conn),
+                    conn.cursor() as session_cur,
+                    conn.cursor() as cur,
+                ):
                     # チャットセッションを保存/更新
-                    await conn.execute(
+                    await session_cur.execute(
                         """
-                        INSERT INTO chat_sessions (id, thread_id, user_id, channel_id, created_at, updated_at)
-                        VALUES (%s, %s, %s, %s, %s, %s)
+                        INSERT INTO chat_sessions (
+                            id, thread_id, user_id, channel_id,
+                            created_at, updated_at, message_count, version
+                        )
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
                         ON CONFLICT (id) DO UPDATE SET
-                            updated_at = EXCLUDED.updated_at
+                            updated_at = EXCLUDED.updated_at,
+                            message_count = chat_sessions.message_count + EXCLUDED.message_count,
+                            version = EXCLUDED.version
+                        WHERE chat_sessions.version = EXCLUDED.version - 1
+                        RETURNING version
                         """,
-                        (
-                            chat_session.id,
-                            chat_session.thread_id,
-                            chat_session.user_id,
-                            chat_session.channel_id,
-                            chat_session.created_at,
-                            datetime.now(),
-                        ),
+                        write_set.chat_session,
                     )
 
                     # メッセージを保存
-                    messages_to_save = [
-                        (
-                            message.id,
-                            chat_session.id,
-                            message.role.value,
-                            message.content,
-                            message.created_at,
+                    if write_set.messages:
+                        await cur.executemany(
+                            """
+                            INSERT INTO messages (id, chat_session_id, role, content, created_at)
+                            VALUES (%s, %s, %s, %s, %s)
+                            ON CONFLICT (id) DO UPDATE SET
+                                role = EXCLUDED.role,
+                                content = EXCLUDED.content
+                            """,
+                            write_set.messages,
                         )
-                        for message in chat_session.messages
-                        if message.role != Role.SYSTEM
-                    ]
-                    if messages_to_save:
-                        async with conn.cursor() as cur:
-                            await cur.executemany(
-                                """
-                                INSERT INTO messages (id, chat_session_id, role, content, created_at)
-                                VALUES (%s, %s, %s, %s, %s)
-                                ON CONFLICT (id) DO UPDATE SET
-                                    role = EXCLUDED.role,
-                                    content = EXCLUDED.content
-                                """,
-                                messages_to_save,
-                            )
 
-                    # タスクプランとタスクを保存
-                    for task_plan in chat_session.task_plans:
-                        # タスクプランを保存
-                        await conn.execute(
+                    # タスクプランを保存
+                    if write_set.task_plans:
+                        await cur.executemany(
                             """
                             INSERT INTO task_plans (id, chat_session_id, message_id, created_at)
                             VALUES (%s, %s, %s, %s)
                             ON CONFLICT (id) DO NOTHING
                             """,
-                            (
-                                task_plan.id,
-                                chat_session.id,
-                                task_plan.message_id,
-                                datetime.now(),
-                            ),
+                            write_set.task_plans,
+                        )
+
+                    # 検索結果のページ本文を保存(同じ本文は1件だけ保持する)
+                    # 既存の本文も更新して行ロックを取り、コミットまで削除されない
+                    # ようにする(ロックの順序を揃えるためIDの順に書き込む)
+                    if write_set.documents:
+                        await cur.executemany(
+                            """
+                            INSERT INTO web_documents (id, content, compression, original_size)
+                            VALUES (%s, %s, %s, %s)
+                            ON CONFLICT (id) DO UPDATE SET saved_at = now()
+                            """,
+                            [
+                                write_set.documents[document_id].as_row()
+                                for document_id in sorted(write_set.documents)
+                            ],
                         )
 
-                        # タスクを保存
-                        for task in task_plan.tasks:
-                            task_log_json = None
-                            if task.task_log:
-                                if hasattr(task.task_log, "to_dict"):
-                                    task_log_json = json.dumps(task.task_log.to_dict())
-
-                            await conn.execute(
-                                """
-                                INSERT INTO tasks (
-                                    id, task_plan_id, description, agent_name,
-                                    status, result, task_log_json,
-                                    created_at, completed_at
-                                )
-                                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                                ON CONFLICT (id) DO UPDATE SET
-                                    status = EXCLUDED.status,
-                                    result = EXCLUDED.result,
-                                    task_log_json = EXCLUDED.task_log_json,
-                                    completed_at = EXCLUDED.completed_at
-                                """,
-                                (
-                                    task.id,
-                                    task_plan.id,
-                                    task.description,
-                                    task.agent_name.value,
-                                    task.status.value,
-                                    task.result,
-                                    task_log_json,
-                                    task.created_at,
-                                    task.completed_at,
-                                ),
+                    # タスクを保存
+                    if write_set.tasks:
+                        await cur.executemany(
+                            """
+                            INSERT INTO tasks (
+                                id, task_plan_id, description, agent_name,
+                                status, result, task_log_json, timings_json,
+                                created_at, completed_at
                             )
+                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                            ON CONFLICT (id) DO UPDATE SET
+                                status = EXCLUDED.status,
+                                result = EXCLUDED.result,
+                                task_log_json = EXCLUDED.task_log_json,
+                                timings_json = EXCLUDED.timings_json,
+                                completed_at = EXCLUDED.completed_at
+                            """,
+                            write_set.tasks,
+                        )
+
+                    # 他の処理が先に保存していた場合は、書き込んだ行をすべて取り消す
+                    if await session_cur.fetchone() is None:
+                        raise ChatSessionConflictError(
+                            write_set.chat_session[0], write_set.version - 1
+                        )
+        except ChatSessionConflictError:
+            raise
         except Exception as e:
             raise RepositorySaveError("ChatSession", e) from e
 
-    async def find_by_id(self, chat_session_id: str) -> ChatSession | None:
-        """IDでチャットセッションを取得"""
+        logger.debug(
+            f"チャットセッションを保存しました (id={write_set.chat_session[0]}, "
+            f"メッセージ: {len(write_set.messages)}件, "
+            f"タスク計画: {len(write_set.task_plans)}件, "
+            f"タスク: {len(write_set.tasks)}件, "
+            f"ページ本文: {len(write_set.documents)}件, "
+            f"書き込み: {write_set.payload_bytes}bytes)"
+        )
+
+    @staticmethod
+    def _pipeline(conn: AsyncConnection) -> AbstractAsyncContextManager:
+        """パイプラインモードに対応したlibpqであればパイプラインで送信する"""
+        if AsyncPipeline.is_supported():
+            return conn.pipeline()
+        return nullcontext()
+
+    @classmethod
+    def build_write_set(cls, chat_session: ChatSession) -> ChatSessionWriteSet:
+        """追加されたメッセージ・タスク計画と、変更されたタスクの行を組み立てる"""
+        messages = [
+            (
+                message.id,
+                chat_session.id,
+                message.role.value,
+                message.content,
+                message.created_at,
+            )
+            for message in chat_session.pending_messages()
+            if message.role != Role.SYSTEM
+        ]
+        # message_countには今回追加するメッセージの件数を渡し、保存済みの件数に加算する
+        version = chat_session.version + 1
+        write_set = ChatSessionWriteSet(
+            chat_session=(
+                chat_session.id,
+                chat_session.thread_id,
+                chat_session.user_id,
+                chat_session.channel_id,
+                chat_session.created_at,
+                datetime.now(),
+                len(messages),
+                version,
+            ),
+            version=version,
+            messages=messages,
+        )
+
+        # 追加されたタスク計画はタスクをすべて書き込む
+        for task_plan in chat_session.pending_task_plans():
+            write_set.task_plans.append(
+                (task_plan.id, chat_session.id, task_plan.message_id, datetime.now())
+            )
+            write_set.tasks.extend(
+                cls._task_row(task_plan, task, write_set.documents)
+                for task in task_plan.tasks
+            )
+
+        # 保存済みのタスク計画は変更されたタスクだけを書き込む
+        write_set.tasks.extend(
+            cls._task_row(task_plan, task, write_set.documents)
+            for task_plan, task in chat_session.modified_tasks()
+        )
+
+        return write_set
+
+    @staticmethod
+    def _task_row(
+        task_plan: TaskPlan, task: Task, documents: dict[str, WebDocument]
+    ) -> tuple:
+        """タスクの行を組み立てる
+
+        Web検索ログのページ本文はweb_documentsに分けて保存し、
+        タスクログからはcontent_idで参照する。
+        """
+        task_log_json = None
+        if task.task_log:
+            if hasattr(task.task_log, "to_dict"):
+                task_log = task.task_log.to_dict()
+                if task.agent_name == AgentName.WEB_SEARCH:
+                    task_log = detach_contents(task_log, documents)
+                task_log_json = json.dumps(task_log)
+
+        timings_json = None
+        if task.timings:
+            timings_json = json.dumps([timing.to_dict() for timing in task.timings])
+
+        return (
+            task.id,
+            task_plan.id,
+            task.description,
+            task.agent_name.value,
+            task.status.value,
+            task.result,
+            task_log_json,
+            timings_json,
+            task.created_at,
+            task.completed_at,
+        )
+
+    async def find_by_id(
+        self,
+        chat_session_id: str,
+        include_task_plans: bool = True,
+        max_messages: int | None = None,
+    ) -> ChatSession | None:
+        """IDでチャットセッションを取得
+
+        メッセージとタスク計画(タスクを含む)はjson_aggで1つのクエリに集約し、
+        1回の往復で取得する。JSONはテキストで受け取り、まとめてデコードする。
+        回答の生成にはメッセージ履歴しか使わないため、include_task_plans=False
+        の場合は過去のタスク計画とタスクログを読み込まない。
+        max_messagesを指定した場合は直近のメッセージだけを読み込み、
+        総件数はchat_sessions.message_countから求める。
+        """
+        try:
+            async with (
+                DatabasePool.get_connection() as conn,
+                conn.cursor() as cur,
+            ):
+                await cur.execute(
+                    f"{self._select_sql(include_task_plans)} WHERE cs.id = %s",
+                    (max_messages, chat_session_id),
+                )
+                row = await cur.fetchone()
+
+            if not row:
+                return None
+
+            chat_session = self._build_chat_session(row)
+            if max_messages is not None:
+                chat_session.trim_messages(max_messages)
+            return chat_session
+        except Exception as e:
+            raise RepositoryFetchError("ChatSession", e) from e
+
+    async def find_by_ids(self, chat_session_ids: list[str]) -> list[ChatSession]:
+        """複数のチャットセッションをタスク計画ごと1回のクエリで取得(更新日時順)"""
+        try:
+            async with (
+                DatabasePool.get_connection() as conn,
+                conn.cursor() as cur,
+            ):
+                await cur.execute(
+                    f"""
+                    {self._select_sql(include_task_plans=True)}
+                    WHERE cs.id = ANY(%s)
+                    ORDER BY cs.updated_at, cs.id
+                    """,
+                    (None, chat_session_ids),
+                )
+                rows = await cur.fetchall()
+        except Exception as e:
+            raise RepositoryFetchError("ChatSession", e) from e
+        return [self._build_chat_session(row) for row in rows]
+
+    async def find_ids_updated_before(self, cutoff: datetime, limit: int) -> list[str]:
+        """cutoffより前に最後に更新されたチャットセッションのIDを古い順に取得"""
         try:
             async with DatabasePool.get_connection() as conn:
-                async with conn.cursor() as cur:
-                    await cur.execute(
-                        """
-                        SELECT id, thread_id, user_id, channel_id, created_at, updated_at
-                        FROM chat_sessions
-                        WHERE id = %s
-                        """,
-                        (chat_session_id,),
-                    )
-                    session_row = await cur.fetchone()
+                cur = await conn.execute(
+                    """
+                    SELECT id FROM chat_sessions
+                    WHERE updated_at < %s
+                    ORDER BY updated_at, id
+                    LIMIT %s
+                    """,
+                    (cutoff, limit),
+                )
+                rows = await cur.fetchall()
+        except Exception as e:
+            raise RepositoryFetchError("ChatSession", e) from e
+        return [row["id"] for row in rows]
 
-                    if not session_row:
-                        return None
+    async def delete_by_ids(
+        self, chat_session_ids: list[str], updated_before: datetime
+    ) -> int:
+        """updated_beforeより前に最後に更新されたチャットセッションを削除する
 
-                    await cur.execute(
-                        """
+        メッセージ・タスク計画・タスク・フィードバックも連鎖して削除される。
+        """
+        try:
+            async with DatabasePool.get_connection() as conn:
+                cur = await conn.execute(
+                    """
+                    DELETE FROM chat_sessions
+                    WHERE id = ANY(%s) AND updated_at < %s
+                    """,
+                    (chat_session_ids, updated_before),
+                )
+                return cur.rowcount
+        except Exception as e:
+            raise RepositorySaveError("ChatSession", e) from e
+
+    async def delete_unreferenced_web_documents(self, saved_before: datetime) -> int:
+        """どのタスクログからも参照されなくなったページ本文を削除する
+
+        タスクログ全体を走査するため、アーカイブ後などにまとめて1回だけ実行する。
+        saved_beforeより後に保存された本文は、保存中のセッションが参照している
+        可能性があるため削除しない(保存側の行ロックを待った後もsaved_atで弾く)。
+        """
+        try:
+            async with DatabasePool.get_connection() as conn:
+                cur = await conn.execute(
+                    """
+                    DELETE FROM web_documents d
+                    WHERE d.saved_at < %s
+                        AND NOT EXISTS (
+                            SELECT 1
+                            FROM tasks t,
+                                jsonb_array_elements(t.task_log_json->'attempts') AS a,
+                                jsonb_array_elements(a->'results') AS r
+                            WHERE t.agent_name = 'web_search'
+                                AND r->>'content_id' = d.id
+                        )
+                    """,
+                    (saved_before,),
+                )
+                return cur.rowcount
+        except Exception as e:
+            raise RepositorySaveError("WebDocument", e) from e
+
+    @staticmethod
+    def _select_sql(include_task_plans: bool) -> str:
+        """チャットセッションを集約して読み込むSELECT(WHERE句は呼び出し側で付ける)
+
+        パラメータはメッセージ件数の上限(LIMIT)が先頭になる。
+        """
+        task_plans_sql = (
+            f"{_TASK_PLANS_JSON_SQL}, {_WEB_DOCUMENTS_JSON_SQL}"
+            if include_task_plans
+            else _NO_TASK_PLANS_SQL
+        )
+        return f"""
+            SELECT
+                cs.id, cs.thread_id, cs.user_id, cs.channel_id,
+                cs.created_at, cs.updated_at, cs.version,
+                cs.message_count,
+                {_MESSAGES_JSON_SQL},
+                {task_plans_sql}
+            FROM chat_sessions cs
+        """
+
+    async def find_messages(
+        self,
+        chat_session_id: str,
+        since: datetime | None = None,
+        before: datetime | None = None,
+        limit: int | None = None,
+    ) -> list[Message]:
+        """セッションのメッセージを古い順に取得
+
+        since・beforeで作成日時の範囲を絞り込み、limitを指定した場合は
+        範囲内の新しいものからlimit件を返す。読み込まなかった古い履歴を
+        必要なときに遡るために使う。
+        """
+        try:
+            async with DatabasePool.get_connection() as conn:
+                cur = await conn.execute(
+                    """
+                    SELECT id, role, content, created_at FROM (
                         SELECT id, role, content, created_at
                         FROM messages
-                        WHERE chat_session_id = %s
-                        ORDER BY created_at ASC
-                        """,
-                        (chat_session_id,),
-                    )
-                    message_rows = await cur.fetchall()
-
-                messages = []
-                for row in message_rows:
-                    if row["role"] == "user":
-                        role = Role.USER
-                    elif row["role"] == "assistant":
-                        role = Role.ASSISTANT
-                    else:
-                        continue  # システムメッセージは無視
-
-                    message = Message.reconstruct(
-                        id=row["id"],
-                        role=role,
-                        content=row["content"],
-                        created_at=row["created_at"],
-                    )
-                    messages.append(message)
+                        WHERE chat_session_id = %(chat_session_id)s
+                            AND role IN ('user', 'assistant')
+                            AND (%(since)s::timestamptz IS NULL OR created_at > %(since)s)
+                            AND (%(before)s::timestamptz IS NULL OR created_at < %(before)s)
+                        ORDER BY created_at DESC
+                        LIMIT %(limit)s
+                    ) m
+                    ORDER BY created_at ASC
+                    """,
+                    {
+                        "chat_session_id": chat_session_id,
+                        "since": since,
+                        "before": before,
+                        "limit": limit,
+                    },
+                )
+                rows = await cur.fetchall()
+        except Exception as e:
+            raise RepositoryFetchError("Message", e) from e
 
-                # task_plansとtasksをJOINで一度に取得
-                async with conn.cursor() as cur:
-                    await cur.execute(
-                        """
-                        SELECT
-                            tp.id as task_plan_id,
-                            tp.message_id,
-                            tp.created_at as task_plan_created_at,
-                            t.id as task_id,
-                            t.description,
-                            t.agent_name,
-                            t.status,
-                            t.result,
-                            t.task_log_json,
-                            t.created_at as task_created_at,
-                            t.completed_at
-                        FROM task_plans tp
-                        LEFT JOIN tasks t ON tp.id = t.task_plan_id
-                        WHERE tp.chat_session_id = %s
-                        ORDER BY tp.created_at ASC, t.created_at ASC
-                        """,
-                        (chat_session_id,),
-                    )
-                    rows = await cur.fetchall()
-
-                # task_plan_idごとにグループ化してTaskPlanを構築
-                from collections import defaultdict
-
-                task_plans_dict = defaultdict(lambda: {"tasks": [], "info": None})
-
-                for row in rows:
-                    plan_id = row["task_plan_id"]
-
-                    # TaskPlan情報を保存（初回のみ）
-                    if task_plans_dict[plan_id]["info"] is None:
-                        task_plans_dict[plan_id]["info"] = {
-                            "id": plan_id,
-                            "message_id": row["message_id"],
-                            "created_at": row["task_plan_created_at"],
-                        }
-
-                    # Taskを追加（task_idがNoneでない場合のみ）
-                    if row["task_id"] is not None:
-                        agent_name = AgentName(row["agent_name"])
-
-                        log_data = row["task_log_json"]
-                        if isinstance(log_data, str):
-                            log_data = json.loads(log_data)
-
-                        task_log: WebSearchTaskLog | GeneralAnswerTaskLog
-                        if agent_name == AgentName.WEB_SEARCH:
-                            task_log = WebSearchTaskLog.from_dict(log_data)
-                        elif agent_name == AgentName.GENERAL_ANSWER:
-                            task_log = GeneralAnswerTaskLog.from_dict(log_data)
-                        else:
-                            raise ValueError(f"未知のagent_name: {agent_name}")
-
-                        task = Task.reconstruct(
-                            id=row["task_id"],
-                            description=row["description"],
-                            agent_name=agent_name,
-                            task_log=task_log,
-                            status=TaskStatus(row["status"]),
-                            result=row["result"],
-                            created_at=row["task_created_at"],
-                            completed_at=row["completed_at"],
-                        )
-                        task_plans_dict[plan_id]["tasks"].append(task)
-
-                # TaskPlanオブジェクトを構築
-                task_plans = []
-                for plan_data in task_plans_dict.values():
-                    task_plan = TaskPlan(
-                        id=plan_data["info"]["id"],
-                        message_id=plan_data["info"]["message_id"],
-                        tasks=plan_data["tasks"],
-                    )
-                    task_plans.append(task_plan)
-
-                return ChatSession.reconstruct(
-                    id=session_row["id"],
-                    thread_id=session_row["thread_id"],
-                    user_id=session_row["user_id"],
-                    channel_id=session_row["channel_id"],
-                    messages=messages,
-                    task_plans=task_plans,
-                    created_at=session_row["created_at"],
-                    updated_at=session_row["updated_at"],
+        return [
+            Message.reconstruct(
+                id=row["id"],
+                role=Role(row["role"]),
+                content=row["content"],
+                created_at=row["created_at"],
+            )
+            for row in rows
+        ]
+
+    async def find_version(self, chat_session_id: str) -> int | None:
+        """チャットセッションのバージョンを取得(存在しない場合はNone)"""
+        try:
+            async with DatabasePool.get_connection() as conn:
+                cur = await conn.execute(
+                    "SELECT version FROM chat_sessions WHERE id = %s",
+                    (chat_session_id,),
                 )
+                row = await cur.fetchone()
         except Exception as e:
             raise RepositoryFetchError("ChatSession", e) from e
+        return row["version"] if row else None
+
+    @staticmethod
+    def _build_chat_session(row: dict) -> ChatSession:
+        """集約したJSONからチャットセッションを組み立てる
+
+        JSONの形はドメインモデルのto_dict()と同じにしてあり、from_dict()で復元する。
+        ページ本文はweb_documentsから展開してタスクログに戻す。
+        """
+        contents = {
+            document["id"]: decompress(
+                base64.b64decode(document["content"]),
+                Compression(document["compression"]),
+            )
+            for document in json.loads(row["web_documents_json"])
+        }
+        task_plans = json.loads(row["task_plans_json"])
+        for task_plan in task_plans:
+            for task in task_plan["tasks"]:
+                attach_contents(task["task_log"], contents)
+
+        messages = [
+            Message.from_dict(message) for message in json.loads(row["messages_json"])
+        ]
+        return ChatSession.reconstruct(
+            id=row["id"],
+            thread_id=row["thread_id"],
+            user_id=row["user_id"],
+            channel_id=row["channel_id"],
+            messages=messages,
+            task_plans=[TaskPlan.from_dict(task_plan) for task_plan in task_plans],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+            version=row["version"],
+            omitted_message_count=max(row["message_count"] - len(messages), 0),
+        )
@@ -41,6 +41,38 @@ class FeedbackRepository:
         except Exception as e:
             raise RepositoryFetchError("Feedback", e) from e
 
+    async def find_by_chat_session_ids(
+        self, chat_session_ids: list[str]
+    ) -> list[Feedback]:
+        """チャットセッションのメッセージに付いたフィードバックをまとめて取得"""
+        try:
+            async with DatabasePool.get_connection() as conn:
+                cur = await conn.execute(
+                    """
+                    SELECT f.id, f.message_id, f.user_id, f.feedback,
+                        f.created_at, f.updated_at
+                    FROM feedbacks f
+                    JOIN messages m ON m.id = f.message_id
+                    WHERE m.chat_session_id = ANY(%s)
+                    """,
+                    (chat_session_ids,),
+                )
+                rows = await cur.fetchall()
+        except Exception as e:
+            raise RepositoryFetchError("Feedback", e) from e
+
+        return [
+            Feedback.reconstruct(
+                id=row["id"],
+                user_id=row["user_id"],
+                message_id=row["message_id"],
+                feedback=FeedbackType(row["feedback"]),
+                created_at=row["created_at"],
+                updated_at=row["updated_at"],
+            )
+            for row in rows
+        ]
+
     async def save(self, feedback: Feedback) -> None:
         """フィードバックを保存"""
         try:
@@ -0,0 +1,92 @@
+import hashlib
+import zlib
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any
+
+from ...log import get_logger
+
+logger = get_logger(__name__)
+
+
+class Compression(Enum):
+    NONE = "none"
+    ZLIB = "zlib"
+
+
+@dataclass(frozen=True)
+class WebDocument:
+    """web_documentsテーブルの1行(本文のハッシュをIDにした圧縮済みページ本文)"""
+
+    id: str
+    data: bytes
+    compression: Compression
+    original_size: int
+
+    @classmethod
+    def from_content(cls, content: str) -> "WebDocument":
+        encoded = content.encode()
+        return cls(
+            id=hashlib.sha256(encoded).hexdigest(),
+            data=zlib.compress(encoded),
+            compression=Compression.ZLIB,
+            original_size=len(encoded),
+        )
+
+    def as_row(self) -> tuple:
+        return (self.id, self.data, self.compression.value, self.original_size)
+
+
+def content_id(content: str) -> str:
+    """ページ本文のSHA-256(16進数)"""
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def decompress(data: bytes, compression: Compression) -> str:
+    if compression == Compression.ZLIB:
+        return zlib.decompress(data).decode()
+    return data.decode()
+
+
+def detach_contents(
+    task_log: dict[str, Any], documents: dict[str, WebDocument]
+) -> dict[str, Any]:
+    """Web検索ログの検索結果から本文を取り除き、本文のIDで参照する形に変換する
+
+    取り除いた本文はdocumentsにIDごとに追加する(同じ本文は1件にまとまる)。
+    """
+    attempts = []
+    for attempt in task_log.get("attempts", []):
+        results = []
+        for result in attempt.get("results", []):
+            if "content" not in result:
+                results.append(result)
+                continue
+            document = WebDocument.from_content(result["content"])
+            documents.setdefault(document.id, document)
+            results.append(
+                {key: value for key, value in result.items() if key != "content"}
+                | {"content_id": document.id}
+            )
+        attempts.append(attempt | {"results": results})
+    return task_log | {"attempts": attempts}
+
+
+def attach_contents(task_log: dict[str, Any], contents: dict[str, str]) -> None:
+    """本文のIDで参照している検索結果に本文を戻す(本文を含む古い形式はそのまま)
+
+    参照先の本文が見つからない場合は、セッション全体を読み込めなくしないよう
+    空の本文にして警告を残す。
+    """
+    for attempt in task_log.get("attempts", []):
+        for result in attempt.get("results", []):
+            if "content" not in result and "content_id" in result:
+                document_id = result.pop("content_id")
+                content = contents.get(document_id)
+                if content is None:
+                    logger.warning(
+                        f"検索結果のページ本文が見つかりません (content_id={document_id}, "
+                        f"url={result.get('url')})"
+                    )
+                    content = ""
+                result["content"] = content
@@ -0,0 +1,204 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+
+from ...domain.exception.chat_session_exception import ChatSessionConflictError
+from ...domain.model.chat_session import ChatSession
+from ...domain.model.message import Message
+from ...log import get_logger
+from .chat_session_repository import ChatSessionRepository, ChatSessionWriteSet
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class WriteBehindStats:
+    """バックグラウンド書き込みの集計"""
+
+    enqueued: int = 0
+    written: int = 0
+    retries: int = 0
+    failed: int = 0
+    # 他の処理と競合し、最新のバージョンの上に書き込み直した回数
+    rebased: int = 0
+    # 書き込み直しても競合し続けて破棄した件数
+    conflicts: int = 0
+
+
+class WriteBehindChatSessionRepository:
+    """保存をすぐに返し、バックグラウンドで書き込むチャットセッションリポジトリ
+
+    save()は書き込む行をその場で組み立てて書き込みタスクに渡すため、
+    呼び出し側は書き込みの完了を待たずにSlackへ回答を投稿できる。
+
+    - 書き込み待ちはmax_pending件までで、超える場合はsave()が空きを待つ
+    - 同じセッションの書き込みは保存した順に1件ずつ実行する
+    - 失敗した書き込みは指数バックオフでmax_attempts回まで再試行する
+    - 他の処理の保存と競合した書き込みは、保存済みの最新バージョンを読み直し、
+      その上に追加・変更分を書き込み直す(メッセージを失わないようにする)
+    - find_by_id()は対象セッションの書き込みが終わってから読み込む
+    - close()で書き込み待ちをすべて書き込む
+    """
+
+    def __init__(
+        self,
+        repository: ChatSessionRepository,
+        max_pending: int = 100,
+        concurrency: int = 4,
+        max_attempts: int = 5,
+        retry_base_delay_seconds: float = 0.5,
+    ):
+        self._repository = repository
+        self._slots = asyncio.Semaphore(max_pending)
+        self._writers = asyncio.Semaphore(concurrency)
+        self._max_attempts = max_attempts
+        self._retry_base_delay_seconds = retry_base_delay_seconds
+        # セッションごとの最後に積んだ書き込み
+        self._latest: dict[str, asyncio.Task] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self.stats = WriteBehindStats()
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._tasks)
+
+    async def save(self, chat_session: ChatSession) -> None:
+        """書き込む行を組み立ててバックグラウンドの書き込みに渡す"""
+        write_set = self._repository.build_write_set(chat_session)
+        chat_session.mark_persisted(write_set.version)
+
+        await self._slots.acquire()
+        previous = self._latest.get(chat_session.id)
+        task = asyncio.create_task(self._write(write_set, previous))
+        self._latest[chat_session.id] = task
+        self._tasks.add(task)
+        task.add_done_callback(lambda done: self._on_done(chat_session.id, done))
+        self.stats.enqueued += 1
+
+    async def find_by_id(
+        self,
+        chat_session_id: str,
+        include_task_plans: bool = True,
+        max_messages: int | None = None,
+    ) -> ChatSession | None:
+        """書き込み待ちの保存を反映してからチャットセッションを取得"""
+        await self._wait_for(chat_session_id)
+        return await self._repository.find_by_id(
+            chat_session_id,
+            include_task_plans=include_task_plans,
+            max_messages=max_messages,
+        )
+
+    async def find_messages(
+        self,
+        chat_session_id: str,
+        since: datetime | None = None,
+        before: datetime | None = None,
+        limit: int | None = None,
+    ) -> list[Message]:
+        """書き込み待ちの保存を反映してからメッセージを取得"""
+        await self._wait_for(chat_session_id)
+        return await self._repository.find_messages(
+            chat_session_id, since=since, before=before, limit=limit
+        )
+
+    async def find_version(self, chat_session_id: str) -> int | None:
+        """書き込み待ちの保存を反映してからバージョンを取得"""
+        await self._wait_for(chat_session_id)
+        return await self._repository.find_version(chat_session_id)
+
+    async def flush(self, timeout: float | None = None) -> bool:
+        """書き込み待ちがなくなるまで待つ。タイムアウトした場合はFalseを返す"""
+        if not self._tasks:
+            return True
+        _, not_done = await asyncio.wait(set(self._tasks), timeout=timeout)
+        return not not_done
+
+    async def close(self, timeout: float | None = None) -> None:
+        """書き込み待ちを書き込んでから停止する
+
+        timeout秒以内に終わらなかった書き込みはキャンセルする。
+        """
+        pending = self.pending_count
+        if not await self.flush(timeout):
+            logger.error(
+                f"チャットセッションの書き込みが終わらないまま停止します "
+                f"(未完了: {self.pending_count}件)"
+            )
+            tasks = set(self._tasks)
+            for task in tasks:
+                task.cancel()
+            await asyncio.wait(tasks)
+
+        logger.info(
+            f"チャットセッションのバックグラウンド書き込みを停止しました "
+            f"(停止時の書き込み待ち: {pending}件, 書き込み: {self.stats.written}件, "
+            f"再試行: {self.stats.retries}回, 失敗: {self.stats.failed}件, "
+            f"書き込み直し: {self.stats.rebased}回, 競合: {self.stats.conflicts}件)"
+        )
+
+    async def _wait_for(self, chat_session_id: str) -> None:
+        if (task := self._latest.get(chat_session_id)) is not None:
+            await asyncio.wait([task])
+
+    def _on_done(self, chat_session_id: str, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        self._slots.release()
+        if self._latest.get(chat_session_id) is task:
+            del self._latest[chat_session_id]
+
+    async def _write(
+        self, write_set: ChatSessionWriteSet, previous: asyncio.Task | None
+    ) -> None:
+        # 同じセッションの前の書き込みを待つ(失敗していても続けて書き込む)
+        if previous is not None:
+            await asyncio.wait([previous])
+
+        chat_session_id = write_set.chat_session[0]
+        conflicted = False
+        for attempt in range(1, self._max_attempts + 1):
+            try:
+                async with self._writers:
+                    if conflicted:
+                        version = await self._repository.find_version(chat_session_id)
+                        write_set = write_set.rebase(version)
+                        self.stats.rebased += 1
+                        conflicted = False
+                    await self._repository.write(write_set)
+            except ChatSessionConflictError as e:
+                if attempt == self._max_attempts:
+                    self.stats.conflicts += 1
+                    logger.error(
+                        f"他の処理との競合が続いたためチャットセッションの書き込みを"
+                        f"破棄しました (id={chat_session_id}, 試行回数: {attempt}回, "
+                        f"行数: {write_set.row_count}): {e!s}"
+                    )
+                    return
+
+                # 競合は待っても解消しないため、すぐに最新のバージョンの上に書き込み直す
+                conflicted = True
+                logger.warning(
+                    f"他の処理と競合したため最新のバージョンに書き込み直します "
+                    f"(id={chat_session_id}, 試行回数: {attempt}/"
+                    f"{self._max_attempts}回): {e!s}"
+                )
+            except Exception as e:
+                if attempt == self._max_attempts:
+                    self.stats.failed += 1
+                    logger.error(
+                        f"チャットセッションの書き込みに失敗しました "
+                        f"(id={chat_session_id}, 試行回数: {attempt}回, "
+                        f"行数: {write_set.row_count}): {e!s}"
+                    )
+                    return
+
+                self.stats.retries += 1
+                logger.warning(
+                    f"チャットセッションの書き込みを再試行します "
+                    f"(id={chat_session_id}, 試行回数: {attempt}/"
+                    f"{self._max_attempts}回): {e!s}"
+                )
+                await asyncio.sleep(self._retry_base_delay_seconds * 2 ** (attempt - 1))
+            else:
+                self.stats.written += 1
+                return
@@ -4,7 +4,7 @@ from contextlib import asynccontextmanager
 import uvicorn
 from fastapi import FastAPI
 
-from .config import ENV
+from .config import ENV, JOB_WORKER_CONCURRENCY, SLACK_EVENT_QUEUE_ENABLED
 from .di_container import DIContainer
 from .infrastructure.database import DatabasePool, run_migrations
 from .infrastructure.external.slack.slack_adapter import SlackAdapter
@@ -47,6 +47,12 @@ async def lifespan(app: FastAPI):
     slack_adapter.register_handler("message", slack_message_controller.execute)
     slack_adapter.register_handler("action", slack_feedback_controller.execute)
 
+    # ジョブキューを使う場合はプロセス内のワーカーを起動
+    job_worker = None
+    if SLACK_EVENT_QUEUE_ENABLED and JOB_WORKER_CONCURRENCY > 0:
+        job_worker = container.create_job_worker()
+        job_worker.start()
+
     # FastAPIモードの場合、ルートを設定
     if ENV in ["dev", "prod"]:
         slack_adapter.setup_routes(app)
@@ -57,6 +63,9 @@ async def lifespan(app: FastAPI):
 
     # シャットダウン時の処理
     logger.info("アプリケーションをシャットダウン中...")
+    if job_worker:
+        await job_worker.stop()
+    await container.close()
     # データベース接続プールをクローズ
     await DatabasePool.close()
     logger.info("データベース接続プールをクローズしました")
@@ -69,6 +78,7 @@ async def setup_socket_mode():
     """Socket Mode用のセットアップ"""
     global slack_adapter, container, slack_message_controller
 
+    job_worker = None
     try:
         logger.info("Socket Mode (ENV=local) で起動中...")
 
@@ -96,9 +106,18 @@ async def setup_socket_mode():
         slack_adapter.register_handler("message", slack_message_controller.execute)
         slack_adapter.register_handler("action", slack_feedback_controller.execute)
 
+        # ジョブキューを使う場合はプロセス内のワーカーを起動
+        if SLACK_EVENT_QUEUE_ENABLED and JOB_WORKER_CONCURRENCY > 0:
+            job_worker = container.create_job_worker()
+            job_worker.start()
+
         await slack_adapter.start_socket_mode()
     finally:
         # クリーンアップ処理
+        if job_worker:
+            await job_worker.stop()
+        if container:
+            await container.close()
         await DatabasePool.close()
         logger.info("データベース接続プールをクローズしました")
 
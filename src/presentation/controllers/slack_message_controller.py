@@ -1,14 +1,21 @@
+from collections.abc import Awaitable, Callable
 from typing import Any
 
 from slack_bolt.async_app import AsyncAck
 
 from ...application.exception.base import ApplicationException
+from ...application.exception.usecase_exception import WorkflowSupersededError
 from ...application.usecase.answer_to_user_request_usecase import (
     AnswerToUserRequestUseCase,
 )
 from ...domain.exception.base import DomainException
 from ...infrastructure.exception.base import InfrastructureException
+from ...infrastructure.exception.concurrency_exception import AdmissionRejectedError
 from ...infrastructure.external.slack.slack_message_service import SlackMessageService
+from ...infrastructure.external.slack.slack_streaming_message import (
+    SlackStreamingMessage,
+)
+from ...infrastructure.queue import PostgresJobQueue
 from ...log.logger import get_logger
 from ..dto.slack_request_dto import SlackRequestDTO
 from ..exception.base import PresentationException
@@ -25,20 +32,49 @@ class SlackMessageController:
         use_case: AnswerToUserRequestUseCase,
         mapper: SlackRequestMapper,
         slack_service: SlackMessageService,
+        streaming_enabled: bool = False,
+        job_queue: PostgresJobQueue | None = None,
     ):
         self._use_case = use_case
         self._mapper = mapper
         self._slack_service = slack_service
+        self._streaming_enabled = streaming_enabled
+        self._job_queue = job_queue
 
     async def execute(self, ack: AsyncAck, body: dict[str, Any]) -> None:
         await ack()
 
         event = body.get("event", {})
+        if self._job_queue is not None:
+            # ジョブキューに登録し、ワークフローの実行はワーカーに任せる
+            await self._enqueue(event)
+            return
+
+        await self.process_event(event)
+
+    async def process_event(
+        self,
+        event: dict[str, Any],
+        *,
+        deduplicate: bool = True,
+        notify_errors: bool = True,
+        placeholder_ts: str | None = None,
+        on_placeholder_posted: Callable[[str], Awaitable[None]] | None = None,
+    ) -> None:
+        """イベントに回答する
+
+        ジョブとして再実行する場合は重複チェックを行わない。notify_errorsが
+        Falseの場合はエラーをユーザーに通知せずに送出し、再実行に任せる。
+        ストリーミング時は、新しく投稿したプレースホルダーのtsを
+        on_placeholder_postedに渡し、再実行ではplaceholder_tsで受け取った
+        プレースホルダーを使い回す(試行ごとにプレースホルダーが増えないようにする)。
+        """
+        stream: SlackStreamingMessage | None = None
         try:
             # Mapperがバリデーションを行う（検証済みDTOを返す）
             slack_dto = self._mapper.from_event(event)
             # 重複チェック
-            if slack_dto.event_id in self._processed_events:
+            if deduplicate and slack_dto.event_id in self._processed_events:
                 logger.debug(
                     f"重複したイベントをスキップしました: {slack_dto.event_id}"
                 )
@@ -56,16 +92,27 @@ class SlackMessageController:
             )
 
             input_dto = self._mapper.to_application_input(slack_dto)
+            thread_ts = slack_dto.thread_ts or slack_dto.message_ts
 
-            # ユースケース実行
-            output_dto = await self._use_case.execute(input_dto)
+            if self._streaming_enabled:
+                # プレースホルダーを投稿し、生成途中の回答で逐次更新する
+                stream = await self._start_stream(
+                    event, thread_ts, placeholder_ts, on_placeholder_posted
+                )
+                output_dto = await self._use_case.execute(
+                    input_dto, answer_stream=stream
+                )
+                await stream.finish(output_dto.answer, output_dto.message_id)
+            else:
+                # ユースケース実行
+                output_dto = await self._use_case.execute(input_dto)
 
-            await self._slack_service.send_message(
-                channel=event.get("channel"),
-                text=output_dto.answer,
-                thread_ts=slack_dto.thread_ts or slack_dto.message_ts,
-                message_id=output_dto.message_id,
-            )
+                await self._slack_service.send_message(
+                    channel=event.get("channel"),
+                    text=output_dto.answer,
+                    thread_ts=thread_ts,
+                    message_id=output_dto.message_id,
+                )
 
             # リアクション削除
             await self._slack_service.remove_reaction(
@@ -75,31 +122,129 @@ class SlackMessageController:
         except PresentationException as e:
             logger.error(f"リクエストエラー: {e.message}")
 
+        except WorkflowSupersededError as e:
+            logger.info(e.message)
+            await self._handle_superseded(slack_dto, stream)
+
         except ApplicationException as e:
             logger.error(f"入力エラー: {e.message}")
 
+        except AdmissionRejectedError as e:
+            await self._handle_rejected(event, slack_dto, e, stream, notify_errors)
+
         except (DomainException, InfrastructureException) as e:
             logger.error(f"システムエラー: {e.message}", exc_info=True)
-            if "slack_dto" in locals():
+            if notify_errors and "slack_dto" in locals():
                 await self._handle_error_response(
                     event,
                     slack_dto,
                     "システムエラーが発生しました。新しいスレッドで再度お試しください。",
+                    stream,
                 )
             raise e
 
         except Exception as e:
             logger.critical(f"予期しないエラー: {e}", exc_info=True)
-            if "slack_dto" in locals():
+            if notify_errors and "slack_dto" in locals():
                 await self._handle_error_response(
                     event,
                     slack_dto,
                     "予期しないエラーが発生しました。新しいスレッドで再度お試しください。",
+                    stream,
                 )
             raise e
 
+    async def _start_stream(
+        self,
+        event: dict[str, Any],
+        thread_ts: str,
+        placeholder_ts: str | None,
+        on_placeholder_posted: Callable[[str], Awaitable[None]] | None,
+    ) -> SlackStreamingMessage:
+        """プレースホルダーを投稿(または使い回し)し、新しく投稿したtsを通知する"""
+        stream = await self._slack_service.start_streaming_message(
+            channel=event.get("channel"),
+            thread_ts=thread_ts,
+            placeholder_ts=placeholder_ts,
+        )
+        if (
+            placeholder_ts is None
+            and stream.ts is not None
+            and on_placeholder_posted is not None
+        ):
+            await on_placeholder_posted(stream.ts)
+        return stream
+
+    async def _enqueue(self, event: dict[str, Any]) -> None:
+        """検証済みのイベントをジョブキューに登録"""
+        try:
+            slack_dto = self._mapper.from_event(event)
+        except PresentationException as e:
+            logger.error(f"リクエストエラー: {e.message}")
+            return
+
+        if self._mapper.is_bot_message(slack_dto):
+            logger.debug("ボットメッセージを無視します")
+            return
+
+        # 同じイベントの再送はevent_idの一意制約で弾く
+        try:
+            enqueued = await self._job_queue.enqueue(slack_dto.event_id, event)
+        except InfrastructureException as e:
+            # ack済みのイベントはSlackから再送されないため、この場で処理する
+            logger.error(
+                f"ジョブキューに登録できなかったため直接処理します "
+                f"(event_id={slack_dto.event_id}): {e.message}"
+            )
+            await self.process_event(event)
+            return
+
+        if not enqueued:
+            logger.debug(f"重複したイベントをスキップしました: {slack_dto.event_id}")
+
+    async def _handle_rejected(
+        self,
+        event: dict[str, Any],
+        slack_dto: SlackRequestDTO,
+        error: AdmissionRejectedError,
+        stream: SlackStreamingMessage | None,
+        notify_errors: bool,
+    ) -> None:
+        """混雑で拒否された場合は再試行を促す返信をする"""
+        if not notify_errors:
+            # ジョブとして時間を空けて再実行する
+            raise error
+
+        logger.warning(f"混雑のため処理を見送りました: {error.message}")
+        await self._handle_error_response(
+            event,
+            slack_dto,
+            "ただいま混み合っています。しばらく時間をおいて再度お試しください。",
+            stream,
+        )
+
+    async def _handle_superseded(
+        self, slack_dto: SlackRequestDTO, stream: SlackStreamingMessage | None
+    ) -> None:
+        """新しいメッセージで中断された場合は、このメッセージへの返信を取り下げる"""
+        try:
+            await self._slack_service.remove_reaction(
+                slack_dto.channel_id, slack_dto.message_ts, "eyes"
+            )
+        except Exception as e:
+            logger.warning(f"リアクション削除に失敗: {e}")
+
+        if stream is not None:
+            await stream.fail(
+                "新しいメッセージを受け付けたため、この回答は中断しました。"
+            )
+
     async def _handle_error_response(
-        self, event: dict[str, Any], slack_dto: SlackRequestDTO, message: str
+        self,
+        event: dict[str, Any],
+        slack_dto: SlackRequestDTO,
+        message: str,
+        stream: SlackStreamingMessage | None = None,
     ) -> None:
         """エラーレスポンスを処理"""
         # リアクション削除
@@ -110,6 +255,11 @@ class SlackMessageController:
         except Exception as e:
             logger.warning(f"リアクション削除に失敗: {e}")
 
+        # ストリーミング中はプレースホルダーをエラーメッセージで置き換える
+        if stream is not None:
+            await stream.fail(message)
+            return
+
         # エラーメッセージ送信
         await self._slack_service.send_message(
             channel=event.get("channel"),
@@ -0,0 +1,51 @@
+import asyncio
+import signal
+
+from slack_sdk.web.async_client import AsyncWebClient
+
+from .config import JOB_WORKER_CONCURRENCY, SLACK_BOT_TOKEN
+from .di_container import DIContainer
+from .infrastructure.database import DatabasePool, run_migrations
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+
+async def run_worker():
+    """ジョブキューのSlackイベントを処理するワーカー専用プロセス"""
+    if not SLACK_BOT_TOKEN:
+        raise ValueError("環境変数 SLACK_BOT_TOKEN が設定されていません。")
+
+    logger.info("データベースマイグレーションを実行中...")
+    run_migrations()
+    logger.info("データベースマイグレーションが完了しました")
+
+    logger.info("データベース接続プールを初期化中...")
+    await DatabasePool.initialize()
+    logger.info("データベース接続プールの初期化が完了しました")
+
+    container = DIContainer(slack_client=AsyncWebClient(token=SLACK_BOT_TOKEN))
+    job_worker = container.create_job_worker(concurrency=max(JOB_WORKER_CONCURRENCY, 1))
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    try:
+        job_worker.start()
+        await stopping.wait()
+    finally:
+        logger.info("ワーカーをシャットダウン中...")
+        await job_worker.stop()
+        await container.close()
+        await DatabasePool.close()
+        logger.info("データベース接続プールをクローズしました")
+
+
+def main():
+    asyncio.run(run_worker())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from src.application.service import ConversationRunRegistry, SupersedePolicy
+
+
+async def wait_forever():
+    await asyncio.Event().wait()
+
+
+@pytest.mark.asyncio
+async def test_none_policy_keeps_previous_run():
+    """NONEポリシーでは古い実行を中断しないことをテスト"""
+    registry = ConversationRunRegistry(SupersedePolicy.NONE)
+    task = asyncio.create_task(wait_forever())
+    previous = registry.register("conv-1", task)
+
+    assert not registry.supersede("conv-1")
+    await asyncio.sleep(0)
+
+    assert not previous.superseded
+    assert not task.cancelled()
+    task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_cancel_policy_cancels_previous_run():
+    """CANCELポリシーでは同じ会話の古い実行を中断することをテスト"""
+    registry = ConversationRunRegistry(SupersedePolicy.CANCEL)
+    task = asyncio.create_task(wait_forever())
+    previous = registry.register("conv-1", task)
+
+    assert registry.supersede("conv-1")
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert previous.superseded
+    assert registry.superseded_count == 1
+
+
+@pytest.mark.asyncio
+async def test_run_is_superseded_only_once():
+    """中断済みの実行は重ねて中断・集計しないことをテスト"""
+    registry = ConversationRunRegistry(SupersedePolicy.MERGE)
+    registry.register("conv-1", asyncio.create_task(wait_forever()))
+
+    assert registry.supersede("conv-1")
+    assert not registry.supersede("conv-1")
+    assert registry.superseded_count == 1
+
+
+@pytest.mark.asyncio
+async def test_finished_run_is_not_superseded():
+    """ワークフローが完了済みの実行は中断の対象にならないことをテスト"""
+    registry = ConversationRunRegistry(SupersedePolicy.MERGE)
+    task = asyncio.create_task(asyncio.sleep(0))
+    previous = registry.register("conv-1", task)
+    await task
+
+    assert not registry.supersede("conv-1")
+    assert not previous.superseded
+
+
+@pytest.mark.asyncio
+async def test_other_conversations_are_not_affected():
+    """別の会話の実行は中断しないことをテスト"""
+    registry = ConversationRunRegistry(SupersedePolicy.CANCEL)
+    task = asyncio.create_task(wait_forever())
+    registry.register("conv-1", task)
+
+    assert not registry.supersede("conv-2")
+    await asyncio.sleep(0)
+
+    assert not task.cancelled()
+    task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_unregistered_run_is_not_superseded():
+    """登録解除した実行は中断の対象にならないことをテスト"""
+    registry = ConversationRunRegistry(SupersedePolicy.CANCEL)
+    task = asyncio.create_task(wait_forever())
+    run = registry.register("conv-1", task)
+    registry.unregister(run)
+
+    assert not registry.supersede("conv-1")
+    task.cancel()
@@ -0,0 +1,30 @@
+from src.application.service import ConversationWorkQueue
+
+
+def test_take_all_returns_messages_in_arrival_order():
+    """未処理のメッセージを到着順にまとめて取り出すことをテスト"""
+    queue = ConversationWorkQueue()
+    first = queue.enqueue("conv-1", "1つ目")
+    second = queue.enqueue("conv-1", "2つ目")
+    queue.enqueue("conv-2", "別の会話")
+
+    messages = queue.take_all("conv-1")
+
+    assert [message.content for message in messages] == ["1つ目", "2つ目"]
+    assert first.consumed and second.consumed
+    assert queue.pending_count("conv-1") == 0
+    assert queue.pending_count("conv-2") == 1
+
+
+def test_requeue_puts_messages_before_newer_ones():
+    """中断したメッセージは後から届いたメッセージより前に戻すことをテスト"""
+    queue = ConversationWorkQueue()
+    queue.enqueue("conv-1", "1つ目")
+    interrupted = queue.take_all("conv-1")
+    queue.enqueue("conv-1", "2つ目")
+
+    queue.requeue("conv-1", interrupted)
+
+    messages = queue.take_all("conv-1")
+    assert [message.content for message in messages] == ["1つ目", "2つ目"]
+    assert all(message.consumed for message in messages)
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from src.application.service import InProcessConversationLock
+
+
+@pytest.mark.asyncio
+async def test_same_conversation_runs_in_arrival_order():
+    """同じ会話の処理は到着順に1件ずつ実行されることをテスト"""
+    lock = InProcessConversationLock()
+    events = []
+
+    async def handle(name: str):
+        async with lock.acquire("conv-1"):
+            events.append(f"{name}:start")
+            await asyncio.sleep(0.01)
+            events.append(f"{name}:end")
+
+    await asyncio.gather(handle("A"), handle("B"), handle("C"))
+
+    assert events == [
+        "A:start",
+        "A:end",
+        "B:start",
+        "B:end",
+        "C:start",
+        "C:end",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_different_conversations_run_concurrently():
+    """別の会話の処理は並行して実行されることをテスト"""
+    lock = InProcessConversationLock()
+    both_entered = asyncio.Event()
+    entered = []
+
+    async def handle(conversation_id: str):
+        async with lock.acquire(conversation_id):
+            entered.append(conversation_id)
+            if len(entered) == 2:
+                both_entered.set()
+            await asyncio.wait_for(both_entered.wait(), timeout=1)
+
+    await asyncio.gather(handle("conv-1"), handle("conv-2"))
+
+    assert sorted(entered) == ["conv-1", "conv-2"]
+
+
+@pytest.mark.asyncio
+async def test_lock_is_released_after_exception():
+    """例外で抜けた場合もロックを解放し、不要になったロックを破棄することをテスト"""
+    lock = InProcessConversationLock()
+
+    with pytest.raises(RuntimeError):
+        async with lock.acquire("conv-1"):
+            raise RuntimeError
+
+    async with lock.acquire("conv-1"):
+        pass
+
+    assert lock._locks == {}
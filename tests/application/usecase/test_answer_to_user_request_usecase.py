@@ -1,3 +1,4 @@
+import asyncio
 from uuid import uuid4
 
 import pytest
@@ -6,11 +7,16 @@ from pytest_mock import MockerFixture
 from src.application.dto.answer_to_user_request_usecase import (
     AnswerToUserRequestInput,
 )
-from src.application.exception.usecase_exception import InvalidInputError
+from src.application.exception.usecase_exception import (
+    InvalidInputError,
+    WorkflowSupersededError,
+)
+from src.application.service import ConversationRunRegistry, SupersedePolicy
 from src.application.usecase.answer_to_user_request_usecase import (
     AnswerToUserRequestUseCase,
 )
-from src.domain.model import Task, TaskPlan, WorkflowResult
+from src.domain.exception import ChatSessionConflictError
+from src.domain.model import ChatSession, Task, TaskPlan, WorkflowResult
 
 
 @pytest.fixture
@@ -116,6 +122,52 @@ async def test_execute_passes_context_to_workflow(
     assert context_arg == valid_input.context
 
 
+@pytest.mark.asyncio
+async def test_execute_loads_session_without_task_plans(
+    usecase,
+    mock_workflow_service,
+    mock_chat_session_repository,
+    valid_input,
+    workflow_result,
+):
+    """回答時は過去のタスク計画を読み込まずにセッションを取得することをテスト"""
+    mock_chat_session_repository.find_by_id.return_value = None
+    mock_workflow_service.execute.return_value = workflow_result
+
+    await usecase.execute(valid_input)
+
+    mock_chat_session_repository.find_by_id.assert_called_once_with(
+        valid_input.context["conversation_id"],
+        include_task_plans=False,
+        max_messages=None,
+    )
+
+
+@pytest.mark.asyncio
+async def test_execute_loads_only_recent_messages(
+    mock_workflow_service,
+    mock_chat_session_repository,
+    valid_input,
+    workflow_result,
+):
+    """履歴の上限件数を指定した場合、直近のメッセージだけを読み込むことをテスト"""
+    usecase = AnswerToUserRequestUseCase(
+        workflow_service=mock_workflow_service,
+        chat_session_repository=mock_chat_session_repository,
+        history_max_messages=20,
+    )
+    mock_chat_session_repository.find_by_id.return_value = None
+    mock_workflow_service.execute.return_value = workflow_result
+
+    await usecase.execute(valid_input)
+
+    mock_chat_session_repository.find_by_id.assert_called_once_with(
+        valid_input.context["conversation_id"],
+        include_task_plans=False,
+        max_messages=20,
+    )
+
+
 @pytest.mark.asyncio
 async def test_execute_creates_session_with_correct_attributes(
     usecase,
@@ -147,3 +199,121 @@ async def test_execute_creates_session_with_correct_attributes(
     assert session_arg.thread_id == "thread-888"
     assert session_arg.user_id == "U99999"
     assert session_arg.channel_id == "C99999"
+
+
+@pytest.mark.asyncio
+async def test_execute_raises_superseded_error_when_newer_message_arrives(
+    mock_workflow_service, mock_chat_session_repository, valid_input, workflow_result
+):
+    """新しいメッセージで中断された実行は保存せずに例外を投げるテスト"""
+    usecase = AnswerToUserRequestUseCase(
+        workflow_service=mock_workflow_service,
+        chat_session_repository=mock_chat_session_repository,
+        run_registry=ConversationRunRegistry(SupersedePolicy.MERGE),
+    )
+    first_started = asyncio.Event()
+    sessions = []
+
+    async def execute(chat_session, context, answer_stream=None):
+        sessions.append(chat_session)
+        if len(sessions) == 1:
+            first_started.set()
+            await asyncio.Event().wait()
+        return workflow_result
+
+    mock_chat_session_repository.find_by_id.return_value = None
+    mock_workflow_service.execute.side_effect = execute
+
+    first = asyncio.create_task(usecase.execute(valid_input))
+    await first_started.wait()
+    follow_up = AnswerToUserRequestInput(
+        user_message="バージョンも教えて", context=valid_input.context
+    )
+    output = await usecase.execute(follow_up)
+
+    with pytest.raises(WorkflowSupersededError):
+        await first
+
+    assert output.answer == workflow_result.answer
+    assert mock_chat_session_repository.save.call_count == 1
+    saved_session = mock_chat_session_repository.save.call_args[0][0]
+    assert saved_session.last_user_message().content == (
+        "Pythonについて教えて\n\nバージョンも教えて"
+    )
+
+
+@pytest.mark.asyncio
+async def test_execute_coalesces_messages_queued_behind_running_workflow(
+    mock_workflow_service, mock_chat_session_repository, valid_input, workflow_result
+):
+    """実行中に届いた複数のメッセージを1回のワークフロー実行にまとめるテスト"""
+    usecase = AnswerToUserRequestUseCase(
+        workflow_service=mock_workflow_service,
+        chat_session_repository=mock_chat_session_repository,
+    )
+    first_started = asyncio.Event()
+    release_first = asyncio.Event()
+    user_messages = []
+
+    async def execute(chat_session, context, answer_stream=None):
+        user_messages.append(chat_session.last_user_message().content)
+        if len(user_messages) == 1:
+            first_started.set()
+            await release_first.wait()
+        return workflow_result
+
+    mock_chat_session_repository.find_by_id.return_value = None
+    mock_workflow_service.execute.side_effect = execute
+
+    first = asyncio.create_task(usecase.execute(valid_input))
+    await first_started.wait()
+    second = asyncio.create_task(
+        usecase.execute(
+            AnswerToUserRequestInput(user_message="B", context=valid_input.context)
+        )
+    )
+    third = asyncio.create_task(
+        usecase.execute(
+            AnswerToUserRequestInput(user_message="C", context=valid_input.context)
+        )
+    )
+    await asyncio.sleep(0)
+    release_first.set()
+
+    results = await asyncio.gather(first, second, third, return_exceptions=True)
+
+    assert user_messages == ["Pythonについて教えて", "B\n\nC"]
+    assert results[0].answer == workflow_result.answer
+    assert results[1].answer == workflow_result.answer
+    assert isinstance(results[2], WorkflowSupersededError)
+    assert mock_chat_session_repository.save.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_execute_raises_conflict_after_max_save_attempts(
+    mock_workflow_service, mock_chat_session_repository, valid_input, workflow_result
+):
+    """保存の競合が続く場合、上限回数まで読み直して保存した後に例外を送出するテスト"""
+    usecase = AnswerToUserRequestUseCase(
+        workflow_service=mock_workflow_service,
+        chat_session_repository=mock_chat_session_repository,
+        max_save_attempts=2,
+    )
+    mock_workflow_service.execute.return_value = workflow_result
+    latest = ChatSession.create(
+        id="conv-123", thread_id="thread-456", user_id="U12345", channel_id="C12345"
+    )
+    mock_chat_session_repository.find_by_id.side_effect = [None, latest]
+    mock_chat_session_repository.save.side_effect = ChatSessionConflictError(
+        "conv-123", 0
+    )
+
+    with pytest.raises(ChatSessionConflictError):
+        await usecase.execute(valid_input)
+
+    assert mock_chat_session_repository.save.call_count == 2
+    # 読み直したセッションに今回のメッセージが取り込まれている
+    assert [m.content for m in latest.messages] == [
+        "Pythonについて教えて",
+        "Pythonはプログラミング言語です",
+    ]
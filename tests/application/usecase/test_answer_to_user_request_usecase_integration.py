@@ -258,3 +258,55 @@ async def test_workflow_result_is_saved_correctly(
     assert saved_task1.result == "検索結果"
     assert saved_task2.description == "一般回答タスク"
     assert saved_task2.result == "一般回答"
+
+
+@pytest.mark.asyncio
+async def test_conflicting_save_is_merged_into_latest_session(
+    usecase, mock_workflow_service, repository
+):
+    """実行中に別インスタンスが保存した場合、読み直してマージすることをテスト"""
+    context = {
+        "conversation_id": "conv-123",
+        "user_id": "U12345",
+        "channel_id": "C12345",
+        "thread_ts": "1234567890.123456",
+    }
+    first_task = Task.create_general_answer("回答する")
+    first_task.complete("回答1")
+    mock_workflow_service.execute.return_value = WorkflowResult(
+        answer="回答1",
+        task_plan=TaskPlan.create(message_id=uuid4(), tasks=[first_task]),
+    )
+    await usecase.execute(
+        AnswerToUserRequestInput(user_message="質問1", context=context)
+    )
+
+    async def execute(chat_session, context, answer_stream=None):
+        # ワークフローの実行中に、別インスタンスが同じセッションを保存する
+        other = await repository.find_by_id("conv-123", include_task_plans=False)
+        other.add_user_message("別インスタンスの質問")
+        other.add_assistant_message("別インスタンスの回答")
+        await repository.save(other)
+
+        task = Task.create_general_answer("回答する")
+        task.complete("回答2")
+        return WorkflowResult(
+            answer="回答2",
+            task_plan=TaskPlan.create(
+                message_id=chat_session.last_user_message().id, tasks=[task]
+            ),
+        )
+
+    mock_workflow_service.execute.side_effect = execute
+
+    output = await usecase.execute(
+        AnswerToUserRequestInput(user_message="質問2", context=context)
+    )
+
+    saved_session = await repository.find_by_id("conv-123")
+    contents = [message.content for message in saved_session.messages]
+    assert "別インスタンスの質問" in contents
+    assert contents[-2:] == ["質問2", "回答2"]
+    assert str(saved_session.messages[-1].id) == output.message_id
+    assert saved_session.version == 3
+    assert len(saved_session.task_plans) == 2
@@ -0,0 +1,32 @@
+from benchmarks.repository_benchmark import build_turn, page_generator, parse_args
+from src.domain.model import ChatSession
+from src.infrastructure.repository import ChatSessionRepository
+
+
+def test_build_turn_adds_tasks_with_search_results():
+    """指定した件数のタスクと検索結果を含むターンが作られることをテスト"""
+    args = parse_args(["--results-per-task", "2", "--content-chars", "10"])
+    chat_session = ChatSession.create(
+        id="bench:1", thread_id="1", user_id="U1", channel_id="C1"
+    )
+
+    build_turn(chat_session, 5, args, page_generator(args))
+    write_set = ChatSessionRepository.build_write_set(chat_session)
+
+    assert len(write_set.messages) == 2
+    assert len(write_set.task_plans) == 1
+    assert len(write_set.tasks) == 5
+    task = chat_session.task_plans[0].tasks[0]
+    assert len(task.task_log.attempts[0].results) == 2
+    assert len(task.task_log.attempts[0].results[0].content) == 10
+
+
+def test_page_generator_reuses_pages_by_duplicate_ratio():
+    """重複割合に応じて同じページ本文が再利用されることをテスト"""
+    args = parse_args(["--content-chars", "50", "--duplicate-ratio", "1.0"])
+    pages = page_generator(args)
+
+    first = pages.page()
+
+    assert len(first) == 50
+    assert all(pages.page() == first for _ in range(5))
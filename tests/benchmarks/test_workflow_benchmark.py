@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from benchmarks.fakes import (
+    FakeLLMClient,
+    LatencyDistribution,
+    StageRecorder,
+)
+from benchmarks.workflow_benchmark import compare, parse_args, run, summarize
+from src.domain.model import Message
+from src.domain.service import TaskPlanningService
+
+
+def test_latency_distribution_is_deterministic_for_seed():
+    """同じシードでは同じ遅延を返すことをテスト"""
+    latency = LatencyDistribution(median_seconds=0.5, p95_seconds=1.5)
+
+    first = [latency.sample(random.Random(1)) for _ in range(3)]
+    second = [latency.sample(random.Random(1)) for _ in range(3)]
+
+    assert first == second
+    assert LatencyDistribution(0, 0).sample(random.Random(1)) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_fake_llm_client_records_stage_from_system_prompt():
+    """システムプロンプトから呼び出し元のステージを判定して記録することをテスト"""
+    recorder = StageRecorder()
+    client = FakeLLMClient(
+        model_name="fake",
+        latency=LatencyDistribution(0, 0),
+        rng=random.Random(1),
+        recorder=recorder,
+    )
+
+    await client.generate(
+        [
+            Message.create_system_message(TaskPlanningService.SYSTEM_PROMPT),
+            Message.create_user_message("質問"),
+        ]
+    )
+
+    assert list(recorder.samples) == ["planning"]
+
+
+def test_summarize_reports_percentiles():
+    """件数とパーセンタイルを集計することをテスト"""
+    summary = summarize([float(i) for i in range(1, 101)])
+
+    assert summary["count"] == 100
+    assert summary["p50"] == pytest.approx(50.5)
+    assert summary["p99"] == pytest.approx(99.01)
+    assert summarize([]) == {"count": 0}
+
+
+@pytest.mark.asyncio
+async def test_run_reports_each_concurrency_level():
+    """同時実行数ごとにスループットとステージ別の遅延を出力することをテスト"""
+    args = parse_args(
+        [
+            "--concurrency",
+            "1,4",
+            "--requests",
+            "4",
+            "--llm-median",
+            "0",
+            "--search-median",
+            "0",
+        ]
+    )
+
+    result = await run(args)
+
+    assert [level["concurrency"] for level in result["levels"]] == [1, 4]
+    level = result["levels"][1]
+    assert level["completed"] == 4
+    assert level["errors"] == {}
+    assert {"workflow", "planning", "final_answer"} <= set(level["stages"])
+    assert level["peak_rss_mb"] > 0
+    assert compare(result, result) == [
+        "concurrency=1: throughput +0.0%, workflow p95 +0.0%",
+        "concurrency=4: throughput +0.0%, workflow p95 +0.0%",
+    ]
@@ -79,6 +79,43 @@ def test_reconstruct_chat_session():
     assert session.updated_at == updated_at
 
 
+def test_reconstruct_chat_session_requires_version_as_keyword():
+    """versionは位置引数では渡せないテスト"""
+    created_at = datetime(2024, 1, 1, 12, 0, 0)
+
+    with pytest.raises(TypeError):
+        ChatSession.reconstruct(  # type: ignore[misc]
+            "session-1",
+            "thread-123",
+            "U12345",
+            "C12345",
+            [],
+            [],
+            created_at,
+            created_at,
+            3,
+        )
+
+
+def test_chat_session_requires_omitted_message_count_as_keyword():
+    """omitted_message_countは位置引数では渡せないテスト"""
+    created_at = datetime(2024, 1, 1, 12, 0, 0)
+
+    with pytest.raises(TypeError):
+        ChatSession(  # type: ignore[misc]
+            "session-1",
+            "thread-123",
+            "U12345",
+            "C12345",
+            [],
+            [],
+            created_at,
+            created_at,
+            0,
+            5,
+        )
+
+
 def test_add_user_message_with_string():
     """文字列でユーザーメッセージを追加するテスト"""
     session = ChatSession.create(
@@ -298,3 +335,125 @@ def test_add_multiple_task_plans():
     assert len(session.task_plans) == 2
     assert session.task_plans[0] == task_plan1
     assert session.task_plans[1] == task_plan2
+
+
+def test_chat_session_round_trips_through_dict():
+    """メッセージとタスク計画を含めて辞書形式から復元できることをテスト"""
+    session = ChatSession.create(
+        id="C12345_1234567890.123456",
+        thread_id="1234567890.123456",
+        user_id="U12345",
+        channel_id="C12345",
+    )
+    session.add_user_message("質問")
+    session.add_task_plan(
+        TaskPlan.create(
+            message_id=session.last_user_message().id,
+            tasks=[Task.create_general_answer("一般回答")],
+        )
+    )
+    session.add_assistant_message("回答")
+
+    restored = ChatSession.from_dict(session.to_dict())
+
+    assert restored.id == session.id
+    assert restored.thread_id == session.thread_id
+    assert [m.id for m in restored.messages] == [m.id for m in session.messages]
+    assert [m.role for m in restored.messages] == [m.role for m in session.messages]
+    assert restored.task_plans[0].id == session.task_plans[0].id
+    assert restored.created_at == session.created_at
+
+
+def test_add_same_task_plan_twice_is_ignored():
+    """同じタスク計画を2回追加しても1件だけ保持されるテスト"""
+    session = ChatSession.create(
+        id="session-1", thread_id=None, user_id="U12345", channel_id="C12345"
+    )
+    task_plan = TaskPlan.create(
+        message_id=uuid4(), tasks=[Task.create_web_search("検索1")]
+    )
+
+    session.add_task_plan(task_plan)
+    session.add_task_plan(task_plan)
+
+    assert session.task_plans == [task_plan]
+
+
+def test_pending_changes_are_cleared_after_mark_persisted():
+    """永続化後に追加・変更された内容だけが保存対象になるテスト"""
+    session = ChatSession.create(
+        id="session-1", thread_id=None, user_id="U12345", channel_id="C12345"
+    )
+    session.add_user_message("質問")
+    task = Task.create_general_answer("回答1")
+    session.add_task_plan(
+        TaskPlan.create(message_id=session.last_user_message().id, tasks=[task])
+    )
+
+    assert len(session.pending_messages()) == 1
+    assert len(session.pending_task_plans()) == 1
+
+    session.mark_persisted()
+
+    assert session.pending_messages() == []
+    assert session.pending_task_plans() == []
+    assert session.modified_tasks() == []
+
+    task.complete("回答")
+
+    assert session.modified_tasks() == [(session.task_plans[0], task)]
+
+
+def test_mark_persisted_records_version():
+    """永続化後のバージョンが記録され、辞書形式でも保持されることをテスト"""
+    session = ChatSession.create(
+        id="session-1", thread_id=None, user_id="U12345", channel_id="C12345"
+    )
+    assert session.version == 0
+
+    session.mark_persisted(3)
+    session.mark_persisted()
+
+    assert session.version == 3
+    assert ChatSession.from_dict(session.to_dict()).version == 3
+
+
+def test_merge_pending_adds_unsaved_changes_of_other_session():
+    """他のセッションの未保存のメッセージとタスク計画を取り込めることをテスト"""
+    latest = ChatSession.create(
+        id="session-1", thread_id=None, user_id="U12345", channel_id="C12345"
+    )
+    latest.add_user_message("別の質問")
+    latest.mark_persisted(2)
+    stale = ChatSession.create(
+        id="session-1", thread_id=None, user_id="U12345", channel_id="C12345"
+    )
+    stale.add_user_message("質問")
+    task_plan = TaskPlan.create(
+        message_id=stale.last_user_message().id,
+        tasks=[Task.create_general_answer("回答1")],
+    )
+    stale.add_task_plan(task_plan)
+
+    latest.merge_pending(stale)
+
+    assert [m.content for m in latest.messages] == ["別の質問", "質問"]
+    assert latest.pending_messages() == [stale.messages[0]]
+    assert latest.pending_task_plans() == [task_plan]
+    assert latest.version == 2
+
+
+def test_trim_messages_keeps_recent_window_starting_with_user():
+    """直近のメッセージだけを残し、先頭がユーザーのメッセージになることをテスト"""
+    session = ChatSession.create(
+        id="session-1", thread_id=None, user_id="U12345", channel_id="C12345"
+    )
+    for i in range(3):
+        session.add_user_message(f"質問{i}")
+        session.add_assistant_message(f"回答{i}")
+
+    session.trim_messages(3)
+
+    assert [m.content for m in session.messages] == ["質問2", "回答2"]
+    assert session.omitted_message_count == 4
+    assert session.message_count == 6
@@ -80,3 +80,18 @@ def test_make_negative():
     assert feedback.feedback == FeedbackType.BAD
     assert feedback.is_negative() is True
     assert feedback.updated_at > original_updated_at
+
+
+def test_feedback_to_dict():
+    """フィードバックを辞書形式に変換するテスト"""
+    message_id = uuid4()
+    feedback = Feedback.create(
+        user_id="U12345", message_id=message_id, feedback=FeedbackType.BAD
+    )
+
+    data = feedback.to_dict()
+
+    assert data["id"] == str(feedback.id)
+    assert data["message_id"] == str(message_id)
+    assert data["feedback"] == FeedbackType.BAD.value
+    assert data["created_at"] == feedback.created_at.isoformat()
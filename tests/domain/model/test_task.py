@@ -10,6 +10,7 @@ from src.domain.exception.task_exception import (
 )
 from src.domain.model.general_answer_task_log import GeneralAnswerTaskLog
 from src.domain.model.task import AgentName, Task, TaskStatus
+from src.domain.model.task_timing import TaskTiming
 from src.domain.model.web_search_task_log import SearchResult, WebSearchTaskLog
 
 
@@ -218,6 +219,22 @@ def test_reconstruct_task():
     assert task.completed_at == completed_at
 
 
+def test_reconstruct_task_requires_timings_as_keyword():
+    """timingsは位置引数では渡せないテスト"""
+    with pytest.raises(TypeError):
+        Task.reconstruct(  # type: ignore[misc]
+            uuid4(),
+            "再構築されたタスク",
+            AgentName.WEB_SEARCH,
+            WebSearchTaskLog.create(),
+            TaskStatus.IN_PROGRESS,
+            None,
+            datetime(2024, 1, 1, 12, 0, 0),
+            None,
+            [],
+        )
+
+
 def test_create_task_with_empty_description_raises_error():
     """空の説明でタスクを作成するとエラーになるテスト"""
     with pytest.raises(EmptyTaskDescriptionError, match="タスクの説明が空です"):
@@ -246,3 +263,43 @@ def test_multiple_web_search_attempts():
 
     assert isinstance(task.task_log, WebSearchTaskLog)
     assert len(task.task_log.attempts) == 3
+
+
+def test_record_timing_merges_same_stage():
+    """同じ段階の計測値が加算され、再実行回数が数えられることをテスト"""
+    task = Task.create_web_search("検索タスク")
+
+    task.record_timing(
+        TaskTiming(stage="execute_search", wall_seconds=1.0, runs=1, llm_calls=1)
+    )
+    task.record_timing(
+        TaskTiming(stage="execute_search", wall_seconds=0.5, runs=1, llm_calls=2)
+    )
+    task.record_timing(TaskTiming(stage="generate_task_result", runs=1))
+
+    assert [timing.stage for timing in task.timings] == [
+        "execute_search",
+        "generate_task_result",
+    ]
+    timing = task.timings[0]
+    assert timing.wall_seconds == 1.5
+    assert timing.llm_calls == 3
+    assert timing.retries == 1
+
+
+def test_timings_round_trip_through_dict():
+    """計測値が辞書形式との変換で保持されることをテスト"""
+    task = Task.create_general_answer("質問に回答")
+    task.record_timing(
+        TaskTiming(
+            stage="generate_answer",
+            wall_seconds=2.0,
+            runs=1,
+            input_tokens=120,
+            output_tokens=40,
+        )
+    )
+
+    restored = Task.from_dict(task.to_dict())
+
+    assert restored.timings == task.timings
@@ -123,3 +123,50 @@ def test_format_task_results_with_all_failed_tasks():
 
     with pytest.raises(AllTasksFailedError, match="全てのタスクが失敗しました"):
         task_plan.format_task_results()
+
+
+def test_unfinished_tasks_returns_tasks_not_completed():
+    """完了していないタスクのみが返されることをテスト"""
+    completed = Task.create_general_answer("完了したタスク")
+    completed.complete("結果")
+    failed = Task.create_web_search("失敗したタスク")
+    failed.fail("タイムアウトしました")
+    in_progress = Task.create_web_search("実行中のタスク")
+
+    task_plan = TaskPlan.create(
+        message_id=uuid4(), tasks=[completed, failed, in_progress]
+    )
+
+    assert task_plan.unfinished_tasks() == [failed, in_progress]
+
+
+def test_replace_task_swaps_task_with_same_id():
+    """同じIDのタスクを別オブジェクトの結果で置き換えるテスト"""
+    task = Task.create_general_answer("一般回答タスク")
+    other = Task.create_web_search("Web検索タスク")
+    task_plan = TaskPlan.create(message_id=uuid4(), tasks=[task, other])
+
+    restored = Task.from_dict(task.to_dict())
+    restored.complete("回答")
+    task_plan.replace_task(restored)
+
+    assert task_plan.tasks[0] is restored
+    assert task_plan.tasks[1] is other
+
+
+def test_task_plan_round_trips_through_dict():
+    """辞書形式に変換して復元できることをテスト"""
+    task = Task.create_web_search("Web検索タスク")
+    task.complete("検索結果")
+    task_plan = TaskPlan.create(
+        message_id=uuid4(), tasks=[task, Task.create_general_answer("一般回答")]
+    )
+
+    restored = TaskPlan.from_dict(task_plan.to_dict())
+
+    assert restored.id == task_plan.id
+    assert restored.message_id == task_plan.message_id
+    assert [t.id for t in restored.tasks] == [t.id for t in task_plan.tasks]
+    assert restored.tasks[0].status == task.status
+    assert restored.tasks[0].result == "検索結果"
+    assert restored.tasks[0].completed_at == task.completed_at
@@ -247,3 +247,77 @@ async def test_execute_returns_assistant_message(
     )
 
     assert result.role.value == "assistant"
+
+
+@pytest.mark.asyncio
+async def test_execute_streams_accumulated_answer(
+    answer_service,
+    mock_llm_client,
+    mocker: MockerFixture,
+    chat_session_with_messages,
+    task_plan_with_completed_tasks,
+):
+    """answer_streamに累積した回答が逐次通知されることをテスト"""
+
+    async def fake_stream(messages):
+        for chunk in ["Python", "は", "便利です"]:
+            yield chunk
+
+    mock_llm_client.stream = fake_stream
+    answer_stream = mocker.AsyncMock()
+
+    result = await answer_service.execute(
+        chat_session_with_messages,
+        task_plan_with_completed_tasks,
+        answer_stream=answer_stream,
+    )
+
+    assert result.content == "Pythonは便利です"
+    assert not mock_llm_client.generate.called
+    pushed = [call.args[0] for call in answer_stream.push.call_args_list]
+    assert pushed == ["Python", "Pythonは", "Pythonは便利です"]
+
+
+@pytest.mark.asyncio
+async def test_execute_mentions_unfinished_tasks(
+    answer_service, mock_llm_client, chat_session_with_messages
+):
+    """完了しなかったタスクがプロンプトに含まれることをテスト"""
+    mock_llm_client.generate.return_value = "回答"
+    completed = Task.create_general_answer("Pythonの特徴を説明")
+    completed.complete("読みやすい言語です")
+    timed_out = Task.create_web_search("Pythonの最新バージョンを検索")
+    timed_out.fail("タイムアウトしました (web_search: 60秒)")
+    task_plan = TaskPlan.create(message_id=uuid4(), tasks=[completed, timed_out])
+
+    await answer_service.execute(chat_session_with_messages, task_plan)
+
+    prompt = mock_llm_client.generate.call_args[0][0][-1].content
+    assert "## 完了しなかったタスク:" in prompt
+    assert "Pythonの最新バージョンを検索: Error: タイムアウトしました" in prompt
+
+
+def test_build_fallback_answer_uses_completed_results(answer_service):
+    """代替の回答に完了したタスクの結果が含まれることをテスト"""
+    completed = Task.create_general_answer("Pythonの特徴を説明")
+    completed.complete("読みやすい言語です")
+    timed_out = Task.create_web_search("Pythonの最新バージョンを検索")
+    timed_out.fail("タイムアウトしました")
+    task_plan = TaskPlan.create(message_id=uuid4(), tasks=[completed, timed_out])
+
+    result = answer_service.build_fallback_answer(task_plan)
+
+    assert "読みやすい言語です" in result.content
+    assert "最新バージョン" not in result.content
+    assert result.role.value == "assistant"
+
+
+def test_build_fallback_answer_without_completed_tasks(answer_service):
+    """完了したタスクがない場合はお詫びの文面になることをテスト"""
+    task = Task.create_web_search("検索")
+    task.fail("タイムアウトしました")
+    task_plan = TaskPlan.create(message_id=uuid4(), tasks=[task])
+
+    result = answer_service.build_fallback_answer(task_plan)
+
+    assert "時間内に回答を用意できませんでした" in result.content
@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 from pytest_mock import MockerFixture
 
@@ -126,7 +128,9 @@ async def test_execute_includes_conversation_history(
     # 会話履歴全体が含まれていることを確認
     assert messages[1].content == "Pythonとは何ですか?"
     assert messages[2].content == "Pythonは..."
-    assert messages[3].content == "もっと詳しく教えて"  # 最新のユーザーメッセージも含まれる
+    assert (
+        messages[3].content == "もっと詳しく教えて"
+    )  # 最新のユーザーメッセージも含まれる
 
 
 @pytest.mark.asyncio
@@ -162,3 +166,131 @@ async def test_build_task_prompt_format(general_answer_service):
     assert "## タスク:" in prompt
     assert task_description in prompt
     assert "上記のタスクについて回答してください" in prompt
+
+
+@pytest.mark.asyncio
+async def test_generate_answer_does_not_modify_task_state(
+    general_answer_service,
+    mock_llm_client,
+    chat_session_with_messages,
+    general_answer_task,
+):
+    """generate_answerがタスクの状態を変更せずに回答を返すことをテスト"""
+    mock_llm_client.generate.return_value = "先行生成した回答"
+
+    answer = await general_answer_service.generate_answer(
+        chat_session_with_messages, "もっと詳しく教えて"
+    )
+
+    assert answer == "先行生成した回答"
+    assert general_answer_task.status == TaskStatus.IN_PROGRESS
+    assert len(general_answer_task.task_log.attempts) == 0
+
+    messages = mock_llm_client.generate.call_args[0][0]
+    assert "もっと詳しく教えて" in messages[-1].content
+
+
+def test_apply_answer_completes_task(general_answer_service, general_answer_task):
+    """apply_answerで生成済みの回答がタスクに記録されることをテスト"""
+    general_answer_service.apply_answer(general_answer_task, "生成済みの回答")
+
+    assert general_answer_task.status == TaskStatus.COMPLETED
+    assert general_answer_task.result == "生成済みの回答"
+    assert general_answer_task.task_log.attempts[0].response == "生成済みの回答"
+
+
+@pytest.mark.asyncio
+async def test_execute_batch_completes_each_task_with_single_call(
+    general_answer_service,
+    mock_llm_client,
+    mocker: MockerFixture,
+    chat_session_with_messages,
+):
+    """複数タスクを1回の構造化出力で回答し、タスクごとに完了させるテスト"""
+    tasks = [
+        Task.create_general_answer("Pythonの特徴を説明してください"),
+        Task.create_general_answer("Pythonの歴史を説明してください"),
+    ]
+    mock_llm_client.generate_with_structured_output.return_value = mocker.Mock(
+        answers=[
+            mocker.Mock(task_id="task-2", answer="1991年に公開されました"),
+            mocker.Mock(task_id="task-1", answer="読みやすい言語です"),
+        ]
+    )
+
+    await general_answer_service.execute_batch(chat_session_with_messages, tasks)
+
+    assert mock_llm_client.generate_with_structured_output.call_count == 1
+    assert not mock_llm_client.generate.called
+
+    assert tasks[0].status == TaskStatus.COMPLETED
+    assert tasks[0].result == "読みやすい言語です"
+    assert tasks[0].task_log.attempts[0].response == "読みやすい言語です"
+    assert tasks[1].status == TaskStatus.COMPLETED
+    assert tasks[1].result == "1991年に公開されました"
+
+    # 会話履歴は1回だけ送信され、全タスクの説明が含まれる
+    messages = mock_llm_client.generate_with_structured_output.call_args[0][0]
+    assert len(messages) == 5
+    assert "task-1" in messages[-1].content
+    assert "Pythonの歴史を説明してください" in messages[-1].content
+
+
+@pytest.mark.asyncio
+async def test_execute_batch_falls_back_for_missing_answers(
+    general_answer_service,
+    mock_llm_client,
+    mocker: MockerFixture,
+    chat_session_with_messages,
+):
+    """回答が欠けたタスクは個別に回答を生成するテスト"""
+    tasks = [
+        Task.create_general_answer("Pythonの特徴を説明してください"),
+        Task.create_general_answer("Pythonの歴史を説明してください"),
+    ]
+    mock_llm_client.generate_with_structured_output.return_value = mocker.Mock(
+        answers=[mocker.Mock(task_id="task-1", answer="読みやすい言語です")]
+    )
+    mock_llm_client.generate.return_value = "個別に生成した回答"
+
+    await general_answer_service.execute_batch(chat_session_with_messages, tasks)
+
+    assert mock_llm_client.generate.call_count == 1
+    assert tasks[0].result == "読みやすい言語です"
+    assert tasks[1].status == TaskStatus.COMPLETED
+    assert tasks[1].result == "個別に生成した回答"
+
+
+@pytest.mark.asyncio
+async def test_execute_batch_falls_back_concurrently_when_no_keys_match(
+    general_answer_service,
+    mock_llm_client,
+    mocker: MockerFixture,
+    chat_session_with_messages,
+):
+    """タスクIDが1つも一致しない場合は全タスクを並行して個別に回答するテスト"""
+    tasks = [Task.create_general_answer(f"質問{i}") for i in range(3)]
+    mock_llm_client.generate_with_structured_output.return_value = mocker.Mock(
+        answers=[
+            mocker.Mock(task_id=f"question-{i}", answer=f"回答{i}") for i in range(3)
+        ]
+    )
+    all_started = asyncio.Event()
+    started = 0
+
+    async def generate(messages):
+        nonlocal started
+        started += 1
+        if started == len(tasks):
+            all_started.set()
+        # 直列に呼び出されていると最初の呼び出しが完了せずにタイムアウトする
+        await asyncio.wait_for(all_started.wait(), timeout=1)
+        return "個別に生成した回答"
+
+    mock_llm_client.generate.side_effect = generate
+
+    await general_answer_service.execute_batch(chat_session_with_messages, tasks)
+
+    assert mock_llm_client.generate.call_count == 3
+    assert all(task.status == TaskStatus.COMPLETED for task in tasks)
+    assert all(task.result == "個別に生成した回答" for task in tasks)
@@ -348,3 +348,27 @@ async def test_execute_returns_only_queries(
     # reasonは含まれず、queriesのみが返されることを確認
     assert isinstance(result, list)
     assert result == ["クエリ1", "クエリ2"]
+
+
+@pytest.mark.asyncio
+async def test_execute_limits_number_of_queries(
+    search_query_service, mock_llm_client, web_search_task
+):
+    """max_queriesを超えるクエリは切り捨てられ、プロンプトで制限が伝わるテスト"""
+
+    class _SearchQueries(BaseModel):
+        queries: list[str] = Field(
+            description="生成された検索クエリのリスト(最大3個)", max_length=3
+        )
+        reason: str = Field(description="これらのクエリを選んだ理由")
+
+    mock_llm_client.generate_with_structured_output.return_value = _SearchQueries(
+        queries=["クエリ1", "クエリ2", "クエリ3"], reason="理由"
+    )
+
+    result = await search_query_service.execute(web_search_task, max_queries=1)
+
+    assert result == ["クエリ1"]
+
+    messages = mock_llm_client.generate_with_structured_output.call_args[0][0]
+    assert "クエリ数の制限" in messages[-1].content
@@ -116,6 +116,37 @@ async def test_execute_with_multiple_tasks(
     assert task_plan.tasks[1].agent_name == AgentName.GENERAL_ANSWER
 
 
+@pytest.mark.asyncio
+async def test_execute_keeps_request_for_single_general_answer_task(
+    task_planning_service, mock_llm_client, chat_session_with_messages
+):
+    """一般回答タスク1件だけの計画ではリクエストをそのままタスク内容にするテスト"""
+
+    class _Task(BaseModel):
+        task_description: str = Field(description="タスクの内容")
+        next_agent: str = Field(description="処理するエージェント")
+
+    class _TaskPlan(BaseModel):
+        tasks: list[_Task]
+        reason: str
+
+    mock_llm_client.generate_with_structured_output.return_value = _TaskPlan(
+        tasks=[
+            _Task(
+                task_description="Pythonの最新バージョンを説明する",
+                next_agent="general_answer",
+            )
+        ],
+        reason="一般知識で回答できる",
+    )
+
+    task_plan = await task_planning_service.execute(chat_session_with_messages)
+
+    [task] = task_plan.tasks
+    assert task.agent_name == AgentName.GENERAL_ANSWER
+    assert task.description == "最新バージョンは?"
+
+
 @pytest.mark.asyncio
 async def test_execute_includes_system_prompt(
     task_planning_service,
@@ -242,3 +273,15 @@ async def test_execute_creates_web_search_task(
 
     assert task_plan.tasks[0].agent_name == AgentName.WEB_SEARCH
     assert task_plan.tasks[0].description == "最新のニュースを検索"
+
+
+def test_fallback_plan_answers_latest_request(
+    task_planning_service, chat_session_with_messages
+):
+    """代替の計画が最新のリクエストへの一般回答タスク1件になることをテスト"""
+    task_plan = task_planning_service.fallback_plan(chat_session_with_messages)
+
+    assert len(task_plan.tasks) == 1
+    assert task_plan.tasks[0].agent_name == AgentName.GENERAL_ANSWER
+    assert task_plan.tasks[0].description == "最新バージョンは?"
+    assert task_plan.message_id == chat_session_with_messages.last_user_message().id
@@ -0,0 +1,120 @@
+import pytest
+
+from src.domain.exception.service_exception import TaskResultNotFoundError
+from src.domain.model import SearchResult
+from src.domain.model.task import Task
+from src.domain.service.task_result_pre_evaluation_service import (
+    PreEvaluationThresholds,
+    TaskResultPreEvaluationService,
+)
+
+
+@pytest.fixture
+def pre_evaluation_service():
+    """TaskResultPreEvaluationServiceのインスタンス"""
+    return TaskResultPreEvaluationService(
+        PreEvaluationThresholds(
+            min_citations=2,
+            min_source_coverage=0.5,
+            min_length=50,
+            min_term_overlap=0.6,
+            accept_score=1.0,
+        )
+    )
+
+
+@pytest.fixture
+def task_with_search_results():
+    """検索結果を持つタスク"""
+    task = Task.create_web_search("Pythonの最新バージョンを検索")
+    task.add_web_search_attempt(
+        query="Python 最新バージョン",
+        results=[
+            SearchResult(
+                url="https://www.python.org/downloads/",
+                title="Download Python",
+                content="Python 3.13.0 is now available",
+            ),
+            SearchResult(
+                url="https://docs.python.org/3.13/whatsnew/3.13.html",
+                title="What's New in Python 3.13",
+                content="New features and improvements",
+            ),
+        ],
+    )
+    return task
+
+
+def test_execute_accepts_well_cited_result(
+    pre_evaluation_service, task_with_search_results
+):
+    """複数の情報源を引用し、タスクを網羅した結果は合格となるテスト"""
+    task_with_search_results.complete(
+        "Pythonの最新バージョンは3.13です[0]。新機能も追加されました[1]。\n\n"
+        "【参考情報】(2件)\n"
+        "[0] <https://www.python.org/downloads/|Download Python>\n"
+        "[1] <https://docs.python.org/3.13/whatsnew/3.13.html|What's New>"
+    )
+
+    result = pre_evaluation_service.execute(task_with_search_results)
+
+    assert result.accepted is True
+    assert result.score == 1.0
+    assert result.citation_count == 2
+    assert result.source_coverage == 1.0
+    # 「検索」以外のタスク語句(Python・最新・バージョン)が含まれる
+    assert result.term_overlap == pytest.approx(3 / 4)
+    assert result.unknown_source_count == 0
+
+
+def test_execute_rejects_result_without_citations(
+    pre_evaluation_service, task_with_search_results
+):
+    """引用のない結果は不合格となるテスト"""
+    task_with_search_results.complete(
+        "Pythonの最新バージョンは3.13です。新しい機能が多数追加されています。"
+        "詳細は公式サイトを参照してください。"
+    )
+
+    result = pre_evaluation_service.execute(task_with_search_results)
+
+    assert result.accepted is False
+    assert result.citation_count == 0
+    assert result.source_coverage == 0.0
+    assert result.score < 1.0
+
+
+def test_execute_rejects_result_with_unknown_source(
+    pre_evaluation_service, task_with_search_results
+):
+    """検索結果にないURLを引用している結果は不合格となるテスト"""
+    task_with_search_results.complete(
+        "Pythonの最新バージョンは3.13です[0][1]。\n\n"
+        "[0] <https://www.python.org/downloads/|Download Python>\n"
+        "[1] <https://docs.python.org/3.13/whatsnew/3.13.html|What's New>\n"
+        "[2] <https://example.com/made-up|創作されたURL>"
+    )
+
+    result = pre_evaluation_service.execute(task_with_search_results)
+
+    assert result.accepted is False
+    assert result.unknown_source_count == 1
+
+
+def test_execute_measures_term_overlap(pre_evaluation_service):
+    """タスク内容の語句が結果に含まれる割合を計算するテスト"""
+    task = Task.create_web_search("東京の天気とPythonの最新バージョン")
+    task.complete("東京の天気は晴れです。")
+
+    result = pre_evaluation_service.execute(task)
+
+    # 東京・天気・Python・最新・バージョン のうち2語が含まれる
+    assert result.term_overlap == pytest.approx(2 / 5)
+
+
+def test_execute_raises_error_when_result_is_missing(pre_evaluation_service):
+    """タスク結果がない場合にエラーを投げるテスト"""
+    task = Task.create_web_search("Pythonの最新バージョンを検索")
+
+    with pytest.raises(TaskResultNotFoundError):
+        pre_evaluation_service.execute(task)
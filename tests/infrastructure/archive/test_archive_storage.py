@@ -0,0 +1,30 @@
+import pytest
+
+from src.infrastructure.archive import LocalArchiveStorage
+
+
+@pytest.mark.asyncio
+async def test_local_storage_writes_file(tmp_path):
+    """ローカルの保存先にサブディレクトリごとファイルを書き出すことをテスト"""
+    storage = LocalArchiveStorage(tmp_path)
+
+    assert not await storage.exists("chat_sessions/a.jsonl.gz")
+    await storage.write("chat_sessions/a.jsonl.gz", b"data")
+
+    assert await storage.exists("chat_sessions/a.jsonl.gz")
+    assert (tmp_path / "chat_sessions" / "a.jsonl.gz").read_bytes() == b"data"
+    assert not (tmp_path / "chat_sessions" / "a.jsonl.gz.tmp").exists()
+
+
+@pytest.mark.asyncio
+async def test_local_storage_reads_and_deletes_file(tmp_path):
+    """ローカルの保存先のファイルを読み込み、削除できることをテスト"""
+    storage = LocalArchiveStorage(tmp_path)
+
+    assert await storage.read("chat_sessions/pending_chunk.json") is None
+    await storage.write("chat_sessions/pending_chunk.json", b"{}")
+    assert await storage.read("chat_sessions/pending_chunk.json") == b"{}"
+
+    await storage.delete("chat_sessions/pending_chunk.json")
+    await storage.delete("chat_sessions/pending_chunk.json")
+    assert not await storage.exists("chat_sessions/pending_chunk.json")
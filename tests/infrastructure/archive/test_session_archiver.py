@@ -0,0 +1,203 @@
+import gzip
+import json
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from src.domain.model import ChatSession
+from src.domain.model.feedback import Feedback, FeedbackType
+from src.infrastructure.archive import LocalArchiveStorage, SessionArchiver
+
+CUTOFF = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+class _FakeChatSessionRepository:
+    """メモリ上のセッションを更新日時順に返すリポジトリ"""
+
+    def __init__(self, chat_sessions: list[ChatSession]):
+        self.chat_sessions = {
+            chat_session.id: chat_session for chat_session in chat_sessions
+        }
+        self.deleted_batches: list[list[str]] = []
+        self.fail_deletes_after: int | None = None
+
+    async def find_ids_updated_before(self, cutoff, limit):
+        old = sorted(
+            (s for s in self.chat_sessions.values() if s.updated_at < cutoff),
+            key=lambda s: (s.updated_at, s.id),
+        )
+        return [s.id for s in old[:limit]]
+
+    async def find_by_ids(self, chat_session_ids):
+        return [self.chat_sessions[id] for id in chat_session_ids]
+
+    async def delete_by_ids(self, chat_session_ids, updated_before):
+        if self.fail_deletes_after == len(self.deleted_batches):
+            raise RuntimeError("削除中に停止")
+        self.deleted_batches.append(chat_session_ids)
+        deleted = 0
+        for id in chat_session_ids:
+            chat_session = self.chat_sessions.get(id)
+            if chat_session and chat_session.updated_at < updated_before:
+                del self.chat_sessions[id]
+                deleted += 1
+        return deleted
+
+    async def delete_unreferenced_web_documents(self, saved_before):
+        return 0
+
+
+class _FakeFeedbackRepository:
+    def __init__(self, feedbacks: list[Feedback] | None = None):
+        self.feedbacks = feedbacks or []
+
+    async def find_by_chat_session_ids(self, chat_session_ids):
+        return self.feedbacks
+
+
+def _session(index: int, days_old: int = 100) -> ChatSession:
+    updated_at = CUTOFF - timedelta(days=days_old - 90, minutes=index)
+    chat_session = ChatSession.reconstruct(
+        id=f"C1:{index}",
+        thread_id=f"{index}",
+        user_id="U1",
+        channel_id="C1",
+        messages=[],
+        task_plans=[],
+        created_at=updated_at,
+        updated_at=updated_at,
+    )
+    chat_session.add_user_message(f"質問{index}")
+    return chat_session
+
+
+def _read_archives(root) -> list[dict]:
+    records = []
+    for path in sorted(root.glob("chat_sessions/*.jsonl.gz")):
+        for line in gzip.decompress(path.read_bytes()).decode().splitlines():
+            records.append(json.loads(line))
+    return records
+
+
+@pytest.mark.asyncio
+async def test_archives_old_sessions_in_chunks(tmp_path):
+    """古いセッションだけをチャンクごとに書き出して削除することをテスト"""
+    repository = _FakeChatSessionRepository(
+        [_session(i) for i in range(5)] + [_session(9, days_old=10)]
+    )
+    archiver = SessionArchiver(
+        repository,
+        _FakeFeedbackRepository(),
+        LocalArchiveStorage(tmp_path),
+        chunk_size=2,
+        delete_batch_size=1,
+    )
+
+    result = await archiver.run(CUTOFF)
+
+    assert result.chunks == 3
+    assert result.uploaded == 3
+    assert result.archived_sessions == 5
+    assert result.deleted_sessions == 5
+    assert list(repository.chat_sessions) == ["C1:9"]
+    assert all(len(batch) == 1 for batch in repository.deleted_batches)
+    assert sorted(record["id"] for record in _read_archives(tmp_path)) == [
+        f"C1:{i}" for i in range(5)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_archive_includes_feedbacks_of_session(tmp_path):
+    """セッションのメッセージに付いたフィードバックを同じ行に含めることをテスト"""
+    chat_session = _session(0)
+    feedback = Feedback.create(
+        user_id="U1",
+        message_id=chat_session.messages[0].id,
+        feedback=FeedbackType.GOOD,
+    )
+    archiver = SessionArchiver(
+        _FakeChatSessionRepository([chat_session]),
+        _FakeFeedbackRepository([feedback]),
+        LocalArchiveStorage(tmp_path),
+    )
+
+    await archiver.run(CUTOFF)
+
+    [record] = _read_archives(tmp_path)
+    assert record["messages"][0]["content"] == "質問0"
+    assert record["feedbacks"] == [feedback.to_dict()]
+
+
+@pytest.mark.asyncio
+async def test_resumes_interrupted_chunk_without_exporting_again(tmp_path):
+    """削除の途中で止まったチャンクは、対象が増えていても書き出し直さずに再開することをテスト"""
+    repository = _FakeChatSessionRepository([_session(i) for i in range(3)])
+    storage = LocalArchiveStorage(tmp_path)
+    archiver = SessionArchiver(
+        repository,
+        _FakeFeedbackRepository(),
+        storage,
+        chunk_size=3,
+        delete_batch_size=1,
+    )
+    repository.fail_deletes_after = 1
+    with pytest.raises(RuntimeError):
+        await archiver.run(CUTOFF)
+
+    # 中断している間に新たに古くなったセッションが増える
+    repository.fail_deletes_after = None
+    repository.chat_sessions["C1:3"] = _session(3)
+
+    result = await archiver.run(CUTOFF)
+
+    assert result.skipped == 1
+    assert result.uploaded == 1
+    assert result.deleted_sessions == 3
+    assert repository.chat_sessions == {}
+    assert sorted(record["id"] for record in _read_archives(tmp_path)) == [
+        f"C1:{i}" for i in range(4)
+    ]
+    assert await storage.read(SessionArchiver.PENDING_CHUNK_NAME) is None
+
+
+@pytest.mark.asyncio
+async def test_exports_recorded_chunk_interrupted_before_export(tmp_path):
+    """書き出し前に止まったチャンクは記録されたセッションだけを書き出すことをテスト"""
+    repository = _FakeChatSessionRepository([_session(0), _session(1)])
+    storage = LocalArchiveStorage(tmp_path)
+    await storage.write(
+        SessionArchiver.PENDING_CHUNK_NAME,
+        json.dumps(
+            {
+                "name": "chat_sessions/interrupted.jsonl.gz",
+                "chat_session_ids": ["C1:0"],
+                "cutoff": CUTOFF.isoformat(),
+            }
+        ).encode(),
+    )
+    archiver = SessionArchiver(repository, _FakeFeedbackRepository(), storage)
+
+    result = await archiver.run(CUTOFF, max_chunks=1)
+
+    assert result.uploaded == 1
+    assert list(repository.chat_sessions) == ["C1:1"]
+    [record] = _read_archives(tmp_path)
+    assert record["id"] == "C1:0"
+    assert (tmp_path / "chat_sessions" / "interrupted.jsonl.gz").exists()
+
+
+@pytest.mark.asyncio
+async def test_stops_after_max_chunks(tmp_path):
+    """1回の実行で処理するチャンク数の上限で止まることをテスト"""
+    repository = _FakeChatSessionRepository([_session(i) for i in range(5)])
+    archiver = SessionArchiver(
+        repository,
+        _FakeFeedbackRepository(),
+        LocalArchiveStorage(tmp_path),
+        chunk_size=2,
+    )
+
+    result = await archiver.run(CUTOFF, max_chunks=1)
+
+    assert result.chunks == 1
+    assert len(repository.chat_sessions) == 3
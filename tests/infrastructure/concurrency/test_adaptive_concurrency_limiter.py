@@ -0,0 +1,340 @@
+import asyncio
+
+import pytest
+
+from src.infrastructure.concurrency import (
+    AdaptiveConcurrencyLimiter,
+    FairnessPolicy,
+    KeyQueueStats,
+    RequestPriority,
+)
+from src.infrastructure.exception import AdmissionRejectedError
+
+
+@pytest.mark.asyncio
+async def test_acquire_queues_requests_over_limit():
+    """上限を超えたリクエストが待機し、解放後に実行されることをテスト"""
+    limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=1)
+    release = asyncio.Event()
+
+    async def hold():
+        async with limiter.acquire():
+            await release.wait()
+
+    first = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    second = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+
+    assert limiter.in_flight == 1
+    assert limiter.queue_depth == 1
+    assert limiter.load() == 2.0
+
+    release.set()
+    await asyncio.gather(first, second)
+
+    stats = limiter.stats()
+    assert stats.in_flight == 0
+    assert stats.queue_depth == 0
+    assert stats.admitted == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_queue():
+    """待機中にキャンセルされたリクエストがキューから外れることをテスト"""
+    limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=1)
+
+    async with limiter.acquire():
+        waiter = asyncio.create_task(limiter.acquire().__aenter__())
+        await asyncio.sleep(0)
+        assert limiter.queue_depth == 1
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert limiter.queue_depth == 0
+
+    assert limiter.in_flight == 0
+
+
+def test_observe_decreases_limit_on_latency_spike():
+    """基準を大きく超える遅延で上限が乗算的に下がることをテスト"""
+    limiter = AdaptiveConcurrencyLimiter(
+        min_limit=10, max_limit=100, initial_limit=60, backoff_ratio=0.5
+    )
+
+    limiter.observe("llm:gemini-2.5-flash", 1.0)
+    limiter.observe("llm:gemini-2.5-flash", 1.5)
+    assert limiter.limit == 60
+
+    limiter.observe("llm:gemini-2.5-flash", 5.0)
+    assert limiter.limit == 30
+
+
+def test_observe_decreases_limit_on_error_within_bounds():
+    """エラーで上限が下がり、最小値を下回らないことをテスト"""
+    limiter = AdaptiveConcurrencyLimiter(
+        min_limit=10,
+        max_limit=100,
+        initial_limit=12,
+        backoff_ratio=0.5,
+        decrease_cooldown_seconds=0,
+    )
+
+    limiter.observe("llm:gemini-2.0-flash", 1.0, error=True)
+    limiter.observe("llm:gemini-2.0-flash", 1.0, error=True)
+
+    assert limiter.limit == 10
+
+
+def test_observe_ignores_repeated_signals_during_cooldown():
+    """クールダウン中の連続した過負荷シグナルでは1回だけ下がることをテスト"""
+    limiter = AdaptiveConcurrencyLimiter(
+        min_limit=1, max_limit=100, initial_limit=50, backoff_ratio=0.5
+    )
+
+    for _ in range(5):
+        limiter.observe("llm:gemini-2.0-flash", 1.0, error=True)
+
+    assert limiter.limit == 25
+
+
+@pytest.mark.asyncio
+async def test_limit_increases_only_when_saturated():
+    """上限まで使われた状態での成功でのみ上限が増えることをテスト"""
+    limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=3, initial_limit=1)
+
+    async with limiter.acquire():
+        pass
+    assert limiter.limit == 2
+
+    # 上限に達していない状態での成功では増えない
+    for _ in range(3):
+        async with limiter.acquire():
+            pass
+    assert limiter.limit == 2
+
+
+@pytest.mark.asyncio
+async def test_acquire_rejects_when_queue_is_full():
+    """キューが満杯の場合は待たずに拒否することをテスト"""
+    limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=1, max_queue_depth=1)
+
+    async with limiter.acquire():
+        queued = asyncio.create_task(limiter.acquire().__aenter__())
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejectedError, match="queue_full"):
+            async with limiter.acquire():
+                pass
+
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+
+    assert limiter.stats().shed_counts == {"queue_full:normal": 1}
+
+
+@pytest.mark.asyncio
+async def test_high_priority_request_evicts_normal_request_from_full_queue():
+    """満杯のキューでは優先度の高いリクエストが低いリクエストを押し出すことをテスト"""
+    limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=1, max_queue_depth=1)
+    release = asyncio.Event()
+    order: list[str] = []
+
+    async def run(name: str, priority: RequestPriority):
+        async with limiter.acquire(priority):
+            order.append(name)
+            await release.wait()
+
+    running = asyncio.create_task(run("running", RequestPriority.NORMAL))
+    await asyncio.sleep(0)
+    normal = asyncio.create_task(run("normal", RequestPriority.NORMAL))
+    await asyncio.sleep(0)
+    high = asyncio.create_task(run("high", RequestPriority.HIGH))
+    await asyncio.sleep(0)
+
+    release.set()
+    results = await asyncio.gather(running, normal, high, return_exceptions=True)
+
+    assert isinstance(results[1], AdmissionRejectedError)
+    assert order == ["running", "high"]
+    assert limiter.stats().shed_counts == {"evicted:normal": 1}
+
+
+@pytest.mark.asyncio
+async def test_acquire_rejects_after_max_wait():
+    """最大待ち時間を過ぎたリクエストを拒否することをテスト"""
+    limiter = AdaptiveConcurrencyLimiter(
+        min_limit=1, max_limit=1, max_wait_seconds=0.01
+    )
+
+    async with limiter.acquire():
+        with pytest.raises(AdmissionRejectedError, match="wait_timeout"):
+            async with limiter.acquire():
+                pass
+
+        assert limiter.queue_depth == 0
+
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_acquire_rejects_immediately_when_expected_wait_is_too_long():
+    """見込み待ち時間が最大待ち時間を超える場合は即時に拒否することをテスト"""
+    limiter = AdaptiveConcurrencyLimiter(
+        min_limit=1, max_limit=1, max_wait_seconds=0.01
+    )
+    # 最大待ち時間より長くかかる処理を1件観測させる
+    async with limiter.acquire():
+        await asyncio.sleep(0.05)
+
+    async with limiter.acquire():
+        with pytest.raises(AdmissionRejectedError, match="expected_wait"):
+            async with limiter.acquire():
+                pass
+
+    stats = limiter.stats()
+    assert stats.shed_counts == {"expected_wait:normal": 1}
+    assert stats.admitted == 2
+
+
+@pytest.mark.asyncio
+async def test_acquire_counts_queued_request_once_in_expected_wait():
+    """見込み待ち時間の計算でキューに入った自身を二重に数えないことをテスト"""
+    limiter = AdaptiveConcurrencyLimiter(
+        min_limit=1, max_limit=1, max_wait_seconds=0.08
+    )
+    async with limiter.acquire():
+        await asyncio.sleep(0.05)
+
+    # 先頭で待つ場合の見込みは処理1件分で、最大待ち時間に収まる
+    assert 0.05 <= limiter.expected_wait_seconds(RequestPriority.NORMAL) < 0.08
+
+    async def hold():
+        async with limiter.acquire():
+            await asyncio.sleep(0.01)
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    async with limiter.acquire():
+        pass
+    await holder
+
+    assert limiter.stats().shed_counts == {}
+
+
+@pytest.mark.asyncio
+async def test_user_quota_defers_requests_while_other_users_run():
+    """上限に達したユーザーは待機し、他のユーザーは先に実行されることをテスト"""
+    limiter = AdaptiveConcurrencyLimiter(
+        min_limit=3,
+        max_limit=3,
+        fairness_policy=FairnessPolicy(default_user_quota=1),
+    )
+    release = asyncio.Event()
+    order: list[str] = []
+
+    async def run(name: str, user_id: str):
+        async with limiter.acquire(user_id=user_id, channel_id="C1"):
+            order.append(name)
+            await release.wait()
+
+    tasks = [
+        asyncio.create_task(run("heavy-1", "U-heavy")),
+        asyncio.create_task(run("heavy-2", "U-heavy")),
+        asyncio.create_task(run("light-1", "U-light")),
+    ]
+    await asyncio.sleep(0)
+
+    assert order == ["heavy-1", "light-1"]
+    key_stats = limiter.key_stats()
+    assert key_stats["user:U-heavy"].in_flight == 1
+    assert key_stats["user:U-heavy"].queued == 1
+    assert key_stats["channel:C1"].in_flight == 2
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+    assert order == ["heavy-1", "light-1", "heavy-2"]
+    assert limiter.key_stats()["user:U-heavy"].admitted == 2
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_channel_quota_overrides_default():
+    """チャンネルごとに個別の上限を設定できることをテスト"""
+    limiter = AdaptiveConcurrencyLimiter(
+        min_limit=10,
+        max_limit=10,
+        max_wait_seconds=0.01,
+        fairness_policy=FairnessPolicy(
+            default_channel_quota=5, channel_quotas={"C-small": 1}
+        ),
+    )
+
+    async with limiter.acquire(user_id="U1", channel_id="C-small"):
+        with pytest.raises(AdmissionRejectedError, match="wait_timeout"):
+            async with limiter.acquire(user_id="U2", channel_id="C-small"):
+                pass
+
+        async with limiter.acquire(user_id="U2", channel_id="C-other"):
+            assert limiter.in_flight == 2
+
+    assert limiter.key_stats()["channel:C-small"].shed == 1
+
+
+@pytest.mark.asyncio
+async def test_stats_for_key_reports_single_key():
+    """キー1つ分の実行状況が全体のスナップショットと一致することをテスト"""
+    limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=1)
+    release = asyncio.Event()
+
+    async def run(user_id: str):
+        async with limiter.acquire(user_id=user_id, channel_id="C1"):
+            await release.wait()
+
+    tasks = [asyncio.create_task(run(user_id)) for user_id in ["U1", "U2"]]
+    await asyncio.sleep(0)
+
+    channel_stats = limiter.stats_for_key("channel:C1")
+    assert channel_stats == limiter.key_stats()["channel:C1"]
+    assert (channel_stats.in_flight, channel_stats.queued) == (1, 1)
+    assert limiter.stats_for_key("user:U2").queued == 1
+    assert limiter.stats_for_key("channel:unknown") == KeyQueueStats()
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+
+@pytest.mark.asyncio
+async def test_idle_key_stats_are_evicted():
+    """実行中のリクエストがないまま期限を過ぎたキーの集計を破棄することをテスト"""
+    limiter = AdaptiveConcurrencyLimiter(
+        min_limit=2, max_limit=2, idle_key_ttl_seconds=0.01
+    )
+    release = asyncio.Event()
+
+    async def run_long():
+        async with limiter.acquire(user_id="U-long", channel_id="C-long"):
+            await release.wait()
+
+    long_task = asyncio.create_task(run_long())
+    async with limiter.acquire(user_id="U-idle", channel_id="C-idle"):
+        pass
+    await asyncio.sleep(0.02)
+
+    async with limiter.acquire(user_id="U-new", channel_id="C-new"):
+        pass
+
+    # 実行中のキーは期限を過ぎても残す
+    assert set(limiter.key_stats()) == {
+        "user:U-long",
+        "channel:C-long",
+        "user:U-new",
+        "channel:C-new",
+    }
+
+    release.set()
+    await long_task
@@ -0,0 +1,109 @@
+import pytest
+
+from src.infrastructure.concurrency.admission_queue import (
+    AdmissionQueue,
+    RequestPriority,
+    Waiter,
+)
+
+
+def make_waiter(
+    user_id: str, channel_id: str, priority: RequestPriority = RequestPriority.NORMAL
+) -> Waiter:
+    return Waiter(
+        priority=priority, enqueued_at=0.0, user_id=user_id, channel_id=channel_id
+    )
+
+
+def drain(queue: AdmissionQueue, is_eligible=lambda _: True) -> list[str]:
+    order = []
+    while (waiter := queue.pop(is_eligible)) is not None:
+        order.append(f"{waiter.channel_id}/{waiter.user_id}")
+    return order
+
+
+@pytest.mark.asyncio
+async def test_pop_alternates_between_channels():
+    """1チャンネルに偏った待機でも、チャンネル間で交互に取り出すことをテスト"""
+    queue = AdmissionQueue()
+    for _ in range(3):
+        queue.push(make_waiter("U1", "C-noisy"))
+    queue.push(make_waiter("U2", "C-quiet"))
+
+    assert drain(queue) == [
+        "C-noisy/U1",
+        "C-quiet/U2",
+        "C-noisy/U1",
+        "C-noisy/U1",
+    ]
+    assert len(queue) == 0
+
+
+@pytest.mark.asyncio
+async def test_pop_rotates_users_within_channel():
+    """同じチャンネル内ではユーザー間で交互に取り出すことをテスト"""
+    queue = AdmissionQueue()
+    queue.push(make_waiter("U1", "C1"))
+    queue.push(make_waiter("U1", "C1"))
+    queue.push(make_waiter("U2", "C1"))
+
+    assert drain(queue) == ["C1/U1", "C1/U2", "C1/U1"]
+
+
+@pytest.mark.asyncio
+async def test_pop_respects_channel_weights():
+    """重みの大きいチャンネルが多く取り出されることをテスト"""
+    queue = AdmissionQueue(
+        channel_weight=lambda channel: 2.0 if channel == "C1" else 1.0
+    )
+    for _ in range(4):
+        queue.push(make_waiter("U1", "C1"))
+        queue.push(make_waiter("U2", "C2"))
+
+    assert drain(queue)[:6] == [
+        "C1/U1",
+        "C1/U1",
+        "C2/U2",
+        "C1/U1",
+        "C1/U1",
+        "C2/U2",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_pop_serves_high_priority_first():
+    """優先度の高いリクエストが先に取り出されることをテスト"""
+    queue = AdmissionQueue()
+    queue.push(make_waiter("U1", "C1"))
+    queue.push(make_waiter("U2", "C2", RequestPriority.HIGH))
+
+    assert drain(queue) == ["C2/U2", "C1/U1"]
+
+
+@pytest.mark.asyncio
+async def test_pop_skips_ineligible_waiters():
+    """上限に達したユーザーのリクエストを飛ばして取り出すことをテスト"""
+    queue = AdmissionQueue()
+    queue.push(make_waiter("U1", "C1"))
+    queue.push(make_waiter("U2", "C1"))
+
+    assert drain(queue, lambda waiter: waiter.user_id != "U1") == ["C1/U2"]
+    assert queue.queued_by_key() == {"channel:C1": 1, "user:U1": 1}
+    assert queue.queued_for("channel:C1") == 1
+    assert queue.queued_for("user:U1") == 1
+    assert queue.queued_for("user:U2") == 0
+
+
+@pytest.mark.asyncio
+async def test_pop_lowest_below_evicts_from_busiest_channel():
+    """押し出しは最も多く待たせているチャンネルの最新のリクエストから行うことをテスト"""
+    queue = AdmissionQueue()
+    quiet = make_waiter("U2", "C-quiet")
+    noisy_old = make_waiter("U1", "C-noisy")
+    noisy_new = make_waiter("U1", "C-noisy")
+    for waiter in [quiet, noisy_old, noisy_new]:
+        queue.push(waiter)
+
+    assert queue.pop_lowest_below(RequestPriority.HIGH) is noisy_new
+    assert queue.pop_lowest_below(RequestPriority.NORMAL) is None
+    assert len(queue) == 2
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+from pytest_mock import MockerFixture
+
+from src.domain.model import Message
+from src.infrastructure.external.llm import LangChainLLMClient
+
+
+@pytest.fixture
+def observations():
+    return []
+
+
+@pytest.fixture
+def create_client(mocker: MockerFixture, observations):
+    def create(model) -> LangChainLLMClient:
+        model_factory = mocker.Mock()
+        model_factory.create.return_value = model
+        return LangChainLLMClient(
+            model_factory=model_factory,
+            model_name="gemini-2.5-flash",
+            latency_observer=lambda *args: observations.append(args),
+            stage="final_answer",
+        )
+
+    return create
+
+
+@pytest.mark.asyncio
+async def test_generate_reports_latency_under_stage(
+    mocker: MockerFixture, create_client, observations
+):
+    """用途ごとの段階名で所要時間を通知することをテスト"""
+    model = mocker.Mock()
+    model.ainvoke = mocker.AsyncMock(return_value=AIMessage(content="回答"))
+    client = create_client(model)
+
+    assert await client.generate([Message.create_user_message("質問")]) == "回答"
+
+    [(stage, _, error)] = observations
+    assert stage == "llm:final_answer"
+    assert error is False
+
+
+@pytest.mark.asyncio
+async def test_stream_excludes_consumer_time(
+    mocker: MockerFixture, create_client, observations
+):
+    """ストリーミングの所要時間に断片を受け取った側の処理時間を含めないテスト"""
+
+    async def astream(messages):
+        for text in ["回", "答"]:
+            yield AIMessageChunk(content=text)
+
+    model = mocker.Mock()
+    model.astream = astream
+    client = create_client(model)
+
+    chunks = []
+    async for chunk in client.stream([Message.create_user_message("質問")]):
+        chunks.append(chunk)
+        # Slackへの投稿に相当する受け取った側の処理
+        await asyncio.sleep(0.05)
+
+    assert chunks == ["回", "答"]
+    [(stage, seconds, error)] = observations
+    assert stage == "llm:final_answer"
+    assert seconds < 0.05
+    assert error is False
@@ -0,0 +1,100 @@
+import pytest
+from pytest_mock import MockerFixture
+
+from src.infrastructure.external.slack.slack_streaming_message import (
+    SlackStreamingMessage,
+)
+
+
+@pytest.fixture
+def mock_message_service(mocker: MockerFixture):
+    """SlackMessageServiceのモック"""
+    service = mocker.AsyncMock()
+    service.post_placeholder.return_value = "1234567890.000001"
+    service.update_message.return_value = True
+    return service
+
+
+@pytest.mark.asyncio
+async def test_push_throttles_updates(mock_message_service):
+    """更新間隔内の通知が間引かれることをテスト"""
+    stream = SlackStreamingMessage(
+        mock_message_service, "C12345", "1234567890.123456", update_interval=60
+    )
+    await stream.start()
+
+    await stream.push("途中")
+    await stream.push("途中の回答")
+
+    assert mock_message_service.update_message.call_count == 1
+    assert stream.update_count == 1
+    assert stream.time_to_first_visible_token is not None
+
+
+@pytest.mark.asyncio
+async def test_finish_updates_placeholder_with_final_answer(mock_message_service):
+    """最終回答でプレースホルダーを確定することをテスト"""
+    stream = SlackStreamingMessage(mock_message_service, "C12345", None)
+    await stream.start()
+
+    await stream.finish("最終回答", "message-1")
+
+    mock_message_service.update_message.assert_called_once_with(
+        channel="C12345",
+        ts="1234567890.000001",
+        text="最終回答",
+        message_id="message-1",
+    )
+    assert not mock_message_service.send_message.called
+
+
+@pytest.mark.asyncio
+async def test_finish_posts_new_message_when_update_fails(mock_message_service):
+    """最終回答で更新できない場合は再試行してから新規投稿することをテスト"""
+    stream = SlackStreamingMessage(mock_message_service, "C12345", "1234567890.123456")
+    await stream.start()
+    mock_message_service.update_message.return_value = False
+
+    await stream.finish("最終回答", "message-1")
+
+    assert mock_message_service.update_message.call_count == 2
+    mock_message_service.send_message.assert_called_once_with(
+        channel="C12345",
+        text="最終回答",
+        thread_ts="1234567890.123456",
+        message_id="message-1",
+    )
+    assert stream.update_count == 0
+
+
+@pytest.mark.asyncio
+async def test_finish_falls_back_to_new_message_without_placeholder(
+    mock_message_service,
+):
+    """プレースホルダー投稿に失敗した場合は新規投稿することをテスト"""
+    mock_message_service.post_placeholder.return_value = None
+    stream = SlackStreamingMessage(mock_message_service, "C12345", None)
+    await stream.start()
+
+    await stream.push("途中")
+    await stream.finish("最終回答", "message-1")
+
+    assert not mock_message_service.update_message.called
+    assert mock_message_service.send_message.called
+
+
+@pytest.mark.asyncio
+async def test_start_reuses_existing_placeholder(mock_message_service):
+    """投稿済みのプレースホルダーを指定した場合は新しく投稿しないテスト"""
+    stream = SlackStreamingMessage(mock_message_service, "C12345", None)
+
+    await stream.start("1234567890.000009")
+
+    assert not mock_message_service.post_placeholder.called
+    mock_message_service.update_message.assert_called_once_with(
+        channel="C12345",
+        ts="1234567890.000009",
+        text=SlackStreamingMessage.PLACEHOLDER_TEXT,
+        use_blocks=False,
+    )
+    assert stream.ts == "1234567890.000009"
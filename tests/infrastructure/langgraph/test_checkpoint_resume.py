@@ -0,0 +1,152 @@
+import asyncio
+
+import pytest
+from langgraph.checkpoint.memory import InMemorySaver
+
+from src.domain.model import ChatSession, Message, Task, TaskPlan, TaskStatus
+from src.infrastructure.external.llm import ModelFactory
+from src.infrastructure.langgraph.checkpoint import (
+    DomainStateSerializer,
+    MeasuredCheckpointSaver,
+)
+from src.infrastructure.langgraph.graph import langgraph_workflow_service
+from src.infrastructure.langgraph.graph.langgraph_workflow_service import (
+    LangGraphWorkflowService,
+)
+
+CONTEXT = {
+    "user_id": "U12345",
+    "channel_id": "C12345",
+    "thread_ts": "1234567890.123456",
+    "message_ts": "1234567890.123456",
+    "conversation_id": "C12345_1234567890.123456",
+}
+
+
+class FakePlanner:
+    def __init__(self, calls: list[str]):
+        self.calls = calls
+
+    async def execute(self, chat_session):
+        self.calls.append("plan")
+        return TaskPlan.create(
+            message_id=chat_session.last_user_message().id,
+            tasks=[
+                Task.create_web_search("検索する"),
+                Task.create_general_answer("回答する"),
+            ],
+        )
+
+
+class FakeGeneralAnswer:
+    def __init__(self, calls: list[str]):
+        self.calls = calls
+
+    async def execute(self, chat_session, task):
+        self.calls.append("general_answer")
+        task.complete("一般回答")
+
+
+class FakeWebSearchGraph:
+    def __init__(self, calls: list[str]):
+        self.calls = calls
+        self.crash = True
+
+    async def ainvoke(self, state, config):
+        self.calls.append("web_search")
+        if self.crash:
+            await asyncio.sleep(0.05)
+            raise RuntimeError("プロセスが停止しました")
+        state["task"].complete("検索結果")
+        return state
+
+
+class FakeFinalAnswer:
+    def __init__(self, calls: list[str]):
+        self.calls = calls
+
+    async def execute(self, chat_session, task_plan, answer_stream=None):
+        self.calls.append("final_answer")
+        return Message.create_assistant_message(task_plan.format_task_results())
+
+
+def make_session() -> ChatSession:
+    session = ChatSession.create(
+        id=CONTEXT["conversation_id"],
+        thread_id=CONTEXT["thread_ts"],
+        user_id=CONTEXT["user_id"],
+        channel_id=CONTEXT["channel_id"],
+    )
+    session.add_user_message("Pythonについて教えて")
+    return session
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+def checkpointer():
+    return MeasuredCheckpointSaver(InMemorySaver(serde=DomainStateSerializer()))
+
+
+@pytest.fixture
+def workflow_service(monkeypatch, calls, checkpointer):
+    monkeypatch.setattr(langgraph_workflow_service, "GOOGLE_API_KEY", "test")
+    monkeypatch.setattr(langgraph_workflow_service, "GOOGLE_CSE_ID", "test")
+    service = LangGraphWorkflowService(
+        ModelFactory(google_api_key="test"), checkpointer=checkpointer
+    )
+    service.supervisor_agent.task_planning_service = FakePlanner(calls)
+    service.supervisor_agent.final_answer_service = FakeFinalAnswer(calls)
+    service.general_answer_agent.general_answer_service = FakeGeneralAnswer(calls)
+    web_search_graph = FakeWebSearchGraph(calls)
+    service.web_search_agent.build_graph = lambda: web_search_graph
+    service.web_search_graph = web_search_graph
+    return service
+
+
+@pytest.mark.asyncio
+async def test_interrupted_run_resumes_from_last_completed_node(
+    workflow_service, calls, checkpointer
+):
+    """中断した実行は完了済みのノードを再実行せずに再開することをテスト"""
+    with pytest.raises(RuntimeError):
+        await workflow_service.execute(make_session(), CONTEXT)
+    assert calls == ["plan", "web_search", "general_answer"]
+
+    workflow_service.web_search_graph.crash = False
+    session = make_session()
+    result = await workflow_service.execute(session, CONTEXT)
+
+    # 計画と一般回答は再実行しない
+    assert calls[3:] == ["web_search", "final_answer"]
+    assert [task.status for task in result.task_plan.tasks] == [
+        TaskStatus.COMPLETED,
+        TaskStatus.COMPLETED,
+    ]
+    assert result.task_plan.message_id == session.last_user_message().id
+    assert checkpointer.write_latency_histogram.count > 0
+
+    # 完了した実行のチェックポイントは削除する
+    thread_id = workflow_service.checkpoint_thread_id(CONTEXT)
+    assert (
+        await checkpointer.aget_tuple({"configurable": {"thread_id": thread_id}})
+        is None
+    )
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_for_different_message_is_discarded(workflow_service, calls):
+    """別の内容のメッセージでは古いチェックポイントを破棄して最初から実行することをテスト"""
+    with pytest.raises(RuntimeError):
+        await workflow_service.execute(make_session(), CONTEXT)
+
+    workflow_service.web_search_graph.crash = False
+    session = make_session()
+    session.add_user_message("やっぱりJavaについて教えて")
+    await workflow_service.execute(session, CONTEXT)
+
+    assert calls.count("plan") == 2
+    assert calls.count("general_answer") == 2
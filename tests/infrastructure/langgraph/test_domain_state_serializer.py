@@ -0,0 +1,72 @@
+from langgraph.types import Send
+
+from src.domain.model import ChatSession, Task, TaskPlan
+from src.domain.model.web_search_task_log import SearchResult
+from src.infrastructure.langgraph.checkpoint import DomainStateSerializer
+
+
+def make_session() -> ChatSession:
+    session = ChatSession.create(
+        id="C12345_1234567890.123456",
+        thread_id="1234567890.123456",
+        user_id="U12345",
+        channel_id="C12345",
+    )
+    session.add_user_message("Pythonの最新バージョンを教えて")
+    return session
+
+
+def test_round_trips_chat_session():
+    """ChatSessionを直列化して復元できることをテスト"""
+    serializer = DomainStateSerializer()
+    session = make_session()
+
+    restored = serializer.loads_typed(serializer.dumps_typed(session))
+
+    assert isinstance(restored, ChatSession)
+    assert restored.id == session.id
+    assert restored.last_user_message().id == session.last_user_message().id
+
+
+def test_round_trips_send_with_task():
+    """タスクを含むSendを直列化して復元できることをテスト"""
+    serializer = DomainStateSerializer()
+    task = Task.create_web_search("Pythonの最新バージョンを調べる")
+    task.add_web_search_attempt(
+        "Python 最新バージョン",
+        [SearchResult(url="https://www.python.org", title="Python", content="3.13")],
+    )
+    send = Send("web_search", {"task": task, "chat_session": make_session()})
+
+    restored = serializer.loads_typed(serializer.dumps_typed([send]))[0]
+
+    assert restored.node == "web_search"
+    assert restored.arg["task"].id == task.id
+    assert restored.arg["task"].task_log.get_all_queries() == ["Python 最新バージョン"]
+    assert isinstance(restored.arg["chat_session"], ChatSession)
+
+
+def test_round_trips_task_plan_in_writes():
+    """ノードの書き込み(チャネル名と値のタプル)を直列化して復元できることをテスト"""
+    serializer = DomainStateSerializer()
+    session = make_session()
+    task_plan = TaskPlan.create(
+        message_id=session.last_user_message().id,
+        tasks=[Task.create_general_answer("回答する")],
+    )
+
+    restored = serializer.loads_typed(serializer.dumps_typed(("task_plan", task_plan)))
+
+    assert restored[0] == "task_plan"
+    assert restored[1].id == task_plan.id
+    assert restored[1].tasks[0].description == "回答する"
+
+
+def test_records_serialized_size():
+    """直列化したサイズを記録することをテスト"""
+    serializer = DomainStateSerializer()
+
+    _, data = serializer.dumps_typed(make_session())
+
+    assert serializer.size_histogram.count == 1
+    assert serializer.size_histogram.sum == len(data)
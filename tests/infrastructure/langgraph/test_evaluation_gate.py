@@ -0,0 +1,95 @@
+import pytest
+from pytest_mock import MockerFixture
+
+from src.domain.model import Task, TaskEvaluation, TaskPreEvaluation
+from src.infrastructure.langgraph.policy import PreEvaluationMode, TaskEvaluationGate
+
+
+def create_pre_evaluation(accepted: bool) -> TaskPreEvaluation:
+    return TaskPreEvaluation(
+        accepted=accepted,
+        score=1.0 if accepted else 0.5,
+        citation_count=2,
+        source_coverage=0.5,
+        length=300,
+        term_overlap=1.0,
+        unknown_source_count=0,
+    )
+
+
+@pytest.fixture
+def task():
+    task = Task.create_web_search("Pythonの最新バージョンを検索")
+    task.complete("Python 3.13がリリースされました")
+    return task
+
+
+@pytest.fixture
+def mock_pre_evaluation_service(mocker: MockerFixture):
+    return mocker.Mock()
+
+
+@pytest.fixture
+def mock_evaluation_service(mocker: MockerFixture):
+    service = mocker.AsyncMock()
+    service.execute.return_value = TaskEvaluation(
+        is_satisfactory=False, need="search", reason="情報不足", feedback="再検索"
+    )
+    return service
+
+
+@pytest.mark.asyncio
+async def test_enforce_mode_skips_llm_when_pre_evaluation_accepts(
+    task, mock_pre_evaluation_service, mock_evaluation_service
+):
+    """enforceモードで事前評価が合格ならLLM評価をスキップするテスト"""
+    mock_pre_evaluation_service.execute.return_value = create_pre_evaluation(True)
+    gate = TaskEvaluationGate(
+        mock_pre_evaluation_service,
+        mock_evaluation_service,
+        mode=PreEvaluationMode.ENFORCE,
+    )
+
+    evaluation = await gate.evaluate(task)
+
+    assert evaluation.is_satisfactory is True
+    assert not mock_evaluation_service.execute.called
+    assert gate.stats.skipped_llm_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_shadow_mode_records_agreement_with_llm(
+    task, mock_pre_evaluation_service, mock_evaluation_service
+):
+    """shadowモードでは常にLLM評価を行い、一致状況を記録するテスト"""
+    mock_pre_evaluation_service.execute.return_value = create_pre_evaluation(True)
+    gate = TaskEvaluationGate(
+        mock_pre_evaluation_service,
+        mock_evaluation_service,
+        mode=PreEvaluationMode.SHADOW,
+    )
+
+    evaluation = await gate.evaluate(task)
+
+    # LLM評価の結果がそのまま使われる
+    assert evaluation.is_satisfactory is False
+    assert mock_evaluation_service.execute.called
+    assert gate.stats.false_accepts == 1
+    assert gate.stats.agreement_rate == 0.0
+
+
+@pytest.mark.asyncio
+async def test_off_mode_uses_llm_only(
+    task, mock_pre_evaluation_service, mock_evaluation_service
+):
+    """offモードでは事前評価を行わないテスト"""
+    gate = TaskEvaluationGate(
+        mock_pre_evaluation_service,
+        mock_evaluation_service,
+        mode=PreEvaluationMode.OFF,
+    )
+
+    await gate.evaluate(task)
+
+    assert not mock_pre_evaluation_service.execute.called
+    assert mock_evaluation_service.execute.called
@@ -0,0 +1,152 @@
+import asyncio
+
+import pytest
+from pytest_mock import MockerFixture
+
+from src.domain.model import ChatSession, Task, TaskPlan, TaskStatus
+from src.domain.service import GeneralAnswerService
+from src.infrastructure.langgraph.agents import SpeculativeGeneralAnswerRunner
+from src.infrastructure.metrics import record_llm_call
+
+
+@pytest.fixture
+def chat_session():
+    session = ChatSession.create(
+        id="session-1", thread_id=None, user_id="user-1", channel_id="channel-1"
+    )
+    session.add_user_message("Pythonのリスト内包表記とは?")
+    return session
+
+
+@pytest.fixture
+def llm_client(mocker: MockerFixture):
+    async def generate(_):
+        record_llm_call(0.1, input_tokens=120, output_tokens=30, error=False)
+        return "投機的な回答"
+
+    client = mocker.Mock()
+    client.generate = mocker.AsyncMock(side_effect=generate)
+    return client
+
+
+@pytest.fixture
+def runner(llm_client):
+    return SpeculativeGeneralAnswerRunner(GeneralAnswerService(llm_client))
+
+
+def create_plan(chat_session: ChatSession, *tasks: Task) -> TaskPlan:
+    return TaskPlan.create(
+        message_id=chat_session.last_user_message().id, tasks=list(tasks)
+    )
+
+
+@pytest.mark.asyncio
+async def test_start_generates_answer_for_last_user_message(
+    runner, chat_session, llm_client
+):
+    """最新のユーザーメッセージに対する回答の生成を開始することをテスト"""
+    speculation = runner.start(chat_session)
+
+    assert speculation.question == "Pythonのリスト内包表記とは?"
+    assert runner.stats.launched == 1
+
+    assert await speculation.future == "投機的な回答"
+    assert speculation.usage.llm_calls == 1
+    assert speculation.usage.input_tokens == 120
+    prompt = llm_client.generate.call_args.args[0][-1].content
+    assert "Pythonのリスト内包表記とは?" in prompt
+
+
+@pytest.mark.asyncio
+async def test_resolve_adopts_answer_on_hit(runner, chat_session):
+    """計画が同じ内容の一般回答タスク1件なら先行生成した回答を採用することをテスト"""
+    task = Task.create_general_answer("Pythonのリスト内包表記とは?")
+    speculation = runner.start(chat_session)
+
+    assert await runner.resolve(speculation, create_plan(chat_session, task))
+
+    assert task.status == TaskStatus.COMPLETED
+    assert task.result == "投機的な回答"
+    assert runner.stats.hits == 1
+    assert runner.stats.wasted_llm_calls == 0
+
+
+@pytest.mark.asyncio
+async def test_resolve_misses_when_plan_has_other_tasks(runner, chat_session):
+    """一般回答タスク1件以外の計画では採用せずに破棄することをテスト"""
+    tasks = [
+        Task.create_general_answer("Pythonのリスト内包表記とは?"),
+        Task.create_web_search("リスト内包表記 最新の仕様"),
+    ]
+    speculation = runner.start(chat_session)
+
+    assert not await runner.resolve(speculation, create_plan(chat_session, *tasks))
+
+    assert speculation.future.done()
+    assert all(task.status == TaskStatus.IN_PROGRESS for task in tasks)
+    assert runner.stats.misses == 1
+    assert runner.stats.wasted_llm_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_resolve_records_wasted_tokens_of_answered_speculation(
+    runner, chat_session
+):
+    """応答済みの投機実行を破棄した場合は使用したトークン数を記録することをテスト"""
+    task = Task.create_web_search("リスト内包表記 最新の仕様")
+    speculation = runner.start(chat_session)
+    await speculation.future
+
+    assert not await runner.resolve(speculation, create_plan(chat_session, task))
+
+    assert runner.stats.wasted_input_tokens == 120
+    assert runner.stats.wasted_output_tokens == 30
+
+
+@pytest.mark.asyncio
+async def test_resolve_misses_when_task_description_differs(runner, chat_session):
+    """計画がメッセージを言い換えた場合は先行生成した回答を採用しないことをテスト"""
+    task = Task.create_general_answer("リスト内包表記の書き方を例を交えて説明する")
+    speculation = runner.start(chat_session)
+
+    assert not await runner.resolve(speculation, create_plan(chat_session, task))
+
+    assert task.status == TaskStatus.IN_PROGRESS
+    assert runner.stats.misses == 1
+    assert runner.stats.hits == 0
+
+
+@pytest.mark.asyncio
+async def test_discard_cancels_running_speculation(runner, chat_session, llm_client):
+    """破棄すると実行中の生成をキャンセルして追加コストに計上することをテスト"""
+
+    async def slow(*_):
+        await asyncio.sleep(1)
+        return "遅い回答"
+
+    llm_client.generate.side_effect = slow
+    speculation = runner.start(chat_session)
+    await asyncio.sleep(0)
+
+    await runner.discard(speculation)
+
+    assert speculation.future.cancelled()
+    assert runner.stats.wasted_llm_calls == 1
+    assert runner.stats.wasted_output_tokens == 0
+
+
+@pytest.mark.asyncio
+async def test_resolve_reports_failure_when_generation_fails(
+    runner, chat_session, llm_client
+):
+    """先行生成が失敗した場合は採用せずに失敗として記録することをテスト"""
+    llm_client.generate.side_effect = RuntimeError("LLM error")
+    task = Task.create_general_answer("Pythonのリスト内包表記とは?")
+    speculation = runner.start(chat_session)
+
+    assert not await runner.resolve(speculation, create_plan(chat_session, task))
+
+    assert task.status == TaskStatus.IN_PROGRESS
+    assert runner.stats.failures == 1
+    assert runner.stats.wasted_llm_calls == 1
+    assert runner.stats.hit_rate == 0.0
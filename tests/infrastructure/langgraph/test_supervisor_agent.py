@@ -0,0 +1,77 @@
+import pytest
+from pytest_mock import MockerFixture
+
+from src.domain.model import AgentName, ChatSession, Task, TaskPlan, TaskStatus
+from src.domain.service import GeneralAnswerService
+from src.infrastructure.langgraph.agents import (
+    SpeculativeGeneralAnswerRunner,
+    SupervisorAgent,
+)
+
+
+@pytest.fixture
+def chat_session():
+    session = ChatSession.create(
+        id="session-1", thread_id=None, user_id="user-1", channel_id="channel-1"
+    )
+    session.add_user_message("Pythonのリスト内包表記とは?")
+    return session
+
+
+@pytest.fixture
+def llm_client(mocker: MockerFixture):
+    client = mocker.Mock()
+    client.generate = mocker.AsyncMock(return_value="投機的な回答")
+    return client
+
+
+def create_agent(
+    mocker: MockerFixture, llm_client, chat_session: ChatSession, *tasks: Task
+) -> SupervisorAgent:
+    task_planning_service = mocker.Mock()
+    task_planning_service.execute = mocker.AsyncMock(
+        return_value=TaskPlan.create(
+            message_id=chat_session.last_user_message().id, tasks=list(tasks)
+        )
+    )
+    return SupervisorAgent(
+        task_planning_service=task_planning_service,
+        final_answer_service=mocker.Mock(),
+        speculative_runner=SpeculativeGeneralAnswerRunner(
+            GeneralAnswerService(llm_client)
+        ),
+    )
+
+
+@pytest.mark.asyncio
+async def test_plan_tasks_adopts_speculative_answer(
+    mocker: MockerFixture, llm_client, chat_session
+):
+    """投機的な回答を採用できた場合はタスク実行をスキップして最終回答へ進むことをテスト"""
+    task = Task.create_general_answer("Pythonのリスト内包表記とは?")
+    agent = create_agent(mocker, llm_client, chat_session, task)
+
+    command = await agent.plan_tasks({"chat_session": chat_session, "deadline": None})
+
+    assert command.goto == "generate_final_answer"
+    assert task.status == TaskStatus.COMPLETED
+    assert task.result == "投機的な回答"
+    assert agent.speculative_runner.stats.hits == 1
+    llm_client.generate.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_plan_tasks_runs_tasks_when_speculation_misses(
+    mocker: MockerFixture, llm_client, chat_session
+):
+    """投機的な回答を採用できない場合は計画どおりにタスクを実行することをテスト"""
+    task = Task.create_general_answer("リスト内包表記の書き方を例を交えて説明する")
+    agent = create_agent(mocker, llm_client, chat_session, task)
+
+    command = await agent.plan_tasks({"chat_session": chat_session, "deadline": None})
+
+    [send] = command.goto
+    assert send.node == AgentName.GENERAL_ANSWER.value
+    assert send.arg["tasks"] == [task]
+    assert task.status == TaskStatus.IN_PROGRESS
+    assert agent.speculative_runner.stats.misses == 1
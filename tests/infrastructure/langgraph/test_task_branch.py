@@ -0,0 +1,67 @@
+import asyncio
+import time
+
+import pytest
+from pytest_mock import MockerFixture
+
+from src.domain.model import AgentName, Task, TaskStatus
+from src.infrastructure.langgraph.graph.task_branch import bound_by_deadline
+from src.infrastructure.langgraph.policy import NodeTimeouts
+
+
+@pytest.fixture
+def node_timeouts():
+    return NodeTimeouts(web_search_seconds=0.05, general_answer_seconds=0.05)
+
+
+@pytest.mark.asyncio
+async def test_timeout_fails_in_progress_task(mocker: MockerFixture, node_timeouts):
+    """制限時間を超えたタスクがタイムアウトとして失敗することをテスト"""
+
+    async def slow(*_):
+        await asyncio.sleep(1)
+
+    subgraph = mocker.Mock()
+    subgraph.ainvoke = slow
+    node = bound_by_deadline(AgentName.WEB_SEARCH, subgraph, node_timeouts)
+    task = Task.create_web_search("検索")
+
+    await node({"task": task, "deadline": None}, {})
+
+    assert task.status == TaskStatus.FAILED
+    assert "タイムアウト" in task.result
+
+
+@pytest.mark.asyncio
+async def test_timeout_keeps_completed_task_result(
+    mocker: MockerFixture, node_timeouts
+):
+    """完了済みのタスクはタイムアウトしても結果が保持されることをテスト"""
+    completed = Task.create_general_answer("完了")
+    completed.complete("回答")
+    pending = Task.create_general_answer("未完了")
+
+    async def slow(*_):
+        await asyncio.sleep(1)
+
+    subgraph = mocker.Mock()
+    subgraph.ainvoke = slow
+    node = bound_by_deadline(AgentName.GENERAL_ANSWER, subgraph, node_timeouts)
+
+    await node({"tasks": [completed, pending], "deadline": None}, {})
+
+    assert completed.status == TaskStatus.COMPLETED
+    assert completed.result == "回答"
+    assert pending.status == TaskStatus.FAILED
+
+
+def test_task_timeout_reserves_time_for_final_answer():
+    """タスクの制限時間が最終回答の確保分を残して短縮されることをテスト"""
+    node_timeouts = NodeTimeouts(web_search_seconds=60, final_answer_reserve_seconds=20)
+
+    assert node_timeouts.task_timeout(AgentName.WEB_SEARCH, None) == 60
+    timeout = node_timeouts.task_timeout(AgentName.WEB_SEARCH, time.time() + 50)
+    assert 29 < timeout <= 30
+    # 期限を過ぎていても最小の制限時間は与える
+    assert node_timeouts.task_timeout(AgentName.WEB_SEARCH, time.time() - 10) == 1.0
+    assert node_timeouts.final_answer_timeout(time.time() + 5) == 20
@@ -0,0 +1,212 @@
+import pytest
+from langgraph.graph import END
+from pytest_mock import MockerFixture
+
+from src.domain.model import Task, TaskEvaluation, TaskPreEvaluation
+from src.infrastructure.langgraph.agents.web_search_agent import WebSearchAgent
+from src.infrastructure.langgraph.policy import (
+    PreEvaluationMode,
+    SearchMode,
+    TaskEvaluationGate,
+    WebSearchPolicy,
+)
+
+
+class _Load:
+    """テストから変更できる負荷"""
+
+    def __init__(self, value: float = 0.0):
+        self.value = value
+
+    def __call__(self) -> float:
+        return self.value
+
+
+@pytest.fixture
+def task():
+    task = Task.create_web_search("Pythonの最新バージョンを検索")
+    task.complete("Python 3.13がリリースされました")
+    return task
+
+
+@pytest.fixture
+def load():
+    return _Load()
+
+
+@pytest.fixture
+def mock_evaluation_service(mocker: MockerFixture):
+    service = mocker.AsyncMock()
+    service.execute.return_value = TaskEvaluation(
+        is_satisfactory=False, need="search", reason="情報不足", feedback="再検索"
+    )
+    return service
+
+
+@pytest.fixture
+def create_agent(mocker: MockerFixture, mock_evaluation_service, load):
+    def create(evaluation_gate=None) -> WebSearchAgent:
+        return WebSearchAgent(
+            search_query_service=mocker.AsyncMock(),
+            task_result_service=mocker.AsyncMock(),
+            task_evaluation_service=mock_evaluation_service,
+            search_client=mocker.AsyncMock(),
+            search_policy=WebSearchPolicy(load_provider=load),
+            evaluation_gate=evaluation_gate,
+        )
+
+    return create
+
+
+@pytest.mark.asyncio
+async def test_generate_task_result_skips_evaluation_under_high_load(
+    create_agent, task, load, mock_evaluation_service
+):
+    """高負荷で評価をスキップする予算の場合は評価せずに終了するテスト"""
+    load.value = 0.9
+    agent = create_agent()
+
+    command = await agent.generate_task_result({"task": task, "attempt": 0})
+
+    assert command.goto == END
+    assert not mock_evaluation_service.execute.called
+
+
+@pytest.mark.asyncio
+async def test_generate_task_result_evaluates_before_last_attempt(create_agent, task):
+    """最終試行より前は評価に進むテスト"""
+    agent = create_agent()
+
+    command = await agent.generate_task_result({"task": task, "attempt": 0})
+
+    assert command.goto == "evaluate_task_result"
+
+
+@pytest.mark.asyncio
+async def test_generate_task_result_ends_on_last_attempt_when_reduced(
+    create_agent, task
+):
+    """縮退中の最終試行では評価結果を活かせないため評価せずに終了するテスト"""
+    agent = create_agent()
+    budget = WebSearchPolicy.BUDGETS[SearchMode.REDUCED]
+
+    command = await agent.generate_task_result(
+        {"task": task, "attempt": budget.max_attempts - 1, "search_budget": budget}
+    )
+
+    assert command.goto == END
+
+
+@pytest.mark.asyncio
+async def test_generate_task_result_evaluates_last_attempt_under_full_budget(
+    create_agent, task, mock_evaluation_service
+):
+    """通常予算では最終試行も評価し、再試行せずに終了するテスト"""
+    agent = create_agent()
+    budget = WebSearchPolicy.BUDGETS[SearchMode.FULL]
+    state = {"task": task, "attempt": budget.max_attempts - 1, "search_budget": budget}
+
+    command = await agent.generate_task_result(state)
+
+    assert command.goto == "evaluate_task_result"
+
+    command = await agent.evaluate_task_result(state)
+
+    assert command.goto == END
+    mock_evaluation_service.execute.assert_awaited_once_with(task)
+
+
+@pytest.mark.asyncio
+async def test_evaluate_task_result_retries_search_with_feedback(create_agent, task):
+    """評価で再検索が必要と判断された場合はフィードバックを付けて再試行するテスト"""
+    agent = create_agent()
+
+    command = await agent.evaluate_task_result({"task": task, "attempt": 0})
+
+    assert command.goto == "generate_search_queries"
+    assert command.update["attempt"] == 1
+    assert command.update["feedback"] == "再検索"
+    assert command.update["search_budget"].mode == SearchMode.FULL
+
+
+@pytest.mark.asyncio
+async def test_evaluate_task_result_redecides_budget_before_retry(
+    create_agent, task, load
+):
+    """再試行の前に負荷を再確認し、高負荷なら再試行せずに終了するテスト"""
+    agent = create_agent()
+    state = {
+        "task": task,
+        "attempt": 0,
+        "search_budget": WebSearchPolicy.BUDGETS[SearchMode.FULL],
+    }
+    load.value = 0.9
+
+    command = await agent.evaluate_task_result(state)
+
+    assert command.goto == END
+    assert command.update["search_budget"].mode == SearchMode.MINIMAL
+
+
+def create_gate(
+    mocker: MockerFixture, evaluation_service, accepted: bool
+) -> TaskEvaluationGate:
+    pre_evaluation_service = mocker.Mock()
+    pre_evaluation_service.execute.return_value = TaskPreEvaluation(
+        accepted=accepted,
+        score=1.0 if accepted else 0.5,
+        citation_count=2,
+        source_coverage=0.5,
+        length=300,
+        term_overlap=1.0,
+        unknown_source_count=0,
+    )
+    return TaskEvaluationGate(
+        pre_evaluation_service, evaluation_service, mode=PreEvaluationMode.ENFORCE
+    )
+
+
+@pytest.mark.asyncio
+async def test_evaluate_task_result_ends_when_pre_evaluation_accepts(
+    mocker: MockerFixture, create_agent, task, mock_evaluation_service
+):
+    """事前評価で合格した場合はLLM評価を行わずに終了するテスト"""
+    gate = create_gate(mocker, mock_evaluation_service, accepted=True)
+    agent = create_agent(evaluation_gate=gate)
+
+    command = await agent.evaluate_task_result({"task": task, "attempt": 0})
+
+    assert command.goto == END
+    assert not mock_evaluation_service.execute.called
+    assert gate.stats.skipped_llm_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_evaluate_task_result_escalates_to_llm_when_pre_evaluation_rejects(
+    mocker: MockerFixture, create_agent, task, mock_evaluation_service
+):
+    """事前評価で不合格の場合はLLM評価に回し、その結果で再試行するテスト"""
+    gate = create_gate(mocker, mock_evaluation_service, accepted=False)
+    agent = create_agent(evaluation_gate=gate)
+
+    command = await agent.evaluate_task_result({"task": task, "attempt": 0})
+
+    assert mock_evaluation_service.execute.called
+    assert command.goto == "generate_search_queries"
+    assert gate.stats.both_rejected == 1
+
+
+@pytest.mark.asyncio
+async def test_gate_is_skipped_when_budget_skips_evaluation(
+    mocker: MockerFixture, create_agent, task, load, mock_evaluation_service
+):
+    """評価をスキップする予算の場合は事前評価も行わないテスト"""
+    gate = create_gate(mocker, mock_evaluation_service, accepted=True)
+    agent = create_agent(evaluation_gate=gate)
+    load.value = 0.9
+
+    command = await agent.generate_task_result({"task": task, "attempt": 0})
+
+    assert command.goto == END
+    assert not gate.pre_evaluation_service.execute.called
+    assert not mock_evaluation_service.execute.called
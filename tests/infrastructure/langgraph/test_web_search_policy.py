@@ -0,0 +1,58 @@
+import pytest
+
+from src.infrastructure.langgraph.policy import SearchMode, WebSearchPolicy
+
+
+def create_policy(load: float) -> WebSearchPolicy:
+    return WebSearchPolicy(
+        load_provider=lambda: load,
+        moderate_load_threshold=0.5,
+        high_load_threshold=0.8,
+        min_full_remaining_seconds=60,
+        min_reduced_remaining_seconds=30,
+    )
+
+
+def test_decide_returns_full_loop_with_spare_capacity():
+    """負荷が低く時間に余裕がある場合は通常のループを許可するテスト"""
+    budget = create_policy(load=0.1).decide(remaining_seconds=100)
+
+    assert budget.mode == SearchMode.FULL
+    assert budget.max_attempts == 2
+    assert budget.max_queries == 3
+    assert budget.skip_evaluation is False
+
+
+@pytest.mark.parametrize(
+    ("load", "remaining_seconds"),
+    [(0.6, 100), (0.1, 45)],
+)
+def test_decide_reduces_under_moderate_pressure(load, remaining_seconds):
+    """中程度の負荷または残り時間が少ない場合はクエリ数とページ数を減らすテスト"""
+    budget = create_policy(load=load).decide(remaining_seconds=remaining_seconds)
+
+    assert budget.mode == SearchMode.REDUCED
+    assert budget.max_queries == 2
+    assert budget.num_results == 2
+
+
+@pytest.mark.parametrize(
+    ("load", "remaining_seconds"),
+    [(0.9, 100), (0.1, 10)],
+)
+def test_decide_minimal_under_high_pressure(load, remaining_seconds):
+    """高負荷または期限間近の場合は評価をスキップし1クエリのみにするテスト"""
+    budget = create_policy(load=load).decide(remaining_seconds=remaining_seconds)
+
+    assert budget.mode == SearchMode.MINIMAL
+    assert budget.max_attempts == 1
+    assert budget.max_queries == 1
+    assert budget.num_results == 1
+    assert budget.skip_evaluation is True
+
+
+def test_decide_without_deadline_uses_load_only():
+    """期限がない場合は負荷のみで判断するテスト"""
+    budget = create_policy(load=0.0).decide(remaining_seconds=None)
+
+    assert budget.mode == SearchMode.FULL
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+from psycopg_pool import PoolTimeout
+from pytest_mock import MockerFixture
+
+from src.application.service import InProcessConversationLock
+from src.infrastructure.exception import ConversationLockUnavailableError
+from src.infrastructure.lock import PostgresConversationLock
+
+
+@pytest.fixture
+def mock_pool_class(mocker: MockerFixture):
+    """AsyncConnectionPoolのモック(作成した接続プールを記録する)"""
+    pools = []
+
+    def create(*args, **kwargs):
+        pool = mocker.AsyncMock()
+        pool.getconn.return_value = mocker.AsyncMock()
+        pools.append(pool)
+        return pool
+
+    pool_class = mocker.patch(
+        "src.infrastructure.lock.postgres_conversation_lock.AsyncConnectionPool",
+        side_effect=create,
+    )
+    pool_class.pools = pools
+    return pool_class
+
+
+def create_lock() -> PostgresConversationLock:
+    return PostgresConversationLock(
+        "postgresql://localhost/test", local_lock=InProcessConversationLock()
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_acquires_create_one_pool(mock_pool_class):
+    """最初のロック取得が同時に来ても接続プールを1つだけ作ることをテスト"""
+    lock = create_lock()
+
+    async def acquire(conversation_id: str) -> None:
+        async with lock.acquire(conversation_id):
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*(acquire(f"C1:{i}") for i in range(5)))
+
+    assert len(mock_pool_class.pools) == 1
+    pool = mock_pool_class.pools[0]
+    assert pool.getconn.call_count == 5
+    assert pool.putconn.call_count == 5
+
+
+@pytest.mark.asyncio
+async def test_pool_timeout_is_reported_as_lock_unavailable(mock_pool_class):
+    """接続を確保できない場合は混雑として扱う例外を送出することをテスト"""
+    lock = create_lock()
+    await lock._get_pool()
+    mock_pool_class.pools[0].getconn.side_effect = PoolTimeout("timeout")
+
+    with pytest.raises(ConversationLockUnavailableError):
+        async with lock.acquire("C1:1"):
+            pass
@@ -0,0 +1,31 @@
+import pytest
+
+from src.infrastructure.metrics import Histogram
+
+
+def test_observe_counts_values_into_buckets():
+    """値がバケットごとに集計されることをテスト"""
+    histogram = Histogram("test", buckets=[1, 5])
+
+    for value in [0.5, 1.0, 3.0, 10.0]:
+        histogram.observe(value)
+
+    assert histogram.snapshot() == {"le_1": 2, "le_5": 1, "le_inf": 1}
+    assert histogram.count == 4
+    assert histogram.mean == pytest.approx(14.5 / 4)
+
+
+def test_percentile_returns_bucket_upper_bound():
+    """分位点を含むバケットの上限値が返されることをテスト"""
+    histogram = Histogram("test", buckets=[1, 5, 10])
+
+    for value in [0.2] * 9 + [7.0]:
+        histogram.observe(value)
+
+    assert histogram.percentile(0.5) == 1
+    assert histogram.percentile(1.0) == 7.0
+
+
+def test_percentile_of_empty_histogram_is_zero():
+    """空のヒストグラムの分位点が0になることをテスト"""
+    assert Histogram("test").percentile(0.95) == 0.0
@@ -0,0 +1,89 @@
+import asyncio
+import contextlib
+
+import pytest
+
+from src.domain.model import Task
+from src.infrastructure.metrics import (
+    WorkflowTrace,
+    instrument_node,
+    record_llm_call,
+)
+
+
+@pytest.mark.asyncio
+async def test_instrument_node_records_timing_on_task():
+    """所要時間とLLM使用量がタスクとトレースに記録されることをテスト"""
+    task = Task.create_web_search("検索タスク")
+
+    async def node(state):
+        await asyncio.sleep(0.01)
+        record_llm_call(0.01, input_tokens=100, output_tokens=20, error=False)
+        return {}
+
+    trace = WorkflowTrace(request_id="C1:1.0")
+    with trace.activate():
+        await instrument_node("execute_search", node)({"task": task}, {})
+
+    timing = task.timings[0]
+    assert timing.stage == "execute_search"
+    assert timing.wall_seconds >= 0.01
+    assert timing.llm_calls == 1
+    assert timing.input_tokens == 100
+    assert timing.output_tokens == 20
+    assert trace.llm_calls == 1
+    assert trace.input_tokens == 100
+    assert [span.stage for span in trace.spans] == ["execute_search"]
+
+
+@pytest.mark.asyncio
+async def test_instrument_node_splits_llm_usage_across_batched_tasks():
+    """複数タスクをまとめて処理した場合に、LLM使用量が按分されることをテスト"""
+    tasks = [Task.create_general_answer(f"質問{i}") for i in range(2)]
+
+    async def node(state):
+        record_llm_call(0.2, input_tokens=101, output_tokens=40, error=False)
+        return {}
+
+    await instrument_node("generate_answer", node)({"tasks": tasks}, {})
+
+    assert [task.timings[0].input_tokens for task in tasks] == [51, 50]
+    assert [task.timings[0].output_tokens for task in tasks] == [20, 20]
+    assert [task.timings[0].llm_calls for task in tasks] == [1, 0]
+
+
+@pytest.mark.asyncio
+async def test_nested_nodes_propagate_llm_usage_to_parent():
+    """サブグラフ内のLLM呼び出しが、親の計測値にも加算されることをテスト"""
+    task = Task.create_web_search("検索タスク")
+
+    async def inner(state):
+        record_llm_call(0.1, input_tokens=10, output_tokens=5, error=False)
+        return {}
+
+    async def outer(state, config):
+        await instrument_node("generate_task_result", inner)(state, config)
+        return {}
+
+    await instrument_node("web_search", outer)({"task": task}, {})
+
+    timings = {timing.stage: timing for timing in task.timings}
+    assert timings["generate_task_result"].input_tokens == 10
+    assert timings["web_search"].input_tokens == 10
+
+
+@pytest.mark.asyncio
+async def test_failed_node_is_recorded_as_error():
+    """例外で終了したノードがエラーとして記録されることをテスト"""
+    task = Task.create_web_search("検索タスク")
+
+    async def node(state):
+        raise RuntimeError("boom")
+
+    trace = WorkflowTrace(request_id="C1:1.0")
+    with trace.activate(), contextlib.suppress(RuntimeError):
+        await instrument_node("execute_search", node)({"task": task}, {})
+
+    assert task.timings[0].errors == 1
+    assert trace.spans[0].error is True
+    assert "execute_search" in trace.summary()
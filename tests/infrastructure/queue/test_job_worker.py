@@ -0,0 +1,170 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+from pytest_mock import MockerFixture
+
+from src.infrastructure.queue import Job, JobStatus, JobWorker
+
+
+def make_job(attempts: int = 1, max_attempts: int = 3) -> Job:
+    return Job(
+        id=uuid4(),
+        event_id="1234567890.123456",
+        payload={"text": "こんにちは"},
+        attempts=attempts,
+        max_attempts=max_attempts,
+    )
+
+
+@pytest.fixture
+def mock_job_queue(mocker: MockerFixture):
+    """PostgresJobQueueのモック"""
+    return mocker.AsyncMock()
+
+
+@pytest.mark.asyncio
+async def test_run_once_returns_false_when_queue_is_empty(
+    mocker: MockerFixture, mock_job_queue
+):
+    """取得できるジョブがない場合は何もしないことをテスト"""
+    handler = mocker.AsyncMock()
+    mock_job_queue.claim.return_value = None
+    worker = JobWorker(mock_job_queue, handler)
+
+    assert not await worker.run_once()
+    assert not handler.called
+
+
+@pytest.mark.asyncio
+async def test_run_once_completes_successful_job(mocker: MockerFixture, mock_job_queue):
+    """処理に成功したジョブを完了にすることをテスト"""
+    job = make_job()
+    handler = mocker.AsyncMock()
+    mock_job_queue.claim.return_value = job
+    worker = JobWorker(mock_job_queue, handler)
+
+    assert await worker.run_once()
+
+    handler.assert_called_once_with(job)
+    mock_job_queue.complete.assert_called_once_with(job)
+    assert not mock_job_queue.fail.called
+
+
+@pytest.mark.asyncio
+async def test_run_once_fails_job_when_handler_raises(
+    mocker: MockerFixture, mock_job_queue
+):
+    """処理に失敗したジョブは失敗として記録し、再実行に任せることをテスト"""
+    job = make_job()
+    handler = mocker.AsyncMock(side_effect=RuntimeError("LLMエラー"))
+    mock_job_queue.claim.return_value = job
+    mock_job_queue.fail.return_value = JobStatus.QUEUED
+    worker = JobWorker(mock_job_queue, handler)
+
+    assert await worker.run_once()
+
+    mock_job_queue.fail.assert_called_once_with(job, "LLMエラー")
+    assert not mock_job_queue.complete.called
+
+
+@pytest.mark.asyncio
+async def test_run_once_dead_letters_job_abandoned_on_last_attempt(
+    mocker: MockerFixture, mock_job_queue
+):
+    """最後の試行中にワーカーが落ちたジョブは処理せずにデッドレターにすることをテスト"""
+    job = make_job(attempts=4, max_attempts=3)
+    handler = mocker.AsyncMock()
+    mock_job_queue.claim.return_value = job
+    worker = JobWorker(mock_job_queue, handler)
+
+    assert await worker.run_once()
+
+    assert not handler.called
+    assert mock_job_queue.fail.called
+
+
+@pytest.mark.asyncio
+async def test_run_once_extends_lease_while_handler_runs(
+    mocker: MockerFixture, mock_job_queue
+):
+    """処理中のジョブのロック期限を定期的に延ばすことをテスト"""
+    job = make_job()
+
+    async def handler(job):
+        await asyncio.sleep(0.05)
+
+    mock_job_queue.claim.return_value = job
+    mock_job_queue.extend_lease.return_value = True
+    worker = JobWorker(mock_job_queue, handler, lease_extension_interval_seconds=0.01)
+
+    assert await worker.run_once()
+
+    assert mock_job_queue.extend_lease.call_count >= 2
+    mock_job_queue.extend_lease.assert_called_with(job)
+    mock_job_queue.complete.assert_called_once_with(job)
+
+
+@pytest.mark.asyncio
+async def test_delete_completed_jobs_deletes_in_batches(
+    mocker: MockerFixture, mock_job_queue
+):
+    """完了したジョブを上限件数ずつ、なくなるまで削除することをテスト"""
+    mock_job_queue.delete_completed.side_effect = [1000, 3]
+    worker = JobWorker(
+        mock_job_queue, mocker.AsyncMock(), completed_retention_seconds=3600
+    )
+
+    assert await worker.delete_completed_jobs() == 1003
+    mock_job_queue.delete_completed.assert_called_with(3600, 1000)
+
+
+@pytest.mark.asyncio
+async def test_stop_cancels_running_workers(mocker: MockerFixture, mock_job_queue):
+    """停止時にワーカーのタスクを終了することをテスト"""
+    mock_job_queue.claim.return_value = None
+    worker = JobWorker(
+        mock_job_queue, mocker.AsyncMock(), concurrency=2, poll_interval_seconds=0.01
+    )
+
+    worker.start()
+    await worker.stop()
+
+    assert worker._tasks == []
+
+
+@pytest.mark.asyncio
+async def test_stop_releases_job_in_progress(mocker: MockerFixture, mock_job_queue):
+    """停止時に処理中のジョブを試行回数を戻してキューに戻すことをテスト"""
+    job = make_job()
+    started = asyncio.Event()
+
+    async def handler(_):
+        started.set()
+        await asyncio.sleep(60)
+
+    mock_job_queue.claim.side_effect = [job, None]
+    worker = JobWorker(mock_job_queue, handler, concurrency=1)
+
+    worker.start()
+    await started.wait()
+    await worker.stop()
+
+    mock_job_queue.release.assert_called_once_with(job)
+    assert not mock_job_queue.fail.called
+    assert not mock_job_queue.complete.called
+
+
+def test_is_last_attempt():
+    """試行回数が上限に達したかを判定することをテスト"""
+    assert not make_job(attempts=2, max_attempts=3).is_last_attempt
+    assert make_job(attempts=3, max_attempts=3).is_last_attempt
+
+
+def test_placeholder_ts_is_read_from_payload():
+    """前の試行で記録したプレースホルダーのtsをペイロードから読むテスト"""
+    job = make_job()
+    assert job.placeholder_ts is None
+
+    job.payload["placeholder_ts"] = "1234567890.000001"
+    assert job.placeholder_ts == "1234567890.000001"
@@ -0,0 +1,88 @@
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import pytest
+from pytest_mock import MockerFixture
+
+from src.infrastructure.database import DatabasePool
+from src.infrastructure.queue import Job, JobStatus, PostgresJobQueue
+
+
+def make_job(attempts: int = 1, max_attempts: int = 3) -> Job:
+    return Job(
+        id=uuid4(),
+        event_id="1234567890.123456",
+        payload={"text": "こんにちは"},
+        attempts=attempts,
+        max_attempts=max_attempts,
+    )
+
+
+@pytest.fixture
+def connection(mocker: MockerFixture):
+    """実行したSQLを記録し、更新件数を返す接続のモック"""
+    conn = mocker.Mock()
+    conn.execute = mocker.AsyncMock(return_value=mocker.Mock(rowcount=1))
+
+    @asynccontextmanager
+    async def get_connection():
+        yield conn
+
+    mocker.patch.object(DatabasePool, "get_connection", get_connection)
+    return conn
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("attempts", "update"),
+    [
+        (1, lambda queue, job: queue.complete(job)),
+        (1, lambda queue, job: queue.fail(job, "エラー")),
+        (3, lambda queue, job: queue.fail(job, "エラー")),
+    ],
+)
+async def test_status_updates_are_guarded_by_attempt(connection, attempts, update):
+    """状態の更新は取得した試行のまま実行中のジョブだけを対象にすることをテスト"""
+    job = make_job(attempts=attempts)
+
+    await update(PostgresJobQueue(), job)
+
+    query, params = connection.execute.call_args.args
+    assert "status = 'running' AND attempts = %s" in query
+    assert params[-2:] == (job.id, attempts)
+
+
+@pytest.mark.asyncio
+async def test_status_update_is_skipped_after_reclaim(
+    mocker: MockerFixture, connection
+):
+    """別のワーカーに再取得されたジョブは更新せずに警告を残すことをテスト"""
+    connection.execute.return_value = mocker.Mock(rowcount=0)
+    warning = mocker.patch("src.infrastructure.queue.postgres_job_queue.logger.warning")
+    job = make_job()
+
+    await PostgresJobQueue().complete(job)
+
+    assert warning.called
+    assert "再取得" in warning.call_args.args[0]
+
+
+@pytest.mark.asyncio
+async def test_fail_dead_letters_last_attempt(connection):
+    """最後の試行で失敗したジョブをデッドレターにすることをテスト"""
+    job = make_job(attempts=3, max_attempts=3)
+
+    assert await PostgresJobQueue().fail(job, "エラー") == JobStatus.DEAD
+    assert connection.execute.call_args.args[1][0] == JobStatus.DEAD.value
+
+
+@pytest.mark.asyncio
+async def test_release_returns_attempt_to_queue(connection):
+    """中断したジョブは試行回数を戻してキューに戻すことをテスト"""
+    job = make_job(attempts=2)
+
+    assert await PostgresJobQueue().release(job)
+
+    query, params = connection.execute.call_args.args
+    assert "attempts = attempts - 1" in query
+    assert params == (job.id, 2)
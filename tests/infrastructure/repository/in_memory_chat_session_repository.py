@@ -1,25 +1,94 @@
 from copy import deepcopy
+from datetime import datetime
+from uuid import UUID
 
+from src.domain.exception import ChatSessionConflictError
 from src.domain.model.chat_session import ChatSession
+from src.domain.model.message import Message
+from src.domain.model.task_plan import TaskPlan
 from src.domain.repository import ChatSessionRepository
 
 
 class InMemoryChatSessionRepository(ChatSessionRepository):
     def __init__(self):
         self._sessions: dict[str, ChatSession] = {}
+        self._task_plans: dict[str, dict[UUID, TaskPlan]] = {}
 
     async def save(self, chat_session: ChatSession) -> None:
-        """チャットセッションを保存"""
+        """チャットセッションを保存
+
+        過去のタスク計画を読み込まずに保存される場合があるため、
+        タスク計画はIDごとに追記して保持する。
+        """
+        stored = self._sessions.get(chat_session.id)
+        if (stored.version if stored else 0) != chat_session.version:
+            raise ChatSessionConflictError(chat_session.id, chat_session.version)
+
+        task_plans = self._task_plans.setdefault(chat_session.id, {})
+        for task_plan in chat_session.task_plans:
+            task_plans[task_plan.id] = deepcopy(task_plan)
+
+        chat_session.mark_persisted(chat_session.version + 1)
         self._sessions[chat_session.id] = deepcopy(chat_session)
 
-    async def find_by_id(self, chat_session_id: str) -> ChatSession | None:
+    async def find_by_id(
+        self,
+        chat_session_id: str,
+        include_task_plans: bool = True,
+        max_messages: int | None = None,
+    ) -> ChatSession | None:
         """IDでチャットセッションを取得"""
         session = self._sessions.get(chat_session_id)
         if session is None:
             return None
 
-        return deepcopy(session)
+        task_plans = (
+            list(self._task_plans.get(chat_session_id, {}).values())
+            if include_task_plans
+            else []
+        )
+        chat_session = ChatSession.reconstruct(
+            id=session.id,
+            thread_id=session.thread_id,
+            user_id=session.user_id,
+            channel_id=session.channel_id,
+            messages=deepcopy(session.messages),
+            task_plans=deepcopy(task_plans),
+            created_at=session.created_at,
+            updated_at=session.updated_at,
+            version=session.version,
+        )
+        if max_messages is not None:
+            chat_session.trim_messages(max_messages)
+        return chat_session
+
+    async def find_messages(
+        self,
+        chat_session_id: str,
+        since: datetime | None = None,
+        before: datetime | None = None,
+        limit: int | None = None,
+    ) -> list[Message]:
+        """セッションのメッセージを古い順に取得"""
+        session = self._sessions.get(chat_session_id)
+        if session is None:
+            return []
+        messages = [
+            message
+            for message in session.messages
+            if (since is None or message.created_at > since)
+            and (before is None or message.created_at < before)
+        ]
+        if limit is not None:
+            messages = messages[-limit:] if limit > 0 else []
+        return deepcopy(messages)
+
+    async def find_version(self, chat_session_id: str) -> int | None:
+        """チャットセッションのバージョンを取得"""
+        session = self._sessions.get(chat_session_id)
+        return session.version if session else None
 
     def clear(self) -> None:
         """全てのセッションをクリア"""
         self._sessions.clear()
+        self._task_plans.clear()
@@ -0,0 +1,173 @@
+import pytest
+
+from src.domain.model import ChatSession
+from src.infrastructure.repository import CachedChatSessionRepository
+
+from .in_memory_chat_session_repository import InMemoryChatSessionRepository
+
+
+class _CountingRepository(InMemoryChatSessionRepository):
+    """find_by_idの呼び出し回数を数えるリポジトリ"""
+
+    def __init__(self):
+        super().__init__()
+        self.loads = 0
+
+    async def find_by_id(
+        self, chat_session_id, include_task_plans=True, max_messages=None
+    ):
+        self.loads += 1
+        return await super().find_by_id(
+            chat_session_id, include_task_plans, max_messages
+        )
+
+
+def _session(id: str = "C1:1") -> ChatSession:
+    session = ChatSession.create(id=id, thread_id="1", user_id="U1", channel_id="C1")
+    session.add_user_message("質問")
+    session.add_assistant_message("回答")
+    return session
+
+
+@pytest.mark.asyncio
+async def test_saved_session_is_served_from_cache():
+    """保存したセッションがデータベースを読まずに返ることをテスト"""
+    inner = _CountingRepository()
+    repository = CachedChatSessionRepository(inner)
+    await repository.save(_session())
+
+    found = await repository.find_by_id("C1:1", include_task_plans=False)
+
+    assert [m.content for m in found.messages] == ["質問", "回答"]
+    assert found.version == 1
+    assert inner.loads == 0
+    assert repository.stats.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_session_is_a_copy():
+    """返したセッションを変更してもキャッシュに影響しないことをテスト"""
+    repository = CachedChatSessionRepository(_CountingRepository())
+    await repository.save(_session())
+
+    found = await repository.find_by_id("C1:1", include_task_plans=False)
+    found.add_user_message("未保存の質問")
+
+    again = await repository.find_by_id("C1:1", include_task_plans=False)
+    assert len(again.messages) == 2
+
+
+@pytest.mark.asyncio
+async def test_session_saved_elsewhere_is_reloaded():
+    """別のインスタンスが保存したセッションは読み直すことをテスト"""
+    inner = _CountingRepository()
+    repository = CachedChatSessionRepository(inner)
+    await repository.save(_session())
+
+    # キャッシュを経由せずに保存する(別のインスタンスからの保存)
+    other = await inner.find_by_id("C1:1")
+    other.add_user_message("別インスタンスの質問")
+    await inner.save(other)
+
+    found = await repository.find_by_id("C1:1", include_task_plans=False)
+
+    assert found.messages[-1].content == "別インスタンスの質問"
+    assert repository.stats.stale == 1
+
+
+@pytest.mark.asyncio
+async def test_miss_loads_and_caches_session():
+    """キャッシュにないセッションは読み込んでキャッシュすることをテスト"""
+    inner = _CountingRepository()
+    await inner.save(_session())
+    repository = CachedChatSessionRepository(inner)
+
+    await repository.find_by_id("C1:1", include_task_plans=False)
+    await repository.find_by_id("C1:1", include_task_plans=False)
+
+    assert inner.loads == 1
+    assert repository.stats.misses == 1
+    assert repository.stats.hits == 1
+    assert repository.stats.hit_rate == 0.5
+
+
+@pytest.mark.asyncio
+async def test_task_plans_are_always_loaded_from_repository():
+    """タスク計画を含む読み込みはキャッシュを使わないことをテスト"""
+    inner = _CountingRepository()
+    repository = CachedChatSessionRepository(inner)
+    await repository.save(_session())
+
+    await repository.find_by_id("C1:1")
+
+    assert inner.loads == 1
+    assert repository.stats.lookups == 0
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_session_is_evicted_by_entry_limit():
+    """件数の上限を超えると最も古く使われたセッションが追い出されることをテスト"""
+    inner = _CountingRepository()
+    repository = CachedChatSessionRepository(inner, max_entries=2)
+    for id in ["C1:1", "C1:2"]:
+        await repository.save(_session(id))
+    await repository.find_by_id("C1:1", include_task_plans=False)
+
+    await repository.save(_session("C1:3"))
+
+    assert repository.stats.entries == 2
+    assert repository.stats.evictions == 1
+    await repository.find_by_id("C1:2", include_task_plans=False)
+    assert inner.loads == 1
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_evicted_by_memory_limit():
+    """メモリ量の上限を超えないように追い出されることをテスト"""
+    repository = CachedChatSessionRepository(_CountingRepository(), max_bytes=1000)
+    for i in range(3):
+        await repository.save(_session(f"C1:{i}"))
+
+    assert repository.stats.bytes <= 1000
+    assert repository.stats.entries == 1
+
+
+def _long_session(id: str = "C1:1", turns: int = 5) -> ChatSession:
+    session = ChatSession.create(id=id, thread_id="1", user_id="U1", channel_id="C1")
+    for i in range(turns):
+        session.add_user_message(f"質問{i}")
+        session.add_assistant_message(f"回答{i}")
+    return session
+
+
+@pytest.mark.asyncio
+async def test_recent_window_is_served_from_cache():
+    """直近のメッセージだけを読み込んだセッションを同じ件数の要求に使うことをテスト"""
+    inner = _CountingRepository()
+    await inner.save(_long_session())
+    repository = CachedChatSessionRepository(inner)
+
+    first = await repository.find_by_id(
+        "C1:1", include_task_plans=False, max_messages=4
+    )
+    second = await repository.find_by_id(
+        "C1:1", include_task_plans=False, max_messages=4
+    )
+
+    assert [m.content for m in second.messages] == [m.content for m in first.messages]
+    assert second.message_count == 10
+    assert inner.loads == 1
+
+
+@pytest.mark.asyncio
+async def test_recent_window_is_not_used_for_full_history():
+    """直近だけを保持したエントリは、すべての履歴の要求には使わないことをテスト"""
+    inner = _CountingRepository()
+    await inner.save(_long_session())
+    repository = CachedChatSessionRepository(inner)
+    await repository.find_by_id("C1:1", include_task_plans=False, max_messages=4)
+
+    found = await repository.find_by_id("C1:1", include_task_plans=False)
+
+    assert len(found.messages) == 10
+    assert inner.loads == 2
@@ -0,0 +1,280 @@
+import base64
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+from pytest_mock import MockerFixture
+
+from src.domain.exception import ChatSessionConflictError
+from src.domain.model import ChatSession, SearchResult, Task, TaskPlan
+from src.infrastructure.database import DatabasePool
+from src.infrastructure.repository import ChatSessionRepository
+from src.infrastructure.repository.web_documents import (
+    WebDocument,
+    detach_contents,
+)
+
+
+class _RecordingCursor:
+    def __init__(self, statements: list[tuple[str, int]], conflict: bool):
+        self._statements = statements
+        self._conflict = conflict
+        self._params = None
+
+    async def execute(self, query, params=None):
+        self._statements.append(("execute", 1))
+        self._params = params
+
+    async def fetchone(self):
+        # バージョンが一致しない場合、chat_sessionsの更新は行を返さない
+        return None if self._conflict else {"version": self._params[-1]}
+
+    async def executemany(self, query, params_seq):
+        self._statements.append(("executemany", len(params_seq)))
+
+
+class _RecordingConnection:
+    """送信した文を記録するだけの接続"""
+
+    def __init__(self, conflict: bool = False):
+        self.statements: list[tuple[str, int]] = []
+        self.pipelined = False
+        self.conflict = conflict
+
+    @asynccontextmanager
+    async def cursor(self):
+        yield _RecordingCursor(self.statements, self.conflict)
+
+    def transaction(self):
+        return _async_nullcontext()
+
+    def pipeline(self):
+        self.pipelined = True
+        return _async_nullcontext()
+
+
+@asynccontextmanager
+async def _async_nullcontext():
+    yield
+
+
+def _answer_turn(session: ChatSession, question: str) -> TaskPlan:
+    session.add_user_message(question)
+    task = Task.create_web_search(f"{question}を調べる")
+    task.add_web_search_attempt(
+        query=question,
+        results=[SearchResult(url="https://example.com", title="t", content="本文")],
+    )
+    task.complete("結果")
+    task_plan = TaskPlan.create(message_id=session.last_user_message().id, tasks=[task])
+    session.add_assistant_message("回答")
+    session.add_task_plan(task_plan)
+    return task_plan
+
+
+def test_write_set_contains_all_rows_of_new_session():
+    """新しいセッションは追加したすべての行を書き込むことをテスト"""
+    session = ChatSession.create(
+        id="C1:1.0", thread_id="1.0", user_id="U1", channel_id="C1"
+    )
+    _answer_turn(session, "質問1")
+
+    write_set = ChatSessionRepository.build_write_set(session)
+
+    assert len(write_set.messages) == 2
+    assert len(write_set.task_plans) == 1
+    assert len(write_set.tasks) == 1
+    assert write_set.payload_bytes > 0
+    assert write_set.version == 1
+
+
+def test_write_set_skips_persisted_rows():
+    """保存済みの行は書き込まず、新しいターンの行だけを書き込むことをテスト"""
+    session = ChatSession.create(
+        id="C1:1.0", thread_id="1.0", user_id="U1", channel_id="C1"
+    )
+    first_plan = _answer_turn(session, "質問1")
+    session.mark_persisted(1)
+
+    second_plan = _answer_turn(session, "質問2")
+    write_set = ChatSessionRepository.build_write_set(session)
+
+    assert write_set.version == 2
+    assert [row[3] for row in write_set.messages] == ["質問2", "回答"]
+    assert [row[0] for row in write_set.task_plans] == [second_plan.id]
+    assert [row[0] for row in write_set.tasks] == [second_plan.tasks[0].id]
+    assert first_plan.tasks[0].id not in [row[0] for row in write_set.tasks]
+
+
+def test_write_set_rebase_replaces_only_version():
+    """書き込み直す行は最新のバージョンの次のバージョンだけが変わることをテスト"""
+    session = ChatSession.create(
+        id="C1:1.0", thread_id="1.0", user_id="U1", channel_id="C1"
+    )
+    _answer_turn(session, "質問1")
+    write_set = ChatSessionRepository.build_write_set(session)
+
+    rebased = write_set.rebase(5)
+
+    assert rebased.version == 6
+    assert rebased.chat_session[-1] == 6
+    assert rebased.chat_session[:-1] == write_set.chat_session[:-1]
+    assert rebased.messages == write_set.messages
+    assert rebased.tasks == write_set.tasks
+
+
+def test_write_set_includes_modified_persisted_task():
+    """保存済みの計画でも、変更されたタスクは書き込むことをテスト"""
+    session = ChatSession.create(
+        id="C1:1.0", thread_id="1.0", user_id="U1", channel_id="C1"
+    )
+    task_plan = _answer_turn(session, "質問1")
+    session.mark_persisted()
+
+    task_plan.tasks[0].update_result("更新した結果")
+    write_set = ChatSessionRepository.build_write_set(session)
+
+    assert write_set.messages == []
+    assert write_set.task_plans == []
+    assert [row[0] for row in write_set.tasks] == [task_plan.tasks[0].id]
+    assert write_set.tasks[0][5] == "更新した結果"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("task_count", [1, 20])
+async def test_save_sends_constant_number_of_statements(
+    mocker: MockerFixture, task_count: int
+):
+    """タスク数によらず、テーブルごとに1回の文でまとめて送信することをテスト"""
+    session = ChatSession.create(
+        id="C1:1.0", thread_id="1.0", user_id="U1", channel_id="C1"
+    )
+    session.add_user_message("質問")
+    session.add_task_plan(
+        TaskPlan.create(
+            message_id=session.last_user_message().id,
+            tasks=[Task.create_general_answer(f"回答{i}") for i in range(task_count)],
+        )
+    )
+    connection = _RecordingConnection()
+
+    @asynccontextmanager
+    async def get_connection():
+        yield connection
+
+    mocker.patch.object(DatabasePool, "get_connection", get_connection)
+
+    await ChatSessionRepository().save(session)
+
+    assert connection.pipelined
+    assert connection.statements == [
+        ("execute", 1),
+        ("executemany", 1),
+        ("executemany", 1),
+        ("executemany", task_count),
+    ]
+    assert session.pending_messages() == []
+    assert session.version == 1
+
+
+@pytest.mark.asyncio
+async def test_save_raises_conflict_when_version_changed(mocker: MockerFixture):
+    """読み込んだ後に他の処理が保存していた場合、競合として扱うことをテスト"""
+    session = ChatSession.create(
+        id="C1:1.0", thread_id="1.0", user_id="U1", channel_id="C1"
+    )
+    session.add_user_message("質問")
+    connection = _RecordingConnection(conflict=True)
+
+    @asynccontextmanager
+    async def get_connection():
+        yield connection
+
+    mocker.patch.object(DatabasePool, "get_connection", get_connection)
+
+    with pytest.raises(ChatSessionConflictError) as exc_info:
+        await ChatSessionRepository().save(session)
+
+    assert exc_info.value.expected_version == 0
+    assert len(session.pending_messages()) == 1
+    assert session.version == 0
+
+
+def test_build_chat_session_from_aggregated_row():
+    """json_aggで集約した行からチャットセッションを復元できることをテスト"""
+    session = ChatSession.create(
+        id="C1:1.0", thread_id="1.0", user_id="U1", channel_id="C1"
+    )
+    task_plan = _answer_turn(session, "質問1")
+    documents: dict[str, WebDocument] = {}
+    task_plan_data = task_plan.to_dict()
+    for task in task_plan_data["tasks"]:
+        task["task_log"] = detach_contents(task["task_log"], documents)
+    row = {
+        "id": session.id,
+        "thread_id": session.thread_id,
+        "user_id": session.user_id,
+        "channel_id": session.channel_id,
+        "created_at": session.created_at,
+        "updated_at": session.updated_at,
+        "version": 3,
+        "message_count": 6,
+        "messages_json": json.dumps(
+            [message.to_dict() for message in session.messages]
+        ),
+        "task_plans_json": json.dumps([task_plan_data]),
+        "web_documents_json": json.dumps(
+            [
+                {
+                    "id": document.id,
+                    "compression": document.compression.value,
+                    "content": base64.b64encode(document.data).decode(),
+                }
+                for document in documents.values()
+            ]
+        ),
+    }
+
+    restored = ChatSessionRepository._build_chat_session(row)
+
+    assert [m.content for m in restored.messages] == ["質問1", "回答"]
+    restored_task = restored.task_plans[0].tasks[0]
+    assert restored_task.id == task_plan.tasks[0].id
+    assert restored_task.result == "結果"
+    assert restored_task.task_log.attempts[0].results[0].content == "本文"
+    assert restored.pending_messages() == []
+    assert restored.version == 3
+    assert restored.omitted_message_count == 4
+    assert restored.message_count == 6
+
+
+def test_write_set_stores_each_page_content_once():
+    """同じページ本文は1件の文書にまとめ、タスクログはIDで参照することをテスト"""
+    session = ChatSession.create(
+        id="C1:1.0", thread_id="1.0", user_id="U1", channel_id="C1"
+    )
+    session.add_user_message("質問")
+    tasks = []
+    for i in range(2):
+        task = Task.create_web_search(f"検索{i}")
+        task.add_web_search_attempt(
+            query=f"クエリ{i}",
+            results=[
+                SearchResult(url="https://example.com", title="t", content="本文" * 100)
+            ],
+        )
+        tasks.append(task)
+    session.add_task_plan(
+        TaskPlan.create(message_id=session.last_user_message().id, tasks=tasks)
+    )
+
+    write_set = ChatSessionRepository.build_write_set(session)
+
+    assert len(write_set.documents) == 1
+    document = next(iter(write_set.documents.values()))
+    assert document.original_size == len(("本文" * 100).encode())
+    assert len(document.data) < document.original_size
+    for row in write_set.tasks:
+        result = json.loads(row[6])["attempts"][0]["results"][0]
+        assert "content" not in result
+        assert result["content_id"] == document.id
@@ -0,0 +1,64 @@
+from src.infrastructure.repository.web_documents import (
+    Compression,
+    WebDocument,
+    attach_contents,
+    content_id,
+    decompress,
+    detach_contents,
+)
+
+
+def test_detach_and_attach_contents_round_trip():
+    """本文を取り除いたタスクログに本文を戻すと元の形になることをテスト"""
+    task_log = {
+        "attempts": [
+            {
+                "query": "q",
+                "results": [
+                    {"url": "https://a.example", "title": "a", "content": "本文A"},
+                    {"url": "https://b.example", "title": "b", "content": "本文B"},
+                ],
+            }
+        ]
+    }
+    documents: dict[str, WebDocument] = {}
+
+    detached = detach_contents(task_log, documents)
+    contents = {
+        document.id: decompress(document.data, document.compression)
+        for document in documents.values()
+    }
+    attach_contents(detached, contents)
+
+    assert detached == task_log
+    assert set(documents) == {content_id("本文A"), content_id("本文B")}
+
+
+def test_attach_contents_keeps_inline_content():
+    """本文を埋め込んだ古い形式の検索結果はそのまま残すことをテスト"""
+    task_log = {"attempts": [{"query": "q", "results": [{"content": "本文"}]}]}
+
+    attach_contents(task_log, {})
+
+    assert task_log["attempts"][0]["results"][0]["content"] == "本文"
+
+
+def test_attach_contents_uses_empty_content_when_document_is_missing():
+    """参照先の本文がない場合は例外にせず空の本文にすることをテスト"""
+    task_log = {
+        "attempts": [
+            {"query": "q", "results": [{"url": "https://a", "content_id": "x"}]}
+        ]
+    }
+
+    attach_contents(task_log, {})
+
+    assert task_log["attempts"][0]["results"][0] == {
+        "url": "https://a",
+        "content": "",
+    }
+
+
+def test_decompress_uncompressed_document():
+    """移行時に非圧縮で保存した本文を読み込めることをテスト"""
+    assert decompress("本文".encode(), Compression.NONE) == "本文"
@@ -0,0 +1,233 @@
+import asyncio
+
+import pytest
+
+from src.domain.exception import ChatSessionConflictError
+from src.domain.model import ChatSession
+from src.infrastructure.exception.repository_exception import RepositorySaveError
+from src.infrastructure.repository import (
+    ChatSessionRepository,
+    WriteBehindChatSessionRepository,
+)
+
+
+class _FakeChatSessionRepository(ChatSessionRepository):
+    """書き込みを記録し、指定した回数だけ失敗するリポジトリ"""
+
+    def __init__(self, failures: int = 0):
+        self.written: list[list[str]] = []
+        self.failures = failures
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def write(self, write_set) -> None:
+        await self.release.wait()
+        if self.failures > 0:
+            self.failures -= 1
+            raise RepositorySaveError("ChatSession")
+        self.written.append([row[3] for row in write_set.messages])
+
+    async def find_by_id(
+        self, chat_session_id, include_task_plans=True, max_messages=None
+    ):
+        return len(self.written)
+
+
+def _session(id: str = "C1:1") -> ChatSession:
+    return ChatSession.create(id=id, thread_id="1", user_id="U1", channel_id="C1")
+
+
+@pytest.mark.asyncio
+async def test_save_returns_before_write_completes():
+    """保存が書き込みの完了を待たずに返ることをテスト"""
+    inner = _FakeChatSessionRepository()
+    inner.release.clear()
+    repository = WriteBehindChatSessionRepository(inner)
+    session = _session()
+    session.add_user_message("質問")
+
+    await repository.save(session)
+
+    assert repository.pending_count == 1
+    assert inner.written == []
+    assert session.pending_messages() == []
+
+    inner.release.set()
+    assert await repository.flush()
+    assert inner.written == [["質問"]]
+    assert repository.stats.written == 1
+
+
+@pytest.mark.asyncio
+async def test_writes_of_same_session_keep_save_order():
+    """同じセッションの書き込みが保存した順に実行されることをテスト"""
+    inner = _FakeChatSessionRepository()
+    inner.release.clear()
+    repository = WriteBehindChatSessionRepository(inner)
+    session = _session()
+
+    session.add_user_message("1回目")
+    await repository.save(session)
+    session.add_user_message("2回目")
+    await repository.save(session)
+
+    inner.release.set()
+    await repository.flush()
+
+    assert inner.written == [["1回目"], ["2回目"]]
+
+
+@pytest.mark.asyncio
+async def test_failed_write_is_retried():
+    """失敗した書き込みが再試行されることをテスト"""
+    inner = _FakeChatSessionRepository(failures=2)
+    repository = WriteBehindChatSessionRepository(
+        inner, max_attempts=3, retry_base_delay_seconds=0
+    )
+    session = _session()
+    session.add_user_message("質問")
+
+    await repository.save(session)
+    await repository.flush()
+
+    assert inner.written == [["質問"]]
+    assert repository.stats.retries == 2
+    assert repository.stats.failed == 0
+
+
+@pytest.mark.asyncio
+async def test_write_is_dropped_after_max_attempts():
+    """再試行の上限を超えた書き込みが失敗として記録されることをテスト"""
+    inner = _FakeChatSessionRepository(failures=5)
+    repository = WriteBehindChatSessionRepository(
+        inner, max_attempts=2, retry_base_delay_seconds=0
+    )
+    session = _session()
+    session.add_user_message("質問")
+
+    await repository.save(session)
+    await repository.flush()
+
+    assert inner.written == []
+    assert repository.stats.failed == 1
+    assert repository.pending_count == 0
+
+
+@pytest.mark.asyncio
+async def test_save_waits_when_pending_writes_reach_limit():
+    """書き込み待ちが上限に達した場合に保存が空きを待つことをテスト"""
+    inner = _FakeChatSessionRepository()
+    inner.release.clear()
+    repository = WriteBehindChatSessionRepository(inner, max_pending=1)
+
+    await repository.save(_session("C1:1"))
+    second = asyncio.create_task(repository.save(_session("C1:2")))
+    await asyncio.sleep(0)
+
+    assert not second.done()
+
+    inner.release.set()
+    await second
+    await repository.flush()
+    assert repository.stats.written == 2
+
+
+@pytest.mark.asyncio
+async def test_find_by_id_waits_for_pending_write_of_session():
+    """読み込みが対象セッションの書き込みを待ってから行われることをテスト"""
+    inner = _FakeChatSessionRepository()
+    inner.release.clear()
+    repository = WriteBehindChatSessionRepository(inner)
+    await repository.save(_session())
+
+    found = asyncio.create_task(repository.find_by_id("C1:1"))
+    await asyncio.sleep(0)
+    assert not found.done()
+
+    inner.release.set()
+    assert await found == 1
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_pending_writes():
+    """停止時に書き込み待ちがすべて書き込まれることをテスト"""
+    inner = _FakeChatSessionRepository()
+    repository = WriteBehindChatSessionRepository(inner)
+    for i in range(3):
+        await repository.save(_session(f"C1:{i}"))
+
+    await repository.close(timeout=1)
+
+    assert len(inner.written) == 3
+    assert repository.pending_count == 0
+
+
+@pytest.mark.asyncio
+async def test_close_cancels_writes_after_timeout():
+    """タイムアウトまでに終わらない書き込みが停止時にキャンセルされることをテスト"""
+    inner = _FakeChatSessionRepository()
+    inner.release.clear()
+    repository = WriteBehindChatSessionRepository(inner)
+    await repository.save(_session())
+
+    await repository.close(timeout=0.01)
+
+    assert inner.written == []
+    assert repository.pending_count == 0
+
+
+@pytest.mark.asyncio
+async def test_conflicting_write_is_rebased_on_latest_version():
+    """他の処理と競合した書き込みを最新のバージョンの上に書き込み直すことをテスト"""
+    inner = _FakeChatSessionRepository()
+    stored = {"version": 3}
+    versions: list[int] = []
+
+    async def write(write_set):
+        versions.append(write_set.version)
+        if write_set.version - 1 != stored["version"]:
+            raise ChatSessionConflictError("C1:1", write_set.version - 1)
+        stored["version"] = write_set.version
+        inner.written.append([row[3] for row in write_set.messages])
+
+    async def find_version(chat_session_id):
+        return stored["version"]
+
+    inner.write = write
+    inner.find_version = find_version
+    repository = WriteBehindChatSessionRepository(inner, retry_base_delay_seconds=0)
+    session = _session()
+    session.add_user_message("質問")
+
+    await repository.save(session)
+    await repository.flush()
+
+    assert versions == [1, 4]
+    assert inner.written == [["質問"]]
+    assert repository.stats.rebased == 1
+    assert repository.stats.conflicts == 0
+
+
+@pytest.mark.asyncio
+async def test_write_is_dropped_when_conflicts_persist():
+    """書き込み直しても競合し続ける場合は上限回数で破棄することをテスト"""
+    inner = _FakeChatSessionRepository()
+
+    async def conflict(write_set):
+        raise ChatSessionConflictError("C1:1", 0)
+
+    async def find_version(chat_session_id):
+        return 0
+
+    inner.write = conflict
+    inner.find_version = find_version
+    repository = WriteBehindChatSessionRepository(
+        inner, max_attempts=3, retry_base_delay_seconds=0
+    )
+
+    await repository.save(_session())
+    await repository.flush()
+
+    assert repository.stats.rebased == 2
+    assert repository.stats.conflicts == 1
+    assert repository.stats.retries == 0
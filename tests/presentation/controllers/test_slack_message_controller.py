@@ -8,8 +8,11 @@ from src.application.dto.answer_to_user_request_usecase import (
     AnswerToUserRequestOutput,
 )
 from src.application.exception.base import ApplicationException
+from src.application.exception.usecase_exception import WorkflowSupersededError
 from src.domain.exception.base import DomainException
 from src.infrastructure.exception.base import InfrastructureException
+from src.infrastructure.exception.concurrency_exception import AdmissionRejectedError
+from src.infrastructure.exception.repository_exception import RepositorySaveError
 from src.presentation.controllers.slack_message_controller import (
     SlackMessageController,
 )
@@ -258,3 +261,289 @@ async def test_execute_sends_message_to_thread(
     # スレッドTSが正しく渡されることを確認
     call_args = mock_slack_service.send_message.call_args
     assert call_args.kwargs["thread_ts"] == "1234567890.123456"
+
+
+@pytest.mark.asyncio
+async def test_execute_streams_answer_when_enabled(
+    *,
+    mock_use_case,
+    mock_mapper,
+    mock_slack_service,
+    mock_ack,
+    valid_body,
+    valid_slack_dto,
+):
+    """ストリーミング有効時はプレースホルダーを更新して回答を確定するテスト"""
+    SlackMessageController._processed_events = set()
+    controller = SlackMessageController(
+        use_case=mock_use_case,
+        mapper=mock_mapper,
+        slack_service=mock_slack_service,
+        streaming_enabled=True,
+    )
+    message_id = uuid4()
+    app_input = AnswerToUserRequestInput(
+        user_message="こんにちは",
+        context={"conversation_id": "C12345_1234567890.123456"},
+    )
+    app_output = AnswerToUserRequestOutput(answer="回答", message_id=message_id)
+    stream = mock_slack_service.start_streaming_message.return_value
+
+    mock_mapper.from_event.return_value = valid_slack_dto
+    mock_mapper.is_bot_message.return_value = False
+    mock_mapper.to_application_input.return_value = app_input
+    mock_use_case.execute.return_value = app_output
+
+    await controller.execute(mock_ack, valid_body)
+
+    mock_slack_service.start_streaming_message.assert_called_once_with(
+        channel="C12345", thread_ts="1234567890.123456", placeholder_ts=None
+    )
+    mock_use_case.execute.assert_called_once_with(app_input, answer_stream=stream)
+    stream.finish.assert_called_once_with("回答", message_id)
+    assert not mock_slack_service.send_message.called
+
+
+@pytest.mark.asyncio
+async def test_execute_replaces_placeholder_on_error_when_streaming(
+    *,
+    mock_use_case,
+    mock_mapper,
+    mock_slack_service,
+    mock_ack,
+    valid_body,
+    valid_slack_dto,
+):
+    """ストリーミング中のエラーはプレースホルダーを置き換えて通知するテスト"""
+    SlackMessageController._processed_events = set()
+    controller = SlackMessageController(
+        use_case=mock_use_case,
+        mapper=mock_mapper,
+        slack_service=mock_slack_service,
+        streaming_enabled=True,
+    )
+    stream = mock_slack_service.start_streaming_message.return_value
+
+    mock_mapper.from_event.return_value = valid_slack_dto
+    mock_mapper.is_bot_message.return_value = False
+    mock_use_case.execute.side_effect = DomainException("エラー")
+
+    with pytest.raises(DomainException):
+        await controller.execute(mock_ack, valid_body)
+
+    assert stream.fail.called
+    assert not mock_slack_service.send_message.called
+
+
+@pytest.mark.asyncio
+async def test_execute_replies_busy_when_admission_is_rejected(
+    *,
+    controller,
+    mock_use_case,
+    mock_mapper,
+    mock_slack_service,
+    mock_ack,
+    valid_body,
+    valid_slack_dto,
+):
+    """混雑で拒否された場合は再試行を促す返信をすることをテスト"""
+    mock_mapper.from_event.return_value = valid_slack_dto
+    mock_mapper.is_bot_message.return_value = False
+    mock_use_case.execute.side_effect = AdmissionRejectedError("queue_full")
+
+    await controller.execute(mock_ack, valid_body)
+
+    call_args = mock_slack_service.send_message.call_args
+    assert "混み合っています" in call_args.kwargs["text"]
+    assert call_args.kwargs["thread_ts"] == "1234567890.123456"
+    assert mock_slack_service.remove_reaction.called
+
+
+@pytest.mark.asyncio
+async def test_execute_withdraws_reply_when_superseded(
+    *,
+    controller,
+    mock_use_case,
+    mock_mapper,
+    mock_slack_service,
+    mock_ack,
+    valid_body,
+    valid_slack_dto,
+):
+    """新しいメッセージで中断された場合は返信せずにリアクションを外すテスト"""
+    mock_mapper.from_event.return_value = valid_slack_dto
+    mock_mapper.is_bot_message.return_value = False
+    mock_use_case.execute.side_effect = WorkflowSupersededError("C12345_1234567890")
+
+    await controller.execute(mock_ack, valid_body)
+
+    assert not mock_slack_service.send_message.called
+    mock_slack_service.remove_reaction.assert_called_once_with(
+        "C12345", "1234567890.123456", "eyes"
+    )
+
+
+@pytest.fixture
+def queued_controller(mock_use_case, mock_mapper, mock_slack_service, mocker):
+    """ジョブキューを使うSlackMessageControllerのインスタンス"""
+    SlackMessageController._processed_events = set()
+    return SlackMessageController(
+        use_case=mock_use_case,
+        mapper=mock_mapper,
+        slack_service=mock_slack_service,
+        job_queue=mocker.AsyncMock(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_execute_only_enqueues_when_job_queue_is_enabled(
+    *,
+    queued_controller,
+    mock_use_case,
+    mock_mapper,
+    mock_slack_service,
+    mock_ack,
+    valid_body,
+    valid_event,
+    valid_slack_dto,
+):
+    """ジョブキュー有効時はイベントを登録するだけでワークフローを実行しないテスト"""
+    mock_mapper.from_event.return_value = valid_slack_dto
+    mock_mapper.is_bot_message.return_value = False
+
+    await queued_controller.execute(mock_ack, valid_body)
+
+    assert mock_ack.called
+    queued_controller._job_queue.enqueue.assert_called_once_with(
+        "1234567890.123456", valid_event
+    )
+    assert not mock_use_case.execute.called
+    assert not mock_slack_service.add_reaction.called
+
+
+@pytest.mark.asyncio
+async def test_execute_processes_directly_when_enqueue_fails(
+    *,
+    queued_controller,
+    mock_use_case,
+    mock_mapper,
+    mock_ack,
+    valid_body,
+    valid_slack_dto,
+):
+    """ジョブキューに登録できない場合はその場でワークフローを実行するテスト"""
+    mock_mapper.from_event.return_value = valid_slack_dto
+    mock_mapper.is_bot_message.return_value = False
+    mock_use_case.execute.return_value = AnswerToUserRequestOutput(
+        answer="回答", message_id=uuid4()
+    )
+    queued_controller._job_queue.enqueue.side_effect = RepositorySaveError(
+        "Job", RuntimeError("接続エラー")
+    )
+
+    await queued_controller.execute(mock_ack, valid_body)
+
+    assert mock_ack.called
+    assert mock_use_case.execute.called
+
+
+@pytest.mark.asyncio
+async def test_execute_does_not_enqueue_bot_message(
+    queued_controller, mock_mapper, mock_ack, valid_body
+):
+    """ボットメッセージはジョブキューに登録しないテスト"""
+    mock_mapper.from_event.return_value = SlackRequestDTO(
+        text="ボットメッセージ",
+        user_id="U12345",
+        channel_id="C12345",
+        message_ts="1234567890.123456",
+        event_id="1234567890.123456",
+        bot_id="B12345",
+    )
+    mock_mapper.is_bot_message.return_value = True
+
+    await queued_controller.execute(mock_ack, valid_body)
+
+    assert not queued_controller._job_queue.enqueue.called
+
+
+@pytest.mark.asyncio
+async def test_process_event_retries_without_notifying_before_last_attempt(
+    *,
+    controller,
+    mock_use_case,
+    mock_mapper,
+    mock_slack_service,
+    valid_event,
+    valid_slack_dto,
+):
+    """最後の試行以外はエラーを通知せずに送出し、再実行に任せるテスト"""
+    mock_mapper.from_event.return_value = valid_slack_dto
+    mock_mapper.is_bot_message.return_value = False
+    mock_use_case.execute.side_effect = AdmissionRejectedError("queue_full")
+
+    with pytest.raises(AdmissionRejectedError):
+        await controller.process_event(
+            valid_event, deduplicate=False, notify_errors=False
+        )
+
+    mock_use_case.execute.side_effect = InfrastructureException("エラー")
+    with pytest.raises(InfrastructureException):
+        await controller.process_event(
+            valid_event, deduplicate=False, notify_errors=False
+        )
+
+    assert mock_use_case.execute.call_count == 2
+    assert not mock_slack_service.send_message.called
+
+
+@pytest.mark.asyncio
+async def test_process_event_reuses_placeholder_across_attempts(
+    *,
+    mocker: MockerFixture,
+    mock_use_case,
+    mock_mapper,
+    mock_slack_service,
+    valid_event,
+    valid_slack_dto,
+):
+    """再実行では前の試行で投稿したプレースホルダーを使い回すテスト"""
+    controller = SlackMessageController(
+        use_case=mock_use_case,
+        mapper=mock_mapper,
+        slack_service=mock_slack_service,
+        streaming_enabled=True,
+    )
+    stream = mock_slack_service.start_streaming_message.return_value
+    stream.ts = "1234567890.000001"
+    on_placeholder_posted = mocker.AsyncMock()
+    mock_mapper.from_event.return_value = valid_slack_dto
+    mock_mapper.is_bot_message.return_value = False
+    mock_use_case.execute.side_effect = InfrastructureException("エラー")
+
+    with pytest.raises(InfrastructureException):
+        await controller.process_event(
+            valid_event,
+            deduplicate=False,
+            notify_errors=False,
+            on_placeholder_posted=on_placeholder_posted,
+        )
+
+    on_placeholder_posted.assert_called_once_with("1234567890.000001")
+    assert not stream.fail.called
+
+    on_placeholder_posted.reset_mock()
+    with pytest.raises(InfrastructureException):
+        await controller.process_event(
+            valid_event,
+            deduplicate=False,
+            notify_errors=False,
+            placeholder_ts="1234567890.000001",
+            on_placeholder_posted=on_placeholder_posted,
+        )
+
+    assert (
+        mock_slack_service.start_streaming_message.call_args.kwargs["placeholder_ts"]
+        == "1234567890.000001"
+    )
+    assert not on_placeholder_posted.called